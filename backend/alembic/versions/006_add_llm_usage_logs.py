@@ -0,0 +1,45 @@
+"""add llm usage logs table
+
+Revision ID: 006_add_llm_usage_logs
+Revises: 005_add_metrics_relations
+Create Date: 2025-10-12 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006_add_llm_usage_logs'
+down_revision = '005_add_metrics_relations'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'llm_usage_logs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('provider', sa.String(length=50), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('operation', sa.String(length=50), nullable=True),
+        sa.Column('prompt_tokens', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('completion_tokens', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('latency_ms', sa.Integer(), nullable=True),
+        sa.Column('success', sa.Boolean(), nullable=True, server_default=sa.text('true')),
+        sa.Column('streamed', sa.Boolean(), nullable=True, server_default=sa.text('false')),
+        sa.Column('usage_estimated', sa.Boolean(), nullable=True, server_default=sa.text('false')),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_llm_usage_logs_id'), 'llm_usage_logs', ['id'], unique=False)
+    op.create_index(op.f('ix_llm_usage_logs_created_at'), 'llm_usage_logs', ['created_at'], unique=False)
+    # 按提供商/模型统计时使用
+    op.create_index('idx_llm_usage_provider_model', 'llm_usage_logs', ['provider', 'model', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('idx_llm_usage_provider_model', table_name='llm_usage_logs')
+    op.drop_index(op.f('ix_llm_usage_logs_created_at'), table_name='llm_usage_logs')
+    op.drop_index(op.f('ix_llm_usage_logs_id'), table_name='llm_usage_logs')
+    op.drop_table('llm_usage_logs')
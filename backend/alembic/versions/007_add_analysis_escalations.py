@@ -0,0 +1,44 @@
+"""add analysis escalations table
+
+Revision ID: 007_add_analysis_escalations
+Revises: 006_add_llm_usage_logs
+Create Date: 2025-10-12 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007_add_analysis_escalations'
+down_revision = '006_add_llm_usage_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'analysis_escalations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('rule_score', sa.Float(), nullable=True),
+        sa.Column('rule_grade', sa.String(length=1), nullable=True),
+        sa.Column('num_platforms', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('threshold', sa.Float(), nullable=True),
+        sa.Column('escalated', sa.Boolean(), nullable=True, server_default=sa.text('false')),
+        sa.Column('reason', sa.String(length=50), nullable=True),
+        sa.Column('llm_score', sa.Float(), nullable=True),
+        sa.Column('llm_grade', sa.String(length=1), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_analysis_escalations_id'), 'analysis_escalations', ['id'], unique=False)
+    op.create_index(op.f('ix_analysis_escalations_project_id'), 'analysis_escalations', ['project_id'], unique=False)
+    op.create_index(op.f('ix_analysis_escalations_created_at'), 'analysis_escalations', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_analysis_escalations_created_at'), table_name='analysis_escalations')
+    op.drop_index(op.f('ix_analysis_escalations_project_id'), table_name='analysis_escalations')
+    op.drop_index(op.f('ix_analysis_escalations_id'), table_name='analysis_escalations')
+    op.drop_table('analysis_escalations')
@@ -0,0 +1,44 @@
+"""add scoring specs table and project spec version
+
+Revision ID: 008_add_scoring_specs
+Revises: 007_add_analysis_escalations
+Create Date: 2025-10-13 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008_add_scoring_specs'
+down_revision = '007_add_analysis_escalations'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'scoring_specs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.String(length=32), nullable=False),
+        sa.Column('spec', sa.JSON(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True, server_default=sa.text('false')),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('version')
+    )
+    op.create_index(op.f('ix_scoring_specs_id'), 'scoring_specs', ['id'], unique=False)
+    op.create_index(op.f('ix_scoring_specs_is_active'), 'scoring_specs', ['is_active'], unique=False)
+
+    op.add_column('projects', sa.Column('scoring_spec_version', sa.String(length=32), nullable=True))
+    op.create_index(op.f('ix_projects_scoring_spec_version'), 'projects', ['scoring_spec_version'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_projects_scoring_spec_version'), table_name='projects')
+    op.drop_column('projects', 'scoring_spec_version')
+
+    op.drop_index(op.f('ix_scoring_specs_is_active'), table_name='scoring_specs')
+    op.drop_index(op.f('ix_scoring_specs_id'), table_name='scoring_specs')
+    op.drop_table('scoring_specs')
@@ -0,0 +1,24 @@
+"""add per-dimension score input hashes to projects
+
+Revision ID: 009_add_score_input_hashes
+Revises: 008_add_scoring_specs
+Create Date: 2025-10-14 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009_add_score_input_hashes'
+down_revision = '008_add_scoring_specs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('projects', sa.Column('score_input_hashes', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('projects', 'score_input_hashes')
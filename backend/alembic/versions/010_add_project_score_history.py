@@ -0,0 +1,67 @@
+"""add partitioned project score history
+
+Revision ID: 010_add_project_score_history
+Revises: 009_add_score_input_hashes
+Create Date: 2025-10-14 12:00:00.000000
+
+"""
+from datetime import datetime, timedelta
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010_add_project_score_history'
+down_revision = '009_add_score_input_hashes'
+branch_labels = None
+depends_on = None
+
+
+def _month_start(ts):
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.create_table(
+            'project_score_history',
+            sa.Column('project_id', sa.Integer(), nullable=False),
+            sa.Column('recorded_at', sa.TIMESTAMP(), nullable=False),
+            *(sa.Column(name, sa.SmallInteger(), nullable=True) for name in (
+                'overall', 'team', 'tech', 'community', 'tokenomics', 'market_timing', 'risk'
+            )),
+            sa.PrimaryKeyConstraint('project_id', 'recorded_at')
+        )
+        return
+
+    # 按月范围分区; 之后的分区由 ScoreHistoryStore 在写入前创建
+    op.execute("""
+        CREATE TABLE project_score_history (
+            project_id INTEGER NOT NULL,
+            recorded_at TIMESTAMP NOT NULL,
+            overall SMALLINT,
+            team SMALLINT,
+            tech SMALLINT,
+            community SMALLINT,
+            tokenomics SMALLINT,
+            market_timing SMALLINT,
+            risk SMALLINT,
+            PRIMARY KEY (project_id, recorded_at)
+        ) PARTITION BY RANGE (recorded_at)
+    """)
+    month = _month_start(datetime.utcnow())
+    for start in (month, _next_month(month)):
+        op.execute(
+            f"CREATE TABLE project_score_history_{start:%Y%m} PARTITION OF project_score_history "
+            f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{_next_month(start):%Y-%m-%d}')"
+        )
+
+
+def downgrade():
+    # 分区随父表一起删除
+    op.execute("DROP TABLE IF EXISTS project_score_history CASCADE")
@@ -0,0 +1,24 @@
+"""add input hash to investment action plans
+
+Revision ID: 011_add_action_plan_input_hash
+Revises: 010_add_project_score_history
+Create Date: 2025-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011_add_action_plan_input_hash'
+down_revision = '010_add_project_score_history'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('investment_action_plans', sa.Column('input_hash', sa.String(length=16), nullable=True))
+
+
+def downgrade():
+    op.drop_column('investment_action_plans', 'input_hash')
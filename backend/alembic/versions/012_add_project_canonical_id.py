@@ -0,0 +1,26 @@
+"""add canonical project id for entity resolution
+
+Revision ID: 012_add_project_canonical_id
+Revises: 011_add_action_plan_input_hash
+Create Date: 2025-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012_add_project_canonical_id'
+down_revision = '011_add_action_plan_input_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('projects', sa.Column('canonical_project_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_projects_canonical_project_id'), 'projects', ['canonical_project_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_projects_canonical_project_id'), table_name='projects')
+    op.drop_column('projects', 'canonical_project_id')
@@ -0,0 +1,32 @@
+"""add canonical keys to project discoveries
+
+Revision ID: 013_add_discovery_keys
+Revises: 012_add_project_canonical_id
+Create Date: 2025-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013_add_discovery_keys'
+down_revision = '012_add_project_canonical_id'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('project_discoveries', sa.Column('discovery_key', sa.String(length=320), nullable=True))
+    op.add_column('project_discoveries', sa.Column('canonical_project_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_project_discoveries_discovery_key'), 'project_discoveries', ['discovery_key'], unique=True)
+    op.create_index(
+        op.f('ix_project_discoveries_canonical_project_id'), 'project_discoveries', ['canonical_project_id'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_project_discoveries_canonical_project_id'), table_name='project_discoveries')
+    op.drop_index(op.f('ix_project_discoveries_discovery_key'), table_name='project_discoveries')
+    op.drop_column('project_discoveries', 'canonical_project_id')
+    op.drop_column('project_discoveries', 'discovery_key')
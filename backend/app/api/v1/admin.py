@@ -343,11 +343,16 @@ async def save_ai_configs(
         saved_count += 1
     
     db.commit()
+
+    # 通知所有API进程和Celery worker重新加载, 无需重启
+    from app.services.analyzers.ai_analyzer import ai_analyzer, provider_config_store
+    provider_config_store.publish_change()
     
     return {
         "success": True,
         "message": f"已保存{saved_count}个AI配置",
-        "saved_count": saved_count
+        "saved_count": saved_count,
+        "active_providers": ai_analyzer.configured_providers()
     }
 
 
@@ -381,6 +386,150 @@ async def get_ai_configs(db: Session = Depends(get_db)) -> Dict[str, Any]:
     }
 
 
+@router.get("/ai-providers/health")
+async def get_ai_providers_health() -> Dict[str, Any]:
+    """获取各AI提供商的路由健康状况(p95延迟、错误率、熔断状态)"""
+    from app.services.analyzers.ai_analyzer import ai_analyzer
+    from app.services.analyzers.provider_router import provider_router
+
+    return {
+        "success": True,
+        "providers": ai_analyzer.configured_providers(),
+        "health": provider_router.get_stats()
+    }
+
+
+@router.get("/llm-usage")
+async def get_llm_usage(days: int = 7, db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """按提供商/模型/调用场景统计LLM的token用量和延迟"""
+    from sqlalchemy import text
+
+    rows = db.execute(text("""
+        SELECT
+            provider,
+            model,
+            operation,
+            COUNT(*) AS calls,
+            SUM(CASE WHEN success THEN 0 ELSE 1 END) AS failures,
+            COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens,
+            COALESCE(SUM(completion_tokens), 0) AS completion_tokens,
+            AVG(prompt_tokens) FILTER (WHERE success) AS avg_prompt_tokens,
+            AVG(completion_tokens) FILTER (WHERE success) AS avg_completion_tokens,
+            AVG(latency_ms) FILTER (WHERE success) AS avg_latency_ms,
+            PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY latency_ms) FILTER (WHERE success) AS p95_latency_ms
+        FROM llm_usage_logs
+        WHERE created_at >= NOW() - make_interval(days => :days)
+        GROUP BY provider, model, operation
+        ORDER BY provider, model, operation
+    """), {"days": days}).fetchall()
+
+    def as_number(value):
+        return round(float(value), 1) if value is not None else None
+
+    return {
+        "success": True,
+        "days": days,
+        "usage": [
+            {
+                "provider": row.provider,
+                "model": row.model,
+                "operation": row.operation,
+                "calls": row.calls,
+                "failures": row.failures,
+                "prompt_tokens": row.prompt_tokens,
+                "completion_tokens": row.completion_tokens,
+                "avg_prompt_tokens": as_number(row.avg_prompt_tokens),
+                "avg_completion_tokens": as_number(row.avg_completion_tokens),
+                "avg_latency_ms": as_number(row.avg_latency_ms),
+                "p95_latency_ms": as_number(row.p95_latency_ms),
+            }
+            for row in rows
+        ]
+    }
+
+
+@router.get("/analysis-escalations/stats")
+async def get_analysis_escalation_stats(days: int = 7, db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """分级分析统计: 升级率、各原因占比、按规则评分分桶的LLM结果（用于调整升级阈值）"""
+    from sqlalchemy import text
+    from app.core.config import settings
+
+    params = {"days": days, "threshold": settings.AI_ESCALATION_MIN_SCORE}
+    window = "created_at >= NOW() - make_interval(days => :days)"
+
+    summary = db.execute(text(f"""
+        SELECT
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE escalated) AS escalated,
+            COUNT(*) FILTER (WHERE reason = 'score') AS by_score,
+            COUNT(*) FILTER (WHERE reason = 'cross_platform') AS by_cross_platform,
+            AVG(llm_score) AS avg_llm_score,
+            COUNT(*) FILTER (WHERE llm_score >= :threshold) AS llm_confirmed
+        FROM analysis_escalations
+        WHERE {window}
+    """), params).fetchone()
+
+    buckets = db.execute(text(f"""
+        SELECT
+            FLOOR(rule_score / 10) * 10 AS bucket,
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE escalated) AS escalated,
+            AVG(llm_score) AS avg_llm_score,
+            AVG(llm_score - rule_score) AS avg_llm_delta
+        FROM analysis_escalations
+        WHERE {window}
+        GROUP BY bucket
+        ORDER BY bucket
+    """), params).fetchall()
+
+    def as_number(value):
+        return round(float(value), 1) if value is not None else None
+
+    return {
+        "success": True,
+        "days": days,
+        "threshold": settings.AI_ESCALATION_MIN_SCORE,
+        "min_platforms": settings.AI_ESCALATION_MIN_PLATFORMS,
+        "total": summary.total,
+        "escalated": summary.escalated,
+        "escalation_rate": round(summary.escalated / summary.total, 3) if summary.total else 0.0,
+        "by_reason": {
+            "score": summary.by_score,
+            "cross_platform": summary.by_cross_platform,
+        },
+        "avg_llm_score": as_number(summary.avg_llm_score),
+        # 升级后LLM评分仍达到阈值的比例, 过低说明阈值偏松
+        "llm_confirm_rate": round(summary.llm_confirmed / summary.escalated, 3) if summary.escalated else None,
+        "buckets": [
+            {
+                "rule_score_from": int(row.bucket) if row.bucket is not None else None,
+                "total": row.total,
+                "escalated": row.escalated,
+                "avg_llm_score": as_number(row.avg_llm_score),
+                "avg_llm_delta": as_number(row.avg_llm_delta),
+            }
+            for row in buckets
+        ]
+    }
+
+
+@router.get("/scoring-spec")
+async def get_scoring_spec() -> Dict[str, Any]:
+    """获取当前启用的评分规范和所有可用版本"""
+    from app.services.scoring_engine import scoring_engine
+    from app.services.scoring_spec import scoring_spec_store
+
+    spec = scoring_spec_store.current()
+    return {
+        "success": True,
+        "version": spec.version,
+        "source": spec.source,
+        "spec": spec.spec,
+        "versions": scoring_spec_store.list_versions(),
+        "dimension_cache": scoring_engine.score_cache.hit_rates(),  # 各进程合计（Redis 不可用时为本进程）
+    }
+
+
 @router.post("/test-ai")
 async def test_ai_connection(request: AITestRequest) -> AITestResponse:
     """测试AI API连接"""
@@ -636,6 +785,19 @@ async def get_pending_projects(
                 "created_at": row[11].isoformat() if row[11] else None
             })
         
+        # 附上发现记录的热度/突发信号（按规范项目键索引查找）
+        from app.services.discovery_store import discovery_store
+        discoveries = discovery_store.find(db, [(project["name"], None) for project in projects])
+        for project in projects:
+            discovery = discoveries.get((project["name"], None))
+            project["discovery"] = {
+                "heat_score": discovery["heat_score"],
+                "is_trending": discovery["is_trending"],
+                "is_surge": discovery["is_surge"],
+                "num_platforms": discovery["num_platforms"],
+                "signal_strength": discovery["signal_strength"],
+            } if discovery else None
+        
         # 统计数据
         stats_result = db.execute(text("""
             SELECT 
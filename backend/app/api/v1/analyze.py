@@ -52,8 +52,8 @@ async def analyze_project(request: AnalyzeRequest):
     if request.engagement:
         project_data["engagement"] = request.engagement
     
-    # 执行分析
-    analysis = ai_analyzer.analyze_full_project(project_data)
+    # 执行分析（异步调用LLM,不阻塞事件循环）
+    analysis = await ai_analyzer.analyze_full_project_async(project_data)
     
     # 检测风险
     risks = risk_detector.detect_risks(project_data)
@@ -93,23 +93,15 @@ async def quick_score(request: AnalyzeRequest):
     # 计算综合评分
     from app.services.analyzers.scorer import project_scorer
     
-    overall_score = project_scorer.calculate_overall_score(
-        team_score=scores["team"],
-        tech_score=scores["technology"],
-        community_score=scores["community"],
-        tokenomics_score=scores["tokenomics"],
-        market_timing_score=scores["market_timing"],
-        risk_score=scores["risk"],
-    )
-    
-    grade = project_scorer.calculate_grade(overall_score)
+    evaluation = project_scorer.evaluate(scores)
     
     return {
         "success": True,
         "data": {
-            "overall_score": overall_score,
-            "grade": grade,
+            "overall_score": evaluation["overall_score"],
+            "grade": evaluation["grade"],
             "scores": scores,
+            "spec_version": evaluation["spec_version"],
         }
     }
 
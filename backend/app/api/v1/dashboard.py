@@ -163,13 +163,53 @@ async def get_recent_projects(
         }
 
 
+@router.get("/trending-discoveries")
+async def get_trending_discoveries(
+    limit: int = 20,
+    min_heat: int = 0,
+    surge_only: bool = False,
+    sort: str = "heat",
+    min_signal: int = 0,
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    获取热度最高的项目发现记录（读取 project_discoveries, 发现任务每次运行后更新）
+    surge_only: 只返回突发项目
+    sort: heat 按热度 / signal 按信号强度（此时按 min_signal 过滤, 忽略 min_heat 和 surge_only）
+    """
+    from app.services.discovery_store import discovery_store
+    
+    try:
+        if sort == "signal":
+            items = discovery_store.strongest(db, limit=limit, min_signal=min_signal)
+        else:
+            items = discovery_store.trending(db, limit=limit, min_heat=min_heat, surge_only=surge_only)
+        for item in items:
+            for field in ("first_discovered_at", "last_mentioned_at", "updated_at"):
+                item[field] = item[field].isoformat() if item[field] else None
+        
+        return {
+            "success": True,
+            "data": {
+                "items": items,
+                "count": len(items)
+            }
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "data": None
+        }
+
+
 @router.get("/top-projects")
 async def get_top_projects(
     limit: int = 10,
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
     """
-    获取Top N高分项目（去重，相同名称只保留评分最高的）
+    获取Top N高分项目（去重，同一规范项目只保留评分最高的，见 entity_resolution）
     """
     try:
         result = db.execute(text("""
@@ -185,7 +225,7 @@ async def get_top_projects(
                     team_score,
                     tech_score,
                     community_score,
-                    ROW_NUMBER() OVER (PARTITION BY LOWER(TRIM(project_name)) ORDER BY overall_score DESC, created_at DESC) as rn
+                    ROW_NUMBER() OVER (PARTITION BY COALESCE(canonical_project_id, id) ORDER BY overall_score DESC, created_at DESC) as rn
                 FROM projects
                 WHERE overall_score IS NOT NULL
             )
@@ -1,7 +1,10 @@
 """项目相关API"""
 
+import json
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from loguru import logger
 from sqlalchemy.orm import Session
 from app.db import get_db
 from app.models import Project
@@ -119,6 +122,48 @@ async def list_projects(
     )
 
 
+@router.get(
+    "/launch-candidates",
+    summary="发币概率最高的项目",
+    description="按发币概率排序的项目列表（读取批量预测结果）"
+)
+async def list_launch_candidates(
+    limit: int = Query(20, ge=1, le=100, description="数量"),
+    min_probability: int = Query(0, ge=0, le=100, description="最低发币概率"),
+    db: Session = Depends(get_db)
+):
+    """发币概率最高的项目（refresh_predictions 任务每小时更新）"""
+    from app.services.prediction_store import prediction_store
+
+    return {
+        "success": True,
+        "data": {
+            "projects": prediction_store.top_launch_candidates(db, limit, min_probability)
+        }
+    }
+
+
+@router.get(
+    "/airdrop-estimates",
+    summary="空投估值最高的项目",
+    description="按空投估值排序的项目列表（读取批量估值结果）"
+)
+async def list_airdrop_estimates(
+    limit: int = Query(20, ge=1, le=100, description="数量"),
+    min_value_usd: int = Query(0, ge=0, description="最低估值(USD)"),
+    db: Session = Depends(get_db)
+):
+    """空投估值最高的项目（refresh_predictions 任务每小时更新）"""
+    from app.services.prediction_store import prediction_store
+
+    return {
+        "success": True,
+        "data": {
+            "projects": prediction_store.top_airdrop_estimates(db, limit, min_value_usd)
+        }
+    }
+
+
 @router.get(
     "/{project_id}",
     response_model=ProjectDetailResponse,
@@ -263,6 +308,65 @@ async def get_project(
     )
 
 
+@router.get(
+    "/{project_id}/analysis/stream",
+    summary="流式生成AI详细分析",
+    description="通过Server-Sent Events推送AI详细分析, 摘要/核心特性/投资建议等字段生成完即推送"
+)
+async def stream_project_analysis(
+    project_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    流式生成项目详细分析
+
+    事件类型: start, summary, key_features, investment_suggestion, error, done
+    (done 携带完整结果, 并会写入 ai_analysis 表)
+    """
+    from app.services.analyzers.ai_analyzer import ai_analyzer
+    from app.tasks.analyzers import build_detailed_analysis_input, save_detailed_analysis
+
+    try:
+        if isinstance(project_id, str) and project_id.startswith("proj_"):
+            pid = int(project_id.replace("proj_", ""))
+        else:
+            pid = int(project_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid project ID format")
+
+    project = db.query(Project).filter(Project.id == pid).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    project_data = build_detailed_analysis_input(db, project)
+
+    def sse(event: str, data) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+    async def event_stream():
+        # 立即推送start事件, 前端无需等待LLM首个token
+        yield sse("start", {"project_id": f"proj_{project.id}", "name": project.project_name})
+
+        failed = False
+        async for field, value in ai_analyzer.stream_detailed_analysis(project_data):
+            if field == "error":
+                failed = True
+            elif field == "done" and not failed:
+                try:
+                    save_detailed_analysis(db, project, value)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"❌ Failed to save streamed analysis for project {project.id}: {e}")
+            yield sse(field, value)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get(
     "/{project_id}/history",
     summary="获取项目历史数据",
@@ -274,16 +378,61 @@ async def get_project_history(
     days: int = Query(7, ge=1, le=90, description="天数"),
     db: Session = Depends(get_db)
 ):
-    """获取项目历史数据"""
-    
-    # TODO: 实现历史数据查询
-    
+    """获取项目历史数据
+
+    - **score**: 评分历史（只在评分变化时记录, 每个点即一次变化; 第一个点是窗口开始时仍有效的评分）
+    - **social** / **onchain**: 指标快照
+    所有查询都是 (project_id, 时间) 索引上的一次范围扫描
+    """
+    from datetime import datetime, timedelta
+    from app.models.project import SocialMetrics, OnchainMetrics
+    from app.services.score_history import score_history
+
+    metric_models = {"social": SocialMetrics, "onchain": OnchainMetrics}
+    if metric != "score" and metric not in metric_models:
+        raise HTTPException(status_code=400, detail="Invalid metric type")
+
+    try:
+        if isinstance(project_id, str) and project_id.startswith("proj_"):
+            pid = int(project_id.replace("proj_", ""))
+        else:
+            pid = int(project_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid project ID format")
+
+    if not db.query(Project.id).filter(Project.id == pid).first():
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    since = datetime.utcnow() - timedelta(days=days)
+    if metric == "score":
+        time_series = score_history.series(db, pid, since)
+    else:
+        model = metric_models[metric]
+        columns = [
+            column for column in model.__table__.columns
+            if column.name not in ("id", "project_id", "snapshot_time")
+        ]
+        rows = db.query(model.snapshot_time, *columns).filter(
+            model.project_id == pid,
+            model.snapshot_time >= since
+        ).order_by(model.snapshot_time).all()
+        time_series = [
+            {
+                "timestamp": row.snapshot_time,
+                **{
+                    column.name: float(value) if value is not None and not isinstance(value, int) else value
+                    for column, value in zip(columns, row[1:])
+                },
+            }
+            for row in rows
+        ]
+
     return {
         "success": True,
         "data": {
-            "project_id": project_id,
+            "project_id": f"proj_{pid}",
             "metric_type": metric,
-            "time_series": []
+            "days": days,
+            "time_series": time_series
         }
     }
-
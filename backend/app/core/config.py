@@ -1,6 +1,6 @@
 """应用配置管理"""
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
@@ -49,7 +49,59 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = None
     ANTHROPIC_API_KEY: Optional[str] = None
     DEEPSEEK_API_KEY: Optional[str] = None  # DeepSeek AI (国内)
-    
+
+    # AI调用限流 (每个提供商独立计数)
+    AI_MAX_CONCURRENCY: int = 4  # 同时在途请求数
+    AI_RPM_LIMIT: int = 60  # 每分钟请求数
+    AI_TPM_LIMIT: int = 120000  # 每分钟token数
+    AI_PROVIDER_LIMITS: Dict[str, Dict[str, int]] = {}  # 按提供商覆盖, 如 {"deepseek": {"concurrency": 8, "rpm": 300}}
+    AI_CONFIG_CHECK_INTERVAL_SECONDS: float = 30.0  # Redis订阅不可用时检查数据库配置版本的间隔
+
+    # 压测/离线调试: 指向本地替身服务 (scripts/llm_standin_server.py), 支持 {provider} 占位符
+    AI_BASE_URL_OVERRIDE: Optional[str] = None  # 如 "http://localhost:8900/{provider}/v1"
+    AI_RECORD_PATH: Optional[str] = None  # 录制真实调用的响应和耗时(JSONL), 供替身服务回放
+
+    # AI提供商路由 (健康统计 / 熔断 / 对冲请求)
+    AI_REQUEST_TIMEOUT_SECONDS: float = 60.0  # 单次请求超时
+    AI_ROUTER_WINDOW: int = 50  # 滚动统计窗口(请求数)
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = 3  # 连续失败多少次后熔断
+    AI_CIRCUIT_COOLDOWN_SECONDS: float = 60.0  # 熔断冷却时间, 之后放行一个探测请求
+    AI_DEGRADED_ERROR_RATE: float = 0.5  # 错误率超过该值时降低路由优先级
+    AI_SLOW_PROVIDER_SECONDS: float = 20.0  # p95延迟超过该值时降低路由优先级
+    AI_HEDGE_DEFAULT_DELAY_SECONDS: float = 10.0  # 样本不足时的对冲等待时间
+
+    # 提示词token预算 (描述、推文等可变字段的总token上限)
+    AI_PROMPT_TOKEN_BUDGET: int = 1500
+    AI_ENRICH_PROMPT_TOKEN_BUDGET: int = 600
+    AI_USAGE_LOG_ENABLED: bool = True  # 记录每次调用的token用量和耗时到 llm_usage_logs
+
+    # 分级分析 (规则预筛选后才调用LLM)
+    AI_TIERED_ANALYSIS: bool = True
+    AI_ESCALATION_MIN_SCORE: float = 55.0  # 规则综合评分达到该值升级到LLM
+    AI_ESCALATION_MIN_PLATFORMS: int = 2  # 或在至少这么多平台出现
+
+    # 评分规范 (scoring_specs 表 / app/services/scoring_specs/v*.json)
+    SCORING_SPEC_CHECK_INTERVAL_SECONDS: float = 60.0  # 检查数据库启用版本的间隔
+
+    # 关键词匹配自动机 (twitter_keywords / platform_search_rules 变化后重建)
+    KEYWORD_MATCHER_CHECK_INTERVAL_SECONDS: float = 60.0
+
+    # 整库风险复查 (RiskDetector.detect_risks_many) 的进程数, 0 = CPU核数
+    RISK_CHECK_WORKERS: int = 0
+
+    # 评分回测 (scripts/run_backtest.py) 的进程数, 0 = CPU核数
+    BACKTEST_WORKERS: int = 0
+
+    # 评分权重拟合 (ai_learning_feedback 审核结果 → 新评分规范版本, 每晚 fit_scoring_weights)
+    WEIGHT_FIT_MIN_REVIEWS: int = 200  # 审核样本少于该值时不拟合
+    WEIGHT_FIT_L2: float = 1.0  # 逻辑回归L2正则强度
+    WEIGHT_FIT_BLEND: float = 0.5  # 新权重 = blend × 拟合权重 + (1 - blend) × 当前权重
+    WEIGHT_FIT_MIN_WEIGHT: float = 0.02  # 每个维度的最低权重
+
+    # 已知项目词典快照 (rebuild_gazetteer 任务写入, 各进程只读 mmap 共享; 多机部署时指向共享卷)
+    GAZETTEER_PATH: str = "/tmp/web3-alpha-hunter/gazetteer.bin"
+    GAZETTEER_CHECK_INTERVAL_SECONDS: float = 60.0  # 检查快照替换和新增项目的间隔
+
     # Twitter API
     TWITTER_API_KEY: Optional[str] = None
     TWITTER_API_SECRET: Optional[str] = None
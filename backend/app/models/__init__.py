@@ -5,6 +5,7 @@ from app.models.project import (
     SocialMetrics,
     OnchainMetrics,
     AIAnalysis,
+    ProjectScoreHistory,
 )
 
 from app.models.prediction import (
@@ -26,6 +27,9 @@ from app.models.kol import (
 from app.models.ai_system import (
     AIWorkConfig,
     AILearningFeedback,
+    LLMUsageLog,
+    AnalysisEscalation,
+    ScoringSpec,
 )
 
 from app.models.platform import (
@@ -44,6 +48,7 @@ __all__ = [
     "SocialMetrics",
     "OnchainMetrics",
     "AIAnalysis",
+    "ProjectScoreHistory",
     "PendingProject",
 
     # 预测相关
@@ -64,6 +69,9 @@ __all__ = [
     "AIConfig",
     "AIWorkConfig",
     "AILearningFeedback",
+    "LLMUsageLog",
+    "AnalysisEscalation",
+    "ScoringSpec",
 
     # 平台监控相关
     "PlatformSearchRule",
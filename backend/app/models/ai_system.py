@@ -1,8 +1,8 @@
 """
-AI系统相关模型 - AI配置和学习反馈
+AI系统相关模型 - AI配置、学习反馈、LLM调用记录和评分规范
 """
 
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, JSON, Index
 from sqlalchemy.sql import func
 from app.db.session import Base
 
@@ -65,3 +65,74 @@ class AILearningFeedback(Base):
 
     def __repr__(self):
         return f"<AILearningFeedback id={self.id} type={self.feedback_type} decision={self.user_decision}>"
+
+
+class LLMUsageLog(Base):
+    """LLM调用记录表 - 每次调用的token用量和耗时, 用于成本/延迟统计"""
+    __tablename__ = "llm_usage_logs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    provider = Column(String(50), nullable=False, comment="提供商: deepseek, claude, openai")
+    model = Column(String(100), nullable=False, comment="模型名称")
+    operation = Column(String(50), comment="调用场景: project_text, detailed_analysis, enrich")
+
+    prompt_tokens = Column(Integer, default=0, comment="输入token数")
+    completion_tokens = Column(Integer, default=0, comment="输出token数")
+    latency_ms = Column(Integer, comment="调用耗时(毫秒)")
+
+    success = Column(Boolean, default=True, comment="是否成功")
+    streamed = Column(Boolean, default=False, comment="是否流式调用")
+    usage_estimated = Column(Boolean, default=False, comment="token数是否为本地估算(提供商未返回usage)")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    __table_args__ = (
+        Index('idx_llm_usage_provider_model', 'provider', 'model', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f"<LLMUsageLog {self.provider}/{self.model} {self.prompt_tokens}+{self.completion_tokens} tokens>"
+
+
+class AnalysisEscalation(Base):
+    """分级分析记录表 - 规则预筛选的决策和LLM结果, 用于调整升级阈值"""
+    __tablename__ = "analysis_escalations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, nullable=False, index=True, comment="项目ID")
+
+    # 规则预筛选
+    rule_score = Column(Float, comment="规则综合评分")
+    rule_grade = Column(String(1), comment="规则等级")
+    num_platforms = Column(Integer, default=0, comment="跨平台信号数")
+    threshold = Column(Float, comment="决策时的升级阈值")
+
+    # 决策
+    escalated = Column(Boolean, default=False, comment="是否升级到LLM")
+    reason = Column(String(50), comment="决策原因: score, cross_platform, below_threshold")
+
+    # LLM结果（仅升级的项目）
+    llm_score = Column(Float, comment="LLM综合评分")
+    llm_grade = Column(String(1), comment="LLM等级")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<AnalysisEscalation project={self.project_id} rule={self.rule_score} escalated={self.escalated}>"
+
+
+class ScoringSpec(Base):
+    """评分规范版本表 - 权重/因子表/分级阈值的声明式定义, 启用的最新版本供所有评分器使用"""
+    __tablename__ = "scoring_specs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    version = Column(String(32), nullable=False, unique=True, comment="版本号, 如 v2")
+    spec = Column(JSON, nullable=False, comment="评分规范 (格式同 app/services/scoring_specs/v1.json)")
+    is_active = Column(Boolean, default=False, index=True, comment="是否启用")
+    notes = Column(Text, comment="发布说明")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<ScoringSpec {self.version} active={self.is_active}>"
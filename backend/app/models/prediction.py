@@ -126,6 +126,7 @@ class InvestmentActionPlan(Base):
     # 状态
     status = Column(String(20), default="active")  # active, completed, cancelled
     completion_percentage = Column(Integer, default=0)  # 0-100
+    input_hash = Column(String(16))  # 生成计划的输入指纹（分级/评分/预算输入）, 不变时批量任务不重新生成
     
     # 时间戳
     created_at = Column(TIMESTAMP, server_default=func.now())
@@ -149,6 +150,8 @@ class ProjectDiscovery(Base):
     
     # 项目信息
     project_name = Column(String(255), nullable=False, index=True)
+    discovery_key = Column(String(320), unique=True, index=True)  # 规范项目键: id:<规范项目ID> 或 name:<小写名称>
+    canonical_project_id = Column(Integer, index=True)  # 已知项目的规范项目ID（见 entity_resolution）
     
     # 发现数据
     total_mentions = Column(Integer)  # 总提及次数
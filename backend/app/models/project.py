@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
-    Column, String, Integer, Text, DECIMAL, 
+    Column, String, Integer, SmallInteger, Text, DECIMAL, 
     TIMESTAMP, Index, JSON, ForeignKey
 )
 from sqlalchemy.orm import relationship
@@ -45,6 +45,8 @@ class Project(Base):
     risk_score = Column(DECIMAL(5, 2))
     
     grade = Column(String(1), index=True)  # S, A, B, C
+    scoring_spec_version = Column(String(32), index=True)  # 规则评分所用的评分规范版本
+    score_input_hashes = Column(JSON)  # 各维度评分输入哈希 {维度: 哈希}, 批量重算时跳过输入未变化的项目
     
     # 关联外键
     social_metrics_id = Column(Integer, ForeignKey('social_metrics.id', ondelete='SET NULL'), nullable=True, index=True)
@@ -52,6 +54,7 @@ class Project(Base):
     
     # 状态
     status = Column(String(50), default="discovered")  # discovered, analyzing, published, archived
+    canonical_project_id = Column(Integer, index=True)  # 实体消歧后的规范项目ID（簇内最小ID, 规范项目指向自己; 空表示未处理）
     first_discovered_at = Column(TIMESTAMP, server_default=func.now(), index=True)
     last_updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
     
@@ -80,6 +83,28 @@ class Project(Base):
         return f"<Project(id={self.id}, name='{self.project_name}', grade='{self.grade}', score={self.overall_score})>"
 
 
+class ProjectScoreHistory(Base):
+    """项目评分历史
+    
+    紧凑存储: 分数×100 存为SMALLINT（保留两位小数）, 主键 (project_id, recorded_at)
+    即按项目的时间范围索引; PostgreSQL 中按月分区（见 services/score_history）。
+    与该项目上一行完全相同的评分不再写入。
+    """
+    
+    __tablename__ = "project_score_history"
+    
+    project_id = Column(Integer, primary_key=True)
+    recorded_at = Column(TIMESTAMP, primary_key=True)
+    
+    overall = Column(SmallInteger)
+    team = Column(SmallInteger)
+    tech = Column(SmallInteger)
+    community = Column(SmallInteger)
+    tokenomics = Column(SmallInteger)
+    market_timing = Column(SmallInteger)
+    risk = Column(SmallInteger)
+
+
 class SocialMetrics(Base):
     """社交媒体指标"""
     
@@ -1,10 +1,214 @@
-"""投资行动指南生成器"""
+"""投资行动指南生成器
 
-from typing import Dict, List
+步骤、预算明细、监控指标和止损条件按分类预编译成模板（模块加载时一次）,
+生成计划时只代入项目名、主网和按比例算好的预算金额。
+批量模式一次填充多个项目, 由 generate_action_plans 任务按输入哈希只重新生成有变化的计划。
+"""
+
+import hashlib
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
 from datetime import date, datetime, timedelta
 from pydantic import BaseModel
 from loguru import logger
 
+WRITE_CHUNK = 1000
+
+# 模板中可用的预算金额占位符: {b60} = int(budget * 0.60)
+BUDGET_SHARES = {
+    "b05": 0.05, "b10": 0.1, "b15": 0.15, "b20": 0.2,
+    "b30": 0.3, "b50": 0.5, "b60": 0.6, "b70": 0.7,
+}
+
+# 步骤模板: (行动, 截止时间, 费用估算, 优先级, 备注), 可用占位符见 _template_values
+DEFI_STEP_TEMPLATES = (
+    ("创建新钱包或准备专用钱包", "立即", "¥0", "high", "建议使用新钱包，避免关联"),
+    ("准备资金并桥接到{blockchain}", "24小时内", "¥{b60} + 跨链费约¥{b05}", "high", "主网: {chain_note}"),
+    ("加入官方社区（Twitter + Telegram + Discord）", "24小时内", "¥0", "medium", "关注官方公告"),
+    ("存入资金到协议（分3-5次，每次约¥{b15}）", "3天内完成首次", "¥{b60}", "high", "分批操作更像真实用户"),
+    ("执行多样化交易（至少10笔不同类型）", "持续进行", "Gas费约¥{b15}", "high", "包括：存款、取款、Swap、添加流动性等"),
+    ("保持协议活跃度（每周2-3笔交易）", "持续至快照", "Gas费计入Step 5", "medium", "活跃用户通常获得更多空投"),
+)
+L2_STEP_TEMPLATES = DEFI_STEP_TEMPLATES[:3] + (
+    ("使用官方桥接资产到{project_name}", "3天内", "¥{b50} + 桥接费约¥{b05}", "high", "官方桥: {official_bridge}"),
+    ("在L2上使用至少5个不同的Dapp", "2周内完成首轮", "Gas费约¥{b10}（L2 Gas费较低）", "high", "包括：DEX、借贷、NFT市场、游戏等"),
+    ("执行多样化交易（每个Dapp至少3笔）", "持续进行", "Gas费计入Step 5", "high", "交易类型越多样，空投概率越大"),
+)
+NFT_STEP_TEMPLATES = (
+    ("加入项目Discord并完成身份验证", "立即", "¥0", "high", "Discord是NFT项目的核心社区"),
+    ("获取社区身份角色", "1周内", "¥0（时间成本）", "high", "有些角色是白名单的前提"),
+    ("积极参与社区活动（每周至少5条发言）", "持续进行", "¥0（时间成本）", "high", "活跃度是白名单筛选的重要指标"),
+    ("完成Crew3/Zealy/Galxe平台任务", "任务截止前", "¥0-200", "high", "查看项目公告了解具体平台"),
+    ("白名单开放时立即申请", "白名单开放时", "¥0", "critical", "设置提醒，避免错过"),
+    ("Mint NFT（预算¥{b70}，建议2-3个）", "Mint开启后2小时内", "¥{b70} + Gas费约¥{b10}", "critical", "设置好Gas，确保交易成功"),
+)
+
+# 预算明细模板: {项目: (比例, 说明)}
+BUDGET_BREAKDOWN_TEMPLATES = {
+    "DeFi": {
+        "协议存款": (0.60, "存入协议赚取收益"),
+        "交易Gas费": (0.15, "各类交易手续费"),
+        "跨链桥接费": (0.05, "资金桥接费用"),
+        "应急储备": (0.20, "应对突发情况"),
+    },
+    "Layer2": {
+        "桥接资产": (0.50, "桥接到L2的主要资金"),
+        "Dapp交互": (0.20, "在各Dapp上的操作资金"),
+        "Gas费": (0.10, "L1+L2的Gas费"),
+        "应急储备": (0.20, "灵活应对"),
+    },
+    "NFT": {
+        "NFT Mint": (0.70, "铸造NFT的主要费用"),
+        "Gas费": (0.15, "Mint时的Gas费"),
+        "任务费用": (0.05, "完成链上任务费用"),
+        "应急储备": (0.10, "应对意外"),
+    },
+    "other": {
+        "主要参与资金": (0.70, "参与项目的主要资金"),
+        "Gas和手续费": (0.15, "各类手续费"),
+        "应急储备": (0.15, "灵活应对"),
+    },
+}
+
+BASE_MONITORING_METRICS = (
+    "官方Twitter发布快照公告",
+    "官方Telegram/Discord发布重要更新",
+    "代币经济学文档发布",
+    "审计报告发布",
+    "融资消息",
+    "竞品项目发币动态",
+)
+CATEGORY_MONITORING_METRICS = {
+    "DeFi": ("协议TVL变化（> ±20%需关注）", "智能合约升级", "流动性挖矿参数变化"),
+    "Layer2": ("L2每日活跃地址数", "L2 TVL变化", "新Dapp上线"),
+    "NFT": ("Mint日期公告", "白名单抽选结果", "地板价变化"),
+    "other": (),
+}
+
+ALERT_CONDITIONS = (
+    "🚨 快照时间公告（Critical）",
+    "🚨 白名单开放（Critical）",
+    "🚨 Mint开始（Critical）",
+    "⚠️ 代币经济学发布（High）",
+    "⚠️ 审计报告有严重漏洞（High）",
+    "⚠️ 官方声明延期（Medium）",
+    "⚠️ 社区负面情绪激增（Medium）",
+)
+
+STOP_LOSS_TEMPLATES = (
+    "💸 资金损失 > ¥{b50}（50%）- 立即退出",
+    "💸 资金损失 > ¥{b30}（30%）- 评估是否退出",
+    "🚨 智能合约被攻击 - 立即提现所有资金",
+    "🚨 项目方跑路迹象 - 立即退出",
+    "🚨 官方宣布项目终止 - 立即退出",
+    "⚠️ 连续3个月无进展 - 考虑退出",
+    "⚠️ TVL/用户暴跌（> 70%）- 考虑退出",
+)
+
+
+def category_key(category: Optional[str]) -> str:
+    """项目分类 → 模板分类（DeFi / Layer2 / NFT / other）"""
+    if category == "DeFi":
+        return "DeFi"
+    if category in ("L2", "Layer2"):
+        return "Layer2"
+    if category == "NFT":
+        return "NFT"
+    return "other"
+
+
+def _compile_text(text: str):
+    """有占位符的文本保留为格式串, 否则填充时直接返回原文"""
+    return (text, "{" in text)
+
+
+def _fill_text(compiled, values: Dict) -> str:
+    text, dynamic = compiled
+    return text.format_map(values) if dynamic else text
+
+
+class PlanTemplate:
+    """一个分类的预编译计划模板"""
+
+    def __init__(self, key: str, steps: Sequence[Tuple[str, str, str, str, str]]):
+        self.key = key
+        self.steps = tuple(
+            (number, tuple(_compile_text(text) for text in fields))
+            for number, fields in enumerate(steps, start=1)
+        )
+        self.breakdown = tuple(BUDGET_BREAKDOWN_TEMPLATES[key].items())
+        self.monitoring = BASE_MONITORING_METRICS + CATEGORY_MONITORING_METRICS[key]
+
+    def fill_steps(self, values: Dict) -> List[Dict]:
+        steps = []
+        for number, (action, deadline, cost, priority, notes) in self.steps:
+            steps.append({
+                "step_number": number,
+                "action": _fill_text(action, values),
+                "deadline": _fill_text(deadline, values),
+                "cost_estimate": _fill_text(cost, values),
+                "status": "pending",
+                "priority": _fill_text(priority, values),
+                "notes": _fill_text(notes, values),
+            })
+        return steps
+
+    def fill_breakdown(self, budget: int) -> Dict:
+        return {item: {"金额": int(budget * ratio), "说明": note} for item, (ratio, note) in self.breakdown}
+
+
+# 按分类预编译（步骤模板: 未知分类按DeFi步骤, 预算明细和监控指标按通用模板）
+PLAN_TEMPLATES = {
+    "DeFi": PlanTemplate("DeFi", DEFI_STEP_TEMPLATES),
+    "Layer2": PlanTemplate("Layer2", L2_STEP_TEMPLATES),
+    "NFT": PlanTemplate("NFT", NFT_STEP_TEMPLATES),
+    "other": PlanTemplate("other", DEFI_STEP_TEMPLATES),
+}
+STOP_LOSS_COMPILED = tuple(_compile_text(text) for text in STOP_LOSS_TEMPLATES)
+
+
+def _template_values(project: Dict, budget: int) -> Dict:
+    """模板占位符的取值"""
+    return {
+        "blockchain": project.get("blockchain", "Ethereum"),
+        "chain_note": project.get("blockchain"),
+        "project_name": project.get("project_name"),
+        "official_bridge": project.get("official_bridge", "见项目文档"),
+        **{name: int(budget * share) for name, share in BUDGET_SHARES.items()},
+    }
+
+
+def plan_input_hash(project: Dict, score: Dict, launch_prob: Dict, airdrop_value: Dict) -> str:
+    """计划输入指纹: 分级、评分、预算输入（发币概率/空投估值）和模板代入的项目字段"""
+    inputs = (
+        score.get("grade"), score.get("composite_score"), score.get("team_score"), score.get("risk_score"),
+        launch_prob.get("launch_probability"), launch_prob.get("estimated_timeline"),
+        airdrop_value.get("estimated_value_usd"),
+        project.get("project_name"), project.get("category", "DeFi"), project.get("blockchain"),
+        project.get("official_bridge"), bool(project.get("has_audit")), bool(project.get("team_anonymous")),
+        project.get("competitor_count", 0),
+    )
+    return hashlib.blake2b(repr(inputs).encode(), digest_size=8).hexdigest()
+
+
+def carry_step_statuses(steps: List[Dict], previous_steps: Optional[List[Dict]]):
+    """重新生成的步骤按 step_number 沿用原计划中的步骤状态"""
+    statuses = {
+        step.get("step_number"): step.get("status")
+        for step in previous_steps or []
+        if isinstance(step, dict) and step.get("status")
+    }
+    for step in steps:
+        step["status"] = statuses.get(step["step_number"], step["status"])
+
+
+def completion_percentage(steps: List[Dict]) -> int:
+    """已完成步骤占比（0-100）"""
+    if not steps:
+        return 0
+    done = sum(1 for step in steps if step.get("status") == "completed")
+    return int(round(done * 100 / len(steps)))
+
 
 class ActionStep(BaseModel):
     """行动步骤"""
@@ -109,247 +313,45 @@ class ActionPlanGenerator:
         
         return int(final)
     
+    def _steps(self, key: str, project: Dict, budget: int) -> List[ActionStep]:
+        return [ActionStep(**step) for step in PLAN_TEMPLATES[key].fill_steps(_template_values(project, budget))]
+
     def generate_defi_steps(self, project: Dict, budget: int) -> List[ActionStep]:
         """生成DeFi项目步骤"""
-        steps = []
-        
-        steps.append(ActionStep(
-            step_number=1,
-            action="创建新钱包或准备专用钱包",
-            deadline="立即",
-            cost_estimate="¥0",
-            priority="high",
-            notes="建议使用新钱包，避免关联"
-        ))
-        
-        steps.append(ActionStep(
-            step_number=2,
-            action=f"准备资金并桥接到{project.get('blockchain', 'Ethereum')}",
-            deadline="24小时内",
-            cost_estimate=f"¥{int(budget * 0.6)} + 跨链费约¥{int(budget * 0.05)}",
-            priority="high",
-            notes=f"主网: {project.get('blockchain')}"
-        ))
-        
-        steps.append(ActionStep(
-            step_number=3,
-            action="加入官方社区（Twitter + Telegram + Discord）",
-            deadline="24小时内",
-            cost_estimate="¥0",
-            priority="medium",
-            notes="关注官方公告"
-        ))
-        
-        steps.append(ActionStep(
-            step_number=4,
-            action=f"存入资金到协议（分3-5次，每次约¥{int(budget * 0.15)}）",
-            deadline="3天内完成首次",
-            cost_estimate=f"¥{int(budget * 0.6)}",
-            priority="high",
-            notes="分批操作更像真实用户"
-        ))
-        
-        steps.append(ActionStep(
-            step_number=5,
-            action="执行多样化交易（至少10笔不同类型）",
-            deadline="持续进行",
-            cost_estimate=f"Gas费约¥{int(budget * 0.15)}",
-            priority="high",
-            notes="包括：存款、取款、Swap、添加流动性等"
-        ))
-        
-        steps.append(ActionStep(
-            step_number=6,
-            action="保持协议活跃度（每周2-3笔交易）",
-            deadline="持续至快照",
-            cost_estimate="Gas费计入Step 5",
-            priority="medium",
-            notes="活跃用户通常获得更多空投"
-        ))
-        
-        return steps
+        return self._steps("DeFi", project, budget)
     
     def generate_l2_steps(self, project: Dict, budget: int) -> List[ActionStep]:
-        """生成L2项目步骤"""
-        steps = []
-        
-        # 前3步同DeFi
-        steps.extend(self.generate_defi_steps(project, budget)[:3])
-        
-        steps.append(ActionStep(
-            step_number=4,
-            action=f"使用官方桥接资产到{project['project_name']}",
-            deadline="3天内",
-            cost_estimate=f"¥{int(budget * 0.5)} + 桥接费约¥{int(budget * 0.05)}",
-            priority="high",
-            notes=f"官方桥: {project.get('official_bridge', '见项目文档')}"
-        ))
-        
-        steps.append(ActionStep(
-            step_number=5,
-            action="在L2上使用至少5个不同的Dapp",
-            deadline="2周内完成首轮",
-            cost_estimate=f"Gas费约¥{int(budget * 0.1)}（L2 Gas费较低）",
-            priority="high",
-            notes="包括：DEX、借贷、NFT市场、游戏等"
-        ))
-        
-        steps.append(ActionStep(
-            step_number=6,
-            action="执行多样化交易（每个Dapp至少3笔）",
-            deadline="持续进行",
-            cost_estimate="Gas费计入Step 5",
-            priority="high",
-            notes="交易类型越多样，空投概率越大"
-        ))
-        
-        return steps
+        """生成L2项目步骤（前3步同DeFi）"""
+        return self._steps("Layer2", project, budget)
     
     def generate_nft_steps(self, project: Dict, budget: int) -> List[ActionStep]:
         """生成NFT项目步骤"""
-        steps = []
-        
-        steps.append(ActionStep(
-            step_number=1,
-            action="加入项目Discord并完成身份验证",
-            deadline="立即",
-            cost_estimate="¥0",
-            priority="high",
-            notes="Discord是NFT项目的核心社区"
-        ))
-        
-        steps.append(ActionStep(
-            step_number=2,
-            action="获取社区身份角色",
-            deadline="1周内",
-            cost_estimate="¥0（时间成本）",
-            priority="high",
-            notes="有些角色是白名单的前提"
-        ))
-        
-        steps.append(ActionStep(
-            step_number=3,
-            action="积极参与社区活动（每周至少5条发言）",
-            deadline="持续进行",
-            cost_estimate="¥0（时间成本）",
-            priority="high",
-            notes="活跃度是白名单筛选的重要指标"
-        ))
-        
-        steps.append(ActionStep(
-            step_number=4,
-            action="完成Crew3/Zealy/Galxe平台任务",
-            deadline="任务截止前",
-            cost_estimate="¥0-200",
-            priority="high",
-            notes="查看项目公告了解具体平台"
-        ))
-        
-        steps.append(ActionStep(
-            step_number=5,
-            action="白名单开放时立即申请",
-            deadline="白名单开放时",
-            cost_estimate="¥0",
-            priority="critical",
-            notes="设置提醒，避免错过"
-        ))
-        
-        steps.append(ActionStep(
-            step_number=6,
-            action=f"Mint NFT（预算¥{int(budget * 0.7)}，建议2-3个）",
-            deadline="Mint开启后2小时内",
-            cost_estimate=f"¥{int(budget * 0.7)} + Gas费约¥{int(budget * 0.1)}",
-            priority="critical",
-            notes="设置好Gas，确保交易成功"
-        ))
-        
-        return steps
+        return self._steps("NFT", project, budget)
     
     def calculate_budget_breakdown(self, budget: int, category: str) -> Dict:
         """计算预算明细"""
-        if category == "DeFi":
-            return {
-                "协议存款": {"金额": int(budget * 0.60), "说明": "存入协议赚取收益"},
-                "交易Gas费": {"金额": int(budget * 0.15), "说明": "各类交易手续费"},
-                "跨链桥接费": {"金额": int(budget * 0.05), "说明": "资金桥接费用"},
-                "应急储备": {"金额": int(budget * 0.20), "说明": "应对突发情况"}
-            }
-        elif category in ["L2", "Layer2"]:
-            return {
-                "桥接资产": {"金额": int(budget * 0.50), "说明": "桥接到L2的主要资金"},
-                "Dapp交互": {"金额": int(budget * 0.20), "说明": "在各Dapp上的操作资金"},
-                "Gas费": {"金额": int(budget * 0.10), "说明": "L1+L2的Gas费"},
-                "应急储备": {"金额": int(budget * 0.20), "说明": "灵活应对"}
-            }
-        elif category == "NFT":
-            return {
-                "NFT Mint": {"金额": int(budget * 0.70), "说明": "铸造NFT的主要费用"},
-                "Gas费": {"金额": int(budget * 0.15), "说明": "Mint时的Gas费"},
-                "任务费用": {"金额": int(budget * 0.05), "说明": "完成链上任务费用"},
-                "应急储备": {"金额": int(budget * 0.10), "说明": "应对意外"}
-            }
-        else:
-            return {
-                "主要参与资金": {"金额": int(budget * 0.70), "说明": "参与项目的主要资金"},
-                "Gas和手续费": {"金额": int(budget * 0.15), "说明": "各类手续费"},
-                "应急储备": {"金额": int(budget * 0.15), "说明": "灵活应对"}
-            }
+        return PLAN_TEMPLATES[category_key(category)].fill_breakdown(budget)
     
     def generate_monitoring_metrics(self, project: Dict) -> List[str]:
         """生成监控指标"""
-        metrics = [
-            "官方Twitter发布快照公告",
-            "官方Telegram/Discord发布重要更新",
-            "代币经济学文档发布",
-            "审计报告发布",
-            "融资消息",
-            "竞品项目发币动态"
-        ]
-        
-        category = project.get("category", "")
-        
-        if category == "DeFi":
-            metrics.extend([
-                "协议TVL变化（> ±20%需关注）",
-                "智能合约升级",
-                "流动性挖矿参数变化"
-            ])
-        elif category in ["L2", "Layer2"]:
-            metrics.extend([
-                "L2每日活跃地址数",
-                "L2 TVL变化",
-                "新Dapp上线"
-            ])
-        elif category == "NFT":
-            metrics.extend([
-                "Mint日期公告",
-                "白名单抽选结果",
-                "地板价变化"
-            ])
-        
-        return metrics
+        return list(PLAN_TEMPLATES[category_key(project.get("category", ""))].monitoring)
     
     def generate_alert_conditions(self) -> List[str]:
         """生成预警条件"""
-        return [
-            "🚨 快照时间公告（Critical）",
-            "🚨 白名单开放（Critical）",
-            "🚨 Mint开始（Critical）",
-            "⚠️ 代币经济学发布（High）",
-            "⚠️ 审计报告有严重漏洞（High）",
-            "⚠️ 官方声明延期（Medium）",
-            "⚠️ 社区负面情绪激增（Medium）"
-        ]
+        return list(ALERT_CONDITIONS)
     
     def identify_risks(self, project: Dict, score: Dict) -> List[str]:
         """识别风险"""
         risks = []
         
-        if score.get("team_score", 0) < 50:
-            risks.append(f"⚠️ 团队背景评分较低（{score['team_score']}/100）")
+        # 评分缺失（数据库中为NULL）时不判断
+        team_score = score.get("team_score")
+        if team_score is not None and team_score < 50:
+            risks.append(f"⚠️ 团队背景评分较低（{team_score}/100）")
         
-        if score.get("risk_score", 0) < 50:
-            risks.append(f"🚨 风险评分较低（{score['risk_score']}/100）")
+        risk_score = score.get("risk_score")
+        if risk_score is not None and risk_score < 50:
+            risks.append(f"🚨 风险评分较低（{risk_score}/100）")
         
         if not project.get("has_audit"):
             risks.append("⚠️ 智能合约未经审计")
@@ -365,15 +367,8 @@ class ActionPlanGenerator:
     
     def generate_stop_loss_conditions(self, budget: int) -> List[str]:
         """生成止损条件"""
-        return [
-            f"💸 资金损失 > ¥{int(budget * 0.5)}（50%）- 立即退出",
-            f"💸 资金损失 > ¥{int(budget * 0.3)}（30%）- 评估是否退出",
-            "🚨 智能合约被攻击 - 立即提现所有资金",
-            "🚨 项目方跑路迹象 - 立即退出",
-            "🚨 官方宣布项目终止 - 立即退出",
-            "⚠️ 连续3个月无进展 - 考虑退出",
-            "⚠️ TVL/用户暴跌（> 70%）- 考虑退出"
-        ]
+        values = {name: int(budget * share) for name, share in BUDGET_SHARES.items()}
+        return [_fill_text(compiled, values) for compiled in STOP_LOSS_COMPILED]
     
     def calculate_expected_roi(
         self,
@@ -402,66 +397,33 @@ class ActionPlanGenerator:
         
         return f"{final_roi:.1f}倍"
     
-    def generate_action_plan(
+    def plan_fields(
         self,
         project: Dict,
         score: Dict,
         launch_prob: Dict,
         airdrop_value: Dict
-    ) -> ActionPlan:
-        """生成完整的投资行动计划
-        
-        Args:
-            project: 项目数据
-            score: 评分数据
-            launch_prob: 发币概率数据
-            airdrop_value: 空投价值数据
-            
-        Returns:
-            行动计划
-        """
-        logger.info(f"📋 Generating action plan for {project['project_name']}")
-        
+    ) -> Dict:
+        """按预编译模板填充一个计划的全部字段（步骤为dict, 字段同 ActionPlan）"""
         # 1. 计算预算
         tier = score.get("grade", "B")
+        composite_score = score.get("composite_score", 60)
+        probability = launch_prob.get("launch_probability", 50)
+        estimated_value = airdrop_value.get("estimated_value_usd", 1000)
         budget = self.calculate_project_budget(
             tier=tier,
-            score=score.get("composite_score", 60),
-            launch_probability=launch_prob.get("launch_probability", 50),
-            airdrop_value=airdrop_value.get("estimated_value_usd", 1000),
+            score=composite_score,
+            launch_probability=probability,
+            airdrop_value=estimated_value,
             available_budget=self.MONTHLY_BUDGET
         )
         
-        # 2. 生成步骤
+        # 2. 步骤和预算明细（未知分类的步骤按DeFi, 明细按通用模板）
         category = project.get("category", "DeFi")
+        key = category_key(category)
+        steps = PLAN_TEMPLATES[key if key != "other" else "DeFi"].fill_steps(_template_values(project, budget))
         
-        if category == "DeFi":
-            steps = self.generate_defi_steps(project, budget)
-        elif category in ["L2", "Layer2"]:
-            steps = self.generate_l2_steps(project, budget)
-        elif category == "NFT":
-            steps = self.generate_nft_steps(project, budget)
-        else:
-            steps = self.generate_defi_steps(project, budget)
-        
-        # 3. 预算明细
-        budget_breakdown = self.calculate_budget_breakdown(budget, category)
-        
-        # 4. 监控和风险
-        monitoring = self.generate_monitoring_metrics(project)
-        alerts = self.generate_alert_conditions()
-        risks = self.identify_risks(project, score)
-        stop_loss = self.generate_stop_loss_conditions(budget)
-        
-        # 5. ROI预估
-        expected_roi = self.calculate_expected_roi(
-            score.get("composite_score", 60),
-            launch_prob.get("launch_probability", 50),
-            airdrop_value.get("estimated_value_usd", 1000),
-            budget
-        )
-        
-        # 6. 评估紧迫性
+        # 3. 评估紧迫性
         prob = launch_prob.get("launch_probability", 0)
         if prob >= 80:
             urgency = "Critical"
@@ -470,27 +432,200 @@ class ActionPlanGenerator:
         else:
             urgency = "Normal"
         
-        plan = ActionPlan(
-            project_name=project["project_name"],
-            project_tier=tier,
-            composite_score=score.get("composite_score", 0),
-            total_budget=budget,
-            budget_breakdown=budget_breakdown,
-            start_date=str(date.today()),
-            target_duration=launch_prob.get("estimated_timeline", "1-3个月"),
-            urgency=urgency,
-            action_steps=steps,
-            monitoring_metrics=monitoring,
-            alert_conditions=alerts,
-            risks=risks,
-            stop_loss_conditions=stop_loss,
-            expected_roi=expected_roi,
-            airdrop_estimate=airdrop_value.get("estimated_value_usd", 0)
-        )
+        return {
+            "project_name": project["project_name"],
+            "project_tier": tier,
+            "composite_score": score.get("composite_score", 0),
+            "total_budget": budget,
+            "budget_breakdown": PLAN_TEMPLATES[key].fill_breakdown(budget),
+            "start_date": str(date.today()),
+            "target_duration": launch_prob.get("estimated_timeline", "1-3个月"),
+            "urgency": urgency,
+            "action_steps": steps,
+            "monitoring_metrics": self.generate_monitoring_metrics(project),
+            "alert_conditions": list(ALERT_CONDITIONS),
+            "risks": self.identify_risks(project, score),
+            "stop_loss_conditions": self.generate_stop_loss_conditions(budget),
+            "expected_roi": self.calculate_expected_roi(composite_score, probability, estimated_value, budget),
+            "airdrop_estimate": airdrop_value.get("estimated_value_usd", 0),
+        }
+    
+    def generate_action_plan(
+        self,
+        project: Dict,
+        score: Dict,
+        launch_prob: Dict,
+        airdrop_value: Dict
+    ) -> ActionPlan:
+        """生成完整的投资行动计划
+        
+        Args:
+            project: 项目数据
+            score: 评分数据
+            launch_prob: 发币概率数据
+            airdrop_value: 空投价值数据
+            
+        Returns:
+            行动计划
+        """
+        logger.info(f"📋 Generating action plan for {project['project_name']}")
         
-        logger.info(f"✅ Action plan generated: Budget ¥{budget}, {len(steps)} steps")
+        plan = ActionPlan(**self.plan_fields(project, score, launch_prob, airdrop_value))
+        
+        logger.info(f"✅ Action plan generated: Budget ¥{plan.total_budget}, {len(plan.action_steps)} steps")
         
         return plan
+    
+    def generate_plans(self, inputs: Sequence[Tuple[Dict, Dict, Dict, Dict]]) -> List[Dict]:
+        """批量填充计划（不逐个记录日志, 不构造pydantic对象）
+        
+        Args:
+            inputs: [(project, score, launch_prob, airdrop_value), ...]
+            
+        Returns:
+            计划字段列表, 字段同 plan_fields
+        """
+        return [self.plan_fields(*item) for item in inputs]
+    
+    def refresh_plans(
+        self,
+        db,
+        tiers: Sequence[str] = ("S", "A"),
+        dry_run: bool = False,
+        force: bool = False
+    ) -> Dict:
+        """为指定分级的项目批量生成行动计划, 只写入输入有变化的计划
+        
+        - 发币概率/空投估值优先读 token_launch_predictions / airdrop_value_estimates 的当前行,
+          没有时按 prediction_store 同样的规则现算
+        - 每个项目保留一份计划: 新项目批量插入, 输入哈希变化的批量更新
+          （保留计划状态; 步骤按 step_number 沿用原有状态, 完成度按沿用后的步骤重新计算）
+        
+        Args:
+            tiers: 生成计划的项目分级
+            dry_run: 只统计变化, 不写入
+            force: 忽略输入哈希, 全部重新生成
+        """
+        from sqlalchemy import or_
+        from app.models import (
+            AirdropValueEstimate, InvestmentActionPlan, OnchainMetrics, Project, TokenLaunchPrediction
+        )
+        from app.services.prediction_store import INACTIVE_STATUSES, airdrop_row, build_prediction_input, launch_row
+        
+        started = time.perf_counter()
+        rows = db.query(
+            Project.id, Project.project_name, Project.category, Project.blockchain, Project.grade,
+            Project.overall_score, Project.team_score, Project.risk_score, Project.extra_metadata,
+            OnchainMetrics.tvl_usd,
+            TokenLaunchPrediction.launch_probability, TokenLaunchPrediction.estimated_timeline,
+            AirdropValueEstimate.estimated_value_usd,
+        ).outerjoin(
+            OnchainMetrics, OnchainMetrics.id == Project.onchain_metrics_id
+        ).outerjoin(
+            TokenLaunchPrediction, TokenLaunchPrediction.project_id == Project.id
+        ).outerjoin(
+            AirdropValueEstimate, AirdropValueEstimate.project_id == Project.id
+        ).filter(
+            Project.grade.in_(tiers),
+            or_(Project.status.notin_(INACTIVE_STATUSES), Project.status.is_(None)),
+        ).order_by(Project.id, TokenLaunchPrediction.id, AirdropValueEstimate.id).all()
+        rows = list({row.id: row for row in rows}.values())  # 同一项目有多行预测时取最新一行
+        
+        current = {
+            plan.project_id: plan._asdict()
+            for plan in db.query(
+                InvestmentActionPlan.id, InvestmentActionPlan.project_id, InvestmentActionPlan.input_hash
+            ).order_by(InvestmentActionPlan.id)
+        }
+        
+        pending, unchanged = [], 0
+        for row in rows:
+            metadata = row.extra_metadata or {}
+            project = {**metadata, "project_name": row.project_name}
+            for field in ("category", "blockchain"):
+                if getattr(row, field):
+                    project[field] = getattr(row, field)
+            
+            score = {"grade": row.grade}
+            for field, value in (
+                ("composite_score", row.overall_score), ("team_score", row.team_score), ("risk_score", row.risk_score)
+            ):
+                if value is not None:
+                    score[field] = int(round(float(value)))
+            
+            if row.launch_probability is None or row.estimated_value_usd is None:
+                prediction_input = build_prediction_input(
+                    row.project_name, row.category, row.extra_metadata, row.tvl_usd
+                )
+            if row.launch_probability is not None:
+                launch_prob = {
+                    "launch_probability": row.launch_probability, "estimated_timeline": row.estimated_timeline
+                }
+            else:
+                launch_prob = launch_row(row.id, prediction_input)
+            if row.estimated_value_usd is not None:
+                airdrop_value = {"estimated_value_usd": row.estimated_value_usd}
+            else:
+                airdrop_value = airdrop_row(row.id, prediction_input)
+            
+            input_hash = plan_input_hash(project, score, launch_prob, airdrop_value)
+            previous = current.get(row.id)
+            if previous is not None and previous["input_hash"] == input_hash and not force:
+                unchanged += 1
+                continue
+            pending.append((row.id, previous, input_hash, (project, score, launch_prob, airdrop_value)))
+        loaded = time.perf_counter()
+        
+        # 只为需要更新的计划读取原有步骤
+        update_ids = [previous["id"] for _, previous, *_ in pending if previous is not None]
+        previous_steps = {}
+        for offset in range(0, len(update_ids), WRITE_CHUNK):
+            previous_steps.update(db.query(InvestmentActionPlan.id, InvestmentActionPlan.action_steps).filter(
+                InvestmentActionPlan.id.in_(update_ids[offset:offset + WRITE_CHUNK])
+            ).all())
+        
+        plans = self.generate_plans([item for *_, item in pending])
+        inserts, updates = [], []
+        now = datetime.utcnow()
+        for (project_id, previous, input_hash, _), fields in zip(pending, plans):
+            fields.pop("project_name")
+            if previous is not None:
+                carry_step_statuses(fields["action_steps"], previous_steps.get(previous["id"]))
+            row = {
+                **fields,
+                "project_id": project_id,
+                "total_steps": len(fields["action_steps"]),
+                "input_hash": input_hash,
+                "updated_at": now,
+            }
+            if previous is None:
+                inserts.append({**row, "status": "active", "completion_percentage": 0, "created_at": now})
+            else:
+                updates.append({
+                    **row, "id": previous["id"], "completion_percentage": completion_percentage(row["action_steps"])
+                })
+        generated = time.perf_counter()
+        
+        if not dry_run:
+            for offset in range(0, len(inserts), WRITE_CHUNK):
+                db.bulk_insert_mappings(InvestmentActionPlan, inserts[offset:offset + WRITE_CHUNK])
+            for offset in range(0, len(updates), WRITE_CHUNK):
+                db.bulk_update_mappings(InvestmentActionPlan, updates[offset:offset + WRITE_CHUNK])
+            db.commit()
+        
+        result = {
+            "projects": len(rows),
+            "inserted": len(inserts),
+            "updated": len(updates),
+            "unchanged": unchanged,
+            "dry_run": dry_run,
+        }
+        logger.info(
+            f"📋 Action plans refreshed for {len(rows)} projects{' (dry run)' if dry_run else ''}: "
+            f"{len(inserts)} inserted, {len(updates)} updated, {unchanged} unchanged "
+            f"(load {loaded - started:.2f}s, generate {generated - loaded:.2f}s, write {time.perf_counter() - generated:.2f}s)"
+        )
+        return result
 
 
 # 全局服务实例
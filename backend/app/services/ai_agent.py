@@ -9,6 +9,7 @@ import json
 from datetime import datetime, timedelta
 
 from app.core.config import settings
+from app.services.scoring_spec import CompiledScoringSpec, scoring_spec_store
 
 
 class AIAgent:
@@ -86,8 +87,9 @@ class AIAgent:
         # 2. 初步评分（这里是模拟，实际应调用AI API）
         scores = self._calculate_scores(raw_data)
         
-        # 3. 综合评分
-        overall_score = self._calculate_overall_score(scores)
+        # 3. 综合评分（权重和分级阈值来自评分规范）
+        spec = scoring_spec_store.current()
+        overall_score = self._calculate_overall_score(scores, spec)
         
         # 4. 检查是否符合最低标准
         if overall_score < self.config['min_ai_score']:
@@ -97,7 +99,7 @@ class AIAgent:
         reasons = self._generate_recommendation_reasons(raw_data, scores)
         
         # 6. 确定等级
-        grade = self._determine_grade(overall_score)
+        grade = self._determine_grade(overall_score, spec)
         
         # 7. 计算置信度
         confidence = self._calculate_confidence(raw_data, scores)
@@ -118,9 +120,11 @@ class AIAgent:
             'ai_tokenomics_score': scores['tokenomics'],
             'ai_market_score': scores['market'],
             'ai_risk_score': scores['risk'],
+            'scoring_spec_version': spec.version,
             'ai_recommendation_reason': {
                 'reasons': reasons,
-                'scores': scores
+                'scores': scores,
+                'spec_version': spec.version
             },
             'ai_extracted_info': {
                 'website': raw_data.get('website'),
@@ -136,16 +140,6 @@ class AIAgent:
         # 这里是简化版评分逻辑
         # 实际应该调用DeepSeek/Claude/OpenAI进行深度分析
         
-        rules = self.config.get('rules', {})
-        weights = rules.get('scoring_weights', {
-            'team': 0.20,
-            'tech': 0.25,
-            'community': 0.20,
-            'tokenomics': 0.15,
-            'market': 0.10,
-            'risk': 0.10
-        })
-        
         # 团队评分
         team_score = 50.0
         if data.get('team_public'):
@@ -206,31 +200,15 @@ class AIAgent:
             'risk': max(0, risk_score)
         }
     
-    def _calculate_overall_score(self, scores: Dict[str, float]) -> float:
-        """计算综合评分"""
-        rules = self.config.get('rules', {})
-        weights = rules.get('scoring_weights', {
-            'team': 0.20,
-            'tech': 0.25,
-            'community': 0.20,
-            'tokenomics': 0.15,
-            'market': 0.10,
-            'risk': 0.10
-        })
-        
-        overall = sum(scores[key] * weights.get(key, 0) for key in scores.keys())
-        return round(overall, 2)
+    def _calculate_overall_score(self, scores: Dict[str, float], spec: Optional[CompiledScoringSpec] = None) -> float:
+        """计算综合评分（按评分规范的维度权重）"""
+        spec = spec or scoring_spec_store.current()
+        return round(spec.composite(scores), 2)
     
-    def _determine_grade(self, score: float) -> str:
-        """根据评分确定等级"""
-        if score >= 90:
-            return 'S'
-        elif score >= 80:
-            return 'A'
-        elif score >= 70:
-            return 'B'
-        else:
-            return 'C'
+    def _determine_grade(self, score: float, spec: Optional[CompiledScoringSpec] = None) -> str:
+        """根据评分确定等级（按评分规范的分级阈值）"""
+        spec = spec or scoring_spec_store.current()
+        return spec.grade(score)
     
     def _calculate_confidence(self, data: Dict[str, Any], scores: Dict[str, float]) -> float:
         """计算AI置信度"""
@@ -377,8 +355,7 @@ class AIAgent:
         
         self.db.commit()
         
-        # TODO: 分析反馈模式，调整评分权重
-        # 例如：如果用户频繁拒绝某类项目，降低该类特征的权重
+        # 评分权重由 weight_trainer 每晚用累计的审核反馈离线拟合（fit_scoring_weights 任务）
     
     def get_learning_stats(self) -> Dict[str, Any]:
         """获取学习统计"""
@@ -406,7 +383,8 @@ class AIAgent:
             'approved': stats.get('approved', 0),
             'rejected': stats.get('rejected', 0),
             'approval_rate': approval_rate,
-            'suggestion': self._get_adjustment_suggestion(approval_rate)
+            'suggestion': self._get_adjustment_suggestion(approval_rate),
+            'scoring_spec_version': scoring_spec_store.current().version  # 最近一次权重拟合发布的版本
         }
     
     def _get_adjustment_suggestion(self, approval_rate: float) -> str:
@@ -1,139 +1,404 @@
 """AI分析引擎 - 使用LLM进行深度分析"""
 
-from typing import Dict, List, Optional
+import asyncio
+import json
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from loguru import logger
-from anthropic import Anthropic
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from app.core.config import settings
+from app.services.analyzers.rate_limiter import get_limiter, estimate_tokens
+from app.services.analyzers.provider_router import provider_router
+from app.services.analyzers.json_stream import IncrementalJSONParser
+from app.services.analyzers.prompt_builder import compact_fields, count_message_tokens, count_tokens
+from app.services.analyzers.usage_recorder import usage_recorder
+from app.services.analyzers.provider_config import ProviderConfigStore
+from app.services.analyzers.risk_detector import extract_risk_text
+from app.services.analyzers.llm_recording import record_exchange
+from app.services.keyword_matcher import keyword_matchers
+from app.services.scoring_spec import scoring_spec_store
+
+
+# 各提供商连接参数（Claude/OpenAI 通过 WildCard/GPTsAPI 中转,统一使用 OpenAI 格式）
+PROVIDER_BASE_URLS = {
+    "deepseek": "https://api.deepseek.com",
+    "claude": "https://api.gptsapi.net/v1",
+    "openai": "https://api.gptsapi.net/v1",
+}
+
+PROVIDER_MODELS = {
+    "deepseek": "deepseek-chat",  # 自动使用最新v3模型
+    "claude": "claude-3-5-sonnet-20241022",  # WildCard 支持的 Claude 模型
+    "openai": "gpt-3.5-turbo",
+}
+
+# 提供商优先级: DeepSeek (国内,便宜快速) → Claude → OpenAI
+PROVIDER_PRIORITY = ["deepseek", "claude", "openai"]
+
+PROJECT_TEXT_SYSTEM_PROMPT = "你是Web3项目分析专家,擅长从文本中提取项目关键信息。你需要客观、专业地分析项目,识别潜在的投资机会和风险。"
+DETAILED_ANALYSIS_SYSTEM_PROMPT = "你是专业的Web3分析师。你必须只基于提供的真实数据进行分析，严禁编造任何信息。如果数据不足，必须明确说明。"
+
+# 规则评分关键词 (关键词, 分类, 分值), 编译为共用的关键词自动机
+TECH_KEYWORDS = [
+    ("zkp", "tech", 15), ("zero-knowledge", "tech", 15), ("zk", "tech", 15),
+    ("layer 2", "tech", 12), ("l2", "tech", 12), ("rollup", "tech", 12),
+    ("cross-chain", "tech", 10), ("bridge", "tech", 10),
+    ("novel", "tech", 10), ("innovative", "tech", 8), ("revolutionary", "tech", 8),
+    ("audit", "tech", 10), ("certik", "tech", 10), ("peckshield", "tech", 10),
+]
+TOKENOMICS_KEYWORDS = [
+    ("fair launch", "positive", 15),
+    ("no presale", "positive", 10),
+    ("community", "positive", 8),
+    ("locked liquidity", "positive", 12),
+    ("vesting", "positive", 8),
+    ("team holds", "negative", -10),
+    ("large allocation", "negative", -8),
+]
+# 当前热门赛道加分(可动态调整)
+HOT_CATEGORY_KEYWORDS = [
+    ("defi", "hot_category", 10),
+    ("ai", "hot_category", 15),
+    ("gamefi", "hot_category", 8),
+    ("infrastructure", "hot_category", 12),
+]
+
+keyword_matchers.define("tech_score", TECH_KEYWORDS)
+keyword_matchers.define("tokenomics_score", TOKENOMICS_KEYWORDS)
+keyword_matchers.define("hot_category", HOT_CATEGORY_KEYWORDS)
+
+def provider_base_url(provider: str) -> str:
+    """提供商的API地址（设置 AI_BASE_URL_OVERRIDE 后指向本地替身服务, 如 http://localhost:8900/{provider}/v1）"""
+    if settings.AI_BASE_URL_OVERRIDE:
+        return settings.AI_BASE_URL_OVERRIDE.format(provider=provider)
+    return PROVIDER_BASE_URLS[provider]
+
+
+# 提供商配置（懒加载 + 热更新）
+provider_config_store = ProviderConfigStore(PROVIDER_PRIORITY)
 
 
 class AIAnalyzer:
-    """AI分析器 - 支持DeepSeek/Claude/GPT"""
+    """AI分析器 - 支持DeepSeek/Claude/GPT
+
+    同步方法供Celery任务使用; 以 _async 结尾的方法供FastAPI异步接口使用,
+    两条路径共享同一套按提供商划分的并发/RPM/TPM限流。
+    所有已配置的提供商都会初始化, 由 provider_router 按健康状况路由、熔断和对冲。
+    提供商在首次使用时才初始化, 配置变更（管理后台保存）后自动热更新。
+    """
     
     def __init__(self):
-        """初始化AI客户端"""
-        self.deepseek_client = None
-        self.claude_client = None
-        self.openai_client = None
-        self.active_provider = None
-        
-        # 尝试从数据库加载配置
-        self._load_config_from_db()
-        
-        # 如果数据库没有配置，使用环境变量
-        if not self.active_provider:
-            self._load_config_from_env()
-    
-    def _load_config_from_db(self):
-        """从数据库加载AI配置"""
-        try:
-            from app.db.session import SessionLocal
-            from app.models.ai_config import AIConfig
-            from cryptography.fernet import Fernet
-            import base64
-            import hashlib
-            
-            # 解密密钥
-            ENCRYPTION_KEY = base64.urlsafe_b64encode(hashlib.sha256(b"web3-alpha-hunter-secret-key").digest())
-            cipher_suite = Fernet(ENCRYPTION_KEY)
-            
-            db = SessionLocal()
+        """创建分析器（不访问数据库, 提供商在首次使用时按配置快照初始化）"""
+        self._clients: Dict[str, OpenAI] = {}
+        self._api_keys: Dict[str, str] = {}
+        self._active_provider: Optional[str] = None
+        self._config_version: Optional[str] = None
+        self._config_lock = threading.Lock()
+        # 异步客户端绑定事件循环, 按 (循环id, 提供商, 密钥) 缓存
+        self._async_clients: Dict[Tuple[int, str, str], AsyncOpenAI] = {}
+
+    def _ensure_loaded(self):
+        """按当前配置快照（懒加载, 版本变化时热更新）初始化提供商客户端"""
+        snapshot = provider_config_store.current()
+        if snapshot.version == self._config_version:
+            return
+
+        with self._config_lock:
+            if snapshot.version == self._config_version:
+                return
+
+            clients = {}
+            for provider in PROVIDER_PRIORITY:
+                api_key = snapshot.api_keys.get(provider)
+                if not api_key:
+                    continue
+                if self._api_keys.get(provider) == api_key:
+                    clients[provider] = self._clients[provider]  # 密钥未变, 复用连接池
+                    continue
+                try:
+                    clients[provider] = OpenAI(
+                        api_key=api_key,
+                        base_url=provider_base_url(provider),
+                        timeout=settings.AI_REQUEST_TIMEOUT_SECONDS
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to initialize {provider}: {e}")
+
+            self._clients = clients
+            self._api_keys = {provider: snapshot.api_keys[provider] for provider in clients}
+            self._active_provider = snapshot.primary if snapshot.primary in clients else next(iter(clients), None)
+            self._config_version = snapshot.version
+            logger.info(f"✅ AI providers ready: {list(clients)} (primary: {self._active_provider}, config {snapshot.version})")
+
+    @property
+    def clients(self) -> Dict[str, OpenAI]:
+        self._ensure_loaded()
+        return self._clients
+
+    @property
+    def api_keys(self) -> Dict[str, str]:
+        self._ensure_loaded()
+        return self._api_keys
+
+    @property
+    def active_provider(self) -> Optional[str]:
+        self._ensure_loaded()
+        return self._active_provider
+
+    @property
+    def deepseek_client(self) -> Optional[OpenAI]:
+        return self.clients.get("deepseek")
+
+    @property
+    def claude_client(self) -> Optional[OpenAI]:
+        return self.clients.get("claude")
+
+    @property
+    def openai_client(self) -> Optional[OpenAI]:
+        return self.clients.get("openai")
+
+    def configured_providers(self) -> List[str]:
+        """已配置的提供商, 主提供商在前, 其余按默认优先级"""
+        self._ensure_loaded()
+        primary = self._active_provider
+        providers = [p for p in PROVIDER_PRIORITY if p in self._clients and p != primary]
+        return [primary] + providers if primary else providers
+
+    # ==================== LLM调用 ====================
+
+    def _async_client(self, provider: str) -> AsyncOpenAI:
+        """获取当前事件循环上的异步客户端"""
+        api_key = self.api_keys[provider]
+        key = (id(asyncio.get_running_loop()), provider, api_key)  # 密钥热更新后自动使用新客户端
+        client = self._async_clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=provider_base_url(provider),
+                timeout=settings.AI_REQUEST_TIMEOUT_SECONDS
+            )
+            self._async_clients[key] = client
+        return client
+
+    async def _close_loop_clients(self):
+        """关闭当前事件循环上创建的异步客户端（asyncio.run结束前调用）"""
+        loop = asyncio.get_running_loop()
+        loop_id = id(loop)
+        for key in [k for k in self._async_clients if k[0] == loop_id]:
+            client = self._async_clients.pop(key)
+            try:
+                await client.close()
+            except Exception as e:
+                logger.debug(f"Failed to close async client {key[1]}: {e}")
+        for provider in PROVIDER_PRIORITY:
+            get_limiter(provider).forget_loop(loop)
+
+    def _run_batch(self, coroutines: List) -> List:
+        """在同步上下文中并发执行一批协程（Celery任务使用）"""
+        async def runner():
             try:
-                # 获取所有启用的AI配置
-                configs = db.query(AIConfig).filter(AIConfig.enabled == True).all()
-                
-                logger.info(f"📂 Found {len(configs)} enabled AI configs in database")
-                
-                for config in configs:
-                    try:
-                        # 解密API密钥
-                        decrypted_key = cipher_suite.decrypt(config.api_key.encode()).decode()
-                        
-                        if config.name.lower() == "deepseek" and not self.active_provider:
-                            self.deepseek_client = OpenAI(
-                                api_key=decrypted_key,
-                                base_url="https://api.deepseek.com"
-                            )
-                            self.active_provider = "deepseek"
-                            logger.info(f"✅ DeepSeek initialized from DB (model: {config.model})")
-                        
-                        elif config.name.lower() == "claude" and not self.active_provider:
-                            self.claude_client = OpenAI(
-                                api_key=decrypted_key,
-                                base_url="https://api.gptsapi.net/v1"
-                            )
-                            self.active_provider = "claude"
-                            logger.info(f"✅ Claude initialized from DB (model: {config.model})")
-                        
-                        elif config.name.lower() == "openai" and not self.active_provider:
-                            self.openai_client = OpenAI(
-                                api_key=decrypted_key,
-                                base_url="https://api.gptsapi.net/v1"
-                            )
-                            self.active_provider = "openai"
-                            logger.info(f"✅ OpenAI initialized from DB (model: {config.model})")
-                    
-                    except Exception as e:
-                        logger.warning(f"Failed to initialize {config.name} from DB: {e}")
+                return await asyncio.gather(*coroutines)
             finally:
-                db.close()
-        except Exception as e:
-            logger.warning(f"Failed to load AI config from DB: {e}")
-    
-    def _load_config_from_env(self):
-        """从环境变量加载AI配置（备用方案）"""
-        # 优先使用DeepSeek (国内,便宜快速)
-        if settings.DEEPSEEK_API_KEY:
+                await self._close_loop_clients()
+
+        try:
+            return asyncio.run(runner())
+        finally:
+            usage_recorder.flush()
+
+    def _chat(
+        self, messages: List[Dict], max_tokens: int, temperature: float,
+        fallback: bool = True, operation: str = "chat", **params
+    ) -> str:
+        """同步调用（经路由选择提供商, fallback=False 时只使用最健康的一个）"""
+        _, text = provider_router.call_sync(
+            self.configured_providers(),
+            lambda provider: self._chat_provider(provider, messages, max_tokens, temperature, operation, **params),
+            fallback=fallback
+        )
+        return text
+
+    async def _achat(
+        self, messages: List[Dict], max_tokens: int, temperature: float,
+        fallback: bool = True, operation: str = "chat", **params
+    ) -> str:
+        """异步调用（经路由选择提供商, 不阻塞事件循环）"""
+        _, text = await provider_router.call_async(
+            self.configured_providers(),
+            lambda provider: self._achat_provider(provider, messages, max_tokens, temperature, operation, **params),
+            fallback=fallback
+        )
+        return text
+
+    def _record_usage(
+        self, provider: str, operation: str, messages: List[Dict], started: float,
+        usage=None, completion: Optional[str] = None, success: bool = True, streamed: bool = False
+    ) -> Optional[int]:
+        """记录一次调用的token用量和耗时, 返回总token数（提供商未返回usage时按本地计数）"""
+        if usage is not None:
+            prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+        else:
+            prompt_tokens, completion_tokens = count_message_tokens(messages), count_tokens(completion)
+
+        latency = time.monotonic() - started
+        usage_recorder.record(
+            provider=provider,
+            model=PROVIDER_MODELS[provider],
+            operation=operation,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens if success else 0,
+            latency=latency,
+            success=success,
+            streamed=streamed,
+            usage_estimated=usage is None
+        )
+        if success:
+            # 设置 AI_RECORD_PATH 时录制响应, 供替身服务回放
+            record_exchange(
+                provider, PROVIDER_MODELS[provider], operation, messages, completion or "",
+                latency, prompt_tokens, completion_tokens, streamed
+            )
+        return prompt_tokens + completion_tokens if success else None
+
+    def _chat_provider(
+        self, provider: str, messages: List[Dict], max_tokens: int, temperature: float,
+        operation: str = "chat", **params
+    ) -> str:
+        """同步调用指定提供商"""
+        limiter = get_limiter(provider)
+        reserved = estimate_tokens(messages, max_tokens)
+
+        with limiter.slot_sync(reserved):
+            started = time.monotonic()
             try:
-                self.deepseek_client = OpenAI(
-                    api_key=settings.DEEPSEEK_API_KEY,
-                    base_url="https://api.deepseek.com"
+                response = self.clients[provider].chat.completions.create(
+                    model=PROVIDER_MODELS[provider],
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **params
                 )
-                self.active_provider = "deepseek"
-                logger.info("✅ DeepSeek v3 client initialized from ENV (优先使用)")
-            except Exception as e:
-                logger.warning(f"Failed to initialize DeepSeek: {e}")
-        
-        # 备用: Claude (通过 WildCard/GPTsAPI 中转,使用 OpenAI 格式)
-        if settings.ANTHROPIC_API_KEY and not self.active_provider:
+            except Exception:
+                self._record_usage(provider, operation, messages, started, success=False)
+                raise
+
+        content = response.choices[0].message.content
+        limiter.settle(reserved, self._record_usage(provider, operation, messages, started, response.usage, content))
+        logger.info(f"✅ {provider} completion finished")
+        return content
+
+    async def _achat_provider(
+        self, provider: str, messages: List[Dict], max_tokens: int, temperature: float,
+        operation: str = "chat", **params
+    ) -> str:
+        """异步调用指定提供商"""
+        limiter = get_limiter(provider)
+        reserved = estimate_tokens(messages, max_tokens)
+
+        async with limiter.slot(reserved):
+            started = time.monotonic()
             try:
-                # WildCard 的 Claude 也使用 OpenAI 客户端格式
-                self.claude_client = OpenAI(
-                    api_key=settings.ANTHROPIC_API_KEY,
-                    base_url="https://api.gptsapi.net/v1"
+                response = await self._async_client(provider).chat.completions.create(
+                    model=PROVIDER_MODELS[provider],
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **params
                 )
-                self.active_provider = "claude"
-                logger.info("✅ Claude client initialized from ENV (via GPTsAPI)")
-            except Exception as e:
-                logger.warning(f"Failed to initialize Claude: {e}")
-        
-        # 备用: OpenAI (通过 WildCard/GPTsAPI 中转)
-        if settings.OPENAI_API_KEY and not self.active_provider:
+            except asyncio.CancelledError:
+                raise  # 对冲落败被取消, 不计为失败
+            except Exception:
+                self._record_usage(provider, operation, messages, started, success=False)
+                raise
+
+        content = response.choices[0].message.content
+        limiter.settle(reserved, self._record_usage(provider, operation, messages, started, response.usage, content))
+        logger.info(f"✅ {provider} completion finished (async)")
+        return content
+
+    async def _astream_provider(
+        self, provider: str, messages: List[Dict], max_tokens: int, temperature: float,
+        operation: str = "chat", **params
+    ) -> AsyncIterator[str]:
+        """流式调用指定提供商, 逐块产出文本"""
+        limiter = get_limiter(provider)
+        reserved = estimate_tokens(messages, max_tokens)
+        chunks = []
+
+        async with limiter.slot(reserved):
+            started = time.monotonic()
             try:
-                self.openai_client = OpenAI(
-                    api_key=settings.OPENAI_API_KEY,
-                    base_url="https://api.gptsapi.net/v1"
+                stream = await self._async_client(provider).chat.completions.create(
+                    model=PROVIDER_MODELS[provider],
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True,
+                    **params
                 )
-                self.active_provider = "openai"
-                logger.info("✅ OpenAI client initialized from ENV (via GPTsAPI)")
-            except Exception as e:
-                logger.warning(f"Failed to initialize OpenAI: {e}")
-    
-    def analyze_project_text(self, text: str, source: str = "twitter", retry_with_fallback: bool = True) -> Dict:
-        """分析项目文本内容（支持自动降级到备用AI）
-
-        Args:
-            text: 项目相关文本(推文、公告等)
-            source: 来源(twitter, telegram等)
-            retry_with_fallback: 失败时是否自动尝试其他AI提供商
-
-        Returns:
-            分析结果字典
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        chunks.append(delta)
+                        yield delta
+            except Exception:
+                self._record_usage(provider, operation, messages, started, success=False, streamed=True)
+                raise
+
+        # 流式响应不返回usage, 按本地计数结算
+        used = self._record_usage(provider, operation, messages, started, completion="".join(chunks), streamed=True)
+        limiter.settle(reserved, used)
+        logger.info(f"✅ {provider} stream finished")
+
+    @staticmethod
+    def _strip_markdown_json(result_text: str) -> str:
+        """移除可能的Markdown代码块标记"""
+        if "```json" in result_text:
+            # 提取```json和```之间的内容
+            match = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
+            if match:
+                result_text = match.group(1)
+        elif "```" in result_text:
+            # 提取```和```之间的内容
+            match = re.search(r'```\s*(.*?)\s*```', result_text, re.DOTALL)
+            if match:
+                result_text = match.group(1)
+        
+        return result_text.strip()
+
+    # ==================== 通用JSON补全 ====================
+
+    def complete_json(
+        self, messages: List[Dict], max_tokens: int = 500, temperature: float = 0.3, operation: str = "chat"
+    ) -> Dict:
+        """调用LLM并把回复解析为JSON对象（经路由选择提供商, 限流、熔断、用量记录同其他调用）
+
+        回复可以带Markdown代码块或前后说明文字, 取其中的JSON对象。
+
+        Raises:
+            ValueError: 回复中没有可解析的JSON对象
         """
-        if not self.active_provider:
-            logger.warning("No AI client available, using mock analysis")
-            return self._mock_analysis(text)
-
+        result_text = self._strip_markdown_json(self._chat(
+            messages, max_tokens=max_tokens, temperature=temperature, operation=operation
+        ))
+        try:
+            return json.loads(result_text)
+        except json.JSONDecodeError:
+            match = re.search(r'\{.*\}', result_text, re.DOTALL)
+            if match:
+                try:
+                    return json.loads(match.group())
+                except json.JSONDecodeError:
+                    pass
+        raise ValueError(f"No JSON object in AI response: {result_text[:100]}")
+
+    # ==================== 项目文本分析 ====================
+
+    def _project_text_messages(self, text: str, source: str) -> List[Dict]:
+        """构建项目文本分析的对话消息（文本去样板并压缩到token预算内）"""
+        text = compact_fields({"text": text}, settings.AI_PROMPT_TOKEN_BUDGET)["text"]
         prompt = f"""分析以下Web3项目相关信息,提供专业评估:
 
 来源: {source}
@@ -165,86 +430,93 @@ class AIAnalyzer:
   "summary": "一句话总结"
 }}
 
-评分规则: overall_score>=90为S级, >=80为A级, >=70为B级, >=60为C级, <60为D级
+评分规则: {scoring_spec_store.current().grading_rule()}
 """
+        return [
+            {"role": "system", "content": PROJECT_TEXT_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _parse_project_text_result(self, result_text: str, original_text: str) -> Dict:
+        """解析项目文本分析结果（处理Markdown代码块）"""
+        result_text = self._strip_markdown_json(result_text)
         
+        # 尝试解析JSON
         try:
-            # 优先使用DeepSeek v3
-            if self.deepseek_client:
-                response = self.deepseek_client.chat.completions.create(
-                    model="deepseek-chat",  # 自动使用最新v3模型
-                    messages=[
-                        {"role": "system", "content": "你是Web3项目分析专家,擅长从文本中提取项目关键信息。你需要客观、专业地分析项目,识别潜在的投资机会和风险。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=2048,  # v3支持更长输出
-                    temperature=0.7,
-                    top_p=0.95,
-                    stream=False
-                )
-                result_text = response.choices[0].message.content
-                logger.info(f"✅ DeepSeek v3 analysis completed")
-            
-            # 备用: Claude (通过 WildCard,使用 OpenAI 格式)
-            elif self.claude_client:
-                response = self.claude_client.chat.completions.create(
-                    model="claude-3-5-sonnet-20241022",  # WildCard 支持的 Claude 模型
-                    messages=[
-                        {"role": "system", "content": "你是Web3项目分析专家,擅长从文本中提取项目关键信息。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=2048,
-                    temperature=0.7
-                )
-                result_text = response.choices[0].message.content
-                logger.info(f"✅ Claude analysis completed (via GPTsAPI)")
-            
-            # 备用: OpenAI
-            elif self.openai_client:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=1024,
-                    temperature=0.7
-                )
-                result_text = response.choices[0].message.content
-                logger.info(f"✅ OpenAI analysis completed")
-            else:
-                logger.warning("No AI provider available")
-                return self._mock_analysis(text)
-            
-            # 解析JSON（处理Markdown代码块）
-            import json
-            import re
-            
-            # 移除可能的Markdown代码块标记
-            if "```json" in result_text:
-                # 提取```json和```之间的内容
-                match = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
-                if match:
-                    result_text = match.group(1)
-            elif "```" in result_text:
-                # 提取```和```之间的内容
-                match = re.search(r'```\s*(.*?)\s*```', result_text, re.DOTALL)
-                if match:
-                    result_text = match.group(1)
-            
-            result_text = result_text.strip()
-            
-            # 尝试解析JSON
-            try:
-                result = json.loads(result_text)
-                logger.info(f"✅ AI analysis completed: {result.get('category', 'Unknown')}")
-                return result
-            except json.JSONDecodeError as je:
-                logger.error(f"JSON解析失败: {je}")
-                logger.error(f"原始响应: {result_text[:500]}")
-                # 如果JSON解析失败，尝试从文本中提取信息
-                return self._extract_from_text(result_text, text)
-            
+            result = json.loads(result_text)
+            logger.info(f"✅ AI analysis completed: {result.get('category', 'Unknown')}")
+            return result
+        except json.JSONDecodeError as je:
+            logger.error(f"JSON解析失败: {je}")
+            logger.error(f"原始响应: {result_text[:500]}")
+            # 如果JSON解析失败，尝试从文本中提取信息
+            return self._extract_from_text(result_text, original_text)
+    
+    def analyze_project_text(self, text: str, source: str = "twitter", retry_with_fallback: bool = True) -> Dict:
+        """分析项目文本内容（支持自动降级到备用AI）
+
+        Args:
+            text: 项目相关文本(推文、公告等)
+            source: 来源(twitter, telegram等)
+            retry_with_fallback: 失败时是否自动尝试其他AI提供商
+
+        Returns:
+            分析结果字典
+        """
+        if not self.active_provider:
+            logger.warning("No AI client available, using mock analysis")
+            return self._mock_analysis(text)
+
+        try:
+            result_text = self._chat(
+                self._project_text_messages(text, source),
+                max_tokens=2048,  # v3支持更长输出
+                temperature=0.7,
+                fallback=retry_with_fallback,
+                operation="project_text",
+                top_p=0.95
+            )
+        except Exception as e:
+            logger.error(f"AI analysis failed: {e}")
+            return self._mock_analysis(text)
+        
+        return self._parse_project_text_result(result_text, text)
+
+    async def analyze_project_text_async(self, text: str, source: str = "twitter", retry_with_fallback: bool = True) -> Dict:
+        """analyze_project_text 的异步版本"""
+        if not self.active_provider:
+            logger.warning("No AI client available, using mock analysis")
+            return self._mock_analysis(text)
+
+        try:
+            result_text = await self._achat(
+                self._project_text_messages(text, source),
+                max_tokens=2048,
+                temperature=0.7,
+                fallback=retry_with_fallback,
+                operation="project_text",
+                top_p=0.95
+            )
         except Exception as e:
             logger.error(f"AI analysis failed: {e}")
             return self._mock_analysis(text)
+
+        return self._parse_project_text_result(result_text, text)
+
+    def analyze_project_texts(self, items: List[Tuple[str, str]]) -> List[Dict]:
+        """并发分析多段项目文本（同步包装,供Celery任务使用）
+
+        Args:
+            items: [(text, source), ...]
+
+        Returns:
+            与输入顺序一致的分析结果列表
+        """
+        if not items:
+            return []
+        return self._run_batch([
+            self.analyze_project_text_async(text, source) for text, source in items
+        ])
     
     def _extract_from_text(self, ai_response: str, original_text: str) -> Dict:
         """从AI文本响应中提取结构化信息"""
@@ -355,21 +627,11 @@ class AIAnalyzer:
         """
         score = 50.0
         
-        # 技术关键词加分
-        tech_keywords = {
-            "zkp": 15, "zero-knowledge": 15, "zk": 15,
-            "layer 2": 12, "l2": 12, "rollup": 12,
-            "cross-chain": 10, "bridge": 10,
-            "novel": 10, "innovative": 8, "revolutionary": 8,
-            "audit": 10, "certik": 10, "peckshield": 10,
-        }
-        
-        text = str(project_data).lower()
-        for keyword, points in tech_keywords.items():
-            if keyword in text:
-                score += points
-                logger.info(f"  +{points}分: 技术关键词 '{keyword}'")
-                break  # 每个类别只加一次分
+        # 技术关键词加分（只取排在最前的一个命中, 每个类别只加一次分; 只匹配字段值, 不含字段名和URL）
+        match = keyword_matchers.get("tech_score").first(extract_risk_text(project_data))
+        if match:
+            score += match.weight
+            logger.info(f"  +{match.weight}分: 技术关键词 '{match.keyword}'")
         
         # GitHub活跃度
         if "github_stars" in project_data:
@@ -444,32 +706,18 @@ class AIAnalyzer:
         """
         score = 60.0  # 基础分
         
-        text = str(project_data).lower()
+        # 只匹配字段值（字段名如 "community" 不计分）
+        found = keyword_matchers.get("tokenomics_score").by_category(extract_risk_text(project_data))
         
         # 正面关键词
-        positive_keywords = {
-            "fair launch": 15,
-            "no presale": 10,
-            "community": 8,
-            "locked liquidity": 12,
-            "vesting": 8,
-        }
-        
-        for keyword, points in positive_keywords.items():
-            if keyword in text:
-                score += points
-                logger.info(f"  +{points}分: 代币关键词 '{keyword}'")
+        for match in found.get("positive", []):
+            score += match.weight
+            logger.info(f"  +{match.weight}分: 代币关键词 '{match.keyword}'")
         
         # 负面关键词
-        negative_keywords = {
-            "team holds": -10,
-            "large allocation": -8,
-        }
-        
-        for keyword, points in negative_keywords.items():
-            if keyword in text:
-                score += points
-                logger.info(f"  {points}分: 代币风险 '{keyword}'")
+        for match in found.get("negative", []):
+            score += match.weight
+            logger.info(f"  {match.weight}分: 代币风险 '{match.keyword}'")
         
         return max(min(score, 100), 0)
     
@@ -484,42 +732,21 @@ class AIAnalyzer:
         """
         score = 70.0  # 基础分
         
-        category = project_data.get("category", "").lower()
-        
-        # 当前热门赛道加分(可动态调整)
-        hot_categories = {
-            "defi": 10,
-            "ai": 15,
-            "gamefi": 8,
-            "infrastructure": 12,
-        }
-        
-        for cat, points in hot_categories.items():
-            if cat in category:
-                score += points
-                logger.info(f"  +{points}分: 热门赛道 '{cat}'")
-                break
+        # 当前热门赛道加分（HOT_CATEGORY_KEYWORDS, 只取排在最前的一个）
+        match = keyword_matchers.get("hot_category").first(project_data.get("category", ""))
+        if match:
+            score += match.weight
+            logger.info(f"  +{match.weight}分: 热门赛道 '{match.keyword}'")
         
         return min(score, 100)
     
-    def generate_detailed_analysis(self, project_data: Dict) -> Dict:
-        """生成详细AI分析（基于真实数据，避免虚假信息）
-
-        Args:
-            project_data: 项目完整数据（包含真实指标）
-
-        Returns:
-            详细分析结果（summary, key_features, investment_suggestion等）
-        """
-        logger.info(f"🔍 Generating detailed AI analysis for {project_data.get('name', 'Unknown')}...")
-
-        if not self.active_provider:
-            logger.warning("No AI client available")
-            return self._mock_detailed_analysis()
-
-        # 构建基于真实数据的prompt
+    def _detailed_analysis_messages(self, project_data: Dict) -> List[Dict]:
+        """构建基于真实数据的详细分析对话消息"""
         project_name = project_data.get("name", "Unknown")
-        description = project_data.get("description", "无描述")
+        description = compact_fields(
+            {"description": project_data.get("description", "无描述")},
+            settings.AI_PROMPT_TOKEN_BUDGET
+        )["description"]
         category = project_data.get("category", "Unknown")
         blockchain = project_data.get("blockchain", "Unknown")
 
@@ -575,68 +802,35 @@ class AIAnalyzer:
 
 **重要提醒：不要编造团队成员、融资信息、合作伙伴等未提供的数据！**"""
 
+        return [
+            {"role": "system", "content": DETAILED_ANALYSIS_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    def generate_detailed_analysis(self, project_data: Dict) -> Dict:
+        """生成详细AI分析（基于真实数据，避免虚假信息）
+
+        Args:
+            project_data: 项目完整数据（包含真实指标）
+
+        Returns:
+            详细分析结果（summary, key_features, investment_suggestion等）
+        """
+        logger.info(f"🔍 Generating detailed AI analysis for {project_data.get('name', 'Unknown')}...")
+
+        if not self.active_provider:
+            logger.warning("No AI client available")
+            return self._mock_detailed_analysis()
+
         try:
-            # 调用AI（优先DeepSeek）
-            if self.deepseek_client:
-                response = self.deepseek_client.chat.completions.create(
-                    model="deepseek-chat",
-                    messages=[
-                        {"role": "system", "content": "你是专业的Web3分析师。你必须只基于提供的真实数据进行分析，严禁编造任何信息。如果数据不足，必须明确说明。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=2048,
-                    temperature=0.3,  # 降低温度，减少创造性，增加准确性
-                    top_p=0.9,
-                    stream=False
-                )
-                result_text = response.choices[0].message.content
-                logger.info(f"✅ DeepSeek detailed analysis generated")
-
-            elif self.claude_client:
-                response = self.claude_client.chat.completions.create(
-                    model="claude-3-5-sonnet-20241022",
-                    messages=[
-                        {"role": "system", "content": "你是专业的Web3分析师。必须只基于真实数据分析，不编造信息。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=2048,
-                    temperature=0.3
-                )
-                result_text = response.choices[0].message.content
-                logger.info(f"✅ Claude detailed analysis generated")
-
-            elif self.openai_client:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "你是专业的Web3分析师。只基于真实数据分析。"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=1500,
-                    temperature=0.3
-                )
-                result_text = response.choices[0].message.content
-                logger.info(f"✅ OpenAI detailed analysis generated")
-            else:
-                logger.warning("No AI provider available")
-                return self._mock_detailed_analysis()
-
-            # 解析JSON
-            import json
-            import re
-
-            # 移除Markdown代码块
-            if "```json" in result_text:
-                match = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
-                if match:
-                    result_text = match.group(1)
-            elif "```" in result_text:
-                match = re.search(r'```\s*(.*?)\s*```', result_text, re.DOTALL)
-                if match:
-                    result_text = match.group(1)
-
-            result_text = result_text.strip()
-            result = json.loads(result_text)
+            result_text = self._chat(
+                self._detailed_analysis_messages(project_data),
+                max_tokens=2048,
+                temperature=0.3,  # 降低温度，减少创造性，增加准确性
+                operation="detailed_analysis",
+                top_p=0.9
+            )
+            result = json.loads(self._strip_markdown_json(result_text))
 
             logger.info(f"✅ Detailed analysis parsed successfully")
             return result
@@ -645,6 +839,90 @@ class AIAnalyzer:
             logger.error(f"❌ Failed to generate detailed analysis: {e}")
             return self._mock_detailed_analysis()
 
+    async def generate_detailed_analysis_async(self, project_data: Dict) -> Dict:
+        """generate_detailed_analysis 的异步版本"""
+        logger.info(f"🔍 Generating detailed AI analysis for {project_data.get('name', 'Unknown')} (async)...")
+
+        if not self.active_provider:
+            logger.warning("No AI client available")
+            return self._mock_detailed_analysis()
+
+        try:
+            result_text = await self._achat(
+                self._detailed_analysis_messages(project_data),
+                max_tokens=2048,
+                temperature=0.3,
+                operation="detailed_analysis",
+                top_p=0.9
+            )
+            return json.loads(self._strip_markdown_json(result_text))
+
+        except Exception as e:
+            logger.error(f"❌ Failed to generate detailed analysis: {e}")
+            return self._mock_detailed_analysis()
+
+    async def stream_detailed_analysis(self, project_data: Dict) -> AsyncIterator[Tuple[str, Any]]:
+        """流式生成详细AI分析
+
+        每当 summary / key_features / investment_suggestion 等顶层字段完整到达即产出
+        (字段名, 值), 最后产出 ("done", 完整结果)。失败时先产出 ("error", 原因),
+        "done" 中未完成的字段用默认值补齐。
+        """
+        logger.info(f"🔍 Streaming detailed AI analysis for {project_data.get('name', 'Unknown')}...")
+
+        if not self.active_provider:
+            logger.warning("No AI client available")
+            result = self._mock_detailed_analysis()
+            for field, value in result.items():
+                yield field, value
+            yield "done", result
+            return
+
+        parser = IncrementalJSONParser()
+        try:
+            async for _, chunk in provider_router.stream_async(
+                self.configured_providers(),
+                lambda provider: self._astream_provider(
+                    provider,
+                    self._detailed_analysis_messages(project_data),
+                    max_tokens=2048,
+                    temperature=0.3,
+                    operation="detailed_analysis",
+                    top_p=0.9
+                )
+            ):
+                for field, value in parser.feed(chunk):
+                    yield field, value
+        except Exception as e:
+            logger.error(f"❌ Failed to stream detailed analysis: {e}")
+            yield "error", str(e)
+            yield "done", {**self._mock_detailed_analysis(), **parser.fields}
+            return
+
+        if parser.done:
+            result = parser.fields
+        else:
+            # 输出不是一个完整对象时退回整体解析
+            try:
+                result = json.loads(self._strip_markdown_json(parser.buffer))
+            except json.JSONDecodeError as e:
+                logger.error(f"❌ Failed to parse streamed analysis: {e}")
+                result = {**self._mock_detailed_analysis(), **parser.fields}
+            for field, value in result.items():
+                if field not in parser.fields:
+                    yield field, value
+
+        logger.info(f"✅ Detailed analysis streamed successfully")
+        yield "done", result
+
+    def generate_detailed_analyses(self, projects_data: List[Dict]) -> List[Dict]:
+        """并发生成多个项目的详细分析（同步包装,供Celery任务使用）"""
+        if not projects_data:
+            return []
+        return self._run_batch([
+            self.generate_detailed_analysis_async(project_data) for project_data in projects_data
+        ])
+
     def _mock_detailed_analysis(self) -> Dict:
         """模拟详细分析（当AI不可用时）"""
         return {
@@ -677,6 +955,19 @@ class AIAnalyzer:
         text = project_data.get("text", "")
         ai_result = self.analyze_project_text(text, project_data.get("source", "unknown"))
 
+        return self._combine_full_analysis(project_data, ai_result)
+
+    async def analyze_full_project_async(self, project_data: Dict) -> Dict:
+        """analyze_full_project 的异步版本（LLM调用不阻塞事件循环）"""
+        logger.info(f"🔍 Starting full project analysis (async)...")
+
+        text = project_data.get("text", "")
+        ai_result = await self.analyze_project_text_async(text, project_data.get("source", "unknown"))
+
+        return self._combine_full_analysis(project_data, ai_result)
+
+    def _combine_full_analysis(self, project_data: Dict, ai_result: Dict) -> Dict:
+        """合并AI分析结果与规则评分"""
         # 合并AI分析结果到项目数据
         enhanced_data = {**project_data, **ai_result}
 
@@ -692,26 +983,18 @@ class AIAnalyzer:
 
         logger.info(f"📊 Individual scores: {scores}")
 
-        # 3. 计算综合评分
+        # 3. 按评分规范计算综合评分和等级
         from app.services.analyzers.scorer import project_scorer
 
-        overall_score = project_scorer.calculate_overall_score(
-            team_score=scores["team"],
-            tech_score=scores["technology"],
-            community_score=scores["community"],
-            tokenomics_score=scores["tokenomics"],
-            market_timing_score=scores["market_timing"],
-            risk_score=scores["risk"],
-        )
-
-        # 4. 计算等级
-        grade = project_scorer.calculate_grade(overall_score)
+        evaluation = project_scorer.evaluate(scores)
+        overall_score, grade = evaluation["overall_score"], evaluation["grade"]
 
-        logger.info(f"✅ Analysis complete: Score={overall_score}, Grade={grade}")
+        logger.info(f"✅ Analysis complete: Score={overall_score}, Grade={grade} (spec {evaluation['spec_version']})")
 
         return {
             "overall_score": overall_score,
             "grade": grade,
+            "spec_version": evaluation["spec_version"],
             "scores": scores,
             "ai_analysis": ai_result,
             "category": ai_result.get("category"),
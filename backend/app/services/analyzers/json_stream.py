@@ -0,0 +1,72 @@
+"""流式JSON解析 - 从逐块到达的LLM输出中尽早取出已完成的顶层字段"""
+
+import json
+from typing import Any, Dict, List, Tuple
+
+
+class IncrementalJSONParser:
+    """增量解析一个JSON对象
+
+    LLM流式返回 ``{"summary": "...", "key_features": [...], ...}`` 时,
+    每当一个顶层字段的值完整到达就立即返回该字段, 不必等待整个对象结束。
+    对象前的Markdown代码块标记等多余文本会被跳过。
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """追加一段文本, 返回本次新完成的 (字段名, 值) 列表"""
+        self.buffer += chunk
+        completed = []
+
+        while self._pos < len(self.buffer) and not self.done:
+            char = self.buffer[self._pos]
+
+            if self._member_start is None:
+                # 尚未进入对象, 跳过 ```json 等前缀
+                if char == "{":
+                    self._depth = 1
+                    self._member_start = self._pos + 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._close_member(self._pos))
+                    self.done = True
+            elif char == "," and self._depth == 1:
+                completed.extend(self._close_member(self._pos))
+                self._member_start = self._pos + 1
+
+            self._pos += 1
+
+        return completed
+
+    def _close_member(self, end: int) -> List[Tuple[str, Any]]:
+        """解析 [_member_start, end) 之间的一个 "key": value"""
+        member = self.buffer[self._member_start:end].strip()
+        if not member:
+            return []
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return []  # 格式不规范的字段留给最终的整体解析处理
+        self.fields.update(parsed)
+        return list(parsed.items())
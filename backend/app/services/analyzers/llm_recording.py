@@ -0,0 +1,78 @@
+"""LLM调用录制 - 把真实调用的请求/响应/耗时写入JSONL, 供本地替身服务回放"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+from loguru import logger
+from app.core.config import settings
+
+_write_lock = threading.Lock()
+
+
+def messages_key(messages: List[Dict]) -> str:
+    """对话消息的指纹（回放时精确匹配同一请求）"""
+    payload = json.dumps(
+        [[m.get("role"), m.get("content")] for m in messages], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def system_prompt_key(messages: List[Dict]) -> str:
+    """系统提示词的指纹（没有精确匹配时按调用场景匹配）"""
+    system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+    return hashlib.sha256(system.encode()).hexdigest()[:16]
+
+
+def record_exchange(
+    provider: str,
+    model: str,
+    operation: str,
+    messages: List[Dict],
+    content: str,
+    latency: float,
+    prompt_tokens: int,
+    completion_tokens: int,
+    streamed: bool = False
+):
+    """追加一条录制记录（未配置 AI_RECORD_PATH 时不做任何事）"""
+    path = settings.AI_RECORD_PATH
+    if not path:
+        return
+
+    record = {
+        "recorded_at": time.time(),
+        "provider": provider,
+        "model": model,
+        "operation": operation,
+        "messages_key": messages_key(messages),
+        "system_key": system_prompt_key(messages),
+        "content": content,
+        "latency": round(latency, 4),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "streamed": streamed,
+    }
+    try:
+        with _write_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning(f"Failed to record LLM exchange to {path}: {e}")
+
+
+def load_recordings(path: Optional[str]) -> List[Dict]:
+    """读取录制文件（忽略损坏的行）"""
+    if not path:
+        return []
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
@@ -0,0 +1,59 @@
+"""分级分析 - 规则预筛选决定哪些项目需要进入LLM分析"""
+
+from typing import Dict, Tuple
+from loguru import logger
+from app.core.config import settings
+from app.services.analyzers.ai_analyzer import ai_analyzer
+from app.services.analyzers.risk_detector import risk_detector
+from app.services.analyzers.scorer import project_scorer
+
+
+class RulePrefilter:
+    """规则预筛选器
+
+    第一层: 所有项目先用规则评分（与 /analyze/quick-score 相同, 不调用LLM）
+    第二层: 只有规则评分达到阈值, 或跨平台信号足够强的项目才升级到LLM分析
+    """
+
+    def score(self, project_data: Dict) -> Dict:
+        """规则评分（各维度 + 综合评分 + 等级 + 评分规范版本）"""
+        risks = risk_detector.detect_risks(project_data)
+        scores = {
+            "team": ai_analyzer.score_team_background(project_data),
+            "technology": ai_analyzer.score_technology(project_data),
+            "community": ai_analyzer.score_community(project_data),
+            "tokenomics": ai_analyzer.score_tokenomics(project_data),
+            "market_timing": ai_analyzer.score_market_timing(project_data),
+            "risk": risk_detector.calculate_risk_score(project_data),
+        }
+
+        result = project_scorer.evaluate(scores, has_fatal_risk=risk_detector.has_fatal_risk(risks))
+        return {**result, "scores": scores}
+
+    def should_escalate(self, rule_score: float, num_platforms: int) -> Tuple[bool, str]:
+        """判断是否升级到LLM分析
+
+        Returns:
+            (是否升级, 原因: score / cross_platform / below_threshold)
+        """
+        if rule_score >= settings.AI_ESCALATION_MIN_SCORE:
+            return True, "score"
+        if num_platforms >= settings.AI_ESCALATION_MIN_PLATFORMS:
+            return True, "cross_platform"
+        return False, "below_threshold"
+
+    def evaluate(self, project_data: Dict, num_platforms: int) -> Dict:
+        """规则评分并给出升级决策"""
+        result = self.score(project_data)
+        escalate, reason = self.should_escalate(result["overall_score"], num_platforms)
+        result.update({"escalate": escalate, "reason": reason, "num_platforms": num_platforms})
+
+        logger.debug(
+            f"  🧮 Rule score {result['overall_score']:.1f} ({result['grade']}), "
+            f"{num_platforms} platforms → {'LLM' if escalate else 'rules only'} ({reason})"
+        )
+        return result
+
+
+# 全局实例
+analysis_prefilter = RulePrefilter()
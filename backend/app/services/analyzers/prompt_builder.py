@@ -0,0 +1,123 @@
+"""提示词构建 - token计数、去除样板内容、按预算截断可变字段"""
+
+import re
+from typing import Dict, List, Optional
+from loguru import logger
+
+# tiktoken编码器延迟加载（首次使用需要加载编码表, 失败时退回字符估算）
+_encoding = None
+_encoding_failed = False
+
+# 推文/公告中对分析无用的样板内容
+_BOILERPLATE_PATTERNS = [
+    re.compile(r'https?://t\.co/\S+'),  # Twitter短链
+    re.compile(r'^\s*RT @\w+:\s*', re.MULTILINE),  # 转推前缀
+    re.compile(
+        r'\b(not financial advice|nfa|dyor|do your own research|follow us|join our (telegram|discord|community)'
+        r'|like (and|&) (rt|retweet)|turn on notifications|link in bio)\b[^\n]*|(不构成投资建议|关注我们)[^\n]*',
+        re.IGNORECASE
+    ),
+    re.compile(r'(?:#\w+\s*){4,}'),  # 连续的话题标签
+]
+_WHITESPACE = re.compile(r'[ \t　]+')
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+
+# 每条消息的格式开销（role、分隔符等）
+MESSAGE_OVERHEAD_TOKENS = 4
+TRUNCATION_MARK = "…"
+
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            _encoding_failed = True
+            logger.warning(f"⚠️ tiktoken unavailable, falling back to estimated token counts: {e}")
+    return _encoding
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """计算文本token数（不同提供商的分词器略有差异, cl100k_base作为统一口径）"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 2 + 1  # 中文约每字1 token, 英文约每4字符1 token
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[Dict]) -> int:
+    """计算对话消息的prompt token数"""
+    return sum(count_tokens(m.get("content")) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def strip_boilerplate(text: Optional[str]) -> str:
+    """去除短链、转推前缀、免责声明、话题标签串和重复行, 压缩空白"""
+    if not text:
+        return ""
+    for pattern in _BOILERPLATE_PATTERNS:
+        text = pattern.sub(" ", text)
+
+    lines = []
+    seen = set()
+    for line in text.split("\n"):
+        line = _WHITESPACE.sub(" ", line).strip()
+        key = line.lower()
+        if line and key in seen:
+            continue  # 多条推文拼接时常有重复行
+        seen.add(key)
+        lines.append(line)
+
+    return _BLANK_LINES.sub("\n", "\n".join(lines)).strip()
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """把文本截断到不超过max_tokens个token"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:max_tokens * 2] + TRUNCATION_MARK
+    tokens = encoding.encode(text, disallowed_special=())
+    # 按token截断可能切在多字节字符中间, decode会替换为�, 去掉即可
+    return encoding.decode(tokens[:max_tokens]).rstrip("�") + TRUNCATION_MARK
+
+
+def compact_fields(fields: Dict[str, Optional[str]], budget: int) -> Dict[str, str]:
+    """去样板后把多个可变字段压缩到总预算内
+
+    短字段保留原文, 剩余预算在超长字段之间平均分配（water-filling）,
+    这样一段很长的描述不会挤掉其他字段。
+    """
+    cleaned = {name: strip_boilerplate(value) for name, value in fields.items()}
+    sizes = {name: count_tokens(value) for name, value in cleaned.items()}
+    if sum(sizes.values()) <= budget:
+        return cleaned
+
+    remaining = budget
+    pending = sorted(sizes, key=sizes.get)
+    limits = {}
+    while pending:
+        share = remaining // len(pending)
+        name = pending[0]
+        if sizes[name] <= share:
+            limits[name] = sizes[name]
+            remaining -= sizes[name]
+            pending.pop(0)
+        else:
+            for name in pending:
+                limits[name] = share
+            break
+
+    compacted = {name: truncate_to_tokens(value, limits[name]) for name, value in cleaned.items()}
+    logger.debug(
+        f"✂️ Prompt fields compacted {sum(sizes.values())} → "
+        f"{sum(count_tokens(v) for v in compacted.values())} tokens"
+    )
+    return compacted
@@ -0,0 +1,212 @@
+"""AI提供商配置 - 内存快照 + 版本号, 通过Redis pub/sub或数据库版本检查热更新"""
+
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional
+from loguru import logger
+from app.core.config import settings
+
+# 管理后台修改配置后发布到该频道, 所有API进程和Celery worker收到后重新加载
+AI_CONFIG_CHANNEL = "web3hunter:ai_config_changed"
+
+ENV_KEY_SETTINGS = {
+    "deepseek": "DEEPSEEK_API_KEY",
+    "claude": "ANTHROPIC_API_KEY",
+    "openai": "OPENAI_API_KEY",
+}
+
+
+class ProviderConfigSnapshot:
+    """某一时刻的提供商配置（只读）"""
+
+    def __init__(self, version: str, api_keys: Dict[str, str], primary: Optional[str]):
+        self.version = version
+        self.api_keys = api_keys  # 提供商 → 明文API密钥
+        self.primary = primary  # 主提供商（数据库中第一个启用的, 否则按环境变量优先级）
+
+    def __repr__(self):
+        return f"<ProviderConfigSnapshot {self.version} providers={list(self.api_keys)}>"
+
+
+class ProviderConfigStore:
+    """提供商配置存储
+
+    - 首次使用时才读取数据库和解密密钥（导入模块不再访问数据库）
+    - 配置变更后由 publish_change() 通过Redis广播, 各进程标记失效后在下次调用时重新加载
+    - Redis不可用时退回定期比对数据库版本号（ai_configs 的行数 + 最大 updated_at）
+    """
+
+    def __init__(self, provider_priority: List[str]):
+        self.provider_priority = provider_priority
+        self._snapshot: Optional[ProviderConfigSnapshot] = None
+        self._db_version: Optional[str] = None
+        self._dirty = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._subscribed = False
+
+    # ==================== 对外接口 ====================
+
+    def current(self) -> ProviderConfigSnapshot:
+        """返回当前配置快照, 必要时重新加载"""
+        self._ensure_listener()
+
+        snapshot = self._snapshot
+        if snapshot is not None and not self._dirty and not self._version_check_due():
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or self._dirty:
+                self._reload()
+            elif self._version_check_due():
+                self._checked_at = time.monotonic()
+                db_version = self._read_db_version()
+                if db_version is not None and db_version != self._db_version:
+                    logger.info(f"🔄 AI config changed in DB ({self._db_version} → {db_version}), reloading")
+                    self._reload()
+            return self._snapshot
+
+    def invalidate(self):
+        """标记本进程的快照失效"""
+        self._dirty = True
+
+    def publish_change(self):
+        """通知所有进程配置已变更（同时使本进程立即失效）"""
+        self.invalidate()
+        try:
+            import redis
+            client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=2)
+            receivers = client.publish(AI_CONFIG_CHANNEL, str(time.time()))
+            logger.info(f"📣 AI config change published to {receivers} subscribers")
+        except Exception as e:
+            # 其他进程会在下次数据库版本检查时发现变更
+            logger.warning(f"Failed to publish AI config change: {e}")
+
+    # ==================== 加载 ====================
+
+    def _reload(self):
+        """重新读取数据库和环境变量配置（调用方持有锁）"""
+        self._dirty = False
+        self._checked_at = time.monotonic()
+
+        api_keys, primary, db_version = self._load_from_db()
+        self._db_version = db_version
+
+        # 数据库未配置的提供商使用环境变量补充
+        for provider in self.provider_priority:
+            key = getattr(settings, ENV_KEY_SETTINGS[provider], None)
+            if key and provider not in api_keys:
+                api_keys[provider] = key
+                logger.info(f"✅ {provider} configured from ENV")
+
+        if not primary:
+            primary = next((p for p in self.provider_priority if p in api_keys), None)
+
+        fingerprint = hashlib.sha256(
+            "|".join(f"{p}:{k}" for p, k in sorted(api_keys.items())).encode()
+        ).hexdigest()[:8]
+        version = f"{db_version or 'nodb'}/{fingerprint}"
+
+        self._snapshot = ProviderConfigSnapshot(version, api_keys, primary)
+        logger.info(f"📂 AI provider config loaded (version {version}, primary: {primary})")
+
+    def _load_from_db(self):
+        """从数据库加载启用的配置, 返回 (密钥, 主提供商, 版本号); 数据库不可用时返回空配置"""
+        api_keys: Dict[str, str] = {}
+        primary = None
+        try:
+            from app.db.session import SessionLocal
+            from app.models.ai_config import AIConfig
+            from cryptography.fernet import Fernet
+            import base64
+
+            # 解密密钥
+            ENCRYPTION_KEY = base64.urlsafe_b64encode(hashlib.sha256(b"web3-alpha-hunter-secret-key").digest())
+            cipher_suite = Fernet(ENCRYPTION_KEY)
+
+            db = SessionLocal()
+            try:
+                db_version = self._query_db_version(db)
+                configs = db.query(AIConfig).filter(AIConfig.enabled == True).all()
+                logger.info(f"📂 Found {len(configs)} enabled AI configs in database")
+
+                for config in configs:
+                    provider = config.name.lower()
+                    if provider not in ENV_KEY_SETTINGS or provider in api_keys:
+                        continue
+                    try:
+                        api_keys[provider] = cipher_suite.decrypt(config.api_key.encode()).decode()
+                        primary = primary or provider
+                        logger.info(f"✅ {config.name} configured from DB (model: {config.model})")
+                    except Exception as e:
+                        logger.warning(f"Failed to decrypt {config.name} key from DB: {e}")
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Failed to load AI config from DB: {e}")
+            return {}, None, None
+
+        return api_keys, primary, db_version
+
+    @staticmethod
+    def _query_db_version(db) -> str:
+        from sqlalchemy import func
+        from app.models.ai_config import AIConfig
+
+        count, updated_at = db.query(func.count(AIConfig.id), func.max(AIConfig.updated_at)).one()
+        return f"{count}@{updated_at.timestamp() if updated_at else 0:.0f}"
+
+    def _read_db_version(self) -> Optional[str]:
+        try:
+            from app.db.session import SessionLocal
+
+            db = SessionLocal()
+            try:
+                return self._query_db_version(db)
+            finally:
+                db.close()
+        except Exception as e:
+            logger.debug(f"AI config version check failed: {e}")
+            return None
+
+    def _version_check_due(self) -> bool:
+        """没有Redis订阅（或上次加载时数据库不可用）时, 按间隔比对数据库版本号"""
+        if self._subscribed and self._db_version is not None:
+            return False
+        return time.monotonic() - self._checked_at >= settings.AI_CONFIG_CHECK_INTERVAL_SECONDS
+
+    # ==================== Redis订阅 ====================
+
+    def _ensure_listener(self):
+        if self._listener is None or not self._listener.is_alive():
+            with self._lock:
+                if self._listener is None or not self._listener.is_alive():
+                    self._listener = threading.Thread(
+                        target=self._listen, name="ai-config-listener", daemon=True
+                    )
+                    self._listener.start()
+
+    def _listen(self):
+        """订阅配置变更频道, 断线后重连（重连期间可能错过消息, 因此重连后强制重新加载）"""
+        import redis
+
+        reconnect = False
+        while True:
+            try:
+                client = redis.Redis.from_url(settings.REDIS_URL)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(AI_CONFIG_CHANNEL)
+                self._subscribed = True
+                if reconnect:
+                    self.invalidate()
+
+                for _ in pubsub.listen():
+                    logger.info("📣 AI config change received, will reload on next use")
+                    self.invalidate()
+            except Exception as e:
+                logger.debug(f"AI config subscription unavailable: {e}")
+            self._subscribed = False
+            reconnect = True
+            time.sleep(settings.AI_CONFIG_CHECK_INTERVAL_SECONDS)
@@ -0,0 +1,330 @@
+"""AI提供商路由 - 滚动延迟/错误率统计、熔断器、对冲请求"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from loguru import logger
+from app.core.config import settings
+
+
+class NoProviderAvailable(Exception):
+    """没有可用的AI提供商（未配置或全部熔断）"""
+
+
+class ProviderHealth:
+    """单个提供商的滚动健康统计 + 熔断器
+
+    熔断器状态:
+    - closed: 正常放行
+    - open: 连续失败达到阈值后打开, 冷却期内不再路由
+    - half_open: 冷却结束后放行一个探测请求, 成功则关闭, 失败则重新打开
+    """
+
+    MIN_SAMPLES = 5  # 计算p95所需的最少样本数
+
+    def __init__(self, provider: str, window: int):
+        self.provider = provider
+        self.latencies = deque(maxlen=window)  # 成功请求耗时（秒）
+        self.outcomes = deque(maxlen=window)  # True=成功, False=失败
+        self.consecutive_failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def p95(self) -> Optional[float]:
+        """最近成功请求的p95延迟"""
+        if len(self.latencies) < self.MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def try_acquire(self, cooldown: float) -> bool:
+        """判断当前是否可以向该提供商发送请求"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= cooldown:
+                self.state = "half_open"
+            if self.state == "half_open" and not self.probe_in_flight:
+                self.probe_in_flight = True
+                logger.info(f"🔌 [{self.provider}] circuit half-open, sending probe request")
+                return True
+            return False
+
+    def record_success(self, latency: Optional[float]):
+        with self._lock:
+            if latency is not None:  # 流式请求的耗时与普通请求不可比, 不计入延迟样本
+                self.latencies.append(latency)
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            if self.state != "closed":
+                logger.info(f"✅ [{self.provider}] circuit closed")
+            self.state = "closed"
+            self.probe_in_flight = False
+
+    def record_failure(self, failure_threshold: int):
+        with self._lock:
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"🚨 [{self.provider}] circuit opened after {self.consecutive_failures} failures")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self.probe_in_flight = False
+
+    def release_probe(self):
+        """探测请求被取消（对冲落败）时释放探测名额"""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def snapshot(self) -> Dict:
+        p95 = self.p95()
+        return {
+            "provider": self.provider,
+            "state": self.state,
+            "p95_latency": round(p95, 3) if p95 is not None else None,
+            "error_rate": round(self.error_rate(), 3),
+            "samples": len(self.outcomes),
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class ProviderRouter:
+    """按健康状况选择提供商, 慢请求超过p95时向备用提供商发送对冲请求, 取最先返回的结果"""
+
+    def __init__(self):
+        self.health: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+        # 同步路径的对冲请求需要在线程中并行执行
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+
+    def _health(self, provider: str) -> ProviderHealth:
+        health = self.health.get(provider)
+        if health is None:
+            with self._lock:
+                health = self.health.setdefault(
+                    provider, ProviderHealth(provider, settings.AI_ROUTER_WINDOW)
+                )
+        return health
+
+    def rank(self, providers: List[str]) -> List[str]:
+        """按健康度排序（健康的按原优先级在前, 高错误率或过慢的在后）, 熔断中的提供商被排除"""
+        ranked = []
+        for priority, provider in enumerate(providers):
+            health = self._health(provider)
+            if health.state == "open" and time.monotonic() - health.opened_at < settings.AI_CIRCUIT_COOLDOWN_SECONDS:
+                continue
+            p95 = health.p95()
+            degraded = (
+                health.error_rate() >= settings.AI_DEGRADED_ERROR_RATE or
+                (p95 is not None and p95 > settings.AI_SLOW_PROVIDER_SECONDS)
+            )
+            ranked.append((degraded, priority, provider))
+        return [provider for _, _, provider in sorted(ranked)]
+
+    def hedge_delay(self, provider: str) -> float:
+        """主请求超过该时长仍未返回时发送对冲请求"""
+        p95 = self._health(provider).p95()
+        return p95 if p95 is not None else settings.AI_HEDGE_DEFAULT_DELAY_SECONDS
+
+    def _next_candidate(self, candidates: List[str]) -> Optional[str]:
+        """取出下一个熔断器放行的候选提供商（半开状态只在真正发送时占用探测名额）"""
+        while candidates:
+            provider = candidates.pop(0)
+            if self._health(provider).try_acquire(settings.AI_CIRCUIT_COOLDOWN_SECONDS):
+                return provider
+        return None
+
+    def _timed_sync(self, provider: str, call: Callable[[str], str]) -> str:
+        health = self._health(provider)
+        started = time.monotonic()
+        try:
+            result = call(provider)
+        except Exception as e:
+            health.record_failure(settings.AI_CIRCUIT_FAILURE_THRESHOLD)
+            logger.warning(f"⚠️ [{provider}] request failed: {e}")
+            raise
+        health.record_success(time.monotonic() - started)
+        return result
+
+    async def _timed_async(self, provider: str, call: Callable[[str], Awaitable[str]]) -> str:
+        health = self._health(provider)
+        started = time.monotonic()
+        try:
+            result = await call(provider)
+        except asyncio.CancelledError:
+            health.release_probe()
+            raise
+        except Exception as e:
+            health.record_failure(settings.AI_CIRCUIT_FAILURE_THRESHOLD)
+            logger.warning(f"⚠️ [{provider}] request failed: {e}")
+            raise
+        health.record_success(time.monotonic() - started)
+        return result
+
+    def call_sync(self, providers: List[str], call: Callable[[str], str], fallback: bool = True) -> Tuple[str, str]:
+        """同步路由调用
+
+        Args:
+            providers: 已配置的提供商（按优先级）
+            call: 对指定提供商发起请求的函数
+            fallback: 是否允许对冲/降级到其他提供商
+
+        Returns:
+            (实际返回结果的提供商, 响应文本)
+        """
+        candidates = self.rank(providers)
+        first = self._next_candidate(candidates)
+        if not first:
+            raise NoProviderAvailable("No AI provider available (all circuits open or none configured)")
+        if not fallback:
+            candidates = []
+
+        pending = {}
+        last_error: Optional[Exception] = None
+
+        def launch(provider: str):
+            pending[self._executor.submit(self._timed_sync, provider, call)] = provider
+
+        launch(first)
+        while pending:
+            # 只有一个在途请求且还有备用时, 等到p95再发对冲请求
+            timeout = None
+            if len(pending) == 1 and candidates:
+                timeout = self.hedge_delay(next(iter(pending.values())))
+
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedge = self._next_candidate(candidates)
+                if hedge:
+                    logger.info(f"⏱️ {next(iter(pending.values()))} exceeded p95, hedging with {hedge}")
+                    launch(hedge)
+                continue
+
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    return provider, future.result()
+                except Exception as e:
+                    last_error = e
+                    if not pending:
+                        next_provider = self._next_candidate(candidates)
+                        if next_provider:
+                            launch(next_provider)
+
+        raise last_error or NoProviderAvailable("All AI providers failed")
+
+    async def call_async(
+        self,
+        providers: List[str],
+        call: Callable[[str], Awaitable[str]],
+        fallback: bool = True
+    ) -> Tuple[str, str]:
+        """异步路由调用（语义同 call_sync, 落败的对冲请求会被取消）"""
+        candidates = self.rank(providers)
+        first = self._next_candidate(candidates)
+        if not first:
+            raise NoProviderAvailable("No AI provider available (all circuits open or none configured)")
+        if not fallback:
+            candidates = []
+
+        pending: Dict[asyncio.Task, str] = {}
+        last_error: Optional[Exception] = None
+
+        def launch(provider: str):
+            pending[asyncio.ensure_future(self._timed_async(provider, call))] = provider
+
+        launch(first)
+        try:
+            while pending:
+                timeout = None
+                if len(pending) == 1 and candidates:
+                    timeout = self.hedge_delay(next(iter(pending.values())))
+
+                done, _ = await asyncio.wait(list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge = self._next_candidate(candidates)
+                    if hedge:
+                        logger.info(f"⏱️ {next(iter(pending.values()))} exceeded p95, hedging with {hedge}")
+                        launch(hedge)
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        return provider, task.result()
+                    except Exception as e:
+                        last_error = e
+                        if not pending:
+                            next_provider = self._next_candidate(candidates)
+                            if next_provider:
+                                launch(next_provider)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error or NoProviderAvailable("All AI providers failed")
+
+    async def stream_async(
+        self,
+        providers: List[str],
+        call: Callable[[str], AsyncIterator[str]],
+        fallback: bool = True
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """流式路由调用, 逐块产出 (提供商, 文本片段)
+
+        首个片段到达前失败可以降级到下一个提供商; 已经开始输出后失败则直接抛出,
+        由调用方决定如何处理已收到的部分内容。流式请求不做对冲。
+        """
+        candidates = self.rank(providers)
+        if not fallback:
+            candidates = candidates[:1]
+
+        last_error: Optional[Exception] = None
+        while True:
+            provider = self._next_candidate(candidates)
+            if not provider:
+                break
+
+            health = self._health(provider)
+            stream = call(provider)
+            started = False
+            try:
+                async for chunk in stream:
+                    started = True
+                    yield provider, chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                health.release_probe()
+                raise
+            except Exception as e:
+                health.record_failure(settings.AI_CIRCUIT_FAILURE_THRESHOLD)
+                logger.warning(f"⚠️ [{provider}] stream failed: {e}")
+                if started:
+                    raise
+                last_error = e
+                continue
+            finally:
+                await stream.aclose()
+
+            health.record_success(None)
+            return
+
+        raise last_error or NoProviderAvailable("No AI provider available (all circuits open or none configured)")
+
+    def get_stats(self) -> List[Dict]:
+        """各提供商健康状况"""
+        return [health.snapshot() for health in self.health.values()]
+
+
+# 全局路由实例
+provider_router = ProviderRouter()
@@ -0,0 +1,144 @@
+"""LLM调用限流 - 每个AI提供商独立的并发信号量 + RPM/TPM令牌桶"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional
+from loguru import logger
+from app.core.config import settings
+from app.services.analyzers.prompt_builder import count_message_tokens
+
+
+class TokenBucket:
+    """按分钟补充的令牌桶（调用方负责加锁）"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(per_minute, 1))
+        self.tokens = self.capacity
+        self.refill_per_second = self.capacity / 60.0
+        self.updated_at = time.monotonic()
+
+    def refill(self):
+        """按流逝时间补充令牌"""
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """取出amount个令牌还需等待的秒数（0表示当前即可取出）"""
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_per_second
+
+    def give_back(self, amount: float):
+        """归还多预留的令牌"""
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ProviderLimiter:
+    """单个AI提供商的限流器
+
+    - 并发: 同时在途的请求数上限（同步路径用线程信号量, 异步路径用事件循环信号量）
+    - RPM: 每分钟请求数
+    - TPM: 每分钟token数（按 prompt估算 + max_tokens 预留, 响应后按实际用量结算）
+    """
+
+    def __init__(self, provider: str, max_concurrency: int, rpm: int, tpm: int):
+        self.provider = provider
+        self.max_concurrency = max(max_concurrency, 1)
+        self.request_bucket = TokenBucket(rpm)
+        self.token_bucket = TokenBucket(tpm)
+
+        self._lock = threading.Lock()
+        self._thread_semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        # asyncio.Semaphore绑定事件循环, Celery中每次asyncio.run都是新循环, 因此按循环分别创建
+        self._loop_semaphores: Dict[int, asyncio.Semaphore] = {}
+
+    def _reserve(self, tokens: float) -> float:
+        """原子地预留1个请求 + tokens个token, 返回需要等待的秒数（0表示预留成功）"""
+        tokens = min(tokens, self.token_bucket.capacity)  # 超大请求按满桶处理, 避免永远等待
+        with self._lock:
+            self.request_bucket.refill()
+            self.token_bucket.refill()
+            wait = max(self.request_bucket.wait_time(1), self.token_bucket.wait_time(tokens))
+            if wait <= 0:
+                self.request_bucket.tokens -= 1
+                self.token_bucket.tokens -= tokens
+            return wait
+
+    def settle(self, reserved_tokens: float, used_tokens: Optional[int]):
+        """按实际token用量结算TPM桶"""
+        if used_tokens is None:
+            return
+        diff = min(reserved_tokens, self.token_bucket.capacity) - used_tokens
+        with self._lock:
+            if diff > 0:
+                self.token_bucket.give_back(diff)
+            else:
+                self.token_bucket.tokens += diff  # 允许透支, 后续请求自然排队
+
+    def _loop_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        key = id(loop)
+        semaphore = self._loop_semaphores.get(key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop_semaphores[key] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, tokens: float):
+        """异步获取调用许可"""
+        async with self._loop_semaphore():
+            while True:
+                wait = self._reserve(tokens)
+                if wait <= 0:
+                    break
+                logger.debug(f"⏳ [{self.provider}] rate limited, waiting {wait:.2f}s")
+                await asyncio.sleep(wait)
+            yield
+
+    @contextmanager
+    def slot_sync(self, tokens: float):
+        """同步获取调用许可（Celery任务使用）"""
+        with self._thread_semaphore:
+            while True:
+                wait = self._reserve(tokens)
+                if wait <= 0:
+                    break
+                logger.debug(f"⏳ [{self.provider}] rate limited, waiting {wait:.2f}s")
+                time.sleep(wait)
+            yield
+
+    def forget_loop(self, loop: asyncio.AbstractEventLoop):
+        """事件循环结束后清理对应的信号量"""
+        self._loop_semaphores.pop(id(loop), None)
+
+
+def estimate_tokens(messages: List[Dict], max_tokens: int) -> int:
+    """估算一次调用最多消耗的token数（prompt token数 + 输出上限）"""
+    return count_message_tokens(messages) + max_tokens
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """获取提供商限流器（按 settings.AI_PROVIDER_LIMITS 覆盖默认值）"""
+    limiter = _limiters.get(provider)
+    if limiter:
+        return limiter
+
+    with _limiters_lock:
+        if provider not in _limiters:
+            overrides = settings.AI_PROVIDER_LIMITS.get(provider, {})
+            _limiters[provider] = ProviderLimiter(
+                provider=provider,
+                max_concurrency=overrides.get("concurrency", settings.AI_MAX_CONCURRENCY),
+                rpm=overrides.get("rpm", settings.AI_RPM_LIMIT),
+                tpm=overrides.get("tpm", settings.AI_TPM_LIMIT),
+            )
+        return _limiters[provider]
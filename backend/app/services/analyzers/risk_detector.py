@@ -1,8 +1,56 @@
 """风险检测器"""
 
-from typing import Dict, List
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
 from loguru import logger
 import re
+from app.core.config import settings
+from app.services.keyword_matcher import keyword_matchers
+
+# 参与风险检测和技术/代币关键词评分的文本字段（只取字段值, 不含字段名; URL会被剔除）
+RISK_TEXT_FIELDS = (
+    "name", "project_name", "text", "description", "summary", "content",
+    "tokenomics", "team_info", "funding", "audit", "audit_status", "whitepaper",
+)
+RISK_TEXT_MAX_DEPTH = 4
+URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+
+# 批量检测时每个进程任务的项目数; 不足一块时直接在当前进程检测
+RISK_BATCH_CHUNK = 500
+
+
+def _collect_text(value, parts: List[str], depth: int = 0):
+    """收集嵌套结构中的字符串值"""
+    if isinstance(value, str):
+        if value:
+            parts.append(value)
+    elif depth < RISK_TEXT_MAX_DEPTH:
+        if isinstance(value, dict):
+            for item in value.values():
+                _collect_text(item, parts, depth + 1)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                _collect_text(item, parts, depth + 1)
+
+
+def flatten_text(value) -> str:
+    """把字段值（字符串 / 嵌套dict或list）展平成文本, 各字符串值之间换行分隔"""
+    parts: List[str] = []
+    _collect_text(value, parts)
+    return "\n".join(parts)
+
+
+def extract_risk_text(project_data: Dict) -> str:
+    """提取风险检测用的小写文本（各字段之间换行分隔, 可疑模式不会跨字段匹配）"""
+    parts: List[str] = []
+    for field in RISK_TEXT_FIELDS:
+        _collect_text(project_data.get(field), parts)
+    text = "\n".join(parts).lower()
+    if "http" in text or "www." in text:
+        text = URL_PATTERN.sub(" ", text)
+    return text
 
 
 class RiskDetector:
@@ -36,54 +84,112 @@ class RiskDetector:
         r"(send|deposit).*?(double|triple|multiply)",  # 发送钱翻倍
         r"first\s+\d+\s+get\s+bonus",  # 前XX名获得奖励
     ]
+    # 每个模式必须出现的字面词: 与关键词在同一次自动机扫描中查找, 出现时才运行对应的预编译正则
+    SCAM_PATTERN_ANCHORS = {
+        SCAM_PATTERNS[0]: ["guaranteed"],
+        SCAM_PATTERNS[1]: ["send", "deposit"],
+        SCAM_PATTERNS[2]: ["bonus"],
+    }
+    # 文本已小写化, 不需要 IGNORECASE
+    SCAM_COMPILED = {pattern: re.compile(pattern) for pattern in SCAM_PATTERNS}
+    
+    # 正面信号关键词 (分类, 关键词)
+    POSITIVE_KEYWORDS = [
+        ("audit", "audit"),  # 同时覆盖 audited
+        ("team_public", "doxxed"),
+        ("team_public", "公开团队"),
+        ("top_auditor", "certik"),
+        ("top_auditor", "peckshield"),
+    ]
     
     def detect_risks(self, project_data: Dict) -> List[Dict]:
         """检测项目风险
         
         Args:
             project_data: 项目数据
-            
+        
         Returns:
             风险列表
         """
+        risks, _ = self._detect(project_data, verbose=True)
+        logger.info(f"🔍 Risk detection completed: {len(risks)} risks found")
+        return risks
+    
+    def detect_risks_many(self, projects: Sequence[Dict], workers: Optional[int] = None) -> List[List[Dict]]:
+        """批量检测风险（整库复查用）
+        
+        项目数超过一块时分块交给进程池并行检测, 结果顺序与输入一致。
+        
+        Args:
+            projects: 项目数据列表
+            workers: 进程数, 默认 RISK_CHECK_WORKERS（0 = CPU核数）
+        
+        Returns:
+            与 projects 一一对应的风险列表
+        """
+        workers = workers or settings.RISK_CHECK_WORKERS or os.cpu_count() or 1
+        chunks = [projects[i:i + RISK_BATCH_CHUNK] for i in range(0, len(projects), RISK_BATCH_CHUNK)]
+        
+        # 守护进程不能再创建子进程, 只能在当前进程检测
+        if workers <= 1 or len(chunks) <= 1 or multiprocessing.current_process().daemon:
+            results = _detect_chunk(projects)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+                results = [risks for chunk in pool.map(_detect_chunk, chunks) for risks in chunk]
+        
+        logger.info(
+            f"🔍 Risk detection completed for {len(projects)} projects: "
+            f"{sum(len(risks) for risks in results)} risks found"
+        )
+        return results
+    
+    def _detect(self, project_data: Dict, verbose: bool = False):
+        """检测风险, 同时返回命中的关键词分类（供 calculate_risk_score 复用同一次扫描）"""
         risks = []
-        text = str(project_data).lower()
+        text = extract_risk_text(project_data)
+        found = keyword_matchers.get("risk").by_category(text)
         
         # 1. 检测高风险关键词
-        for keyword in self.HIGH_RISK_KEYWORDS:
-            if keyword in text:
-                risks.append({
-                    "type": "scam_indicator",
-                    "severity": "high",
-                    "message": f"检测到高风险关键词: '{keyword}'",
-                    "category": "language"
-                })
-                logger.warning(f"🚨 HIGH RISK: Found keyword '{keyword}'")
+        for match in found.get("high", []):
+            risks.append({
+                "type": "scam_indicator",
+                "severity": "high",
+                "message": f"检测到高风险关键词: '{match.keyword}'",
+                "category": "language"
+            })
+            if verbose:
+                logger.warning(f"🚨 HIGH RISK: Found keyword '{match.keyword}'")
         
         # 2. 检测中风险关键词
-        for keyword in self.MEDIUM_RISK_KEYWORDS:
-            if keyword in text:
-                risks.append({
-                    "type": "team_anonymous" if "anonymous" in keyword else "technical",
-                    "severity": "medium",
-                    "message": f"发现风险点: {keyword}",
-                    "category": "transparency" if "anonymous" in keyword else "technical"
-                })
+        for match in found.get("medium", []):
+            anonymous = "anonymous" in match.keyword
+            risks.append({
+                "type": "team_anonymous" if anonymous else "technical",
+                "severity": "medium",
+                "message": f"发现风险点: {match.keyword}",
+                "category": "transparency" if anonymous else "technical"
+            })
         
         # 3. 检测可疑模式
+        anchored = {match.keyword for match in found.get("scam_anchor", [])}
         for pattern in self.SCAM_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
+            if anchored.isdisjoint(self.SCAM_PATTERN_ANCHORS[pattern]):
+                continue
+            if self.SCAM_COMPILED[pattern].search(text):
                 risks.append({
                     "type": "scam_pattern",
                     "severity": "high",
                     "message": f"检测到可疑模式: {pattern}",
                     "category": "pattern"
                 })
-                logger.warning(f"🚨 SCAM PATTERN detected: {pattern}")
+                if verbose:
+                    logger.warning(f"🚨 SCAM PATTERN detected: {pattern}")
         
         # 4. 检测团队透明度
         if "team" in project_data or "team_info" in project_data:
-            team_info = project_data.get("team_info", "").lower()
+            team_parts: List[str] = []
+            _collect_text(project_data.get("team_info"), team_parts)
+            team_info = " ".join(team_parts).lower()
             if "anonymous" in team_info or "anon" in team_info:
                 risks.append({
                     "type": "team_anonymous",
@@ -92,8 +198,11 @@ class RiskDetector:
                     "category": "transparency"
                 })
         
-        # 5. 检测审计状态
-        if "audit" not in text and "audited" not in text:
+        # 5. 检测审计状态（文本提到审计, 或结构化审计信息标记已审计）
+        audit_status = project_data.get("audit_status")
+        if isinstance(audit_status, dict) and audit_status.get("has_audit"):
+            found.setdefault("audit", [])
+        if "audit" not in found:
             risks.append({
                 "type": "no_audit",
                 "severity": "medium",
@@ -112,15 +221,14 @@ class RiskDetector:
                     "category": "technical"
                 })
         
-        logger.info(f"🔍 Risk detection completed: {len(risks)} risks found")
-        return risks
+        return risks, found
     
     def calculate_scam_probability(self, risks: List[Dict]) -> float:
         """计算骗局概率
         
         Args:
             risks: 风险列表
-            
+        
         Returns:
             骗局概率 (0-100)
         """
@@ -147,13 +255,13 @@ class RiskDetector:
         
         Args:
             project_data: 项目数据
-            
+        
         Returns:
             风险评分 (0-100)
         """
         score = 100.0  # 从满分开始扣分
         
-        risks = self.detect_risks(project_data)
+        risks, found = self._detect(project_data)
         
         # 根据风险扣分
         for risk in risks:
@@ -165,17 +273,15 @@ class RiskDetector:
                 score -= 5
         
         # 正面因素加分
-        text = str(project_data).lower()
-        
-        if "audit" in text or "audited" in text:
+        if "audit" in found:
             score += 10
             logger.info("  +10分: 已审计")
         
-        if "doxxed" in text or "公开团队" in text:
+        if "team_public" in found:
             score += 10
             logger.info("  +10分: 团队公开")
         
-        if "certik" in text or "peckshield" in text:
+        if "top_auditor" in found:
             score += 5
             logger.info("  +5分: 知名审计机构")
         
@@ -190,22 +296,46 @@ class RiskDetector:
         Returns:
             是否有致命风险
         """
+        reason = self._fatal_reason(risks)
+        if reason:
+            logger.warning(f"⚠️ FATAL RISK: {reason}")
+        return reason is not None
+    
+    def summarize(self, risks: List[Dict]) -> Dict:
+        """风险摘要（批量复查时写回项目, 不逐个打日志）"""
+        return {
+            "risk_types": sorted({risk["type"] for risk in risks}),
+            "scam_probability": self.calculate_scam_probability(risks),
+            "has_fatal_risk": self._fatal_reason(risks) is not None,
+        }
+    
+    def _fatal_reason(self, risks: List[Dict]) -> Optional[str]:
         # 如果有2个以上高风险,视为致命
         high_risk_count = sum(1 for r in risks if r["severity"] == "high")
         
         if high_risk_count >= 2:
-            logger.warning("⚠️ FATAL RISK: Multiple high-severity risks detected")
-            return True
+            return "Multiple high-severity risks detected"
         
         # 检测特定致命风险
         for risk in risks:
             if risk["type"] == "scam_indicator":
-                logger.warning(f"⚠️ FATAL RISK: {risk['message']}")
-                return True
+                return risk["message"]
         
-        return False
+        return None
+
 
+def _detect_chunk(projects: Sequence[Dict]) -> List[List[Dict]]:
+    """进程池任务: 检测一块项目（模块级函数, 可被子进程按名称导入）"""
+    return [risk_detector._detect(project_data)[0] for project_data in projects]
+
+
+keyword_matchers.define("risk", [
+    *((keyword, "high") for keyword in RiskDetector.HIGH_RISK_KEYWORDS),
+    *((keyword, "medium") for keyword in RiskDetector.MEDIUM_RISK_KEYWORDS),
+    *((keyword, category) for category, keyword in RiskDetector.POSITIVE_KEYWORDS),
+    *((anchor, "scam_anchor")
+      for anchors in RiskDetector.SCAM_PATTERN_ANCHORS.values() for anchor in anchors),
+])
 
 # 全局风险检测器实例
 risk_detector = RiskDetector()
-
@@ -2,20 +2,41 @@
 
 from typing import Dict, Optional
 from loguru import logger
+from app.services.scoring_spec import scoring_spec_store
 
 
 class ProjectScorer:
-    """项目评分器"""
+    """项目评分器（权重、调整项和分级阈值来自评分规范, 见 scoring_spec）"""
     
-    # 各维度权重
-    WEIGHTS = {
-        "team": 0.20,        # 团队背景 20%
-        "technology": 0.25,  # 技术创新 25%
-        "community": 0.20,   # 社区热度 20%
-        "tokenomics": 0.15,  # 代币模型 15%
-        "market_timing": 0.10,  # 市场时机 10%
-        "risk": 0.10,        # 风险控制 10%
-    }
+    def evaluate(
+        self,
+        scores: Dict[str, float],
+        has_fatal_risk: bool = False,
+        has_top_vc: bool = False
+    ) -> Dict:
+        """按当前评分规范计算综合评分和等级
+        
+        Args:
+            scores: 各维度评分 (team/technology/community/tokenomics/market_timing/risk, 0-100)
+            has_fatal_risk: 是否存在致命风险
+            has_top_vc: 是否有顶级VC背书
+            
+        Returns:
+            {overall_score, grade, spec_version}
+        """
+        spec = scoring_spec_store.current()
+        
+        if has_fatal_risk:
+            logger.warning(f"Project has fatal risk, score x{spec.fatal_risk_multiplier}")
+        if has_top_vc:
+            logger.info(f"Project has top-tier VC backing, +{spec.top_vc_bonus:g} bonus")
+        
+        overall = round(spec.composite(scores, fatal_risk=has_fatal_risk, top_vc=has_top_vc), 2)
+        return {
+            "overall_score": overall,
+            "grade": spec.grade(overall),
+            "spec_version": spec.version,
+        }
     
     def calculate_overall_score(
         self,
@@ -43,31 +64,18 @@ class ProjectScorer:
         Returns:
             综合评分 (0-100)
         """
-        
-        # 加权平均
-        overall = (
-            team_score * self.WEIGHTS["team"] +
-            tech_score * self.WEIGHTS["technology"] +
-            community_score * self.WEIGHTS["community"] +
-            tokenomics_score * self.WEIGHTS["tokenomics"] +
-            market_timing_score * self.WEIGHTS["market_timing"] +
-            risk_score * self.WEIGHTS["risk"]
-        )
-        
-        # 致命风险降级
-        if has_fatal_risk:
-            logger.warning("Project has fatal risk, score reduced by 50%")
-            overall *= 0.5
-        
-        # 顶级VC加分
-        if has_top_vc:
-            logger.info("Project has top-tier VC backing, +5 bonus")
-            overall += 5
-        
-        # 确保在0-100范围内
-        overall = min(max(overall, 0), 100)
-        
-        return round(overall, 2)
+        return self.evaluate(
+            {
+                "team": team_score,
+                "technology": tech_score,
+                "community": community_score,
+                "tokenomics": tokenomics_score,
+                "market_timing": market_timing_score,
+                "risk": risk_score,
+            },
+            has_fatal_risk=has_fatal_risk,
+            has_top_vc=has_top_vc,
+        )["overall_score"]
     
     def calculate_grade(self, score: float) -> str:
         """根据评分计算等级
@@ -78,14 +86,7 @@ class ProjectScorer:
         Returns:
             等级: S, A, B, C
         """
-        if score >= 85:
-            return "S"
-        elif score >= 70:
-            return "A"
-        elif score >= 55:
-            return "B"
-        else:
-            return "C"
+        return scoring_spec_store.current().grade(score)
     
     def score_team(self, data: Dict) -> float:
         """评估团队背景
@@ -0,0 +1,93 @@
+"""LLM调用记录 - 缓冲后批量写入 llm_usage_logs 表"""
+
+import atexit
+import threading
+import time
+from typing import Dict, List
+from loguru import logger
+from app.core.config import settings
+
+
+class UsageRecorder:
+    """记录每次LLM调用的token用量和耗时
+
+    调用路径上只做内存追加, 攒够一批或超过间隔后在后台线程批量写库,
+    不阻塞Celery任务和FastAPI事件循环。
+    """
+
+    FLUSH_SIZE = 50  # 攒够多少条写一次
+    FLUSH_INTERVAL = 30  # 最长多少秒写一次
+
+    def __init__(self):
+        self._buffer: List[Dict] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        operation: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency: float,
+        success: bool = True,
+        streamed: bool = False,
+        usage_estimated: bool = False
+    ):
+        if not settings.AI_USAGE_LOG_ENABLED:
+            return
+
+        with self._lock:
+            self._buffer.append({
+                "provider": provider,
+                "model": model,
+                "operation": operation,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "latency_ms": int(latency * 1000),
+                "success": success,
+                "streamed": streamed,
+                "usage_estimated": usage_estimated,
+            })
+            due = (
+                len(self._buffer) >= self.FLUSH_SIZE or
+                time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL
+            )
+            batch = self._take() if due else None
+
+        if batch:
+            threading.Thread(target=self._write, args=(batch,), daemon=True).start()
+
+    def _take(self) -> List[Dict]:
+        """取出缓冲区（调用方持有锁）"""
+        batch, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+        return batch
+
+    def flush(self):
+        """立即写入缓冲区中的记录（批处理结束/进程退出时调用）"""
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: List[Dict]):
+        try:
+            from app.db.session import SessionLocal
+            from app.models.ai_system import LLMUsageLog
+
+            db = SessionLocal()
+            try:
+                db.bulk_insert_mappings(LLMUsageLog, batch)
+                db.commit()
+                logger.debug(f"📝 Recorded {len(batch)} LLM usage rows")
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Failed to record LLM usage ({len(batch)} rows dropped): {e}")
+
+
+# 全局实例
+usage_recorder = UsageRecorder()
+atexit.register(usage_recorder.flush)
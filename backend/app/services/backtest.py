@@ -0,0 +1,487 @@
+"""评分回测 - 用历史快照按时间点重放评分, 评估排名质量
+
+每个评估时间点只使用当时已有的数据:
+- 社交指标取该时间点之前最近的 social_metrics 快照（超过 max_staleness 视为缺失）
+- 增长率由快照计算（当前值 / 30天前的值 - 1）, 不使用 extra_metadata 中的当前增长数据
+- 项目在 first_discovered_at 之后才进入排名
+- 前瞻收益取 horizon 之后的目标指标（默认 onchain_metrics.price_usd）相对当时的涨幅
+
+特征矩阵与评分规范无关（除赛道分外）, 每个项目只展开一次, 然后用每个候选评分规范
+分别调用 scoring_kernel 评分。项目按块分给进程池, 每个进程自己读取所负责项目的快照。
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from loguru import logger
+from sqlalchemy import select
+from app.core.config import settings
+from app.services import scoring_kernel
+from app.services.scoring_spec import CompiledScoringSpec, scoring_spec_store
+
+# 每个进程任务的项目数
+BACKTEST_CHUNK_PROJECTS = 50
+# 增长率的回看窗口
+GROWTH_WINDOW_HOURS = 30 * 24
+
+SOCIAL_COLUMNS = (
+    "twitter_followers", "twitter_engagement_rate", "telegram_members", "telegram_message_frequency",
+    "discord_members", "discord_online_members", "github_stars", "github_forks",
+    "github_commits_last_week", "github_contributors",
+)
+ONCHAIN_COLUMNS = ("price_usd", "market_cap", "tvl_usd", "volume_24h", "holder_count")
+# 前瞻收益可用的目标指标 → 所在快照表
+TARGETS = {
+    **{column: "onchain" for column in ONCHAIN_COLUMNS},
+    "twitter_followers": "social",
+    "telegram_members": "social",
+}
+
+_COL = scoring_kernel.FEATURE_INDEX
+
+
+def _epoch_seconds(values: Sequence[datetime]) -> np.ndarray:
+    return np.array(values, dtype="datetime64[s]").astype(np.int64)
+
+
+def _as_of(times: np.ndarray, grid: np.ndarray, max_age: int) -> np.ndarray:
+    """每个时间点之前最近一个快照的下标（没有或超过 max_age 秒时为 -1）"""
+    index = np.searchsorted(times, grid, side="right") - 1
+    valid = index >= 0
+    valid[valid] = grid[valid] - times[index[valid]] <= max_age
+    return np.where(valid, index, -1)
+
+
+def _take(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """按下标取值, 下标为 -1 时为 NaN"""
+    if not len(values):
+        return np.full(len(index), np.nan)
+    return np.where(index >= 0, values[np.maximum(index, 0)], np.nan)
+
+
+def _load_series(db, model, columns: Sequence[str], project_ids: Sequence[int], since: datetime, until: datetime):
+    """读取一组项目的快照 → {项目ID: (时间秒数组, {列: float数组, 缺失为NaN})}"""
+    rows = db.execute(
+        select(model.project_id, model.snapshot_time, *(getattr(model, column) for column in columns)).where(
+            model.project_id.in_(project_ids),
+            model.snapshot_time >= since,
+            model.snapshot_time < until,
+        ).order_by(model.project_id, model.snapshot_time)
+    ).all()
+    if not rows:
+        return {}
+
+    project_column = np.array([row[0] for row in rows], dtype=np.int64)
+    times = _epoch_seconds([row[1] for row in rows])
+    values = {
+        column: np.array([np.nan if row[i] is None else float(row[i]) for row in rows], dtype=np.float64)
+        for i, column in enumerate(columns, start=2)
+    }
+    bounds = np.r_[0, np.flatnonzero(np.diff(project_column)) + 1, len(rows)]
+    return {
+        int(project_column[start]): (
+            times[start:end], {column: array[start:end] for column, array in values.items()}
+        )
+        for start, end in zip(bounds[:-1], bounds[1:])
+    }
+
+
+def _growth(values: np.ndarray, times: np.ndarray, grid: np.ndarray, max_age: int) -> np.ndarray:
+    """时间点上相对 GROWTH_WINDOW_HOURS 前的增长率（缺少任一端时为0）"""
+    now = _take(values, _as_of(times, grid, max_age))
+    before = _take(values, _as_of(times, grid - GROWTH_WINDOW_HOURS * 3600, max_age))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = now / before - 1
+    return np.where(np.isfinite(growth) & (before > 0), growth, 0.0)
+
+
+def build_project_matrix(
+    project: Dict,
+    social,
+    grid: np.ndarray,
+    max_age: int,
+    spec: CompiledScoringSpec
+) -> np.ndarray:
+    """一个项目在所有时间点上的特征矩阵 (时间点数 × 特征数)
+
+    静态字段来自 extra_metadata; 社交字段按 build_scoring_input 的换算方式逐时间点覆盖。
+    """
+    project_data = dict(project["metadata"] or {})
+    project_data["category"] = project["category"] or ""
+    project_data.pop("growth_data", None)
+    matrix = np.tile(
+        np.array(scoring_kernel.extract_features(project_data, spec), dtype=np.float64), (len(grid), 1)
+    )
+    if social is None:
+        return matrix
+
+    times, values = social
+    index = _as_of(times, grid, max_age)
+    column = {name: _take(array, index) for name, array in values.items()}
+
+    def fill(present: np.ndarray, updates: Dict[str, np.ndarray]):
+        for name, value in updates.items():
+            matrix[present, _COL[name]] = np.nan_to_num(value[present])
+
+    followers = column["twitter_followers"]
+    fill(~np.isnan(followers), {
+        "has_twitter": np.ones(len(grid)),
+        "twitter_followers": followers,
+        "engagement_rate": column["twitter_engagement_rate"] / 100,  # 表中存百分比
+    })
+    fill(~np.isnan(column["telegram_members"]), {
+        "has_telegram": np.ones(len(grid)),
+        "telegram_members": column["telegram_members"],
+        "daily_messages": column["telegram_message_frequency"] * 24,  # 表中存每小时消息数
+    })
+    discord_members = column["discord_members"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fill(np.nan_to_num(discord_members) > 0, {
+            "has_discord": np.ones(len(grid)),
+            "discord_activity": np.nan_to_num(column["discord_online_members"]) / discord_members * 100,
+        })
+    fill(~np.isnan(column["github_stars"]) | ~np.isnan(column["github_contributors"]), {
+        "has_github": np.ones(len(grid)),
+        "commits_30d": column["github_commits_last_week"] * 4,
+        "contributors": column["github_contributors"],
+        "stars": column["github_stars"],
+    })
+    matrix[:, _COL["twitter_growth"]] = _growth(values["twitter_followers"], times, grid, max_age)
+    matrix[:, _COL["telegram_growth"]] = _growth(values["telegram_members"], times, grid, max_age)
+    return matrix
+
+
+def _forward_returns(series, target: str, grid: np.ndarray, horizon: int, max_age: int) -> np.ndarray:
+    """时间点到 horizon 之后目标指标的涨幅（缺失为NaN）"""
+    if series is None:
+        return np.full(len(grid), np.nan)
+    times, values = series
+    now = _take(values[target], _as_of(times, grid, max_age))
+    later = _take(values[target], _as_of(times, grid + horizon, max_age))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = later / now - 1
+    return np.where(np.isfinite(returns) & (now > 0), returns, np.nan)
+
+
+def _init_worker():
+    """进程池初始化: 不复用父进程的数据库连接"""
+    from app.db.session import engine
+
+    engine.dispose(close=False)
+
+
+def _backtest_chunk(payload: Dict) -> Dict:
+    """进程池任务: 读取一块项目的快照, 展开特征并用每个评分规范评分（模块级函数, 可被子进程按名称导入）"""
+    from app.db.session import SessionLocal
+    from app.models.project import OnchainMetrics, SocialMetrics
+
+    projects = payload["projects"]
+    grid = payload["grid"]
+    max_age, horizon, target = payload["max_age"], payload["horizon"], payload["target"]
+    specs = {label: scoring_spec_store.compile(spec) for label, spec in payload["specs"].items()}
+    ids = [project["id"] for project in projects]
+    since = datetime.utcfromtimestamp(int(grid[0]) - GROWTH_WINDOW_HOURS * 3600 - max_age)
+    until = datetime.utcfromtimestamp(int(grid[-1]) + horizon + 1)
+
+    db = SessionLocal()
+    try:
+        social = _load_series(db, SocialMetrics, SOCIAL_COLUMNS, ids, since, until)
+        onchain = (
+            _load_series(db, OnchainMetrics, ONCHAIN_COLUMNS, ids, since, until)
+            if TARGETS[target] == "onchain" else social
+        )
+    finally:
+        db.close()
+
+    shape = (len(grid), len(projects))
+    scores = {label: np.zeros(shape, dtype=np.int16) for label in specs}
+    grades = {label: np.zeros(shape, dtype=np.int8) for label in specs}
+    forward = np.full(shape, np.nan, dtype=np.float32)
+    eligible = np.zeros(shape, dtype=bool)
+    track_column = _COL["track_score"]
+
+    first_spec = next(iter(specs.values()))
+    for j, project in enumerate(projects):
+        eligible[:, j] = grid >= project["discovered_at"]
+        forward[:, j] = _forward_returns(onchain.get(project["id"]), target, grid, horizon, max_age)
+        matrix = build_project_matrix(project, social.get(project["id"]), grid, max_age, first_spec)
+        for label, spec in specs.items():
+            matrix[:, track_column] = spec.track_score(project["category"] or "")
+            results = scoring_kernel.score_matrix(matrix, spec)
+            scores[label][:, j] = results["composite_score"]
+            grades[label][:, j] = results["grade_index"]
+
+    return {"scores": scores, "grades": grades, "forward": forward, "eligible": eligible}
+
+
+def average_ranks(values: np.ndarray) -> np.ndarray:
+    """平均秩（并列取平均, 评分是整数, 并列很多）"""
+    order = np.argsort(values, kind="mergesort")
+    ordered = values[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    ends = np.r_[starts[1:], len(values)]
+    group = np.repeat(np.arange(len(starts)), ends - starts)
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = ((starts + ends - 1) / 2.0)[group]
+    return ranks
+
+
+def _spearman(x: np.ndarray, y: np.ndarray) -> float:
+    rx, ry = average_ranks(x), average_ranks(y)
+    rx, ry = rx - rx.mean(), ry - ry.mean()
+    denominator = np.sqrt((rx * rx).sum() * (ry * ry).sum())
+    return float((rx * ry).sum() / denominator) if denominator > 0 else np.nan
+
+
+def _nan_stat(values: List[float], fn) -> Optional[float]:
+    values = [v for v in values if v is not None and not np.isnan(v)]
+    return round(float(fn(values)), 4) if values else None
+
+
+def ranking_metrics(
+    scores: np.ndarray,
+    grades: np.ndarray,
+    forward: np.ndarray,
+    eligible: np.ndarray,
+    spec: CompiledScoringSpec,
+    top_k: int,
+    winner_return: float,
+    alert_grade: str,
+    step_hours: float
+) -> Dict:
+    """排名质量指标
+
+    - ic: 每个时间点评分与前瞻收益的Spearman相关, 取均值和IR（均值/标准差）
+    - precision_at_k / recall_at_k: 评分前k名中赢家（前瞻收益 ≥ winner_return）的比例 / 赢家被前k名覆盖的比例
+    - grades: 各分级的平均前瞻收益和赢家比例
+    - lead_time: 每个赢家第一次达到 alert_grade 的时间相对其上涨起点（第一次前瞻收益达标的时间点）提前多少小时
+    """
+    labels = list(spec.grade_labels)
+    if alert_grade not in labels:
+        raise ValueError(f"Unknown alert grade {alert_grade} (spec {spec.version} grades: {labels})")
+    alert_index = labels.index(alert_grade)
+
+    ics, precisions, recalls, top_returns, universe_returns = [], [], [], [], []
+    for t in range(scores.shape[0]):
+        valid = eligible[t] & ~np.isnan(forward[t])
+        if valid.sum() < 3:
+            continue
+        score, returns = scores[t, valid], forward[t, valid].astype(np.float64)
+        ics.append(_spearman(score, returns))
+
+        top = np.argsort(-score, kind="mergesort")[:top_k]
+        winners = returns >= winner_return
+        precisions.append(winners[top].mean())
+        if winners.any():
+            recalls.append(winners[top].sum() / winners.sum())
+        top_returns.append(returns[top].mean())
+        universe_returns.append(returns.mean())
+
+    # 各分级的前瞻收益
+    valid = eligible & ~np.isnan(forward)
+    grade_stats = {}
+    for index, label in enumerate(labels):
+        mask = valid & (grades == index)
+        count = int(mask.sum())
+        returns = forward[mask].astype(np.float64)
+        grade_stats[str(label)] = {
+            "observations": count,
+            "mean_forward_return": round(float(returns.mean()), 4) if count else None,
+            "winner_rate": round(float((returns >= winner_return).mean()), 4) if count else None,
+        }
+
+    # 赢家的提前量
+    breakout = valid & (forward >= winner_return)
+    flagged = eligible & (grades >= alert_index)
+    is_winner = breakout.any(axis=0)
+    breakout_at = breakout.argmax(axis=0)
+    flagged_at = np.where(flagged.any(axis=0), flagged.argmax(axis=0), -1)
+    winner_flags = flagged_at[is_winner]
+    winner_breakouts = breakout_at[is_winner]
+    early = (winner_flags >= 0) & (winner_flags <= winner_breakouts)
+    leads = (winner_breakouts[early] - winner_flags[early]) * step_hours
+    ic_std = _nan_stat(ics, np.std)
+
+    return {
+        "time_points": len(ics),
+        "ic_mean": _nan_stat(ics, np.mean),
+        "ic_ir": round(_nan_stat(ics, np.mean) / ic_std, 4) if ic_std else None,
+        f"precision_at_{top_k}": _nan_stat(precisions, np.mean),
+        f"recall_at_{top_k}": _nan_stat(recalls, np.mean),
+        f"top_{top_k}_mean_return": _nan_stat(top_returns, np.mean),
+        "universe_mean_return": _nan_stat(universe_returns, np.mean),
+        "grades": grade_stats,
+        "lead_time": {
+            "alert_grade": alert_grade,
+            "winners": int(is_winner.sum()),
+            "flagged_before_breakout": int(early.sum()),
+            "flagged_rate": round(float(early.mean()), 4) if len(early) else None,
+            "median_lead_hours": round(float(np.median(leads)), 1) if len(leads) else None,
+            "mean_lead_hours": round(float(leads.mean()), 1) if len(leads) else None,
+        },
+    }
+
+
+class ScoringBacktest:
+    """评分规范回测: 对比当前规范与候选规范（权重/分级阈值调整）的历史排名质量"""
+
+    def load_projects(self, db, statuses: Optional[List[str]] = None) -> List[Dict]:
+        from app.models import Project
+
+        query = db.query(
+            Project.id, Project.category, Project.extra_metadata,
+            Project.first_discovered_at, Project.created_at
+        )
+        if statuses:
+            query = query.filter(Project.status.in_(statuses))
+        return [
+            {
+                "id": row.id,
+                "category": row.category,
+                "metadata": row.extra_metadata,
+                "discovered_at": int(_epoch_seconds([row.first_discovered_at or row.created_at or datetime.min])[0]),
+            }
+            for row in query.order_by(Project.id).all()
+        ]
+
+    def run(
+        self,
+        specs: Dict[str, Dict],
+        start: datetime,
+        end: datetime,
+        step_hours: float = 24,
+        horizon_hours: float = 30 * 24,
+        target: str = "price_usd",
+        top_k: int = 20,
+        winner_return: float = 1.0,
+        alert_grade: str = "A",
+        max_staleness_hours: float = 7 * 24,
+        statuses: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        projects: Optional[List[Dict]] = None
+    ) -> Dict:
+        """回测
+
+        Args:
+            specs: {标签: 评分规范字典}, 如 {"v1": 当前规范, "v1+weights": 调整权重后的规范}
+            start / end: 评估时间范围（end 之后还需要 horizon 的数据计算前瞻收益）
+            step_hours: 评估时间点间隔
+            horizon_hours: 前瞻收益的时间跨度
+            target: 前瞻收益的目标指标, 见 TARGETS
+            top_k: 排名前k名
+            winner_return: 前瞻收益达到该值算赢家（1.0 = 翻倍）
+            alert_grade: 计算提前量时"被发现"的最低分级
+            max_staleness_hours: 快照超过该时长视为缺失
+            statuses: 只回测指定状态的项目
+            workers: 进程数, 默认 BACKTEST_WORKERS（0 = CPU核数）
+            projects: 直接指定项目（默认从 projects 表读取）
+
+        Returns:
+            {"config": 回测参数, "specs": {标签: 排名质量指标}, "projects": 项目数, "elapsed_seconds": 耗时}
+
+        Raises:
+            ValueError: 未知的 target, end 早于 start, 或 step_hours 不是正数
+        """
+        if target not in TARGETS:
+            raise ValueError(f"Unknown backtest target {target}, expected one of {sorted(TARGETS)}")
+        # 空的时间网格会让各块在 grid[0] 处越界, 派发前检查
+        if end < start:
+            raise ValueError(f"Backtest end {end.isoformat()} is before start {start.isoformat()}")
+        if int(step_hours * 3600) <= 0:
+            raise ValueError(f"Backtest step_hours must be positive, got {step_hours}")
+        started = time.perf_counter()
+
+        if projects is None:
+            from app.db.session import SessionLocal
+
+            db = SessionLocal()
+            try:
+                projects = self.load_projects(db, statuses)
+            finally:
+                db.close()
+
+        step, horizon = int(step_hours * 3600), int(horizon_hours * 3600)
+        first, last = _epoch_seconds([start, end])
+        grid = np.arange(first, last + 1, step, dtype=np.int64)
+        compiled = {label: scoring_spec_store.compile(spec) for label, spec in specs.items()}
+        payloads = [
+            {
+                "projects": projects[i:i + BACKTEST_CHUNK_PROJECTS],
+                "grid": grid,
+                "specs": specs,
+                "max_age": int(max_staleness_hours * 3600),
+                "horizon": horizon,
+                "target": target,
+            }
+            for i in range(0, len(projects), BACKTEST_CHUNK_PROJECTS)
+        ]
+        logger.info(
+            f"⏪ Backtesting {len(specs)} specs over {len(projects)} projects × {len(grid)} time points "
+            f"({len(payloads)} chunks)"
+        )
+
+        workers = workers or settings.BACKTEST_WORKERS or os.cpu_count() or 1
+        # 守护进程不能再创建子进程, 只能在当前进程回测
+        if workers <= 1 or len(payloads) <= 1 or multiprocessing.current_process().daemon:
+            chunks = [_backtest_chunk(payload) for payload in payloads]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(payloads)), initializer=_init_worker) as pool:
+                chunks = list(pool.map(_backtest_chunk, payloads))
+        replayed = time.perf_counter()
+
+        metrics = {}
+        if chunks:
+            forward = np.concatenate([chunk["forward"] for chunk in chunks], axis=1)
+            eligible = np.concatenate([chunk["eligible"] for chunk in chunks], axis=1)
+            for label, spec in compiled.items():
+                metrics[label] = ranking_metrics(
+                    np.concatenate([chunk["scores"][label] for chunk in chunks], axis=1),
+                    np.concatenate([chunk["grades"][label] for chunk in chunks], axis=1),
+                    forward, eligible, spec, top_k, winner_return, alert_grade, step_hours,
+                )
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"✅ Backtest completed in {elapsed:.1f}s (replay {replayed - started:.1f}s, "
+            f"metrics {elapsed - (replayed - started):.1f}s)"
+        )
+        return {
+            "config": {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "step_hours": step_hours,
+                "horizon_hours": horizon_hours,
+                "target": target,
+                "top_k": top_k,
+                "winner_return": winner_return,
+                "alert_grade": alert_grade,
+                "max_staleness_hours": max_staleness_hours,
+            },
+            "projects": len(projects),
+            "time_points": len(grid),
+            "specs": metrics,
+            "elapsed_seconds": round(elapsed, 2),
+        }
+
+
+def spec_variant(base: Dict, weights: Optional[Dict[str, float]] = None,
+                 grade_cutoffs: Optional[Dict[str, float]] = None, suffix: str = "candidate") -> Dict:
+    """在已有规范上调整权重/分级阈值, 生成候选规范（版本号加后缀, 不写入数据库）"""
+    spec = dict(base)
+    spec["version"] = f"{base['version']}-{suffix}"
+    if weights:
+        spec["weights"] = {**base["weights"], **weights}
+    if grade_cutoffs:
+        spec["grades"] = [
+            {**grade, "min_score": grade_cutoffs.get(grade["grade"], grade["min_score"])}
+            for grade in base["grades"]
+        ]
+    return spec
+
+
+# 全局实例
+scoring_backtest = ScoringBacktest()
@@ -83,6 +83,26 @@ class CoinGeckoCollector:
             logger.error(f"❌ Failed to fetch recently added coins: {e}")
             return []
     
+    def get_coin_list(self) -> List[Dict]:
+        """获取全部币种列表 [{"id", "symbol", "name"}]（用于已知项目词典）"""
+        try:
+            response = requests.get(
+                f"{self.BASE_URL}/coins/list",
+                timeout=30
+            )
+
+            if response.status_code == 200:
+                coins = response.json()
+                logger.info(f"📊 Fetched {len(coins)} coins from CoinGecko coin list")
+                return coins
+            else:
+                logger.warning(f"CoinGecko API returned {response.status_code}")
+                return []
+
+        except Exception as e:
+            logger.error(f"❌ Failed to fetch coin list: {e}")
+            return []
+
     def get_coin_details(self, coin_id: str) -> Dict:
         """获取币种完整详情信息
         
@@ -8,6 +8,24 @@ import discord
 from discord.ext import commands
 
 from app.core.config import settings
+from app.services.keyword_matcher import keyword_matchers
+from app.services.entity_extractor import discord_name_extractor
+
+
+# 消息信息类型关键词 (信息类型, 重要度, 关键词), 按优先级排列
+INFO_TYPE_KEYWORDS = [
+    ("SNAPSHOT_ANNOUNCEMENT", 100, ["snapshot", "快照", "airdrop announcement"]),
+    ("WHITELIST_OPEN", 95, ["whitelist open", "白名单开放", "allowlist"]),
+    ("TOKEN_LAUNCH", 90, ["token launch", "tge", "代币上线"]),
+    ("AIRDROP_ALERT", 85, ["airdrop", "空投"]),
+    ("PARTNERSHIP", 70, ["partnership", "合作", "integration"]),
+]
+
+keyword_matchers.define("discord_info", [
+    (keyword, info_type, importance)
+    for info_type, importance, keywords in INFO_TYPE_KEYWORDS
+    for keyword in keywords
+])
 
 
 class DiscordCollector:
@@ -194,26 +212,11 @@ class DiscordCollector:
         info_type = None
         importance = 0
         
-        # 高优先级关键词
-        if any(kw in text for kw in ["snapshot", "快照", "airdrop announcement"]):
-            info_type = "SNAPSHOT_ANNOUNCEMENT"
-            importance = 100
-        
-        elif any(kw in text for kw in ["whitelist open", "白名单开放", "allowlist"]):
-            info_type = "WHITELIST_OPEN"
-            importance = 95
-        
-        elif any(kw in text for kw in ["token launch", "tge", "代币上线"]):
-            info_type = "TOKEN_LAUNCH"
-            importance = 90
-        
-        elif any(kw in text for kw in ["airdrop", "空投"]):
-            info_type = "AIRDROP_ALERT"
-            importance = 85
-        
-        elif any(kw in text for kw in ["partnership", "合作", "integration"]):
-            info_type = "PARTNERSHIP"
-            importance = 70
+        # 关键词按优先级排列, 取最靠前的命中
+        match = keyword_matchers.get("discord_info").first(text)
+        if match:
+            info_type = match.category
+            importance = int(match.weight)
         
         elif re.search(r"0x[a-fA-F0-9]{40}", text):
             info_type = "CONTRACT_ADDRESS"
@@ -235,21 +238,7 @@ class DiscordCollector:
     
     def extract_project_names(self, text: str) -> List[str]:
         """从文本中提取项目名称"""
-        projects = []
-        
-        # 正则匹配
-        pattern = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'
-        matches = re.findall(pattern, text)
-        projects.extend(matches)
-        
-        # 去重和清洗
-        projects = list(set([p.strip() for p in projects if len(p) > 2]))
-        
-        # 过滤噪音
-        noise_words = ["Discord", "Twitter", "Telegram", "The", "This"]
-        projects = [p for p in projects if p not in noise_words]
-        
-        return projects
+        return discord_name_extractor.extract(text)
     
     async def save_message(self, message: discord.Message):
         """保存消息到数据库"""
@@ -7,6 +7,17 @@ from typing import List, Dict, Optional
 from datetime import datetime
 from loguru import logger
 from bs4 import BeautifulSoup
+from app.services.keyword_matcher import keyword_matchers
+from app.services.entity_extractor import medium_name_extractor
+
+# Web3相关性关键词
+WEB3_KEYWORDS = [
+    "web3", "crypto", "blockchain", "defi", "nft",
+    "dao", "ethereum", "solana", "layer2", "rollup",
+    "metaverse", "gamefi", "socialfi"
+]
+
+keyword_matchers.define("web3_related", [(keyword, "web3") for keyword in WEB3_KEYWORDS])
 
 
 class MediumCollector:
@@ -72,15 +83,8 @@ class MediumCollector:
     
     def is_web3_related(self, article: Dict) -> bool:
         """判断文章是否Web3相关"""
-        text = (article.get("title", "") + " " + article.get("summary", "")).lower()
-        
-        keywords = [
-            "web3", "crypto", "blockchain", "defi", "nft",
-            "dao", "ethereum", "solana", "layer2", "rollup",
-            "metaverse", "gamefi", "socialfi"
-        ]
-        
-        return any(keyword in text for keyword in keywords)
+        text = article.get("title", "") + " " + article.get("summary", "")
+        return keyword_matchers.get("web3_related").contains_any(text)
     
     def scrape_article(self, url: str) -> Optional[Dict]:
         """爬取文章全文
@@ -162,26 +166,8 @@ class MediumCollector:
             return 0
     
     def extract_project_names(self, text: str) -> List[str]:
-        """从文本中提取项目名称"""
-        projects = []
-        
-        # 正则匹配大写开头的词组
-        pattern = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'
-        matches = re.findall(pattern, text)
-        projects.extend(matches)
-        
-        # 去重和清洗
-        projects = list(set([p.strip() for p in projects if len(p) > 2]))
-        
-        # 过滤常见词汇
-        noise_words = [
-            "The", "This", "That", "Medium", "Twitter", "Facebook",
-            "Google", "Apple", "Microsoft", "Amazon"
-        ]
-        projects = [p for p in projects if p not in noise_words]
-        
-        # 限制数量
-        return projects[:50]
+        """从文本中提取项目名称（最多50个）"""
+        return medium_name_extractor.extract(text)
     
     def analyze_article(self, article: Dict) -> Dict:
         """分析文章（使用AI）
@@ -7,6 +7,20 @@ from loguru import logger
 from telethon import TelegramClient, events
 from telethon.tl.types import Channel, User
 from app.core.config import settings
+from app.services.keyword_matcher import keyword_matchers
+
+
+# 项目发布信号关键词
+LAUNCH_KEYWORDS = [
+    "launch", "presale", "airdrop", "testnet", "mainnet",
+    "IDO", "ICO", "token sale", "fair launch", "whitelist"
+]
+
+keyword_matchers.define(
+    "telegram_launch",
+    [(keyword, "launch") for keyword in LAUNCH_KEYWORDS],
+    db_sources=("platform_search_rules:telegram",)
+)
 
 
 class TelegramCollector:
@@ -244,13 +258,10 @@ class TelegramCollector:
         telegram_pattern = r't\.me/([a-zA-Z0-9_]+)'
         telegram_links = re.findall(telegram_pattern, text)
         
-        # 关键词检测
-        keywords = [
-            "launch", "presale", "airdrop", "testnet", "mainnet",
-            "IDO", "ICO", "token sale", "fair launch", "whitelist"
-        ]
-        
-        found_keywords = [kw for kw in keywords if kw.lower() in text.lower()]
+        # 关键词检测（内置关键词 + 数据库启用的 twitter_keywords 和 Telegram 搜索规则关键词）
+        found_keywords = list(dict.fromkeys(
+            match.keyword for match in keyword_matchers.get("telegram_launch").find_unique(text)
+        ))
         
         # 如果没有找到关键信息，返回None
         if not urls and not contracts and not found_keywords:
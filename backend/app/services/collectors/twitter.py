@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from loguru import logger
 import tweepy
 from app.core.config import settings
+from app.services.entity_extractor import twitter_name_extractor
 
 
 class TwitterCollector:
@@ -393,32 +394,7 @@ class TwitterCollector:
         Returns:
             项目名称列表
         """
-        projects = []
-        
-        # 方法1: 正则匹配（大写开头的词组）
-        pattern1 = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'
-        matches1 = re.findall(pattern1, text)
-        projects.extend(matches1)
-        
-        # 方法2: 识别特定模式
-        pattern2 = r'(?:check out|introducing|new project)\s+([A-Z][a-zA-Z\s]+?)(?:\.|,|$)'
-        matches2 = re.findall(pattern2, text, re.IGNORECASE)
-        projects.extend(matches2)
-        
-        # 方法3: 识别网站链接
-        urls = re.findall(r'https?://([a-zA-Z0-9-]+)\.[a-z]+', text)
-        for url in urls:
-            project_name = url.replace('-', ' ').title()
-            projects.append(project_name)
-        
-        # 去重和清洗
-        projects = list(set([p.strip() for p in projects if p.strip()]))
-        
-        # 过滤噪音（通用词汇）
-        noise_words = ["The", "This", "That", "Twitter", "Discord", "Telegram"]
-        projects = [p for p in projects if p not in noise_words and len(p) > 2]
-        
-        return projects
+        return twitter_name_extractor.extract(text)
     
     def mine_comment_section(self, tweet_id: str) -> List[Dict]:
         """挖掘评论区
@@ -0,0 +1,255 @@
+"""项目发现记录持久化 - discover_projects 的结果按规范项目批量写入 project_discoveries
+
+每个规范项目一行（discovery_key: 已知项目为 id:<规范项目ID>, 其余为 name:<小写名称>, 与 mention_counters 的键一致）:
+- 词典已把别名的提及映射到规范项目; 词典快照之后才归并的项目在写入前按规范项目ID合并（ProjectMentionStats.merge）
+- 新项目批量插入, 已有的批量更新最新的提及统计、热度、突发和提及样本; 首次发现时间和审核状态保留
+- 看板和待审核列表按 idx_discovery_heat / idx_discovery_signal 索引读取, 不再重跑发现流程
+"""
+
+import random
+import time
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from loguru import logger
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.models import Project, ProjectDiscovery
+from app.services.mention_aggregator import DEFAULT_SAMPLE_SIZE, ProjectMentionStats
+from app.services.mention_counters import counter_key
+
+WRITE_CHUNK = 1000
+MAX_RATIO = 999.99  # DECIMAL(5, 2)
+
+# 每次更新时覆盖的列（discovery_status / discovered_at 保留）
+UPDATE_COLUMNS = (
+    "project_name", "canonical_project_id", "total_mentions", "platform_mentions", "num_platforms",
+    "signal_strength", "last_mentioned_at", "heat_score", "mentions_24h", "mentions_7d", "growth_rate",
+    "is_trending", "is_surge", "surge_ratio", "has_token", "mention_samples",
+)
+
+
+def _timestamp(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None) if value.tzinfo else value
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return parsed.replace(tzinfo=None) if parsed.tzinfo else parsed
+    return None
+
+
+def _ratio(value) -> Optional[float]:
+    return None if value is None else round(min(float(value), MAX_RATIO), 2)
+
+
+def mention_sample(mention: Dict) -> Dict:
+    """提及样本只保存可序列化的字段（不含原始消息）"""
+    discovered_at = _timestamp(mention.get("discovered_at"))
+    return {
+        "platform": mention.get("platform"),
+        "text": mention.get("text", ""),
+        "discovered_at": discovered_at.isoformat() if discovered_at else None,
+    }
+
+
+def discovery_row(project: Dict, canonical_project_id: Optional[int]) -> Dict:
+    """discover_projects 的一个项目 → project_discoveries 行"""
+    heat = project.get("heat_data") or {}
+    surge = project.get("surge_data") or {}
+    return {
+        "project_name": project["project_name"][:255],
+        "discovery_key": counter_key(project["project_name"], canonical_project_id),
+        "canonical_project_id": canonical_project_id,
+        "total_mentions": project.get("total_mentions", 0),
+        "platform_mentions": project.get("platform_mentions") or {},
+        "num_platforms": project.get("num_platforms", 0),
+        "signal_strength": project.get("signal_strength", 0),
+        "first_discovered_at": _timestamp(project.get("first_discovered_at")),
+        "last_mentioned_at": _timestamp(project.get("last_mentioned_at")),
+        "heat_score": heat.get("heat_score", 0),
+        "mentions_24h": heat.get("mentions_24h", 0),
+        "mentions_7d": heat.get("mentions_7d", 0),
+        "growth_rate": _ratio(heat.get("growth_rate")),
+        "is_trending": int(bool(heat.get("is_trending"))),
+        "is_surge": int(bool(surge.get("is_surge"))),
+        "surge_ratio": _ratio(surge.get("surge_ratio")),
+        "has_token": int(bool((project.get("token_status") or {}).get("has_token"))),
+        "mention_samples": [mention_sample(mention) for mention in project.get("mentions", [])],
+    }
+
+
+def merge_projects(projects: List[Dict]) -> Dict:
+    """同一规范项目的多个发现结果合并成一个: 提及统计和样本按 ProjectMentionStats.merge 合并,
+    名称取信号最强的, 热度/突发取最高的, 任一名称已发币即算已发币"""
+    ordered = sorted(projects, key=lambda project: project.get("signal_strength", 0), reverse=True)
+    rng = random.Random()
+    stats = ProjectMentionStats.from_dict(ordered[0])
+    for project in ordered[1:]:
+        stats.merge(ProjectMentionStats.from_dict(project), DEFAULT_SAMPLE_SIZE, rng)
+    heat = max((project.get("heat_data") or {} for project in projects), key=lambda data: data.get("heat_score", 0))
+    surge = max((project.get("surge_data") or {} for project in projects), key=lambda data: data.get("surge_ratio") or 0)
+    has_token = any((project.get("token_status") or {}).get("has_token") for project in projects)
+    return {**stats.to_dict(), "heat_data": heat, "surge_data": surge, "token_status": {"has_token": has_token}}
+
+
+def discovery_summary(row) -> Dict:
+    """project_discoveries 行 → 接口返回"""
+    as_float = lambda value: float(value) if isinstance(value, Decimal) else value
+    return {
+        "id": row.id,
+        "project_name": row.project_name,
+        "project_id": row.canonical_project_id,
+        "total_mentions": row.total_mentions,
+        "platform_mentions": row.platform_mentions or {},
+        "num_platforms": row.num_platforms,
+        "signal_strength": row.signal_strength,
+        "heat_score": row.heat_score,
+        "mentions_24h": row.mentions_24h,
+        "mentions_7d": row.mentions_7d,
+        "growth_rate": as_float(row.growth_rate),
+        "is_trending": bool(row.is_trending),
+        "is_surge": bool(row.is_surge),
+        "surge_ratio": as_float(row.surge_ratio),
+        "has_token": bool(row.has_token),
+        "mention_samples": row.mention_samples or [],
+        "discovery_status": row.discovery_status,
+        "first_discovered_at": row.first_discovered_at,
+        "last_mentioned_at": row.last_mentioned_at,
+        "updated_at": row.updated_at,
+    }
+
+
+class DiscoveryStore:
+    """项目发现记录的批量写入和查询"""
+
+    def _canonical_ids(self, db: Session, project_ids: Iterable[int]) -> Dict[int, int]:
+        """项目ID → 规范项目ID（未归并的项目指向自己）"""
+        project_ids = list(set(project_ids))
+        canonical = {}
+        for offset in range(0, len(project_ids), WRITE_CHUNK):
+            rows = db.query(Project.id, Project.canonical_project_id).filter(
+                Project.id.in_(project_ids[offset:offset + WRITE_CHUNK])
+            )
+            canonical.update({row.id: row.canonical_project_id or row.id for row in rows})
+        return canonical
+
+    def _current_rows(self, db: Session, keys: List[str]) -> Dict[str, Dict]:
+        current = {}
+        for offset in range(0, len(keys), WRITE_CHUNK):
+            rows = db.query(
+                ProjectDiscovery.id, ProjectDiscovery.discovery_key, ProjectDiscovery.first_discovered_at
+            ).filter(ProjectDiscovery.discovery_key.in_(keys[offset:offset + WRITE_CHUNK]))
+            current.update({row.discovery_key: row._asdict() for row in rows})
+        return current
+
+    def upsert(self, db: Session, projects: List[Dict], dry_run: bool = False) -> Dict:
+        """按规范项目批量写入发现结果
+
+        Args:
+            projects: discover_projects 的结果（含 heat_data / surge_data / token_status / mentions）
+            dry_run: 只统计, 不写入
+        """
+        started = time.perf_counter()
+        canonical = self._canonical_ids(db, (p["project_id"] for p in projects if p.get("project_id") is not None))
+
+        # 归并到同一规范项目的多个名称合并成一条
+        groups = defaultdict(list)
+        for project in projects:
+            project_id = project.get("project_id")
+            canonical_id = canonical.get(project_id, project_id)
+            groups[counter_key(project["project_name"], canonical_id)].append(project)
+        rows = {}
+        for key, members in groups.items():
+            project = members[0] if len(members) == 1 else merge_projects(members)
+            project_id = project.get("project_id")
+            rows[key] = discovery_row(project, canonical.get(project_id, project_id))
+
+        now = datetime.utcnow()
+        current = self._current_rows(db, list(rows))
+        inserts, updates = [], []
+        for key, row in rows.items():
+            previous = current.get(key)
+            if previous is None:
+                inserts.append({**row, "discovery_status": "new", "discovered_at": now, "updated_at": now})
+                continue
+            update = {column: row[column] for column in UPDATE_COLUMNS}
+            first_seen = previous["first_discovered_at"]
+            if row["first_discovered_at"] and (first_seen is None or row["first_discovered_at"] < first_seen):
+                update["first_discovered_at"] = row["first_discovered_at"]
+            updates.append({**update, "id": previous["id"], "updated_at": now})
+
+        if not dry_run:
+            for offset in range(0, len(inserts), WRITE_CHUNK):
+                db.bulk_insert_mappings(ProjectDiscovery, inserts[offset:offset + WRITE_CHUNK])
+            for offset in range(0, len(updates), WRITE_CHUNK):
+                db.bulk_update_mappings(ProjectDiscovery, updates[offset:offset + WRITE_CHUNK])
+            db.commit()
+
+        result = {"projects": len(projects), "inserted": len(inserts), "updated": len(updates), "dry_run": dry_run}
+        logger.info(
+            f"🗂️ Discoveries saved{' (dry run)' if dry_run else ''}: {len(inserts)} new, {len(updates)} updated "
+            f"({len(projects)} projects, {time.perf_counter() - started:.2f}s)"
+        )
+        return result
+
+    def trending(
+        self,
+        db: Session,
+        limit: int = 20,
+        min_heat: int = 0,
+        trending_only: bool = False,
+        surge_only: bool = False
+    ) -> List[Dict]:
+        """热度最高的发现（idx_discovery_heat 倒序扫描）"""
+        query = db.query(ProjectDiscovery).filter(ProjectDiscovery.heat_score >= min_heat)
+        if trending_only:
+            query = query.filter(ProjectDiscovery.is_trending == 1)
+        if surge_only:
+            query = query.filter(ProjectDiscovery.is_surge == 1)
+        rows = query.order_by(ProjectDiscovery.heat_score.desc(), ProjectDiscovery.is_trending.desc()).limit(limit)
+        return [discovery_summary(row) for row in rows]
+
+    def strongest(self, db: Session, limit: int = 20, min_signal: int = 0) -> List[Dict]:
+        """信号强度最高的发现（idx_discovery_signal 倒序扫描, 同分按发现时间新的在前）"""
+        rows = db.query(ProjectDiscovery).filter(
+            ProjectDiscovery.signal_strength >= min_signal
+        ).order_by(ProjectDiscovery.signal_strength.desc(), ProjectDiscovery.discovered_at.desc()).limit(limit)
+        return [discovery_summary(row) for row in rows]
+
+    def find(self, db: Session, projects: List[Tuple[str, Optional[int]]]) -> Dict[Tuple[str, Optional[int]], Dict]:
+        """按 (名称, 规范项目ID) 查找发现记录: 先按规范项目键, 再按名称键, 最后按原名称（旧记录没有键）
+
+        Returns:
+            {(名称, 规范项目ID): 发现记录摘要}, 没有记录的不返回
+        """
+        if not projects:
+            return {}
+        keys = {counter_key(name, project_id) for name, project_id in projects if project_id is not None}
+        keys |= {counter_key(name) for name, _ in projects}
+        names = list({name for name, _ in projects})
+        rows = db.query(ProjectDiscovery).filter(
+            or_(ProjectDiscovery.discovery_key.in_(keys), ProjectDiscovery.project_name.in_(names))
+        ).all()
+        by_key = {row.discovery_key: row for row in rows if row.discovery_key}
+        by_name = {}
+        for row in rows:
+            by_name.setdefault(row.project_name.lower(), row)
+
+        found = {}
+        for name, project_id in projects:
+            row = (
+                (by_key.get(counter_key(name, project_id)) if project_id is not None else None)
+                or by_key.get(counter_key(name))
+                or by_name.get(name.lower())
+            )
+            if row is not None:
+                found[(name, project_id)] = discovery_summary(row)
+        return found
+
+
+# 全局实例
+discovery_store = DiscoveryStore()
@@ -1,16 +1,87 @@
 """AI数据补全服务 - 智能推断和搜索缺失字段"""
 
+import hashlib
+import json
 import re
-from typing import Dict, Optional
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
 from loguru import logger
+from app.core.config import settings
 from app.services.analyzers import ai_analyzer
+from app.services.analyzers.prompt_builder import compact_fields
+from app.services.keyword_matcher import keyword_matchers
+
+
+# AI可以推断的字段及其提示词说明
+AI_FIELD_SPECS = {
+    "blockchain": (
+        "主要运行的区块链平台(Ethereum/Solana/BSC/Polygon/Arbitrum/Base/Avalanche等，如果无法确定则为null)",
+        '从描述中识别区块链关键词(如"on Ethereum", "Solana-based", "multi-chain"等)',
+    ),
+    "category": (
+        "项目分类(DeFi/NFT/GameFi/Infrastructure/DAO/Layer2/Bridge等，如果无法确定则为null)",
+        '从功能描述判断(如"DEX"→DeFi, "NFT marketplace"→NFT, "play-to-earn"→GameFi)',
+    ),
+    "twitter": (
+        "可能的Twitter账号(格式@username，如果无法确定则为null)",
+        "如果描述中有@username或twitter.com/username，提取出来",
+    ),
+    "website": (
+        "可能的官网域名(完整URL，如果无法确定则为null)",
+        "如果描述中有域名，提取第一个",
+    ),
+}
+
+# 区块链关键词映射（只收明确指向某条链的词; 'eth'/'evm' 这类多链通用的词留给AI推断）
+BLOCKCHAIN_KEYWORDS = {
+    'Ethereum': ['ethereum', 'erc-20', 'erc20', 'erc-721'],
+    'Solana': ['solana', 'sol', 'spl'],
+    'BSC': ['bsc', 'binance smart chain', 'bnb chain', 'bep-20'],
+    'Polygon': ['polygon', 'matic'],
+    'Arbitrum': ['arbitrum', 'arb'],
+    'Optimism': ['optimism', 'op mainnet'],
+    'Base': ['base chain', 'base network'],
+    'Avalanche': ['avalanche', 'avax'],
+    'Sui': ['sui network', 'sui blockchain'],
+    'Aptos': ['aptos'],
+}
+
+# 分类关键词映射（'protocol'/'network'/'layer' 这类几乎每个项目都会出现的词不参与规则提取）
+CATEGORY_KEYWORDS = {
+    'DeFi': ['defi', 'dex', 'swap', 'liquidity', 'lending', 'staking', 'yield', 'amm'],
+    'NFT': ['nft', 'non-fungible', 'collectible', 'digital art', 'pfp'],
+    'GameFi': ['gamefi', 'play-to-earn', 'p2e', 'game', 'metaverse'],
+    'Infrastructure': ['infrastructure', 'oracle', 'rpc', 'indexer'],
+    'DAO': ['dao', 'governance', 'decentralized autonomous'],
+    'Bridge': ['bridge', 'cross-chain', 'interoperability'],
+    'Launchpad': ['launchpad', 'ido', 'initial dex offering'],
+}
+
+
+def _keyword_entries(keyword_map: Dict[str, List[str]]) -> List:
+    return [(keyword, value) for value, keywords in keyword_map.items() for keyword in keywords]
+
+
+# 按整词匹配（允许复数s）, 避免 'eth' 命中 'method'; 取映射中排在最前的取值
+keyword_matchers.define("blockchain", _keyword_entries(BLOCKCHAIN_KEYWORDS), whole_word=True, plural=True)
+keyword_matchers.define("category", _keyword_entries(CATEGORY_KEYWORDS), whole_word=True, plural=True)
+
+ENRICH_CACHE_PREFIX = "web3hunter:enrich:"
+ENRICH_CACHE_TTL = 7 * 24 * 3600  # 同一项目名+描述的推断结果缓存7天
+LOCAL_CACHE_SIZE = 2048
 
 
 class DataEnricher:
-    """数据增强器 - 使用AI和搜索引擎补全缺失字段"""
+    """数据增强器 - 先用规则提取, 只有仍缺失的字段才调用AI推断"""
     
     def __init__(self):
         """初始化数据增强器"""
+        # AI推断结果缓存: 进程内LRU + Redis（多个Celery worker共享）
+        self._local_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self.stats = {"enriched": 0, "ai_calls": 0, "cache_hits": 0}
         logger.info("✅ DataEnricher initialized")
     
     def enrich_project(self, project_data: Dict) -> Dict:
@@ -25,42 +96,123 @@ class DataEnricher:
         logger.info(f"🔍 Enriching project: {project_data.get('name', 'Unknown')}")
         
         enriched = project_data.copy()
+        description = project_data.get('description') or ''
         
-        # 1. 使用AI推断缺失字段
-        ai_inferred = self.ai_infer_missing_fields(project_data)
-        
-        # 2. 从描述中提取社交链接
-        social_links = self.extract_social_links_from_text(
-            project_data.get('description', '')
-        )
+        # 1. 规则提取（无网络调用）: 社交链接、区块链、分类
+        extracted = self.extract_social_links_from_text(description)
+        extracted['blockchain'] = self.extract_blockchain_from_description(description)
+        extracted['category'] = self.extract_category_from_description(description)
         
-        # 3. 合并结果（原有数据优先）
-        for key, value in ai_inferred.items():
+        # 2. 合并结果（原有数据优先）
+        for key, value in extracted.items():
             if not enriched.get(key) and value:
                 enriched[key] = value
         
-        for key, value in social_links.items():
-            if not enriched.get(key) and value:
-                enriched[key] = value
+        # 3. 只对仍缺失的字段调用AI推断（按项目名+描述缓存）
+        missing = [field for field in AI_FIELD_SPECS if not enriched.get(field)]
+        if missing:
+            ai_inferred = self.ai_infer_missing_fields(project_data, missing)
+            for key, value in ai_inferred.items():
+                if not enriched.get(key) and value:
+                    enriched[key] = value
         
-        logger.info(f"✅ Enrichment complete for {enriched.get('name')}")
+        self.stats["enriched"] += 1
+        logger.info(f"✅ Enrichment complete for {enriched.get('name')} (AI fields: {missing or 'none'})")
         return enriched
+
+    # ==================== AI推断缓存 ====================
+
+    @staticmethod
+    def _cache_key(name: str, description: str) -> str:
+        """规范化项目名 + 描述哈希"""
+        normalized = re.sub(r'[^a-z0-9\u4e00-\u9fff]+', '', (name or '').lower())
+        digest = hashlib.sha1(description.strip().encode()).hexdigest()[:16]
+        return f"{normalized}:{digest}"
+
+    def _get_redis(self):
+        """Redis不可用时退回纯进程内缓存, 60秒后再重试连接"""
+        if self._redis is None and time.monotonic() >= self._redis_retry_at:
+            try:
+                import redis
+                client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+                client.ping()
+                self._redis = client
+            except Exception as e:
+                self._redis_retry_at = time.monotonic() + 60
+                logger.debug(f"Enrichment cache falling back to in-process only: {e}")
+        return self._redis
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        entry = self._local_cache.get(key)
+        if entry is not None:
+            self._local_cache.move_to_end(key)
+            return entry
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                raw = client.get(ENRICH_CACHE_PREFIX + key)
+                if raw:
+                    entry = json.loads(raw)
+                    self._cache_put_local(key, entry)
+                    return entry
+            except Exception as e:
+                self._redis = None
+                logger.debug(f"Enrichment cache read failed: {e}")
+        return None
+
+    def _cache_put_local(self, key: str, entry: Dict):
+        self._local_cache[key] = entry
+        self._local_cache.move_to_end(key)
+        while len(self._local_cache) > LOCAL_CACHE_SIZE:
+            self._local_cache.popitem(last=False)
+
+    def _cache_set(self, key: str, entry: Dict):
+        self._cache_put_local(key, entry)
+        client = self._get_redis()
+        if client is not None:
+            try:
+                client.setex(ENRICH_CACHE_PREFIX + key, ENRICH_CACHE_TTL, json.dumps(entry, ensure_ascii=False))
+            except Exception as e:
+                self._redis = None
+                logger.debug(f"Enrichment cache write failed: {e}")
     
-    def ai_infer_missing_fields(self, project_data: Dict) -> Dict:
-        """使用AI推断缺失字段
+    def ai_infer_missing_fields(self, project_data: Dict, fields: Optional[List[str]] = None) -> Dict:
+        """使用AI推断缺失字段（结果按项目名+描述缓存, 只询问缓存中没有的字段）
         
         Args:
             project_data: 包含name和description的项目数据
+            fields: 需要推断的字段, 默认全部 (blockchain, category, twitter, website)
             
         Returns:
             推断出的字段字典 {blockchain, category, twitter, website等}
         """
         name = project_data.get('name', 'Unknown')
         description = project_data.get('description', '')
+        fields = [field for field in (fields or AI_FIELD_SPECS) if field in AI_FIELD_SPECS]
         
         if not description or description == 'N/A':
             logger.warning(f"⚠️ No description for {name}, skipping AI inference")
             return {}
+
+        # 缓存记录已询问过的字段（包括AI也无法确定的）, 避免重复调用
+        cache_key = self._cache_key(name, description)
+        cached = self._cache_get(cache_key) or {"asked": [], "values": {}}
+        to_ask = [field for field in fields if field not in cached["asked"]]
+        if not to_ask:
+            self.stats["cache_hits"] += 1
+            logger.debug(f"💾 Enrichment cache hit for {name}")
+            return {field: cached["values"][field] for field in fields if cached["values"].get(field)}
+
+        # 描述去样板并压缩到token预算内
+        description = compact_fields(
+            {"description": description}, settings.AI_ENRICH_PROMPT_TOKEN_BUDGET
+        )["description"]
+
+        json_lines = ",\n".join(f'    "{field}": "{AI_FIELD_SPECS[field][0]}"' for field in to_ask)
+        rule_lines = "\n".join(
+            f"{i}. {field}: {AI_FIELD_SPECS[field][1]}" for i, field in enumerate(to_ask, 1)
+        )
         
         # 构建AI提示词
         prompt = f"""分析以下Web3项目信息，推断缺失的字段：
@@ -70,17 +222,11 @@ class DataEnricher:
 
 请推断并返回JSON格式（只返回JSON，不要其他内容）：
 {{
-    "blockchain": "主要运行的区块链平台(Ethereum/Solana/BSC/Polygon/Arbitrum/Base/Avalanche等，如果无法确定则为null)",
-    "category": "项目分类(DeFi/NFT/GameFi/Infrastructure/DAO/Layer2/Bridge等，如果无法确定则为null)",
-    "twitter": "可能的Twitter账号(格式@username，如果无法确定则为null)",
-    "website": "可能的官网域名(完整URL，如果无法确定则为null)"
+{json_lines}
 }}
 
 推断规则：
-1. blockchain: 从描述中识别区块链关键词(如"on Ethereum", "Solana-based", "multi-chain"等)
-2. category: 从功能描述判断(如"DEX"→DeFi, "NFT marketplace"→NFT, "play-to-earn"→GameFi)
-3. twitter: 如果描述中有@username或twitter.com/username，提取出来
-4. website: 如果描述中有域名，提取第一个
+{rule_lines}
 """
         
         try:
@@ -89,62 +235,34 @@ class DataEnricher:
                 logger.warning("⚠️ No AI provider available, skipping inference")
                 return {}
             
-            # 使用AI客户端
-            client = None
-            model = None
-            
-            if ai_analyzer.active_provider == "deepseek":
-                client = ai_analyzer.deepseek_client
-                model = "deepseek-chat"
-            elif ai_analyzer.active_provider == "claude":
-                client = ai_analyzer.claude_client
-                model = "claude-3-5-sonnet-20241022"
-            elif ai_analyzer.active_provider == "openai":
-                client = ai_analyzer.openai_client
-                model = "gpt-4o-mini"
-            
-            if not client:
-                return {}
-            
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "你是一个Web3项目数据分析专家，擅长从描述中推断项目信息。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=500
-            )
-            
-            result_text = response.choices[0].message.content.strip()
-            
-            # 提取JSON
-            import json
-            # 尝试直接解析
+            # 经AIAnalyzer路由调用（限流、熔断、用量记录）
+            self.stats["ai_calls"] += 1
             try:
-                result = json.loads(result_text)
-            except:
-                # 如果失败，尝试提取JSON部分
-                json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group())
-                else:
-                    logger.warning(f"⚠️ Failed to parse AI response: {result_text[:100]}")
-                    return {}
+                result = ai_analyzer.complete_json(
+                    [
+                        {"role": "system", "content": "你是一个Web3项目数据分析专家，擅长从描述中推断项目信息。"},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=500,
+                    temperature=0.3,
+                    operation="enrich"
+                )
+            except ValueError as e:
+                logger.warning(f"⚠️ Failed to parse AI response: {e}")
+                return {}
             
             # 验证并清理结果
             inferred = {}
-            if result.get('blockchain') and result['blockchain'] != 'null':
-                inferred['blockchain'] = result['blockchain']
-            if result.get('category') and result['category'] != 'null':
-                inferred['category'] = result['category']
-            if result.get('twitter') and result['twitter'] != 'null':
-                inferred['twitter'] = result['twitter']
-            if result.get('website') and result['website'] != 'null':
-                inferred['website'] = result['website']
+            for field in to_ask:
+                if result.get(field) and result[field] != 'null':
+                    inferred[field] = result[field]
+            
+            # 合并已缓存的字段后写回缓存
+            values = {**cached["values"], **inferred}
+            self._cache_set(cache_key, {"asked": sorted(set(cached["asked"]) | set(to_ask)), "values": values})
             
             logger.info(f"🤖 AI inferred fields: {inferred}")
-            return inferred
+            return {field: values[field] for field in fields if values.get(field)}
             
         except Exception as e:
             logger.error(f"❌ AI inference failed: {e}")
@@ -216,28 +334,8 @@ class DataEnricher:
         if not description:
             return None
         
-        desc_lower = description.lower()
-        
-        # 区块链关键词映射
-        blockchain_keywords = {
-            'Ethereum': ['ethereum', 'eth', 'erc-20', 'erc20', 'erc-721', 'evm'],
-            'Solana': ['solana', 'sol', 'spl'],
-            'BSC': ['bsc', 'binance smart chain', 'bnb chain', 'bep-20'],
-            'Polygon': ['polygon', 'matic'],
-            'Arbitrum': ['arbitrum', 'arb'],
-            'Optimism': ['optimism', 'op mainnet'],
-            'Base': ['base chain', 'base network'],
-            'Avalanche': ['avalanche', 'avax'],
-            'Sui': ['sui network', 'sui blockchain'],
-            'Aptos': ['aptos'],
-        }
-        
-        for blockchain, keywords in blockchain_keywords.items():
-            for keyword in keywords:
-                if keyword in desc_lower:
-                    return blockchain
-        
-        return None
+        match = keyword_matchers.get("blockchain").first(description)
+        return match.category if match else None
     
     def extract_category_from_description(self, description: str) -> Optional[str]:
         """从描述中提取项目分类
@@ -251,25 +349,8 @@ class DataEnricher:
         if not description:
             return None
         
-        desc_lower = description.lower()
-        
-        # 分类关键词映射
-        category_keywords = {
-            'DeFi': ['defi', 'dex', 'swap', 'liquidity', 'lending', 'staking', 'yield', 'amm'],
-            'NFT': ['nft', 'non-fungible', 'collectible', 'digital art', 'pfp'],
-            'GameFi': ['gamefi', 'play-to-earn', 'p2e', 'game', 'metaverse'],
-            'Infrastructure': ['infrastructure', 'protocol', 'layer', 'blockchain', 'network'],
-            'DAO': ['dao', 'governance', 'decentralized autonomous'],
-            'Bridge': ['bridge', 'cross-chain', 'interoperability'],
-            'Launchpad': ['launchpad', 'ido', 'initial dex offering'],
-        }
-        
-        for category, keywords in category_keywords.items():
-            for keyword in keywords:
-                if keyword in desc_lower:
-                    return category
-        
-        return None
+        match = keyword_matchers.get("category").first(description)
+        return match.category if match else None
 
 
 # 全局实例
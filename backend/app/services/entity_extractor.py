@@ -0,0 +1,166 @@
+"""文本实体提取 - 项目名、链接、@账号、合约地址一次扫描同时提取
+
+各采集器的 extract_project_names 共用:
+- 所有模式合并成一个预编译正则, 对文本只做一次 finditer
+- 噪音词集合在模块加载时冻结, 不再每次调用重建
+- 上下文模式（"Introducing X"、"X Protocol"）在扫到的词组上就地处理, 不再额外扫描全文
+- 词组里的词可以是大写开头或驼峰（LayerZero、EigenLayer、zkSync）; 驼峰的通用词（DeFi、GitHub）不进入词组,
+  在词组中作为分隔, 各采集器的噪音词也都包含它们
+"""
+
+import re
+from typing import Iterable, List, NamedTuple, Optional
+
+# 驼峰形式的通用词（原来只匹配大写开头的词, 这些词不会出现在项目名里）
+CAMEL_NOISE_WORDS = frozenset({"DeFi", "GameFi", "SocialFi", "TradFi", "YouTube", "GitHub", "LinkedIn", "TikTok"})
+
+# 词组中的一个词: 驼峰/混合大小写（LayerZero、zkSync, 不含驼峰通用词）或大写开头
+NAME_WORD = (
+    rf"(?:(?!(?:{'|'.join(sorted(CAMEL_NOISE_WORDS))})\b)[A-Za-z]*[a-z][A-Z][A-Za-z]*|[A-Z][a-z]+)"
+)
+
+# 合并扫描器: 链接 | 合约地址 | @账号 | 大写开头或驼峰的词组
+ENTITY_PATTERN = re.compile(
+    r"(?P<url>https?://(?:www\.)?(?P<host>[a-zA-Z0-9-]+)\.[a-z]+\S*)"
+    r"|(?P<contract>\b0x[a-fA-F0-9]{40}\b)"
+    r"|(?<![\w@])@(?P<handle>\w{1,30})"
+    rf"|(?P<name>\b{NAME_WORD}(?:\s+{NAME_WORD})*\b)"
+)
+CAPITALIZED_WORD = re.compile(r"[A-Z][a-z]+\Z")
+WHITESPACE = re.compile(r"\s+")
+
+# 词组开头的引导语和限定词（"Introducing Foo" / "The Foo" → "Foo"）
+LEADING_CUES = (("check", "out"), ("new", "project"), ("introducing",), ("announcing",))
+LEADING_DETERMINERS = frozenset({"the", "this", "that", "these", "those", "new", "launch"})
+# 词组首尾的类型词（"Protocol Foo" / "Foo Protocol" → "Foo"）
+LEADING_KINDS = frozenset({"protocol", "network", "chain"})
+TRAILING_KINDS = frozenset({"protocol", "network", "chain", "finance", "swap"})
+
+# 各采集器的噪音词（都包含驼峰通用词）
+DISCOVERY_NOISE_WORDS = CAMEL_NOISE_WORDS | {
+    "The", "This", "That", "These", "Those",
+    "Twitter", "Discord", "Telegram", "Medium",
+    "Http", "Https", "Com", "Org", "Io",
+    "New", "Launch", "Project", "Protocol",
+    "And", "For", "With",
+}
+TWITTER_NOISE_WORDS = CAMEL_NOISE_WORDS | {"The", "This", "That", "Twitter", "Discord", "Telegram"}
+MEDIUM_NOISE_WORDS = CAMEL_NOISE_WORDS | {
+    "The", "This", "That", "Medium", "Twitter", "Facebook",
+    "Google", "Apple", "Microsoft", "Amazon",
+}
+DISCORD_NOISE_WORDS = CAMEL_NOISE_WORDS | {"Discord", "Twitter", "Telegram", "The", "This"}
+
+
+class ExtractedEntities(NamedTuple):
+    names: List[str]  # 候选项目名（按首次出现顺序去重）
+    urls: List[str]
+    handles: List[str]  # 不含@
+    contracts: List[str]
+
+
+def _context_names(phrase: str) -> List[str]:
+    """去掉词组首尾的引导语/类型词后剩下的名称"""
+    words = phrase.split()
+    lowered = [word.lower() for word in words]
+    start, end = 0, len(words)
+    while start < end:
+        for cue in LEADING_CUES:
+            if tuple(lowered[start:start + len(cue)]) == cue:
+                start += len(cue)
+                break
+        else:
+            if lowered[start] not in LEADING_DETERMINERS:
+                break
+            start += 1
+    if start < end and lowered[start] in LEADING_KINDS:
+        start += 1
+    if end - start > 1 and lowered[end - 1] in TRAILING_KINDS:
+        end -= 1
+    if start == 0 and end == len(words) or start >= end:
+        return []
+    return [" ".join(words[start:end])]
+
+
+def scan(text: Optional[str], context: bool = True, url_names: bool = True) -> ExtractedEntities:
+    """单次扫描提取所有实体（项目名未过滤噪音）
+
+    Args:
+        context: 从 "Introducing X" / "X Protocol" 这类词组中额外提取 X
+        url_names: 链接域名转成项目名（"foo-bar.io" → "Foo Bar"）
+    """
+    names, urls, handles, contracts = {}, {}, {}, {}
+    if not text:
+        return ExtractedEntities([], [], [], [])
+
+    for match in ENTITY_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == "name":
+            phrase = match.group("name")
+            if "\n" in phrase or "  " in phrase:
+                phrase = WHITESPACE.sub(" ", phrase)
+            names[phrase] = None
+            if context and " " in phrase:
+                for name in _context_names(phrase):
+                    names[name] = None
+        elif kind == "url":
+            urls[match.group("url")] = None
+            if url_names:
+                name = match.group("host").replace("-", " ").title()
+                if len(name) > 3:
+                    names[name] = None
+        elif kind == "handle":
+            handle = match.group("handle")
+            handles[handle] = None
+            if CAPITALIZED_WORD.match(handle):
+                names[handle] = None
+        else:
+            contracts[match.group("contract")] = None
+
+    return ExtractedEntities(list(names), list(urls), list(handles), list(contracts))
+
+
+class ProjectNameExtractor:
+    """带噪音词和长度过滤的项目名提取"""
+
+    def __init__(
+        self,
+        noise_words: Iterable[str] = DISCOVERY_NOISE_WORDS,
+        min_length: int = 3,
+        max_length: Optional[int] = None,
+        context: bool = True,
+        url_names: bool = True,
+        limit: Optional[int] = None
+    ):
+        self.noise_words = frozenset(noise_words)
+        self.min_length = min_length
+        self.max_length = max_length
+        self.context = context
+        self.url_names = url_names
+        self.limit = limit
+
+    def _keep(self, name: str) -> bool:
+        return (
+            name not in self.noise_words
+            and len(name) >= self.min_length
+            and (self.max_length is None or len(name) <= self.max_length)
+        )
+
+    def extract_entities(self, text: Optional[str]) -> ExtractedEntities:
+        """提取所有实体, 项目名经过噪音词和长度过滤"""
+        entities = scan(text, context=self.context, url_names=self.url_names)
+        names = [name for name in entities.names if self._keep(name)]
+        if self.limit is not None:
+            names = names[:self.limit]
+        return entities._replace(names=names)
+
+    def extract(self, text: Optional[str]) -> List[str]:
+        """提取项目名"""
+        return self.extract_entities(text).names
+
+
+# 全局实例（各采集器的过滤规则）
+discovery_name_extractor = ProjectNameExtractor(DISCOVERY_NOISE_WORDS, max_length=49)
+twitter_name_extractor = ProjectNameExtractor(TWITTER_NOISE_WORDS)
+medium_name_extractor = ProjectNameExtractor(MEDIUM_NOISE_WORDS, context=False, url_names=False, limit=50)
+discord_name_extractor = ProjectNameExtractor(DISCORD_NOISE_WORDS, context=False, url_names=False)
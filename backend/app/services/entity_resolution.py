@@ -0,0 +1,334 @@
+"""项目实体消歧 - 把不同来源写入的同一项目（"NextGen Protocol" / "NextGenProtocol" / "@NextGenProtocol"）归并到一个规范项目
+
+- 标识键: 官网域名、Twitter账号、合约地址, 相同即合并
+- 名称: 规范化名称相同, 或 MinHash LSH（名称三字母组）分桶后三字母组 Jaccard 达到阈值的候选, 在两个簇的标识键不冲突时合并
+- 合并用并查集, 结果写入 projects.canonical_project_id（簇内最小ID, 规范项目指向自己）
+- 增量: canonical_project_id 为空的新项目才产生候选, 已有的簇从表中恢复; 全量重建时所有项目都参与
+- 有项目改指向别的规范项目时（结果中的 remapped）, 调用方重建已知项目词典, 别名的提及随后记到规范项目上
+
+键全部哈希成 uint64 存在 numpy 数组里, 分桶用排序 + 相邻比较, 内存和耗时随项目数线性增长。
+"""
+
+import re
+import time
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.models import Project
+
+WRITE_CHUNK = 1000
+LOAD_CHUNK = 10000
+
+NUM_HASHES = 32
+BANDS = 8  # 每段 NUM_HASHES // BANDS 个最小哈希, Jaccard 0.8 的名称约 98% 概率进入同一桶
+NAME_SIMILARITY = 0.75
+MAX_BUCKET_SIZE = 200  # 更大的桶是泛化名称/占位值, 不作为候选
+MINHASH_CHUNK = 20000
+
+# 名称末尾的通用后缀（按词切分后去掉, 至少保留一个词）
+NAME_SUFFIXES = frozenset({
+    "protocol", "network", "finance", "labs", "lab", "dao", "token", "official", "hq", "app", "io", "xyz",
+})
+NAME_WORD_PATTERN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+|[^\W\d_A-Za-z]+")
+TWITTER_HANDLE_PATTERN = re.compile(r"^[a-z0-9_]{1,15}$")
+PLACEHOLDER_VALUES = frozenset({"", "n/a", "na", "none", "null", "unknown", "tbd", "-"})
+
+# 托管/社交平台域名不能代表项目本身; 子域名托管平台保留完整主机名
+GENERIC_HOSTS = frozenset({
+    "twitter.com", "x.com", "t.me", "telegram.me", "discord.gg", "discord.com", "medium.com", "github.com",
+    "youtube.com", "youtu.be", "coingecko.com", "coinmarketcap.com", "google.com", "docs.google.com",
+    "linktr.ee", "reddit.com", "etherscan.io", "bscscan.com", "solscan.io",
+})
+SUBDOMAIN_HOSTS = frozenset({
+    "github.io", "gitbook.io", "notion.site", "substack.com", "mirror.xyz", "vercel.app", "netlify.app",
+    "medium.com", "pages.dev", "webflow.io",
+})
+
+
+def name_key(name: Optional[str]) -> str:
+    """规范化名称: 按空格/驼峰切词, 去掉末尾通用后缀, 小写拼接（"@NextGenProtocol" → "nextgen"）"""
+    words = NAME_WORD_PATTERN.findall(name or "")
+    while len(words) > 1 and words[-1].lower() in NAME_SUFFIXES:
+        words.pop()
+    return "".join(words).lower()
+
+
+def website_key(url: Optional[str]) -> Optional[str]:
+    """官网域名（去掉 www. 和子域名; 托管平台保留子域名; 社交平台返回None）"""
+    if not url or url.strip().lower() in PLACEHOLDER_VALUES:
+        return None
+    url = url.strip().lower()
+    host = urlparse(url if "://" in url else f"http://{url}").hostname or ""
+    host = host.removeprefix("www.")
+    labels = host.split(".")
+    if len(labels) < 2 or host in GENERIC_HOSTS:
+        return None
+    domain = ".".join(labels[-2:])
+    if domain in SUBDOMAIN_HOSTS:
+        return host if len(labels) > 2 else None
+    return None if domain in GENERIC_HOSTS else domain
+
+
+def twitter_key(handle: Optional[str]) -> Optional[str]:
+    """Twitter账号（兼容 @handle 和 twitter.com/x.com 链接）"""
+    if not handle:
+        return None
+    handle = handle.strip().lower().rstrip("/")
+    if "/" in handle:
+        handle = handle.rsplit("/", 1)[-1]
+    handle = handle.lstrip("@").split("?", 1)[0]
+    return handle if TWITTER_HANDLE_PATTERN.match(handle) and handle not in PLACEHOLDER_VALUES else None
+
+
+def contract_key(address: Optional[str]) -> Optional[str]:
+    """合约地址（EVM地址转小写, 零地址和占位值忽略）"""
+    if not address:
+        return None
+    address = address.strip()
+    if address.lower().startswith("0x"):
+        address = address.lower()
+        if not address[2:].strip("0"):
+            return None
+    return address if len(address) >= 20 and address.lower() not in PLACEHOLDER_VALUES else None
+
+
+def key_hash(value: Optional[str]) -> int:
+    """键 → 非零 uint64（0 表示缺失）"""
+    if not value:
+        return 0
+    return int.from_bytes(blake2b(value.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+
+def trigrams(key: str) -> set:
+    padded = f" {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(a: str, b: str) -> float:
+    ta, tb = trigrams(a), trigrams(b)
+    return len(ta & tb) / len(ta | tb) if ta or tb else 0.0
+
+
+def mix64(values: np.ndarray) -> np.ndarray:
+    """murmur3 fmix64（uint64 乘法按 2^64 回绕）"""
+    values = values ^ (values >> np.uint64(33))
+    values = values * np.uint64(0xFF51AFD7ED558CCD)
+    values = values ^ (values >> np.uint64(33))
+    values = values * np.uint64(0xC4CEB9FE1A85EC53)
+    return values ^ (values >> np.uint64(33))
+
+
+def minhash_bands(keys: List[str], seed: int = 1) -> np.ndarray:
+    """名称三字母组的 MinHash 签名, 按段合并成 (项目数, BANDS) 的 uint64 桶值（空名称为0）
+
+    第 k 个哈希函数为 mix64(三字母组哈希 ^ seeds[k])。
+    """
+    seeds = np.random.default_rng(seed).integers(0, 1 << 63, size=(NUM_HASHES, 1), dtype=np.uint64)
+    rows_per_band = NUM_HASHES // BANDS
+    shingle_hashes = {}  # 不同的三字母组数量有限, 缓存其哈希
+    bands = np.zeros((len(keys), BANDS), dtype=np.uint64)
+
+    for start in range(0, len(keys), MINHASH_CHUNK):
+        chunk = keys[start:start + MINHASH_CHUNK]
+        present = [index for index, key in enumerate(chunk) if key]
+        if not present:
+            continue
+        shingles, offsets = [], []
+        for index in present:
+            offsets.append(len(shingles))
+            for gram in trigrams(chunk[index]):
+                value = shingle_hashes.get(gram)
+                if value is None:
+                    value = shingle_hashes[gram] = key_hash(gram)
+                shingles.append(value)
+        values = mix64(np.asarray(shingles, dtype=np.uint64) ^ seeds)
+        signatures = np.minimum.reduceat(values, offsets, axis=1).T  # (名称数, NUM_HASHES)
+
+        banded = np.zeros((len(present), BANDS), dtype=np.uint64)
+        for row in range(rows_per_band):
+            banded = banded * np.uint64(0x9E3779B97F4A7C15) + signatures[:, row::rows_per_band]
+        bands[start + np.asarray(present)] = banded | np.uint64(1)
+    return bands
+
+
+def equal_runs(values: np.ndarray, pending: np.ndarray) -> Iterable[np.ndarray]:
+    """值相同（非0）且包含待处理项目的分组, 返回每组的行号"""
+    order = np.argsort(values, kind="stable")
+    sorted_values = values[order]
+    starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    ends = np.r_[starts[1:], len(values)]
+    sizes = ends - starts
+    pending_counts = np.add.reduceat(pending[order].astype(np.int64), starts) if len(values) else starts
+    selected = (sorted_values[starts] != 0) & (sizes >= 2) & (pending_counts > 0)
+    oversized = selected & (sizes > MAX_BUCKET_SIZE)
+    if oversized.any():
+        logger.debug(f"🔗 Skipped {int(oversized.sum())} oversized entity buckets")
+    for start, end in zip(starts[selected & ~oversized], ends[selected & ~oversized]):
+        yield order[start:end]
+
+
+class UnionFind:
+    """并查集（根为簇内最小行号）, 每个根记录簇的官网/Twitter/合约键, 用于名称合并时的冲突检查"""
+
+    def __init__(self, parent: np.ndarray, identifiers: np.ndarray):
+        self.parent = parent
+        self.identifiers = identifiers.copy()  # (行数, 3)
+        has_parent = parent != np.arange(len(parent))
+        for column in range(identifiers.shape[1]):
+            mask = has_parent & (identifiers[:, column] != 0)
+            self.identifiers[parent[mask], column] = identifiers[mask, column]
+        self.merges = 0
+
+    def find(self, index: int) -> int:
+        parent = self.parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return int(index)
+
+    def conflicts(self, a: int, b: int) -> bool:
+        ids_a, ids_b = self.identifiers[a], self.identifiers[b]
+        return bool(np.any((ids_a != 0) & (ids_b != 0) & (ids_a != ids_b)))
+
+    def union(self, a: int, b: int, check_conflicts: bool = False) -> bool:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if check_conflicts and self.conflicts(root_a, root_b):
+            return False
+        if root_a > root_b:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        ids_a = self.identifiers[root_a]
+        self.identifiers[root_a] = np.where(ids_a != 0, ids_a, self.identifiers[root_b])
+        self.merges += 1
+        return True
+
+    def roots(self) -> np.ndarray:
+        parent = self.parent
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                return parent
+            parent = grandparent
+
+
+class EntityResolver:
+    """项目实体消歧（批处理）"""
+
+    def _load(self, db: Session) -> Tuple[np.ndarray, List[str], np.ndarray, np.ndarray]:
+        """读取所有项目的ID、规范化名称、标识键哈希和当前规范项目ID（0 表示未处理）"""
+        ids, names, identifiers, canonical = [], [], [], []
+        query = db.query(
+            Project.id, Project.project_name, Project.website, Project.twitter_handle,
+            Project.contract_address, Project.canonical_project_id
+        ).order_by(Project.id).yield_per(LOAD_CHUNK)
+        for row in query:
+            ids.append(row.id)
+            names.append(name_key(row.project_name))
+            identifiers.append((
+                key_hash(website_key(row.website)),
+                key_hash(twitter_key(row.twitter_handle)),
+                key_hash(contract_key(row.contract_address)),
+            ))
+            canonical.append(row.canonical_project_id or 0)
+        return (
+            np.asarray(ids, dtype=np.int64),
+            names,
+            np.asarray(identifiers, dtype=np.uint64).reshape(-1, 3),
+            np.asarray(canonical, dtype=np.int64),
+        )
+
+    def resolve(self, db: Session, full: bool = False, dry_run: bool = False) -> Dict:
+        """归并重复项目并写入 canonical_project_id
+
+        Args:
+            full: 全量重建（忽略已有的归并结果）; 默认只为未处理的新项目找重复
+            dry_run: 只统计, 不写入
+        """
+        if not full and db.query(Project.id).filter(Project.canonical_project_id.is_(None)).first() is None:
+            return {"projects": 0, "pending": 0, "merged": 0, "updated": 0, "remapped": 0, "dry_run": dry_run}
+
+        started = time.perf_counter()
+        ids, names, identifiers, canonical = self._load(db)
+        if not len(ids):
+            return {"projects": 0, "pending": 0, "merged": 0, "updated": 0, "remapped": 0, "dry_run": dry_run}
+        pending = np.ones(len(ids), dtype=bool) if full else canonical == 0
+
+        # 恢复已有的簇（指向已删除项目的按未处理算）
+        parent = np.arange(len(ids))
+        if not full:
+            canonical_rows = np.minimum(np.searchsorted(ids, canonical), len(ids) - 1)
+            valid = ~pending & (ids[canonical_rows] == canonical)
+            parent[valid] = canonical_rows[valid]
+            pending |= ~pending & ~valid
+        union_find = UnionFind(parent, identifiers)
+        loaded = time.perf_counter()
+
+        # 1. 标识键相同直接合并
+        for column in range(identifiers.shape[1]):
+            for members in equal_runs(identifiers[:, column], pending):
+                for member in members[1:]:
+                    union_find.union(int(members[0]), int(member))
+
+        # 2. 名称候选: 规范化名称相同 + LSH 分桶, 三字母组相似且标识键不冲突才合并
+        name_hashes = np.fromiter((key_hash(name) for name in names), dtype=np.uint64, count=len(names))
+        bands = np.zeros((len(ids), BANDS), dtype=np.uint64)
+        if pending.all():
+            lsh_rows = np.arange(len(ids))
+        else:
+            # 同桶必然共享三字母组, 只需为与新项目名称有共同三字母组的项目计算签名
+            pending_grams = set().union(*(trigrams(names[row]) for row in np.flatnonzero(pending) if names[row]))
+            lsh_rows = np.asarray([
+                row for row, name in enumerate(names)
+                if name and (pending[row] or not pending_grams.isdisjoint(trigrams(name)))
+            ], dtype=np.int64)
+        if len(lsh_rows):
+            bands[lsh_rows] = minhash_bands([names[row] for row in lsh_rows])
+        candidate_pairs = set()
+        for values in [name_hashes] + [bands[:, band] for band in range(BANDS)]:
+            for members in equal_runs(values, pending):
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        if pending[a] or pending[b]:
+                            candidate_pairs.add((int(min(a, b)), int(max(a, b))))
+        for a, b in sorted(candidate_pairs):
+            if names[a] == names[b] or trigram_similarity(names[a], names[b]) >= NAME_SIMILARITY:
+                union_find.union(a, b, check_conflicts=True)
+        matched = time.perf_counter()
+
+        # 3. 写入变化的规范项目ID
+        resolved = ids[union_find.roots()]
+        changed = np.flatnonzero(resolved != canonical)
+        updates = [{"id": int(ids[row]), "canonical_project_id": int(resolved[row])} for row in changed]
+        if not dry_run:
+            for offset in range(0, len(updates), WRITE_CHUNK):
+                db.bulk_update_mappings(Project, updates[offset:offset + WRITE_CHUNK])
+            db.commit()
+
+        result = {
+            "projects": len(ids),
+            "pending": int(pending.sum()),
+            "candidate_pairs": len(candidate_pairs),
+            "merged": union_find.merges,
+            "duplicates": int((resolved != ids).sum()),
+            "updated": len(updates),
+            "remapped": sum(1 for update in updates if update["id"] != update["canonical_project_id"]),
+            "dry_run": dry_run,
+        }
+        logger.info(
+            f"🔗 Entity resolution{' (full)' if full else ''}{' (dry run)' if dry_run else ''}: "
+            f"{result['pending']} pending of {result['projects']} projects, {result['merged']} merges, "
+            f"{result['duplicates']} duplicates, {result['updated']} rows updated "
+            f"(load {loaded - started:.2f}s, match {matched - loaded:.2f}s, write {time.perf_counter() - matched:.2f}s)"
+        )
+        return result
+
+
+# 全局实例
+entity_resolver = EntityResolver()
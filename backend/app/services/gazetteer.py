@@ -0,0 +1,548 @@
+"""已知项目词典（gazetteer）- 文本中的项目名/代币符号/推特账号一次扫描映射到规范项目ID
+
+词条来源: projects 表的 project_name / symbol / twitter_handle, 以及 CoinGecko 币种列表
+（与已有项目同名的币种并入该项目, 其余作为只有 coingecko_id 的实体）。
+已归并的重复项目（canonical_project_id, 见 entity_resolution）的词条指向规范项目的ID和名称,
+各别名的提及在聚合、小时计数和发现记录中都落到同一个键上。
+
+结构: 词级前缀树。每个节点是"词条前k个词"的 crc32 哈希, 按哈希排序后存为 numpy 数组;
+匹配时逐层向量化查找 —— 第k层只扩展第k-1层命中且有子节点的位置, 每条文本最多
+MAX_PHRASE_TOKENS 次 searchsorted, 只有完整词条命中时才比对原文排除哈希碰撞。
+
+共享: rebuild_gazetteer 任务把完整快照原子写入 GAZETTEER_PATH, 各进程只读 mmap 加载（页缓存在进程间共享）,
+文件被替换后下次检查时切换到新快照。
+增量: 快照之后新增的项目（id > 快照的 max_project_id）按 GAZETTEER_CHECK_INTERVAL_SECONDS
+从数据库读入进程内的增量表, 与快照一起匹配。
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+from loguru import logger
+from app.core.config import settings
+from app.services.entity_extractor import DISCOVERY_NOISE_WORDS
+
+MAGIC = b"GAZETTR1"
+MAX_PHRASE_TOKENS = 6
+ALIGNMENT = 8
+
+# 词条类型
+KIND_NAME = 1
+KIND_HANDLE = 2
+KIND_SYMBOL = 4
+KIND_NAMES = {KIND_NAME: "name", KIND_HANDLE: "handle", KIND_SYMBOL: "symbol"}
+
+# 节点标记
+NODE_IS_KEY = 1
+NODE_HAS_CHILDREN = 2
+
+TOKEN_PATTERN = re.compile(r"(\$)?([^\W_]+)")
+WORD_PATTERN = re.compile(r"[^\W_]+")  # 与 TOKEN_PATTERN 切出的词一一对应
+HANDLE_PATTERN = re.compile(r"(?:twitter\.com/|x\.com/|@)?([A-Za-z0-9_]{2,30})/?$")
+
+# 单个词的通用词不作为项目名词条（"Base"、"Blast" 这类词只在 CoinGecko 币种里时跳过）
+COMMON_WORDS = frozenset({word.lower() for word in DISCOVERY_NOISE_WORDS} | {
+    "a", "an", "ai", "all", "app", "are", "base", "blast", "bridge", "buy", "chain", "coin", "dao", "defi",
+    "dex", "eth", "finance", "for", "from", "gas", "get", "go", "hold", "in", "is", "it", "just", "layer",
+    "link", "me", "meme", "moon", "network", "nft", "not", "now", "of", "on", "one", "open", "or", "pump",
+    "real", "sell", "so", "swap", "the", "to", "token", "up", "us", "web3", "we", "wrapped", "you",
+})
+
+# 快照中的数组: (名称, dtype)
+ARRAYS = (
+    ("node_hash", np.uint32),
+    ("node_flags", np.uint8),
+    ("node_text_start", np.int64),
+    ("node_text_length", np.int32),
+    ("node_ref_start", np.int32),
+    ("node_ref_count", np.int32),
+    ("ref_entity", np.int32),
+    ("ref_kind", np.uint8),
+    ("text_blob", np.uint8),
+)
+
+
+class Token(NamedTuple):
+    word: str  # 小写
+    start: int
+    end: int
+    cashtag: bool  # 有 $ 前缀
+    upper: bool  # 原文全大写
+    capitalized: bool  # 原文含大写字母（首字母大写或驼峰, 如 zkSync）
+
+
+class GazetteerMatch(NamedTuple):
+    project_id: Optional[int]
+    coingecko_id: Optional[str]
+    name: str  # 规范名称
+    kind: str  # name / handle / symbol
+    start: int  # 在原文中的位置
+    end: int
+    text: str  # 原文中的提及
+
+
+def tokenize(text: Optional[str]) -> List[Token]:
+    """文本 → 词列表（小写词 + 原文位置和大小写信息）"""
+    if not text:
+        return []
+    return [_token(match) for match in TOKEN_PATTERN.finditer(text)]
+
+
+def _token(match: re.Match) -> Token:
+    word = match.group(2)
+    return Token(
+        word.lower(), match.start(2), match.end(2), match.group(1) is not None, word.isupper(),
+        any(char.isupper() for char in word)
+    )
+
+
+def normalize(text: Optional[str]) -> str:
+    """词条规范形式: 小写词以单个空格连接"""
+    return " ".join(token.word for token in tokenize(text))
+
+
+def _handle_key(handle: Optional[str]) -> Optional[str]:
+    match = HANDLE_PATTERN.search((handle or "").strip())
+    return normalize(match.group(1)) if match else None
+
+
+def entity_keys(entity: Dict, from_project: bool) -> List[Tuple[str, int]]:
+    """实体的词条 [(规范形式, 类型)]"""
+    keys = []
+    name = normalize(entity.get("name"))
+    if name and (from_project or " " in name or name not in COMMON_WORDS):
+        keys.append((name, KIND_NAME))
+    handle = _handle_key(entity.get("twitter_handle"))
+    if handle and handle not in COMMON_WORDS:
+        keys.append((handle, KIND_HANDLE))
+    symbol = normalize(entity.get("symbol"))
+    if symbol and " " not in symbol and not symbol.isdigit():
+        keys.append((symbol, KIND_SYMBOL))
+    return [(key, kind) for key, kind in keys if key.count(" ") < MAX_PHRASE_TOKENS]
+
+
+def _prefixes(key: str) -> List[str]:
+    words = key.split(" ")
+    return [" ".join(words[:length]) for length in range(1, len(words) + 1)]
+
+
+class GazetteerSnapshot:
+    """只读 mmap 加载的词典快照"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.stat = os.fstat(f.fileno())
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a gazetteer snapshot: {path}")
+        header_length, = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(self._mmap[header_start:header_start + header_length])
+        self.entities: List[list] = self.header["entities"]  # [[规范项目ID, coingecko_id, 规范名称], ...]
+        self.max_project_id: int = self.header["max_project_id"]
+        for name, dtype in ARRAYS:
+            offset, count = self.header["arrays"][name]
+            setattr(self, name, np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset))
+
+    def same_file(self, stat: os.stat_result) -> bool:
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) == (
+            self.stat.st_ino, self.stat.st_mtime_ns, self.stat.st_size
+        )
+
+    def node_text(self, node: int) -> bytes:
+        start = int(self.node_text_start[node])
+        return self.text_blob[start:start + int(self.node_text_length[node])].tobytes()
+
+    def find_key(self, node: int, key: bytes) -> Optional[int]:
+        """哈希命中的节点中找原文一致的完整词条（处理哈希碰撞）"""
+        target = self.node_hash[node]
+        while node < len(self.node_hash) and self.node_hash[node] == target:
+            if self.node_ref_count[node] and self.node_text(node) == key:
+                return node
+            node += 1
+        return None
+
+    def refs(self, node: int) -> List[Tuple[int, int]]:
+        start = int(self.node_ref_start[node])
+        count = int(self.node_ref_count[node])
+        return list(zip(self.ref_entity[start:start + count].tolist(), self.ref_kind[start:start + count].tolist()))
+
+    def match_spans(self, words: List[str]) -> List[Tuple[int, int, List[Tuple[int, int]]]]:
+        """逐层向量化查找, 返回所有完整词条命中 [(起始词, 结束词, [(实体序号, 类型)])]"""
+        hits = []
+        if not len(self.node_hash) or not words:
+            return hits
+        encoded = [word.encode() for word in words]
+        starts = list(range(len(words)))
+        hashes = [zlib.crc32(word) for word in encoded]
+        for level in range(1, MAX_PHRASE_TOKENS + 1):
+            queries = np.fromiter(hashes, dtype=np.uint32, count=len(hashes))
+            nodes = np.searchsorted(self.node_hash, queries)
+            found = np.flatnonzero(self.node_hash[np.minimum(nodes, len(self.node_hash) - 1)] == queries)
+
+            next_starts, next_hashes = [], []
+            for position in found.tolist():
+                start, node = starts[position], int(nodes[position])
+                flags = self.node_flags[node]
+                end = start + level
+                if flags & NODE_IS_KEY:
+                    key_node = self.find_key(node, b" ".join(encoded[start:end]))
+                    if key_node is not None:
+                        hits.append((start, end, self.refs(key_node)))
+                if flags & NODE_HAS_CHILDREN and end < len(words):
+                    next_starts.append(start)
+                    next_hashes.append(zlib.crc32(b" " + encoded[end], hashes[position]))
+            if not next_starts:
+                break
+            starts, hashes = next_starts, next_hashes
+        return hits
+
+
+def write_snapshot(path: Path, entities: List[list], keys: Dict[str, List[Tuple[int, int]]], max_project_id: int):
+    """编译词条并原子写入快照文件
+
+    Args:
+        entities: [[规范项目ID, coingecko_id, 规范名称], ...]
+        keys: {规范形式: [(实体序号, 类型), ...]}
+    """
+    nodes: Dict[str, List] = {}  # 节点文本 → [标记, 引用列表]
+    for key, refs in keys.items():
+        prefixes = _prefixes(key)
+        for depth, prefix in enumerate(prefixes, start=1):
+            node = nodes.setdefault(prefix, [0, []])
+            if depth < len(prefixes):
+                node[0] |= NODE_HAS_CHILDREN
+        nodes[key][0] |= NODE_IS_KEY
+        nodes[key][1] = refs
+
+    texts = sorted(nodes, key=lambda text: (zlib.crc32(text.encode()), text))
+    node_hash = np.array([zlib.crc32(text.encode()) for text in texts], dtype=np.uint32)
+    node_flags = np.array([nodes[text][0] for text in texts], dtype=np.uint8)
+    # 哈希相同的节点合并标记（逐层查找时只看第一个; 是否真的是词条由 find_key 比对原文和引用决定）
+    if len(texts):
+        run_starts = np.flatnonzero(np.r_[True, node_hash[1:] != node_hash[:-1]])
+        run_lengths = np.diff(np.r_[run_starts, len(texts)])
+        node_flags = np.repeat(np.bitwise_or.reduceat(node_flags, run_starts), run_lengths).astype(np.uint8)
+
+    encoded = [text.encode() for text in texts]
+    lengths = np.array([len(text) for text in encoded], dtype=np.int32)
+    text_start = np.zeros(len(texts), dtype=np.int64)
+    if len(texts):
+        text_start[1:] = np.cumsum(lengths[:-1])
+    ref_counts = np.array([len(nodes[text][1]) for text in texts], dtype=np.int32)
+    ref_start = np.zeros(len(texts), dtype=np.int32)
+    if len(texts):
+        ref_start[1:] = np.cumsum(ref_counts[:-1])
+    flat_refs = [ref for text in texts for ref in nodes[text][1]]
+
+    arrays = {
+        "node_hash": node_hash,
+        "node_flags": node_flags,
+        "node_text_start": text_start,
+        "node_text_length": lengths,
+        "node_ref_start": ref_start,
+        "node_ref_count": ref_counts,
+        "ref_entity": np.array([entity for entity, _ in flat_refs], dtype=np.int32),
+        "ref_kind": np.array([kind for _, kind in flat_refs], dtype=np.uint8),
+        "text_blob": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    }
+
+    # 头部长度按占位偏移（足够多位数）计算, 真实偏移填入后用空格补齐到同样长度
+    placeholder = 10 ** 15
+    header = {
+        "built_at": datetime.utcnow().isoformat(),
+        "max_project_id": max_project_id,
+        "entities": entities,
+        "arrays": {name: [placeholder, len(arrays[name])] for name, _ in ARRAYS},
+    }
+    header_length = len(json.dumps(header, ensure_ascii=False).encode())
+    offset = len(MAGIC) + 8 + header_length
+    offset += -offset % ALIGNMENT
+    for name, dtype in ARRAYS:
+        header["arrays"][name][0] = offset
+        offset += arrays[name].astype(dtype, copy=False).nbytes
+        offset += -offset % ALIGNMENT
+    header_bytes = json.dumps(header, ensure_ascii=False).encode().ljust(header_length)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", header_length))
+        f.write(header_bytes)
+        for name, dtype in ARRAYS:
+            f.write(b"\0" * (header["arrays"][name][0] - f.tell()))
+            f.write(arrays[name].astype(dtype, copy=False).tobytes())
+    os.replace(temp_path, path)
+    return {"entities": len(entities), "keys": len(keys), "nodes": len(texts), "bytes": offset}
+
+
+class Gazetteer:
+    """已知项目词典: 快照（mmap, 进程间共享）+ 进程内增量表"""
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._snapshot: Optional[GazetteerSnapshot] = None
+        self._entities: List[list] = []  # 增量实体（序号接在快照实体之后）
+        self._delta_keys: Dict[str, List[Tuple[int, int]]] = {}
+        self._delta_prefixes = set()
+        self._max_project_id = 0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return Path(self._path or settings.GAZETTEER_PATH)
+
+    @property
+    def coins_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".coins.json")
+
+    # ---------- 匹配 ----------
+
+    def match(self, text: Optional[str]) -> List[GazetteerMatch]:
+        """文本中所有已知项目的提及（最长匹配优先, 互不重叠, 按出现顺序）"""
+        self.refresh()
+        if not text:
+            return []
+        # 只切词并小写化; 大小写和位置信息只在有命中时才按词序号取
+        words = [word.lower() for word in WORD_PATTERN.findall(text)]
+
+        # 快照和增量表在重新加载时整体替换, 先取引用保证本次匹配前后一致
+        snapshot, delta_entities = self._snapshot, self._entities
+        entities = (snapshot.entities if snapshot is not None else []), delta_entities
+        spans = snapshot.match_spans(words) if snapshot is not None else []
+        if self._delta_keys:
+            spans.extend(self._delta_spans(words))
+
+        if not spans:
+            return []
+        token_matches = list(TOKEN_PATTERN.finditer(text))
+        tokens = {}
+        candidates = []
+        for start, end, refs in spans:
+            for index in (start, end - 1):
+                if index not in tokens:
+                    tokens[index] = _token(token_matches[index])
+            accepted = [ref for ref in refs if self._accept(ref, tokens[start], end - start)]
+            if accepted:
+                candidates.append((start, -(end - start), end, accepted))
+        candidates.sort()
+
+        matches, covered = [], -1
+        for start, _, end, refs in candidates:
+            if start <= covered:
+                continue
+            covered = end - 1
+            span_start, span_end = tokens[start].start, tokens[end - 1].end
+            seen = set()
+            for entity_index, kind in refs:
+                if entity_index in seen:
+                    continue
+                seen.add(entity_index)
+                project_id, coingecko_id, name = self._entity(entity_index, entities)
+                matches.append(GazetteerMatch(
+                    project_id, coingecko_id, name, KIND_NAMES[kind], span_start, span_end, text[span_start:span_end]
+                ))
+        return matches
+
+    def project_ids(self, text: Optional[str]) -> List[int]:
+        """文本提及的已知项目ID（去重, 按出现顺序）"""
+        return list(dict.fromkeys(match.project_id for match in self.match(text) if match.project_id is not None))
+
+    @staticmethod
+    def _entity(index: int, entities: Tuple[List[list], List[list]]) -> list:
+        snapshot_entities, delta_entities = entities
+        if index < len(snapshot_entities):
+            return snapshot_entities[index]
+        return delta_entities[index - len(snapshot_entities)]
+
+    @staticmethod
+    def _accept(ref: Tuple[int, int], first: Token, length: int) -> bool:
+        """大小写规则: 多词项目名/账号不区分大小写, 单词项目名需 $ 前缀或含大写字母, 代币符号需 $ 前缀或全大写
+
+        单词名称常是普通英文词（自动创建的项目里有 "Live"、"Scroll"、"Base"）, 小写的 "is live" / "base fee" 不算提及。
+        """
+        _, kind = ref
+        if kind == KIND_SYMBOL:
+            return first.cashtag or (first.upper and len(first.word) >= 2)
+        if kind == KIND_NAME and length == 1:
+            return first.cashtag or first.capitalized
+        return True
+
+    def _delta_spans(self, words: List[str]):
+        spans = []
+        for start in range(len(words)):
+            key = words[start]
+            end = start + 1
+            while key in self._delta_prefixes:
+                refs = self._delta_keys.get(key)
+                if refs:
+                    spans.append((start, end, refs))
+                if end >= len(words) or end - start >= MAX_PHRASE_TOKENS:
+                    break
+                key = f"{key} {words[end]}"
+                end += 1
+        return spans
+
+    # ---------- 加载与增量 ----------
+
+    def refresh(self, force: bool = False):
+        """按间隔检查快照文件是否被替换, 并读入快照之后新增的项目"""
+        if not force and time.monotonic() - self._checked_at < settings.GAZETTEER_CHECK_INTERVAL_SECONDS:
+            return
+        with self._lock:
+            if not force and time.monotonic() - self._checked_at < settings.GAZETTEER_CHECK_INTERVAL_SECONDS:
+                return
+            self._checked_at = time.monotonic()
+            self._reload_snapshot()
+            self._load_new_projects()
+
+    def _reload_snapshot(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if self._snapshot is not None and self._snapshot.same_file(stat):
+            return
+        try:
+            snapshot = GazetteerSnapshot(self.path)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load gazetteer snapshot {self.path}: {e}")
+            return
+        self._snapshot = snapshot
+        self._entities, self._delta_keys, self._delta_prefixes = [], {}, set()
+        self._max_project_id = snapshot.max_project_id
+        logger.info(
+            f"📚 Gazetteer snapshot loaded: {len(snapshot.entities)} entities, {len(snapshot.node_hash)} nodes "
+            f"(built {snapshot.header['built_at']})"
+        )
+
+    def _load_new_projects(self):
+        try:
+            from app.db.session import SessionLocal
+            from app.models import Project
+
+            db = SessionLocal()
+            try:
+                rows = db.query(
+                    Project.id, Project.project_name, Project.symbol, Project.twitter_handle,
+                    Project.canonical_project_id
+                ).filter(Project.id > self._max_project_id).order_by(Project.id).all()
+            finally:
+                db.close()
+        except Exception as e:
+            logger.debug(f"Projects table unavailable, keeping current gazetteer: {e}")
+            return
+        if rows:
+            self.add_projects([row._asdict() for row in rows])
+
+    def add_projects(self, projects: Iterable[Dict]):
+        """把新项目加入进程内增量表（下次完整重建时并入快照; 已归并的指向规范项目ID）"""
+        base = len(self._snapshot.entities) if self._snapshot is not None else 0
+        added = 0
+        for project in projects:
+            entity_index = base + len(self._entities)
+            canonical_id = project.get("canonical_project_id") or project["id"]
+            self._entities.append([canonical_id, None, project["project_name"]])
+            for key, kind in entity_keys({**project, "name": project["project_name"]}, from_project=True):
+                self._delta_keys.setdefault(key, []).append((entity_index, kind))
+                self._delta_prefixes.update(_prefixes(key))
+            self._max_project_id = max(self._max_project_id, project["id"])
+            added += 1
+        if added:
+            logger.debug(f"📚 Gazetteer: {added} new projects added incrementally")
+
+    # ---------- 完整重建 ----------
+
+    def load_coins(self, coins: Optional[List[Dict]] = None) -> List[Dict]:
+        """CoinGecko币种列表: 传入时写入缓存文件, 否则读缓存"""
+        if coins:
+            self.coins_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.coins_path.with_name(f".{self.coins_path.name}.{os.getpid()}.tmp")
+            temp_path.write_text(json.dumps(coins, ensure_ascii=False))
+            os.replace(temp_path, self.coins_path)
+            return coins
+        try:
+            return json.loads(self.coins_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return []
+
+    def rebuild(self, db, coins: Optional[List[Dict]] = None) -> Dict:
+        """从 projects 表和 CoinGecko 币种列表编译完整快照并替换文件
+
+        Args:
+            coins: CoinGecko /coins/list 结果（不传则用上次缓存的列表）
+        """
+        from app.models import Project
+        from app.services.prediction_store import INACTIVE_STATUSES
+        from sqlalchemy import or_
+
+        started = time.perf_counter()
+        projects = db.query(
+            Project.id, Project.project_name, Project.symbol, Project.twitter_handle, Project.canonical_project_id
+        ).filter(or_(Project.status.notin_(INACTIVE_STATUSES), Project.status.is_(None))).order_by(Project.id).all()
+        max_project_id = db.query(Project.id).order_by(Project.id.desc()).limit(1).scalar() or 0
+        coins = self.load_coins(coins)
+
+        # 重复项目的词条指向规范项目（规范项目本身不活跃时也用它的名称）
+        canonical_ids = {project.id: project.canonical_project_id or project.id for project in projects}
+        canonical_names = {project.id: project.project_name for project in projects}
+        missing = list(set(canonical_ids.values()) - set(canonical_names))
+        for offset in range(0, len(missing), 1000):
+            canonical_names.update(
+                db.query(Project.id, Project.project_name).filter(Project.id.in_(missing[offset:offset + 1000]))
+            )
+
+        entities: List[list] = []
+        keys: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        by_name: Dict[str, int] = {}
+        for project in projects:
+            index = len(entities)
+            canonical_id = canonical_ids[project.id]
+            entities.append([canonical_id, None, canonical_names.get(canonical_id, project.project_name)])
+            for key, kind in entity_keys({**project._asdict(), "name": project.project_name}, from_project=True):
+                keys[key].append((index, kind))
+            by_name.setdefault(normalize(project.project_name), index)
+
+        # 同一符号对应多个币种时不收录该符号（无法判断指哪个）
+        symbol_counts = defaultdict(int)
+        for coin in coins:
+            symbol_counts[normalize(coin.get("symbol"))] += 1
+        for coin in coins:
+            name = normalize(coin.get("name"))
+            if not name or not coin.get("id"):
+                continue
+            if name in by_name:
+                entities[by_name[name]][1] = coin["id"]
+                continue
+            index = len(entities)
+            entities.append([None, coin["id"], coin.get("name")])
+            by_name[name] = index
+            for key, kind in entity_keys(coin, from_project=False):
+                if kind == KIND_SYMBOL and (symbol_counts[key] > 1 or key in keys):
+                    continue
+                keys[key].append((index, kind))
+
+        stats = write_snapshot(self.path, entities, dict(keys), max_project_id)
+        self.refresh(force=True)
+        logger.info(
+            f"📚 Gazetteer rebuilt: {stats['entities']} entities, {stats['keys']} keys, "
+            f"{stats['nodes']} nodes, {stats['bytes'] / 1e6:.1f} MB ({time.perf_counter() - started:.2f}s)"
+        )
+        return {"projects": len(projects), "coins": len(coins), **stats}
+
+
+# 全局实例
+gazetteer = Gazetteer()
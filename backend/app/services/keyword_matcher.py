@@ -0,0 +1,255 @@
+"""多关键词匹配 - Aho–Corasick自动机, 一次线性扫描返回所有命中的关键词及其分类和权重
+
+各处关键词扫描共用:
+- 固定关键词集在首次使用时编译一次
+- 引用数据库关键词表（twitter_keywords / platform_search_rules.search_keywords）的关键词集,
+  按间隔比对表内容指纹, 变化后重新编译
+"""
+
+import hashlib
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import ahocorasick
+from loguru import logger
+from app.core.config import settings
+
+
+class KeywordEntry(NamedTuple):
+    keyword: str
+    category: Optional[str] = None
+    weight: float = 0.0
+
+
+class KeywordMatch(NamedTuple):
+    keyword: str  # 关键词原文（保留定义时的大小写）
+    category: Optional[str]
+    weight: float
+    rank: int  # 定义顺序, 用于"按顺序取第一个命中"的场景
+    start: int  # 在小写化文本中的位置
+    end: int
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """编译后的关键词自动机（只读, 可多线程共用）
+
+    whole_word=True 时只接受整词命中（等价于正则 \\b...\\b）, plural=True 时允许词尾多一个s。
+    大小写不敏感: 关键词和文本都先小写化。
+    """
+
+    def __init__(self, entries: Iterable, whole_word: bool = False, plural: bool = False, name: str = ""):
+        self.name = name
+        self.whole_word = whole_word
+        self.plural = plural
+        self.entries: List[KeywordEntry] = []
+
+        by_key: Dict[str, List[Tuple[int, KeywordEntry]]] = {}
+        for item in entries:
+            entry = item if isinstance(item, KeywordEntry) else KeywordEntry(*item)
+            key = entry.keyword.lower()
+            if not key:
+                continue
+            by_key.setdefault(key, []).append((len(self.entries), entry))
+            self.entries.append(entry)
+
+        self._automaton = ahocorasick.Automaton()
+        for key, ranked in by_key.items():
+            self._automaton.add_word(key, (key, tuple(ranked)))
+        if by_key:
+            self._automaton.make_automaton()
+        self._empty = not by_key
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _boundary_ok(self, text: str, start: int, end: int) -> bool:
+        if start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if end + 1 >= len(text) or not _is_word_char(text[end + 1]):
+            return True
+        # 允许复数: keyword + 's' 后是词边界
+        return (
+            self.plural and text[end + 1] == "s"
+            and (end + 2 >= len(text) or not _is_word_char(text[end + 2]))
+        )
+
+    def _iter(self, lowered: str, unique: bool = False):
+        if self._empty or not lowered:
+            return
+        seen = set()
+        for end, (key, ranked) in self._automaton.iter(lowered):
+            if unique and key in seen:
+                continue
+            start = end - len(key) + 1
+            if self.whole_word and not self._boundary_ok(lowered, start, end):
+                continue
+            if unique:
+                seen.add(key)
+            for rank, entry in ranked:
+                yield KeywordMatch(entry.keyword, entry.category, entry.weight, rank, start, end + 1)
+
+    def find_all(self, text: Optional[str]) -> List[KeywordMatch]:
+        """所有命中（同一关键词多次出现会返回多次）"""
+        return list(self._iter((text or "").lower()))
+
+    def find_unique(self, text: Optional[str]) -> List[KeywordMatch]:
+        """每个关键词只保留第一次命中, 按定义顺序返回（对应原来的 for keyword in ...: if keyword in text）"""
+        return sorted(self._iter((text or "").lower(), unique=True), key=lambda match: match.rank)
+
+    def first(self, text: Optional[str]) -> Optional[KeywordMatch]:
+        """定义顺序最靠前的命中（对应原来的 for ...: if keyword in text: return/break）"""
+        best = None
+        for match in self._iter((text or "").lower()):
+            if best is None or match.rank < best.rank:
+                best = match
+        return best
+
+    def contains_any(self, text: Optional[str]) -> bool:
+        for _ in self._iter((text or "").lower()):
+            return True
+        return False
+
+    def by_category(self, text: Optional[str]) -> Dict[Optional[str], List[KeywordMatch]]:
+        """按分类分组的去重命中"""
+        grouped: Dict[Optional[str], List[KeywordMatch]] = {}
+        for match in self.find_unique(text):
+            grouped.setdefault(match.category, []).append(match)
+        return grouped
+
+
+def _load_twitter_keywords(db) -> List[KeywordEntry]:
+    from app.models.platform import TwitterKeyword
+
+    rows = db.query(TwitterKeyword.keyword, TwitterKeyword.category, TwitterKeyword.weight).filter(
+        TwitterKeyword.enabled == True
+    ).order_by(TwitterKeyword.priority.desc(), TwitterKeyword.id).all()
+    return [KeywordEntry(keyword, category, float(weight or 0)) for keyword, category, weight in rows]
+
+
+def _load_platform_search_keywords(db, platform: str) -> List[KeywordEntry]:
+    from app.models.platform import PlatformSearchRule
+
+    rule = db.query(PlatformSearchRule.search_keywords).filter(
+        PlatformSearchRule.platform == platform, PlatformSearchRule.enabled == True
+    ).first()
+    entries = []
+    for item in (rule[0] if rule and rule[0] else []):
+        if isinstance(item, dict):
+            entries.append(KeywordEntry(item.get("keyword", ""), item.get("category"), float(item.get("weight") or 0)))
+        elif item:
+            entries.append(KeywordEntry(str(item)))
+    return entries
+
+
+# 数据库关键词来源: "twitter_keywords" 或 "platform_search_rules:<platform>"
+DB_SOURCES: Dict[str, Callable] = {
+    "twitter_keywords": _load_twitter_keywords,
+}
+
+
+def _load_db_source(db, source: str) -> List[KeywordEntry]:
+    if source.startswith("platform_search_rules:"):
+        return _load_platform_search_keywords(db, source.split(":", 1)[1])
+    return DB_SOURCES[source](db)
+
+
+class KeywordMatcherRegistry:
+    """关键词集注册表: 按名称取编译好的自动机, 数据库关键词变化后自动重建"""
+
+    def __init__(self):
+        self._definitions: Dict[str, Dict] = {}
+        self._matchers: Dict[str, KeywordMatcher] = {}
+        self._db_entries: Dict[str, List[KeywordEntry]] = {}
+        self._db_fingerprint: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def define(
+        self,
+        name: str,
+        entries: Sequence,
+        db_sources: Sequence[str] = (),
+        whole_word: bool = False,
+        plural: bool = False
+    ):
+        """注册关键词集（重复注册同名集合会覆盖并在下次使用时重新编译）"""
+        with self._lock:
+            self._definitions[name] = {
+                "entries": list(entries),
+                "db_sources": tuple(db_sources),
+                "whole_word": whole_word,
+                "plural": plural,
+            }
+            self._matchers.pop(name, None)
+
+    def get(self, name: str) -> KeywordMatcher:
+        """取编译好的自动机"""
+        definition = self._definitions[name]
+        if definition["db_sources"] and self._check_due():
+            self._refresh_db_entries()
+
+        matcher = self._matchers.get(name)
+        if matcher is None:
+            with self._lock:
+                matcher = self._matchers.get(name)
+                if matcher is None:
+                    matcher = self._build(name, definition)
+                    self._matchers[name] = matcher
+        return matcher
+
+    def invalidate(self):
+        """强制下次使用时重新读取数据库关键词"""
+        self._checked_at = 0.0
+
+    def _build(self, name: str, definition: Dict) -> KeywordMatcher:
+        entries = list(definition["entries"])
+        for source in definition["db_sources"]:
+            entries.extend(self._db_entries.get(source, []))
+        matcher = KeywordMatcher(
+            entries, whole_word=definition["whole_word"], plural=definition["plural"], name=name
+        )
+        logger.debug(f"🔤 Keyword matcher '{name}' compiled ({len(matcher)} keywords)")
+        return matcher
+
+    def _check_due(self) -> bool:
+        return time.monotonic() - self._checked_at >= settings.KEYWORD_MATCHER_CHECK_INTERVAL_SECONDS
+
+    def _refresh_db_entries(self):
+        """重新读取所有数据库关键词来源, 内容指纹变化时丢弃引用它们的自动机"""
+        with self._lock:
+            if not self._check_due():
+                return
+            self._checked_at = time.monotonic()
+            sources = sorted({s for d in self._definitions.values() for s in d["db_sources"]})
+
+            try:
+                from app.db.session import SessionLocal
+
+                db = SessionLocal()
+                try:
+                    loaded = {source: _load_db_source(db, source) for source in sources}
+                finally:
+                    db.close()
+            except Exception as e:
+                logger.debug(f"Keyword tables unavailable, keeping current matchers: {e}")
+                return
+
+            fingerprint = hashlib.sha256(repr(sorted(loaded.items())).encode()).hexdigest()[:16]
+            if fingerprint == self._db_fingerprint:
+                return
+
+            if self._db_fingerprint is not None:
+                logger.info("🔄 Keyword tables changed, rebuilding keyword matchers")
+            self._db_fingerprint = fingerprint
+            self._db_entries = loaded
+            for name, definition in self._definitions.items():
+                if definition["db_sources"]:
+                    self._matchers.pop(name, None)
+
+
+# 全局实例
+keyword_matchers = KeywordMatcherRegistry()
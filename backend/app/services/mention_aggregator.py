@@ -0,0 +1,230 @@
+"""项目提及流式聚合 - 逐条更新计数、首末时间和平台分布, 只保留固定大小的提及样本
+
+内存只与项目数相关（每个项目: 计数 + 平台计数 + 最多 sample_size 条提及）, 与消息总量无关,
+输入可以是生成器, 整批数据不需要同时在内存中。
+项目按 counter_key 聚合（已知项目按规范项目ID, 其余按小写名称）, 与小时计数和发现记录的键一致。
+传入 counters 时同时把每次提及写入项目的小时计数（见 mention_counters）, 每 FLUSH_ITEMS 条消息写一次。
+"""
+
+import random
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from app.services.mention_counters import MentionCounters, counter_key, to_hour
+
+DEFAULT_SAMPLE_SIZE = 10
+FLUSH_ITEMS = 1000
+
+
+def item_key(platform: str, item: Dict) -> Optional[str]:
+    """消息唯一ID（平台 + 频道 + 消息ID/链接）, 用于小时计数去重"""
+    item_id = next(
+        (item[field] for field in ("tweet_id", "message_id", "url", "link") if item.get(field) not in (None, "")), None
+    )
+    if item_id is None:
+        return None
+    channel = item.get("source_channel") or item.get("channel") or ""
+    return f"{platform}:{channel}:{item_id}"
+
+
+class ProjectMentionStats:
+    """单个项目的聚合状态"""
+
+    __slots__ = (
+        "project_name", "project_id", "coingecko_id", "total_mentions",
+        "platform_counts", "first_discovered_at", "last_mentioned_at", "sample",
+    )
+
+    def __init__(self, project_name: str):
+        self.project_name = project_name
+        self.project_id: Optional[int] = None
+        self.coingecko_id: Optional[str] = None
+        self.total_mentions = 0
+        self.platform_counts: Dict[str, int] = {}
+        self.first_discovered_at = None
+        self.last_mentioned_at = None
+        self.sample: List[Dict] = []
+
+    def signal_strength(self) -> int:
+        """初步信号强度（提及数 + 跨平台 + 基础分）"""
+        return int(min(100, (
+            min(40, self.total_mentions * 5) +  # 提及数
+            min(40, len(self.platform_counts) * 13) +  # 跨平台
+            20  # 基础分
+        )))
+
+    def merge(self, other: "ProjectMentionStats", sample_size: int, rng: random.Random):
+        """合并另一部分数据中同一项目的统计（结合律: 分块聚合后按任意分组合并, 结果与整体聚合同分布）
+
+        合并样本按两边剩余的提及数成比例抽取: 每个位置以 剩余A/(剩余A+剩余B) 的概率取A,
+        再从两边样本中各随机取对应条数, 仍是全部提及的均匀抽样。
+        """
+        if other.project_id is not None or other.coingecko_id is not None:
+            self.project_id, self.coingecko_id = other.project_id, other.coingecko_id
+        for platform, count in other.platform_counts.items():
+            self.platform_counts[platform] = self.platform_counts.get(platform, 0) + count
+        if other.first_discovered_at is not None and (
+            self.first_discovered_at is None or other.first_discovered_at < self.first_discovered_at
+        ):
+            self.first_discovered_at = other.first_discovered_at
+        if other.last_mentioned_at is not None and (
+            self.last_mentioned_at is None or other.last_mentioned_at > self.last_mentioned_at
+        ):
+            self.last_mentioned_at = other.last_mentioned_at
+
+        remaining_a, remaining_b = self.total_mentions, other.total_mentions
+        from_a = 0
+        for _ in range(min(sample_size, remaining_a + remaining_b)):
+            if rng.randrange(remaining_a + remaining_b) < remaining_a:
+                from_a += 1
+                remaining_a -= 1
+            else:
+                remaining_b -= 1
+        taken_b = min(sample_size, self.total_mentions + other.total_mentions) - from_a
+        self.sample = rng.sample(self.sample, from_a) + rng.sample(other.sample, taken_b)
+        self.total_mentions += other.total_mentions
+
+    @classmethod
+    def from_dict(cls, project: Dict) -> "ProjectMentionStats":
+        """to_dict 的结果还原为聚合状态（用于合并已输出的结果）"""
+        stats = cls(project["project_name"])
+        stats.project_id = project.get("project_id")
+        stats.coingecko_id = project.get("coingecko_id")
+        stats.total_mentions = project.get("total_mentions", 0)
+        stats.platform_counts = dict(project.get("platform_mentions") or {})
+        stats.first_discovered_at = project.get("first_discovered_at")
+        stats.last_mentioned_at = project.get("last_mentioned_at")
+        stats.sample = list(project.get("mentions", []))
+        return stats
+
+    def to_dict(self) -> Dict:
+        project_data = {
+            "project_name": self.project_name,
+            "total_mentions": self.total_mentions,
+            "platform_mentions": dict(self.platform_counts),
+            "num_platforms": len(self.platform_counts),
+            "first_discovered_at": self.first_discovered_at,
+            "last_mentioned_at": self.last_mentioned_at,
+            "signal_strength": self.signal_strength(),
+            "mentions": list(self.sample),  # 均匀抽样的提及
+            "discovery_status": "new",
+        }
+        if self.project_id is not None or self.coingecko_id is not None:
+            project_data["project_id"] = self.project_id
+            project_data["coingecko_id"] = self.coingecko_id
+        return project_data
+
+
+class MentionAggregator:
+    """流式聚合项目提及
+
+    样本用蓄水池抽样（Algorithm R）: 第n次提及以 sample_size/n 的概率替换样本中的随机一条,
+    任意时刻样本都是已见提及的均匀抽样。
+    """
+
+    def __init__(
+        self,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        seed: Optional[int] = None,
+        counters: Optional[MentionCounters] = None
+    ):
+        self.sample_size = sample_size
+        self.projects: Dict[str, ProjectMentionStats] = {}  # counter_key → 聚合状态
+        self.items = 0
+        self.counters = counters
+        self._pending = []
+        self._random = random.Random(seed)
+
+    def __len__(self):
+        return len(self.projects)
+
+    def add(
+        self,
+        project_name: str,
+        mention: Dict,
+        project_id: Optional[int] = None,
+        coingecko_id: Optional[str] = None
+    ) -> str:
+        """记录一次提及
+
+        Args:
+            mention: {"platform", "discovered_at", "text", ...}
+            project_id: 已知项目的规范项目ID
+
+        Returns:
+            项目的聚合键（counter_key）
+        """
+        key = counter_key(project_name, project_id)
+        stats = self.projects.get(key)
+        if stats is None:
+            stats = self.projects[key] = ProjectMentionStats(project_name)
+        if project_id is not None or coingecko_id is not None:
+            stats.project_id, stats.coingecko_id = project_id, coingecko_id
+
+        stats.total_mentions += 1
+        platform = mention["platform"]
+        stats.platform_counts[platform] = stats.platform_counts.get(platform, 0) + 1
+
+        discovered_at = mention["discovered_at"]
+        if stats.first_discovered_at is None or discovered_at < stats.first_discovered_at:
+            stats.first_discovered_at = discovered_at
+        if stats.last_mentioned_at is None or discovered_at > stats.last_mentioned_at:
+            stats.last_mentioned_at = discovered_at
+
+        if len(stats.sample) < self.sample_size:
+            stats.sample.append(mention)
+        else:
+            slot = self._random.randrange(stats.total_mentions)
+            if slot < self.sample_size:
+                stats.sample[slot] = mention
+        return key
+
+    def add_item(self, platform: str, item: Dict, projects: Iterable[Dict]):
+        """记录一条消息中的所有项目提及
+
+        Args:
+            projects: [{"project_name", "project_id", "coingecko_id"}]（ProjectDiscoveryService.extract_project_mentions 的结果）
+        """
+        self.items += 1
+        text = item.get("text", "") or item.get("content", "")
+        mention = {
+            "platform": platform,
+            "source_item": item,
+            "discovered_at": item.get("created_at") or item.get("date") or datetime.utcnow(),
+            "text": text[:200],  # 保存上下文
+        }
+        hour = to_hour(mention["discovered_at"]) if self.counters is not None else None
+        counted = []
+        for project in projects:
+            key = self.add(project["project_name"], mention, project.get("project_id"), project.get("coingecko_id"))
+            if hour is not None:
+                counted.append((key, hour, platform))
+
+        if counted:
+            self._pending.append((item_key(platform, item), counted))
+            if len(self._pending) >= FLUSH_ITEMS:
+                self.flush()
+
+    def flush(self):
+        """把待写入的提及写入小时计数"""
+        if self._pending:
+            self.counters.record(self._pending)
+            self._pending = []
+
+    def merge(self, other: "MentionAggregator"):
+        """合并另一个聚合器的部分结果（用于分块并行聚合, 小时计数由各自的聚合器写入）"""
+        self.items += other.items
+        for key, stats in other.projects.items():
+            current = self.projects.get(key)
+            if current is None:
+                self.projects[key] = stats
+            else:
+                current.merge(stats, self.sample_size, self._random)
+
+    def results(self) -> List[Dict]:
+        """聚合结果, 按信号强度倒序（先写完小时计数）"""
+        if self.counters is not None:
+            self.flush()
+        aggregated = [stats.to_dict() for stats in self.projects.values()]
+        aggregated.sort(key=lambda x: x["signal_strength"], reverse=True)
+        return aggregated
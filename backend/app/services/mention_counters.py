@@ -0,0 +1,263 @@
+"""项目提及的小时计数环形缓冲 - 话题热度、增长率和突发检测的数据来源
+
+每个项目一个 Redis 哈希 mention_counts:<项目键>:
+- t<槽位> / c<槽位>: 槽位 = 小时序号 % RING_HOURS, 记录该槽位当前对应的小时和提及数;
+  写入时槽位里是更早的小时就覆盖（环形复用）, 是同一小时就累加 —— 每次写入 O(1), 由 Lua 脚本原子完成
+- p:<平台>: 该平台最近一次提及的小时, 用于统计24小时内的平台数
+同一条消息（按平台+消息ID）只计一次, 采集窗口重叠时不会重复累加。
+Redis 不可用时退回进程内的环形缓冲（不跨进程共享, 重启后丢失）。
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from loguru import logger
+from app.core.config import settings
+
+RING_HOURS = 14 * 24  # 保留两周: 7天热度窗口 + 突发检测的基线
+KEY_PREFIX = "mention_counts:"
+SEEN_PREFIX = "mention_seen:"
+KEY_TTL_SECONDS = RING_HOURS * 3600
+SEEN_TTL_SECONDS = 8 * 24 * 3600  # 采集窗口远小于该值
+LOCAL_SEEN_MAX = 200_000  # 进程内去重的消息ID上限, 超出时先淘汰最早记录的
+SURGE_MIN_MENTIONS = 10
+SURGE_RATIO = 3
+
+# KEYS[1] = 计数哈希; ARGV = 小时, 槽位, 增量, 平台, TTL
+RECORD_SCRIPT = """
+local hour = tonumber(ARGV[1])
+local slot_hour = tonumber(redis.call('HGET', KEYS[1], 't' .. ARGV[2]) or '-1')
+if slot_hour == hour then
+    redis.call('HINCRBY', KEYS[1], 'c' .. ARGV[2], ARGV[3])
+elseif slot_hour < hour then
+    redis.call('HSET', KEYS[1], 't' .. ARGV[2], hour, 'c' .. ARGV[2], ARGV[3])
+end
+local platform_hour = tonumber(redis.call('HGET', KEYS[1], 'p:' .. ARGV[4]) or '-1')
+if platform_hour < hour then
+    redis.call('HSET', KEYS[1], 'p:' .. ARGV[4], hour)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return 1
+"""
+
+
+def to_hour(value) -> Optional[int]:
+    """时间 → UTC小时序号（无时区的时间按UTC处理）"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() // 3600)
+
+
+def current_hour() -> int:
+    return int(time.time() // 3600)
+
+
+def counter_key(project_name: str, project_id: Optional[int] = None) -> str:
+    """已知项目按ID计数, 其余按小写名称"""
+    return f"id:{project_id}" if project_id is not None else f"name:{project_name.strip().lower()}"
+
+
+class HourlySeries:
+    """一个项目最近 RING_HOURS 小时的计数（hourly[-1] 为当前小时）"""
+
+    def __init__(self, hourly: List[int], platform_hours: Dict[str, int], now_hour: int):
+        self.hourly = hourly
+        self.platform_hours = platform_hours
+        self.now_hour = now_hour
+
+    @classmethod
+    def from_fields(cls, fields: Dict[str, int], now_hour: int) -> "HourlySeries":
+        hourly = [0] * RING_HOURS
+        platform_hours = {}
+        for name, value in fields.items():
+            if name.startswith("p:"):
+                platform_hours[name[2:]] = value
+            elif name.startswith("t"):
+                age = now_hour - value
+                if 0 <= age < RING_HOURS:
+                    hourly[RING_HOURS - 1 - age] = fields.get("c" + name[1:], 0)
+        return cls(hourly, platform_hours, now_hour)
+
+    def total(self, hours: int = RING_HOURS) -> int:
+        return sum(self.hourly[-hours:])
+
+    def platforms_since(self, hours: int) -> int:
+        return sum(1 for hour in self.platform_hours.values() if hour > self.now_hour - hours)
+
+    def heat(self) -> Dict:
+        """话题热度（24小时提及、相对前6天的增长率、24小时平台数）"""
+        mentions_24h = self.total(24)
+        mentions_7d = self.total(24 * 7)
+        if mentions_7d > mentions_24h:
+            recent_rate = mentions_24h / (mentions_7d - mentions_24h)
+        else:
+            recent_rate = 1.0
+        heat_score = min(100, (
+            min(50, mentions_24h * 10) +  # 24小时提及
+            min(30, recent_rate * 30) +  # 增长率
+            min(20, self.platforms_since(24) * 7)  # 平台数
+        ))
+        return {
+            "heat_score": int(heat_score),
+            "mentions_24h": mentions_24h,
+            "mentions_7d": mentions_7d,
+            "growth_rate": recent_rate,
+            "is_trending": heat_score > 70,
+        }
+
+    def surge(self) -> Dict:
+        """突发检测: 最近24小时的每小时提及数 vs 首次出现以来更早时段的每小时均值"""
+        if self.total() < SURGE_MIN_MENTIONS:
+            return {"is_surge": False}
+        first_active = next((index for index, count in enumerate(self.hourly) if count), RING_HOURS)
+        baseline_hours = RING_HOURS - 24 - first_active
+        if baseline_hours <= 0:
+            return {"is_surge": False}
+
+        baseline = sum(self.hourly[first_active:-24]) / baseline_hours
+        recent_avg = self.total(24) / 24
+        surge_ratio = recent_avg / baseline if baseline > 0 else 0
+        return {
+            "is_surge": surge_ratio > SURGE_RATIO,
+            "surge_ratio": surge_ratio,
+            "baseline_per_hour": baseline,
+            "recent_per_hour": recent_avg,
+        }
+
+
+class MentionCounters:
+    """项目小时计数（Redis 哈希环形缓冲, 不可用时退回进程内）"""
+
+    def __init__(self):
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self._script = None
+        self._local: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._local_seen: Dict[str, float] = {}
+        self._local_seen_order: "deque[Tuple[float, str]]" = deque()  # (过期时间, 消息ID), 按写入先后即过期先后
+        self._lock = threading.Lock()
+
+    def _get_redis(self):
+        """Redis不可用时退回进程内计数, 60秒后再重试连接"""
+        if self._redis is None and time.monotonic() >= self._redis_retry_at:
+            try:
+                import redis
+                client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=2, socket_connect_timeout=1)
+                client.ping()
+                self._script = client.register_script(RECORD_SCRIPT)
+                self._redis = client
+            except Exception as e:
+                self._redis_retry_at = time.monotonic() + 60
+                logger.debug(f"Mention counters falling back to in-process only: {e}")
+        return self._redis
+
+    def record(self, items: Sequence[Tuple[Optional[str], Iterable[Tuple[str, int, str]]]]) -> int:
+        """写入一批消息的提及计数
+
+        Args:
+            items: [(消息唯一ID或None, [(项目键, 小时序号, 平台), ...])], 有ID且已计过的消息跳过
+
+        Returns:
+            实际计入的消息数
+        """
+        client = self._get_redis()
+        if client is not None:
+            try:
+                return self._record_redis(client, items)
+            except Exception as e:
+                self._redis = None
+                logger.warning(f"⚠️ Mention counter write failed, counting in-process: {e}")
+        with self._lock:
+            return self._record_local(items)
+
+    def _aggregate(self, items, is_new) -> Dict[Tuple[str, int, str], int]:
+        increments = defaultdict(int)
+        for (_, mentions), new in zip(items, is_new):
+            if new:
+                for key, hour, platform in mentions:
+                    increments[(key, hour, platform)] += 1
+        return increments
+
+    def _record_redis(self, client, items) -> int:
+        pipe = client.pipeline(transaction=False)
+        for item_id, _ in items:
+            if item_id is not None:
+                pipe.set(SEEN_PREFIX + item_id, 1, nx=True, ex=SEEN_TTL_SECONDS)
+        results = iter(pipe.execute())
+        is_new = [item_id is None or bool(next(results)) for item_id, _ in items]
+
+        pipe = client.pipeline(transaction=False)
+        for (key, hour, platform), count in self._aggregate(items, is_new).items():
+            self._script(
+                keys=[KEY_PREFIX + key], args=[hour, hour % RING_HOURS, count, platform, KEY_TTL_SECONDS], client=pipe
+            )
+        pipe.execute()
+        return sum(is_new)
+
+    def _prune_local_seen(self, now: float):
+        """淘汰已过期的消息ID, 超出上限时再淘汰最早的（TTL固定, 队首总是最早过期）"""
+        order = self._local_seen_order
+        while order and (order[0][0] < now or len(order) > LOCAL_SEEN_MAX):
+            expires_at, item_id = order.popleft()
+            if self._local_seen.get(item_id) == expires_at:
+                del self._local_seen[item_id]
+
+    def _record_local(self, items) -> int:
+        now = time.monotonic()
+        self._prune_local_seen(now)
+        is_new = []
+        for item_id, _ in items:
+            new = item_id is None or self._local_seen.get(item_id, 0) < now
+            if item_id is not None and new:
+                expires_at = now + SEEN_TTL_SECONDS
+                self._local_seen[item_id] = expires_at
+                self._local_seen_order.append((expires_at, item_id))
+            is_new.append(new)
+
+        for (key, hour, platform), count in self._aggregate(items, is_new).items():
+            fields = self._local[key]
+            slot = hour % RING_HOURS
+            slot_hour = fields.get(f"t{slot}", -1)
+            if slot_hour == hour:
+                fields[f"c{slot}"] += count
+            elif slot_hour < hour:
+                fields[f"t{slot}"], fields[f"c{slot}"] = hour, count
+            if fields.get(f"p:{platform}", -1) < hour:
+                fields[f"p:{platform}"] = hour
+        return sum(is_new)
+
+    def series_many(self, keys: Sequence[str], now_hour: Optional[int] = None) -> Dict[str, HourlySeries]:
+        """批量读取项目的小时计数（一次 pipeline）"""
+        now_hour = current_hour() if now_hour is None else now_hour
+        client = self._get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.hgetall(KEY_PREFIX + key)
+                rows = pipe.execute()
+                return {
+                    key: HourlySeries.from_fields({name.decode(): int(value) for name, value in row.items()}, now_hour)
+                    for key, row in zip(keys, rows)
+                }
+            except Exception as e:
+                self._redis = None
+                logger.warning(f"⚠️ Mention counter read failed, using in-process counts: {e}")
+        with self._lock:
+            return {key: HourlySeries.from_fields(dict(self._local.get(key, {})), now_hour) for key in keys}
+
+    def series(self, key: str, now_hour: Optional[int] = None) -> HourlySeries:
+        return self.series_many([key], now_hour)[key]
+
+
+# 全局实例
+mention_counters = MentionCounters()
@@ -0,0 +1,218 @@
+"""发币概率/空投估值持久化 - 一次遍历计算所有活跃项目, 只写入有变化的行
+
+token_launch_predictions / airdrop_value_estimates 每个项目保留一行当前预测:
+- 新项目批量插入, 概率或估值有变化的批量更新, 没变化的不写
+- 列表接口直接按 idx_prediction_probability / idx_estimate_value 索引排序取前N行, 不再逐请求计算
+"""
+
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from loguru import logger
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.models import AirdropValueEstimate, OnchainMetrics, Project, TokenLaunchPrediction
+from app.services.scoring_engine import scoring_engine
+
+USD_CNY_RATE = 7.2
+WRITE_CHUNK = 1000
+INACTIVE_STATUSES = ("archived",)
+
+# 预测表的信号列 → predict_token_launch_probability 读取的输入字段
+LAUNCH_SIGNAL_COLUMNS = {
+    "has_snapshot_announced": "snapshot_announced",
+    "has_tokenomics_published": "tokenomics_published",
+    "has_points_system": "points_system_live",
+    "has_audit_completed": "audit_completed",
+    "has_mainnet_live": "mainnet_live",
+    "has_roadmap_token_mention": "roadmap_mentions_token",
+}
+# 比较这些列决定是否需要写入
+LAUNCH_COMPARE_COLUMNS = (
+    "launch_probability", "confidence", "estimated_timeline", "detected_signals", "signal_count",
+    *LAUNCH_SIGNAL_COLUMNS,
+)
+AIRDROP_COMPARE_COLUMNS = (
+    "estimated_value_usd", "min_value_usd", "max_value_usd", "confidence", "reference_category",
+)
+
+
+def build_prediction_input(name: str, category: Optional[str], metadata: Optional[dict], tvl) -> Dict:
+    """构建发币概率/空投估值的输入: extra_metadata + 分类 + 最新链上TVL"""
+    project_data = dict(metadata or {})
+    project_data["project_name"] = name
+    if category:
+        project_data["category"] = category
+
+    # 结构化字段推出的信号（元数据里显式给出时以元数据为准）
+    audit_status = project_data.get("audit_status")
+    project_data.setdefault("tokenomics_published", bool(project_data.get("tokenomics")))
+    project_data.setdefault("audit_completed", isinstance(audit_status, dict) and bool(audit_status.get("has_audit")))
+
+    project_data["funding_amount"] = float(project_data.get("funding_amount") or 0)
+    project_data["tvl"] = float(tvl) if tvl is not None else float(project_data.get("tvl") or 0)
+    return project_data
+
+
+def launch_row(project_id: int, project_data: Dict) -> Dict:
+    """发币概率 → token_launch_predictions 行"""
+    prediction = scoring_engine.predict_token_launch_probability(project_data)
+    return {
+        "project_id": project_id,
+        "launch_probability": prediction["launch_probability"],
+        "confidence": prediction["confidence"],
+        "estimated_timeline": prediction["estimated_timeline"],
+        "detected_signals": prediction["detected_signals"],
+        "signal_count": prediction["signal_count"],
+        **{column: int(bool(project_data.get(field))) for column, field in LAUNCH_SIGNAL_COLUMNS.items()},
+    }
+
+
+def airdrop_row(project_id: int, project_data: Dict) -> Dict:
+    """空投估值 → airdrop_value_estimates 行"""
+    estimate = scoring_engine.estimate_airdrop_value(project_data)
+    adjustments = estimate["adjustments"]
+    return {
+        "project_id": project_id,
+        "estimated_value_usd": estimate["estimated_value_usd"],
+        "estimated_value_cny": int(estimate["estimated_value_usd"] * USD_CNY_RATE),
+        "min_value_usd": estimate["value_range_usd"]["min"],
+        "max_value_usd": estimate["value_range_usd"]["max"],
+        "confidence": estimate["confidence"],
+        "reference_category": estimate["reference_category"],
+        "historical_avg": estimate["historical_avg"],
+        "tvl_adjustment": adjustments["tvl"],
+        "funding_adjustment": adjustments["funding"],
+        "final_adjustment": round(adjustments["final"], 2),
+    }
+
+
+class PredictionStore:
+    """发币概率/空投估值的批量计算和查询"""
+
+    def _current_rows(self, db: Session, model, columns) -> Dict[int, Dict]:
+        """各项目当前的预测行 {项目ID: {id, 比较列...}}（同一项目有多行时取最新一行）"""
+        rows = db.query(model.id, model.project_id, *(getattr(model, column) for column in columns)).order_by(model.id)
+        return {row.project_id: row._asdict() for row in rows}
+
+    def _diff(self, computed: List[Dict], current: Dict[int, Dict], columns, time_column: str, now: datetime):
+        inserts, updates = [], []
+        for row in computed:
+            previous = current.get(row["project_id"])
+            if previous is None:
+                inserts.append({**row, time_column: now, "updated_at": now})
+            elif any(previous[column] != row[column] for column in columns):
+                updates.append({**row, "id": previous["id"], time_column: now, "updated_at": now})
+        return inserts, updates
+
+    @staticmethod
+    def _write(db: Session, model, inserts: List[Dict], updates: List[Dict]):
+        for offset in range(0, len(inserts), WRITE_CHUNK):
+            db.bulk_insert_mappings(model, inserts[offset:offset + WRITE_CHUNK])
+        for offset in range(0, len(updates), WRITE_CHUNK):
+            db.bulk_update_mappings(model, updates[offset:offset + WRITE_CHUNK])
+
+    def refresh(self, db: Session, statuses: Optional[List[str]] = None, dry_run: bool = False) -> Dict:
+        """重算所有活跃项目的发币概率和空投估值并写入有变化的行
+
+        Args:
+            statuses: 只计算指定状态的项目（默认除 archived 外全部）
+            dry_run: 只统计变化, 不写入
+        """
+        started = time.perf_counter()
+        query = db.query(
+            Project.id, Project.project_name, Project.category, Project.extra_metadata, OnchainMetrics.tvl_usd
+        ).outerjoin(OnchainMetrics, OnchainMetrics.id == Project.onchain_metrics_id)
+        if statuses:
+            query = query.filter(Project.status.in_(statuses))
+        else:
+            query = query.filter(or_(Project.status.notin_(INACTIVE_STATUSES), Project.status.is_(None)))
+        projects = query.all()
+
+        launches, airdrops = [], []
+        for project in projects:
+            project_data = build_prediction_input(
+                project.project_name, project.category, project.extra_metadata, project.tvl_usd
+            )
+            launches.append(launch_row(project.id, project_data))
+            airdrops.append(airdrop_row(project.id, project_data))
+        computed = time.perf_counter()
+
+        now = datetime.utcnow()
+        launch_inserts, launch_updates = self._diff(
+            launches, self._current_rows(db, TokenLaunchPrediction, LAUNCH_COMPARE_COLUMNS),
+            LAUNCH_COMPARE_COLUMNS, "predicted_at", now
+        )
+        airdrop_inserts, airdrop_updates = self._diff(
+            airdrops, self._current_rows(db, AirdropValueEstimate, AIRDROP_COMPARE_COLUMNS),
+            AIRDROP_COMPARE_COLUMNS, "estimated_at", now
+        )
+
+        if not dry_run:
+            self._write(db, TokenLaunchPrediction, launch_inserts, launch_updates)
+            self._write(db, AirdropValueEstimate, airdrop_inserts, airdrop_updates)
+            db.commit()
+
+        result = {
+            "projects": len(projects),
+            "launch_predictions": {"inserted": len(launch_inserts), "updated": len(launch_updates)},
+            "airdrop_estimates": {"inserted": len(airdrop_inserts), "updated": len(airdrop_updates)},
+            "dry_run": dry_run,
+        }
+        logger.info(
+            f"🔮 Predictions refreshed for {len(projects)} projects{' (dry run)' if dry_run else ''}: "
+            f"launch {result['launch_predictions']}, airdrop {result['airdrop_estimates']} "
+            f"(compute {computed - started:.2f}s, diff+write {time.perf_counter() - computed:.2f}s)"
+        )
+        return result
+
+    def top_launch_candidates(self, db: Session, limit: int = 20, min_probability: int = 0) -> List[Dict]:
+        """发币概率最高的项目（idx_prediction_probability 倒序扫描, 跳过已归档项目的旧预测）"""
+        rows = db.query(TokenLaunchPrediction, Project.project_name, Project.symbol, Project.grade).join(
+            Project, Project.id == TokenLaunchPrediction.project_id
+        ).filter(
+            TokenLaunchPrediction.launch_probability >= min_probability,
+            or_(Project.status.notin_(INACTIVE_STATUSES), Project.status.is_(None)),
+        ).order_by(TokenLaunchPrediction.launch_probability.desc()).limit(limit).all()
+        return [
+            {
+                "project_id": f"proj_{prediction.project_id}",
+                "name": name,
+                "symbol": symbol,
+                "grade": grade,
+                "launch_probability": prediction.launch_probability,
+                "confidence": prediction.confidence,
+                "estimated_timeline": prediction.estimated_timeline,
+                "detected_signals": prediction.detected_signals or [],
+                "predicted_at": prediction.predicted_at,
+            }
+            for prediction, name, symbol, grade in rows
+        ]
+
+    def top_airdrop_estimates(self, db: Session, limit: int = 20, min_value_usd: int = 0) -> List[Dict]:
+        """空投估值最高的项目（idx_estimate_value 倒序扫描, 跳过已归档项目的旧估值）"""
+        rows = db.query(AirdropValueEstimate, Project.project_name, Project.symbol, Project.grade).join(
+            Project, Project.id == AirdropValueEstimate.project_id
+        ).filter(
+            AirdropValueEstimate.estimated_value_usd >= min_value_usd,
+            or_(Project.status.notin_(INACTIVE_STATUSES), Project.status.is_(None)),
+        ).order_by(AirdropValueEstimate.estimated_value_usd.desc()).limit(limit).all()
+        return [
+            {
+                "project_id": f"proj_{estimate.project_id}",
+                "name": name,
+                "symbol": symbol,
+                "grade": grade,
+                "estimated_value_usd": estimate.estimated_value_usd,
+                "estimated_value_cny": estimate.estimated_value_cny,
+                "value_range_usd": {"min": estimate.min_value_usd, "max": estimate.max_value_usd},
+                "confidence": estimate.confidence,
+                "reference_category": estimate.reference_category,
+                "estimated_at": estimate.estimated_at,
+            }
+            for estimate, name, symbol, grade in rows
+        ]
+
+
+# 全局实例
+prediction_store = PredictionStore()
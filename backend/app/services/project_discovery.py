@@ -1,10 +1,13 @@
 """项目发现服务 - 从多平台数据中发现和聚合项目"""
 
-import re
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
-from collections import defaultdict
+import multiprocessing
+from typing import Dict, Iterable, List, Optional
+from datetime import datetime
 from loguru import logger
+from app.services.entity_extractor import discovery_name_extractor
+from app.services.gazetteer import gazetteer
+from app.services.mention_aggregator import MentionAggregator
+from app.services.mention_counters import HourlySeries, counter_key, mention_counters
 
 
 class ProjectDiscoveryService:
@@ -18,89 +21,71 @@ class ProjectDiscoveryService:
     def extract_project_names(self, text: str) -> List[str]:
         """从文本中提取项目名称（增强版）
         
+        大写词组、"Introducing X"/"X Protocol" 上下文、链接域名一次扫描提取, 见 entity_extractor
+        
         Args:
             text: 文本内容
             
         Returns:
             项目名称列表
         """
-        projects = []
-        
-        # 方法1: 正则匹配大写开头的词组
-        pattern1 = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'
-        matches1 = re.findall(pattern1, text)
-        projects.extend(matches1)
-        
-        # 方法2: 特定模式匹配
-        patterns = [
-            r'(?:check out|introducing|new project|announcing)\s+([A-Z][a-zA-Z\s]+?)(?:\.|,|$)',
-            r'([A-Z][a-zA-Z]+)\s+(?:protocol|network|chain|finance|swap)',
-            r'(?:protocol|network|chain)\s+([A-Z][a-zA-Z\s]+)',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            projects.extend(matches)
-        
-        # 方法3: URL中提取
-        urls = re.findall(r'https?://([a-zA-Z0-9-]+)\.[a-z]+', text)
-        for url in urls:
-            # 转换域名为项目名
-            name = url.replace('-', ' ').title()
-            if len(name) > 3:
-                projects.append(name)
-        
-        # 方法4: 合约地址附近的文本
-        contract_pattern = r"0x[a-fA-F0-9]{40}"
-        contracts = re.findall(contract_pattern, text)
-        if contracts:
-            # 在合约地址前后找项目名
-            for contract in contracts:
-                idx = text.find(contract)
-                before = text[max(0, idx-50):idx]
-                after = text[idx:min(len(text), idx+50)]
-                
-                # 提取大写开头的词
-                nearby = before + after
-                names = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', nearby)
-                projects.extend(names)
-        
-        # 清洗和去重
-        projects = list(set([p.strip() for p in projects if p.strip()]))
-        
-        # 过滤噪音
-        noise_words = {
-            "The", "This", "That", "These", "Those",
-            "Twitter", "Discord", "Telegram", "Medium",
-            "Http", "Https", "Com", "Org", "Io",
-            "New", "Launch", "Project", "Protocol",
-            "And", "For", "With"
-        }
-        
-        projects = [
-            p for p in projects
-            if p not in noise_words and len(p) > 2 and len(p) < 50
-        ]
+        return discovery_name_extractor.extract(text)
+    
+    def extract_project_mentions(self, text: str) -> List[Dict]:
+        """从文本中提取项目提及: 先用已知项目词典匹配（含小写的多词名称和 $代币符号）, 再补充词典之外的候选名称
         
-        return projects
+        Returns:
+            [{"project_name": 规范名称或候选名称, "project_id": 已知项目的规范项目ID或None, "coingecko_id": ...}]
+        """
+        mentions = {}
+        known_texts = set()
+        for match in gazetteer.match(text):
+            known_texts.add(match.text.lower())
+            key = match.project_id or match.coingecko_id
+            mentions.setdefault(key, {
+                "project_name": match.name,
+                "project_id": match.project_id,
+                "coingecko_id": match.coingecko_id,
+            })
+        
+        known_names = {mention["project_name"].lower() for mention in mentions.values()} | known_texts
+        for name in self.extract_project_names(text):
+            if name.lower() not in known_names:
+                mentions.setdefault(name, {"project_name": name, "project_id": None, "coingecko_id": None})
+        return list(mentions.values())
     
-    def aggregate_multi_source_data(self, data_sources: Dict[str, List[Dict]]) -> List[Dict]:
-        """聚合多平台数据
+    def aggregate_multi_source_data(self, data_sources: Dict[str, Iterable[Dict]], workers: int = 1) -> List[Dict]:
+        """聚合多平台数据（流式: 逐条更新计数, 每个项目只保留固定数量的提及样本, 同时写入小时计数）
         
         Args:
-            data_sources: 各平台数据，格式：{"twitter": [...], "telegram": [...], ...}
+            data_sources: 各平台数据，格式：{"twitter": [...], "telegram": [...], ...}, 每个平台的数据可以是生成器
+            workers: 大于1时分块多进程提取（历史数据回填, 见 parallel_extraction）; 在守护进程中退回单进程
             
         Returns:
-            聚合后的项目列表
+            聚合后的项目列表（按信号强度排序）
         """
         logger.info("🔍 Aggregating multi-source data...")
         
-        # 项目名称 -> 提及列表
-        project_mentions = defaultdict(list)
+        # 守护进程（如Celery prefork worker）不能再创建子进程, 只能在当前进程提取
+        if workers > 1 and not multiprocessing.current_process().daemon:
+            from app.services.parallel_extraction import parallel_extractor
+            aggregator = parallel_extractor.aggregate(data_sources, workers=workers)
+        else:
+            aggregator = self._aggregate_serial(data_sources)
+        
+        logger.info(f"📊 Found {len(aggregator)} unique project names")
+        
+        aggregated_projects = aggregator.results()
+        
+        logger.info(f"✅ Aggregated {len(aggregated_projects)} projects")
+        return aggregated_projects
+    
+    def _aggregate_serial(self, data_sources: Dict[str, Iterable[Dict]]) -> MentionAggregator:
+        aggregator = MentionAggregator(counters=mention_counters)
         
         # 处理各平台数据
         for platform, items in data_sources.items():
-            logger.info(f"  - Processing {platform}: {len(items)} items")
+            processed = aggregator.items
             
             for item in items:
                 # 提取项目名称
@@ -109,163 +94,57 @@ class ProjectDiscoveryService:
                 if not text:
                     continue
                 
-                projects = self.extract_project_names(text)
-                
-                for project in projects:
-                    project_mentions[project].append({
-                        "platform": platform,
-                        "source_item": item,
-                        "discovered_at": item.get("created_at") or item.get("date") or datetime.utcnow(),
-                        "text": text[:200]  # 保存上下文
-                    })
-        
-        logger.info(f"📊 Found {len(project_mentions)} unique project names")
-        
-        # 构建项目数据
-        aggregated_projects = []
-        
-        for project_name, mentions in project_mentions.items():
-            # 按平台统计
-            platform_counts = defaultdict(int)
-            for mention in mentions:
-                platform_counts[mention["platform"]] += 1
-            
-            # 跨平台一致性
-            num_platforms = len(platform_counts)
-            
-            # 总提及数
-            total_mentions = len(mentions)
+                aggregator.add_item(platform, item, self.extract_project_mentions(text))
             
-            # 首次发现时间
-            first_discovered = min(m["discovered_at"] for m in mentions)
-            
-            # 最近提及时间
-            last_mentioned = max(m["discovered_at"] for m in mentions)
-            
-            # 计算初步信号强度
-            signal_strength = min(100, (
-                min(40, total_mentions * 5) +  # 提及数
-                min(40, num_platforms * 13) +  # 跨平台
-                20  # 基础分
-            ))
-            
-            project_data = {
-                "project_name": project_name,
-                "total_mentions": total_mentions,
-                "platform_mentions": dict(platform_counts),
-                "num_platforms": num_platforms,
-                "first_discovered_at": first_discovered,
-                "last_mentioned_at": last_mentioned,
-                "signal_strength": int(signal_strength),
-                "mentions": mentions[:10],  # 保存前10条提及
-                "discovery_status": "new"
-            }
-            
-            aggregated_projects.append(project_data)
+            logger.info(f"  - Processed {platform}: {aggregator.items - processed} items")
         
-        # 按信号强度排序
-        aggregated_projects.sort(key=lambda x: x["signal_strength"], reverse=True)
-        
-        logger.info(f"✅ Aggregated {len(aggregated_projects)} projects")
-        return aggregated_projects
+        return aggregator
     
-    def calculate_topic_heat(self, project_name: str, mentions: List[Dict]) -> Dict:
-        """计算项目话题热度
+    def calculate_topic_heat(
+        self,
+        project_name: str,
+        project_id: Optional[int] = None,
+        series: Optional[HourlySeries] = None
+    ) -> Dict:
+        """计算项目话题热度（基于项目全部历史提及的小时计数, 见 mention_counters）
         
         Args:
             project_name: 项目名称
-            mentions: 提及列表
+            project_id: 已知项目的规范项目ID
+            series: 已读取的小时计数（批量计算时传入, 省去逐个读取）
             
         Returns:
             热度数据
         """
-        if not mentions:
+        if series is None:
+            series = mention_counters.series(counter_key(project_name, project_id))
+        if not series.total():
             return {"heat_score": 0}
         
-        # 统计不同时间段的提及数
-        now = datetime.utcnow()
-        
-        # 处理日期格式
-        def parse_date(d):
-            if isinstance(d, datetime):
-                return d
-            elif isinstance(d, str):
-                try:
-                    return datetime.fromisoformat(d.replace('Z', '+00:00'))
-                except:
-                    return datetime.utcnow()
-            else:
-                return datetime.utcnow()
-        
-        mentions_24h = [m for m in mentions if (now - parse_date(m["discovered_at"])).total_seconds() < 86400]
-        mentions_7d = [m for m in mentions if (now - parse_date(m["discovered_at"])).total_seconds() < 604800]
-        
-        # 计算增长率
-        if len(mentions_7d) > len(mentions_24h):
-            recent_rate = len(mentions_24h) / (len(mentions_7d) - len(mentions_24h))
-        else:
-            recent_rate = 1.0
-        
-        # 计算热度分
-        heat_score = min(100, (
-            min(50, len(mentions_24h) * 10) +  # 24小时提及
-            min(30, recent_rate * 30) +  # 增长率
-            min(20, len(set(m["platform"] for m in mentions_24h)) * 7)  # 平台数
-        ))
-        
-        return {
-            "project_name": project_name,
-            "heat_score": int(heat_score),
-            "mentions_24h": len(mentions_24h),
-            "mentions_7d": len(mentions_7d),
-            "growth_rate": recent_rate,
-            "is_trending": heat_score > 70
-        }
+        return {"project_name": project_name, **series.heat()}
     
-    def detect_sudden_surge(self, project_name: str, mentions: List[Dict]) -> Dict:
-        """检测突然爆发
+    def detect_sudden_surge(
+        self,
+        project_name: str,
+        project_id: Optional[int] = None,
+        series: Optional[HourlySeries] = None
+    ) -> Dict:
+        """检测突然爆发（最近24小时每小时提及数 vs 更早的基线, 基于小时计数）
         
         Args:
             project_name: 项目名称
-            mentions: 提及列表（按时间排序）
+            project_id: 已知项目的规范项目ID
+            series: 已读取的小时计数
             
         Returns:
             爆发检测结果
         """
-        if len(mentions) < 10:
-            return {"is_surge": False}
-        
-        # 按小时统计
-        hourly_counts = defaultdict(int)
-        
-        for mention in mentions:
-            hour = mention["discovered_at"].replace(minute=0, second=0, microsecond=0)
-            hourly_counts[hour] += 1
-        
-        # 转换为列表
-        sorted_hours = sorted(hourly_counts.keys())
-        counts = [hourly_counts[h] for h in sorted_hours]
-        
-        if len(counts) < 24:
-            return {"is_surge": False}
-        
-        # 计算基线（前面的平均值）
-        baseline = sum(counts[:-24]) / len(counts[:-24]) if len(counts) > 24 else 0
-        
-        # 最近24小时平均
-        recent_avg = sum(counts[-24:]) / 24
-        
-        # 判断爆发
-        surge_ratio = recent_avg / baseline if baseline > 0 else 0
-        is_surge = surge_ratio > 3
-        
-        return {
-            "project_name": project_name,
-            "is_surge": is_surge,
-            "surge_ratio": surge_ratio,
-            "baseline_per_hour": baseline,
-            "recent_per_hour": recent_avg
-        }
+        if series is None:
+            series = mention_counters.series(counter_key(project_name, project_id))
+        surge = series.surge()
+        if "surge_ratio" in surge:
+            surge = {"project_name": project_name, **surge}
+        return surge
     
     def filter_known_projects(self, projects: List[Dict]) -> List[Dict]:
         """过滤已知大项目
@@ -314,11 +193,12 @@ class ProjectDiscoveryService:
             "checked_at": datetime.utcnow()
         }
     
-    def discover_projects(self, data_sources: Dict[str, List[Dict]]) -> List[Dict]:
+    def discover_projects(self, data_sources: Dict[str, List[Dict]], workers: int = 1) -> List[Dict]:
         """完整的项目发现流程
         
         Args:
             data_sources: 各平台数据
+            workers: 提取进程数（大批量回填时大于1）
             
         Returns:
             发现的项目列表
@@ -326,28 +206,24 @@ class ProjectDiscoveryService:
         logger.info("🚀 Starting project discovery process...")
         
         # 1. 聚合多平台数据
-        aggregated = self.aggregate_multi_source_data(data_sources)
+        aggregated = self.aggregate_multi_source_data(data_sources, workers=workers)
         logger.info(f"  ✅ Step 1: Aggregated {len(aggregated)} projects")
         
         # 2. 过滤已知大项目
         filtered = self.filter_known_projects(aggregated)
         logger.info(f"  ✅ Step 2: Filtered to {len(filtered)} projects")
         
-        # 3. 计算热度和爆发
-        for project in filtered:
+        # 3. 计算热度和爆发（一次读取所有项目的小时计数）
+        keys = [counter_key(project["project_name"], project.get("project_id")) for project in filtered]
+        series_by_key = mention_counters.series_many(keys)
+        for project, key in zip(filtered, keys):
+            series = series_by_key[key]
+            
             # 话题热度
-            heat = self.calculate_topic_heat(
-                project["project_name"],
-                project["mentions"]
-            )
-            project["heat_data"] = heat
+            project["heat_data"] = self.calculate_topic_heat(project["project_name"], series=series)
             
             # 突发检测
-            surge = self.detect_sudden_surge(
-                project["project_name"],
-                project["mentions"]
-            )
-            project["surge_data"] = surge
+            project["surge_data"] = self.detect_sudden_surge(project["project_name"], series=series)
             
             # 检查代币状态
             token_status = self.check_token_status(project["project_name"])
@@ -0,0 +1,165 @@
+"""评分历史 - 追加项目评分快照（紧凑存储、按月分区、去掉连续重复行）"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+from loguru import logger
+from sqlalchemy import and_, func, text
+from sqlalchemy.orm import Session
+from app.models import Project, ProjectScoreHistory
+
+# 历史表列 → projects 表列
+HISTORY_COLUMNS = {
+    "overall": "overall_score",
+    "team": "team_score",
+    "tech": "tech_score",
+    "community": "community_score",
+    "tokenomics": "tokenomics_score",
+    "market_timing": "market_timing_score",
+    "risk": "risk_score",
+}
+SCORE_SCALE = 100  # 分数×100 存为SMALLINT
+LOOKUP_CHUNK = 1000
+
+
+def _month_start(ts: datetime) -> datetime:
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month: datetime) -> datetime:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"project_score_history_{month:%Y%m}"
+
+
+class ScoreHistoryStore:
+    """评分历史存储
+
+    - 写入: 与项目最近一行比较, 只追加有变化的评分
+    - 分区: PostgreSQL 中按月分区, 写入前确保当月和下月分区存在（每个进程每月只检查一次）
+    - 查询: 主键 (project_id, recorded_at) 上的一次范围扫描
+    """
+
+    def __init__(self):
+        self._partitions = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def pack(row: Dict) -> Dict[str, Optional[int]]:
+        """projects 表字段的评分 → 历史表的紧凑整数"""
+        return {
+            column: None if row.get(source) is None else int(round(float(row[source]) * SCORE_SCALE))
+            for column, source in HISTORY_COLUMNS.items()
+        }
+
+    def append_many(self, db: Session, rows: Sequence[Dict], recorded_at: Optional[datetime] = None) -> int:
+        """追加评分快照（不提交, 由调用方提交）
+
+        Args:
+            rows: [{"id": 项目ID, "overall_score": ..., "team_score": ...}], 字段同 projects 表
+            recorded_at: 记录时间（默认当前UTC时间）
+
+        Returns:
+            实际写入的行数
+        """
+        packed = {row["id"]: self.pack(row) for row in rows}  # 同一批次内同一项目以最后一次为准
+        if not packed:
+            return 0
+
+        previous = self.latest(db, list(packed))
+        recorded_at = recorded_at or datetime.utcnow()
+        new_rows = [
+            {"project_id": project_id, "recorded_at": recorded_at, **values}
+            for project_id, values in packed.items()
+            if previous.get(project_id) != values
+        ]
+        if new_rows:
+            self.ensure_partitions(db, recorded_at)
+            db.execute(ProjectScoreHistory.__table__.insert(), new_rows)
+
+        logger.debug(f"📈 Score history: {len(new_rows)}/{len(packed)} projects changed")
+        return len(new_rows)
+
+    def record_projects(self, db: Session, projects: Iterable[Project], recorded_at: Optional[datetime] = None) -> int:
+        """追加项目当前的评分（ORM对象）"""
+        return self.append_many(db, [
+            {"id": project.id, **{source: getattr(project, source) for source in HISTORY_COLUMNS.values()}}
+            for project in projects
+        ], recorded_at)
+
+    def latest(self, db: Session, project_ids: Sequence[int]) -> Dict[int, Dict[str, Optional[int]]]:
+        """各项目最近一行评分 {项目ID: {列: 整数}}"""
+        history = ProjectScoreHistory
+        result = {}
+        for offset in range(0, len(project_ids), LOOKUP_CHUNK):
+            chunk = project_ids[offset:offset + LOOKUP_CHUNK]
+            last = db.query(
+                history.project_id, func.max(history.recorded_at).label("recorded_at")
+            ).filter(history.project_id.in_(chunk)).group_by(history.project_id).subquery()
+            rows = db.query(history).join(last, and_(
+                history.project_id == last.c.project_id, history.recorded_at == last.c.recorded_at
+            )).all()
+            for row in rows:
+                result[row.project_id] = {column: getattr(row, column) for column in HISTORY_COLUMNS}
+        return result
+
+    def series(self, db: Session, project_id: int, since: datetime) -> List[Dict]:
+        """项目从 since 起的评分时间序列
+
+        只在评分变化时记录, since 之前最后一行是窗口开始时仍有效的评分: 作为第一个点, 时间取 since
+        （窗口内没有变化的项目也有值）
+        """
+        history = ProjectScoreHistory
+        previous = db.query(history).filter(
+            history.project_id == project_id,
+            history.recorded_at < since
+        ).order_by(history.recorded_at.desc()).limit(1).first()
+        rows = db.query(history).filter(
+            history.project_id == project_id,
+            history.recorded_at >= since
+        ).order_by(history.recorded_at).all()
+
+        points = [self._point(row, row.recorded_at) for row in rows]
+        if previous is not None and (not rows or rows[0].recorded_at > since):
+            points.insert(0, self._point(previous, since))
+        return points
+
+    @staticmethod
+    def _point(row: ProjectScoreHistory, timestamp: datetime) -> Dict:
+        return {
+            "timestamp": timestamp,
+            **{
+                column: None if getattr(row, column) is None else getattr(row, column) / SCORE_SCALE
+                for column in HISTORY_COLUMNS
+            },
+        }
+
+    def ensure_partitions(self, db: Session, ts: datetime):
+        """确保 ts 所在月份和下个月的分区存在（仅PostgreSQL）"""
+        if db.get_bind().dialect.name != "postgresql":
+            return
+
+        month = _month_start(ts)
+        for start in (month, _next_month(month)):
+            if start in self._partitions:
+                continue
+            with self._lock:
+                if start in self._partitions:
+                    continue
+                try:
+                    with db.begin_nested():
+                        db.execute(text(
+                            f"CREATE TABLE IF NOT EXISTS {partition_name(start)} "
+                            f"PARTITION OF project_score_history "
+                            f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{_next_month(start):%Y-%m-%d}')"
+                        ))
+                    self._partitions.add(start)
+                except Exception as e:
+                    # 并发创建同一分区时另一方会成功, 下次写入再确认
+                    logger.warning(f"⚠️ Failed to create score history partition {partition_name(start)}: {e}")
+
+
+# 全局实例
+score_history = ScoreHistoryStore()
@@ -1,9 +1,130 @@
 """AI评分引擎 - 6维度项目评分系统"""
 
-from typing import Dict, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
 from datetime import datetime
 from loguru import logger
 from pydantic import BaseModel
+from app.services import scoring_kernel
+from app.services.scoring_spec import CompiledScoringSpec, scoring_spec_store
+
+
+SCORE_CACHE_MAX_ENTRIES = 300000
+STATS_KEY = "scoring:dimension_cache"
+STATS_FLUSH_SECONDS = 10
+
+
+def dimension_input_hashes(project_data: Dict, spec: CompiledScoringSpec) -> Dict[str, str]:
+    """各维度输入哈希 {维度: 哈希}（与 projects.score_input_hashes 相同, 各维度读取的特征见 scoring_kernel.DIMENSION_FEATURES）"""
+    matrix = scoring_kernel.build_matrix([project_data], spec)
+    return scoring_kernel.format_hashes(scoring_kernel.input_hashes(matrix, spec), 0)
+
+
+class DimensionScoreCache:
+    """维度分缓存: (维度, 输入哈希) → 分数, 统计各维度命中率
+
+    输入哈希与 rescore_projects 写入 score_input_hashes 的是同一个（含评分规范指纹）, 输入相同的维度
+    不论来自哪个项目都直接复用分数。命中统计按 STATS_FLUSH_SECONDS 累加到 Redis 哈希, 各进程
+    （worker 的批量重算、采集任务）合计; Redis 不可用时只有本进程的统计。
+    """
+    
+    def __init__(self, max_entries: int = SCORE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {dimension: {"hits": 0, "misses": 0} for dimension in scoring_kernel.DIMENSION_FEATURES}
+        self._unflushed: Dict[str, int] = {}
+        self._flushed_at = time.monotonic()
+        self._redis = None
+        self._redis_retry_at = 0.0
+    
+    def _get_redis(self):
+        """Redis不可用时只保留进程内统计, 60秒后再重试连接"""
+        if self._redis is None and time.monotonic() >= self._redis_retry_at:
+            try:
+                import redis
+                from app.core.config import settings
+                client = redis.Redis.from_url(settings.REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+                client.ping()
+                self._redis = client
+            except Exception as e:
+                self._redis_retry_at = time.monotonic() + 60
+                logger.debug(f"Dimension cache stats falling back to in-process only: {e}")
+        return self._redis
+    
+    def get(self, dimension: str, input_hash: str) -> Optional[int]:
+        with self._lock:
+            score = self._entries.get((dimension, input_hash))
+            if score is not None:
+                self._entries.move_to_end((dimension, input_hash))
+        self.record(dimension, score is not None)
+        return score
+    
+    def put(self, dimension: str, input_hash: str, score: int):
+        with self._lock:
+            self._entries[(dimension, input_hash)] = score
+            self._entries.move_to_end((dimension, input_hash))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def record(self, dimension: str, hit: bool, count: int = 1):
+        """记录命中/未命中（批量重算按数据库中保存的哈希判断, 也计入这里）"""
+        field = f"{dimension}:{'hits' if hit else 'misses'}"
+        with self._lock:
+            self._stats[dimension]["hits" if hit else "misses"] += count
+            self._unflushed[field] = self._unflushed.get(field, 0) + count
+            due = time.monotonic() - self._flushed_at >= STATS_FLUSH_SECONDS
+        if due:
+            self.flush()
+    
+    def flush(self):
+        """把未写入的命中统计累加到 Redis"""
+        with self._lock:
+            pending, self._unflushed = self._unflushed, {}
+            self._flushed_at = time.monotonic()
+        client = self._get_redis() if pending else None
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for field, count in pending.items():
+                pipe.hincrby(STATS_KEY, field, count)
+            pipe.execute()
+        except Exception as e:
+            self._redis = None
+            logger.warning(f"⚠️ Failed to persist dimension cache stats: {e}")
+    
+    def hit_rates(self) -> Dict[str, Dict]:
+        """各维度命中率（Redis 中各进程的合计; 不可用时为本进程的统计）"""
+        self.flush()
+        counts = None
+        client = self._get_redis()
+        if client is not None:
+            try:
+                fields = {name.decode(): int(value) for name, value in client.hgetall(STATS_KEY).items()}
+                counts = {
+                    dimension: {kind: fields.get(f"{dimension}:{kind}", 0) for kind in ("hits", "misses")}
+                    for dimension in self._stats
+                }
+            except Exception as e:
+                self._redis = None
+                logger.warning(f"⚠️ Failed to read dimension cache stats: {e}")
+        if counts is None:
+            with self._lock:
+                counts = {dimension: dict(values) for dimension, values in self._stats.items()}
+        return {
+            dimension: {
+                **values,
+                "hit_rate": round(values["hits"] / max(values["hits"] + values["misses"], 1), 4),
+            }
+            for dimension, values in counts.items()
+        }
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
 
 
 class ProjectScore(BaseModel):
@@ -25,40 +146,46 @@ class ProjectScore(BaseModel):
     
     # 推荐度
     recommendation: str  # Strong Buy, Buy, Hold, Pass
+    
+    # 评分规范版本
+    spec_version: Optional[str] = None
 
 
 class ScoringEngine:
-    """评分引擎"""
+    """评分引擎（权重、因子表、上下限和分级阈值来自评分规范, 见 scoring_spec）"""
     
-    # 维度权重
-    WEIGHTS = {
-        "team": 0.20,
-        "tech": 0.25,
-        "community": 0.20,
-        "tokenomics": 0.15,
-        "market": 0.10,
-        "risk": 0.10
+    # 维度 → 评分方法（各维度读取的特征见 scoring_kernel.DIMENSION_FEATURES）
+    DIMENSION_SCORERS = {
+        "team": "assess_team_background",
+        "tech": "assess_technical_innovation",
+        "community": "assess_community_heat",
+        "tokenomics": "assess_tokenomics",
+        "market": "assess_market_timing",
+        "risk": "assess_risks",
     }
     
     def __init__(self):
         """初始化"""
+        self.score_cache = DimensionScoreCache()
         logger.info("✅ Scoring Engine initialized")
     
-    def assess_team_background(self, project_data: Dict) -> int:
+    def assess_team_background(self, project_data: Dict, spec: Optional[CompiledScoringSpec] = None) -> int:
         """评估团队背景（0-100分）
         
         Args:
             project_data: 项目数据
+            spec: 评分规范（默认当前启用版本）
             
         Returns:
             团队背景评分
         """
-        score = 0
+        spec = spec or scoring_spec_store.current()
+        score = spec.caps["team"]["base"]
         
         team_info = project_data.get("team_info", {})
         
         if not team_info:
-            return 20  # 基础分
+            return spec.caps["team"]["no_data"]  # 基础分
         
         # 因子1: 团队成员数量（15分）
         team_size = len(team_info.get("members", []))
@@ -98,18 +225,20 @@ class ScoringEngine:
         transparency = team_info.get("transparency_score", 0.5)
         score += transparency * 10
         
-        return min(100, int(score))
+        return spec.clamp("team", int(score))
     
-    def assess_technical_innovation(self, project_data: Dict) -> int:
+    def assess_technical_innovation(self, project_data: Dict, spec: Optional[CompiledScoringSpec] = None) -> int:
         """评估技术创新（0-100分）
         
         Args:
             project_data: 项目数据
+            spec: 评分规范（默认当前启用版本）
             
         Returns:
             技术创新评分
         """
-        score = 0
+        spec = spec or scoring_spec_store.current()
+        score = spec.caps["tech"]["base"]
         
         # 因子1: GitHub活跃度（30分）
         github = project_data.get("github", {})
@@ -138,18 +267,20 @@ class ScoringEngine:
             if audit_status.get("top_auditor"):
                 score += 10
         
-        return min(100, int(score))
+        return spec.clamp("tech", int(score))
     
-    def assess_community_heat(self, project_data: Dict) -> int:
+    def assess_community_heat(self, project_data: Dict, spec: Optional[CompiledScoringSpec] = None) -> int:
         """评估社区热度（0-100分）
         
         Args:
             project_data: 项目数据
+            spec: 评分规范（默认当前启用版本）
             
         Returns:
             社区热度评分
         """
-        score = 0
+        spec = spec or scoring_spec_store.current()
+        score = spec.caps["community"]["base"]
         
         # 因子1: Twitter（30分）
         twitter = project_data.get("twitter", {})
@@ -183,23 +314,25 @@ class ScoringEngine:
         telegram_growth = growth.get("telegram_growth_30d", 0)
         score += min(10, telegram_growth * 100)
         
-        return min(100, int(score))
+        return spec.clamp("community", int(score))
     
-    def assess_tokenomics(self, project_data: Dict) -> int:
+    def assess_tokenomics(self, project_data: Dict, spec: Optional[CompiledScoringSpec] = None) -> int:
         """评估代币经济（0-100分）
         
         Args:
             project_data: 项目数据
+            spec: 评分规范（默认当前启用版本）
             
         Returns:
             代币经济评分
         """
-        score = 50  # 基础分（很多项目还未公布代币经济学）
+        spec = spec or scoring_spec_store.current()
+        score = spec.caps["tokenomics"]["base"]
         
         tokenomics = project_data.get("tokenomics", {})
         
         if not tokenomics:
-            return score
+            return spec.caps["tokenomics"]["no_data"]  # 很多项目还未公布代币经济学
         
         # 因子1: 代币分配合理性（30分）
         distribution = tokenomics.get("distribution", {})
@@ -208,25 +341,16 @@ class ScoringEngine:
             community_allocation = distribution.get("community", 0)
             
             # 团队占比不应过高
-            if team_allocation < 0.2:  # <20%
-                score += 15
-            elif team_allocation < 0.3:
-                score += 10
+            score += spec.bracket("team_allocation_points", team_allocation)
             
             # 社区占比应该较高
-            if community_allocation > 0.5:  # >50%
-                score += 15
-            elif community_allocation > 0.3:
-                score += 10
+            score += spec.bracket("community_allocation_points", community_allocation)
         
         # 因子2: 释放机制（30分）
         vesting = tokenomics.get("vesting", {})
         if vesting:
             team_lockup = vesting.get("team_lockup_months", 0)
-            if team_lockup >= 12:
-                score += 15
-            elif team_lockup >= 6:
-                score += 10
+            score += spec.bracket("team_lockup_points", team_lockup)
             
             release_schedule = vesting.get("release_schedule", "")
             if "gradual" in release_schedule.lower():
@@ -247,153 +371,123 @@ class ScoringEngine:
         if has_staking:
             score += 10
         
-        return min(100, int(score))
+        return spec.clamp("tokenomics", int(score))
     
-    def assess_market_timing(self, project_data: Dict) -> int:
+    def assess_market_timing(self, project_data: Dict, spec: Optional[CompiledScoringSpec] = None) -> int:
         """评估市场时机（0-100分）
         
         Args:
             project_data: 项目数据
+            spec: 评分规范（默认当前启用版本）
             
         Returns:
             市场时机评分
         """
-        score = 50  # 基础分
-        
-        # 因子1: 赛道热度（40分）
-        category = project_data.get("category", "")
-        
-        # 当前热门赛道（2024-2025）
-        hot_tracks = {
-            "AI": 95,
-            "DePIN": 90,
-            "RWA": 85,
-            "Gaming": 80,
-            "DeFi": 75,
-            "SocialFi": 70,
-            "Layer2": 85,
-            "Restaking": 90
-        }
+        spec = spec or scoring_spec_store.current()
+        score = spec.caps["market"]["base"]
         
-        track_score = hot_tracks.get(category, 60)
-        score += (track_score - 50) * 0.4
+        # 因子1: 赛道热度（40分, 热门赛道表见评分规范）
+        track_score = spec.track_score(project_data.get("category", ""))
+        score += (track_score - 50) * spec.factors["track_weight"]
         
-        # 因子2: 竞品分析（30分）
+        # 因子2: 竞品分析（30分）: 蓝海 > 竞争适中 > 竞争激烈 > 过于激烈不加分
         competitors = project_data.get("competitors", [])
-        competitor_count = len(competitors)
-        
-        if competitor_count == 0:
-            # 蓝海市场
-            score += 30
-        elif competitor_count <= 3:
-            # 竞争适中
-            score += 20
-        elif competitor_count <= 5:
-            # 竞争激烈
-            score += 10
-        # else: 竞争过于激烈，不加分
+        score += spec.bracket("competitor_points", len(competitors))
         
         # 因子3: 叙事契合度（30分）
         narrative = project_data.get("narrative_fit", 0.5)
         score += narrative * 30
         
-        return min(100, int(score))
+        return spec.clamp("market", int(score))
     
-    def assess_risks(self, project_data: Dict) -> int:
+    def assess_risks(self, project_data: Dict, spec: Optional[CompiledScoringSpec] = None) -> int:
         """评估风险（0-100分，分数越高越安全）
         
         Args:
             project_data: 项目数据
+            spec: 评分规范（默认当前启用版本）
             
         Returns:
             风险评分
         """
-        score = 100  # 从满分开始扣分
+        spec = spec or scoring_spec_store.current()
+        penalties = spec.factors["risk_penalties"]
+        thresholds = spec.factors["risk_thresholds"]
+        score = spec.caps["risk"]["base"]  # 从满分开始扣分
         
-        # 风险1: 团队匿名（-30分）
+        # 风险1: 团队匿名
         if project_data.get("team_anonymous", True):
-            score -= 30
+            score -= penalties["team_anonymous"]
         
-        # 风险2: 未审计（-20分）
+        # 风险2: 未审计
         if not project_data.get("audit_status", {}).get("has_audit"):
-            score -= 20
+            score -= penalties["no_audit"]
         
-        # 风险3: 代币集中度过高（-15分）
+        # 风险3: 代币集中度过高
         token_concentration = project_data.get("token_concentration", 0)
-        if token_concentration > 0.5:
-            score -= 15
-        elif token_concentration > 0.3:
-            score -= 10
+        score -= spec.bracket("token_concentration_penalty", token_concentration)
         
-        # 风险4: 社交媒体刷量（-15分）
-        if project_data.get("bot_suspicion", 0) > 0.5:
-            score -= 15
+        # 风险4: 社交媒体刷量
+        if project_data.get("bot_suspicion", 0) > thresholds["bot_suspicion"]:
+            score -= penalties["bot_suspicion"]
         
-        # 风险5: 白皮书抄袭（-20分）
-        if project_data.get("whitepaper_plagiarism", 0) > 0.8:
-            score -= 20
+        # 风险5: 白皮书抄袭
+        if project_data.get("whitepaper_plagiarism", 0) > thresholds["whitepaper_plagiarism"]:
+            score -= penalties["whitepaper_plagiarism"]
         
-        # 风险6: 域名年龄过短（-10分）
+        # 风险6: 域名年龄过短
         domain_age_days = project_data.get("domain_age_days", 0)
-        if domain_age_days < 30:
-            score -= 10
+        if domain_age_days < thresholds["young_domain_days"]:
+            score -= penalties["young_domain"]
         
-        return max(0, int(score))
+        return spec.clamp("risk", int(score))
     
-    def calculate_comprehensive_score(self, project_data: Dict) -> ProjectScore:
+    def calculate_comprehensive_score(self, project_data: Dict, use_cache: bool = True) -> ProjectScore:
         """计算综合评分
         
         Args:
             project_data: 项目数据
+            use_cache: 按维度输入哈希复用已算过的维度分
             
         Returns:
             项目评分
         """
         logger.info(f"🔍 Calculating score for {project_data.get('project_name', 'Unknown')}")
+        spec = scoring_spec_store.current()
         
         # 1. 计算各维度得分
-        team_score = self.assess_team_background(project_data)
-        tech_score = self.assess_technical_innovation(project_data)
-        community_score = self.assess_community_heat(project_data)
-        tokenomics_score = self.assess_tokenomics(project_data)
-        market_score = self.assess_market_timing(project_data)
-        risk_score = self.assess_risks(project_data)
-        
-        # 2. 计算加权综合分
-        composite = (
-            team_score * self.WEIGHTS["team"] +
-            tech_score * self.WEIGHTS["tech"] +
-            community_score * self.WEIGHTS["community"] +
-            tokenomics_score * self.WEIGHTS["tokenomics"] +
-            market_score * self.WEIGHTS["market"] +
-            risk_score * self.WEIGHTS["risk"]
-        )
-        
-        # 3. 致命风险降级
-        if project_data.get("is_likely_scam", False):
-            composite *= 0.3  # 降70%
+        scores = self.dimension_scores(project_data, spec, use_cache)
+        team_score = scores["team"]
+        tech_score = scores["tech"]
+        community_score = scores["community"]
+        tokenomics_score = scores["tokenomics"]
+        market_score = scores["market"]
+        risk_score = scores["risk"]
+        
+        # 2. 加权综合分 + 致命风险降级 + 顶级VC加分
+        is_likely_scam = project_data.get("is_likely_scam", False)
+        has_top_tier_vc = project_data.get("has_top_tier_vc", False)
+        if is_likely_scam:
             logger.warning("⚠️ Scam suspicion detected, score reduced")
-        
-        # 4. 顶级VC加分
-        if project_data.get("has_top_tier_vc", False):
-            composite = min(100, composite + 5)
+        if has_top_tier_vc:
             logger.info("✨ Top-tier VC backing, score boosted")
         
-        composite = max(0, min(100, int(composite)))
-        
-        # 5. 确定分级
-        if composite >= 85:
-            grade = "S"
-            recommendation = "Strong Buy"
-        elif composite >= 70:
-            grade = "A"
-            recommendation = "Buy"
-        elif composite >= 55:
-            grade = "B"
-            recommendation = "Hold"
-        else:
-            grade = "C"
-            recommendation = "Pass"
+        composite = int(spec.composite(
+            {
+                "team": team_score,
+                "tech": tech_score,
+                "community": community_score,
+                "tokenomics": tokenomics_score,
+                "market": market_score,
+                "risk": risk_score,
+            },
+            fatal_risk=is_likely_scam,
+            top_vc=has_top_tier_vc,
+        ))
+        
+        # 3. 确定分级
+        grade = spec.grade(composite)
+        recommendation = spec.recommendation(composite)
         
         score_result = ProjectScore(
             team_score=team_score,
@@ -404,13 +498,66 @@ class ScoringEngine:
             risk_score=risk_score,
             composite_score=composite,
             grade=grade,
-            recommendation=recommendation
+            recommendation=recommendation,
+            spec_version=spec.version
         )
         
-        logger.info(f"✅ Score calculated: {composite}/100 (Grade {grade})")
+        logger.info(f"✅ Score calculated: {composite}/100 (Grade {grade}, spec {spec.version})")
         
         return score_result
     
+    def dimension_scores(
+        self,
+        project_data: Dict,
+        spec: Optional[CompiledScoringSpec] = None,
+        use_cache: bool = False
+    ) -> Dict[str, int]:
+        """六个维度的得分 {维度: 分数}; use_cache 时只计算输入哈希没见过的维度"""
+        spec = spec or scoring_spec_store.current()
+        if not use_cache:
+            return {
+                dimension: getattr(self, method)(project_data, spec)
+                for dimension, method in self.DIMENSION_SCORERS.items()
+            }
+        
+        scores = {}
+        hashes = dimension_input_hashes(project_data, spec)
+        for dimension, method in self.DIMENSION_SCORERS.items():
+            input_hash = hashes[dimension]
+            score = self.score_cache.get(dimension, input_hash)
+            if score is None:
+                score = getattr(self, method)(project_data, spec)
+                self.score_cache.put(dimension, input_hash, score)
+            scores[dimension] = score
+        return scores
+    
+    def score_batch(self, projects: Sequence[Dict], spec: Optional[CompiledScoringSpec] = None) -> Dict:
+        """批量计算综合评分（NumPy向量化, 结果与 calculate_comprehensive_score 一致）
+        
+        Args:
+            projects: 项目数据列表
+            spec: 评分规范（默认当前启用版本）
+            
+        Returns:
+            {字段名: 数组}, 字段同 ProjectScore, 另含 grade_index 和 spec_version;
+            用 scoring_kernel.result_rows 转成字典列表
+        """
+        spec = spec or scoring_spec_store.current()
+        started = time.perf_counter()
+        matrix = scoring_kernel.build_matrix(projects, spec)
+        extracted = time.perf_counter()
+        results = self.score_matrix(matrix, spec)
+        
+        logger.info(
+            f"✅ Batch scored {len(projects)} projects with spec {spec.version} "
+            f"(extract {extracted - started:.3f}s, kernel {time.perf_counter() - extracted:.3f}s)"
+        )
+        return results
+    
+    def score_matrix(self, matrix, spec: Optional[CompiledScoringSpec] = None) -> Dict:
+        """对已展开的特征矩阵评分（见 scoring_kernel.FEATURES）"""
+        return scoring_kernel.score_matrix(matrix, spec or scoring_spec_store.current())
+    
     def predict_token_launch_probability(self, project_data: Dict) -> Dict:
         """预测发币概率
         
@@ -505,25 +652,25 @@ class ScoringEngine:
         
         base_value = reference["avg"]
         
-        # 调整因子
-        adjustment = 1.0
-        
         # TVL调整
         tvl = project_data.get("tvl", 0)
+        tvl_adjustment = 1.0
         if tvl > 100_000_000:
-            adjustment *= 1.5
+            tvl_adjustment = 1.5
         elif tvl > 50_000_000:
-            adjustment *= 1.3
+            tvl_adjustment = 1.3
         elif tvl > 10_000_000:
-            adjustment *= 1.1
+            tvl_adjustment = 1.1
         
         # 融资调整
         funding = project_data.get("funding_amount", 0)
+        funding_adjustment = 1.0
         if funding > 50_000_000:
-            adjustment *= 1.4
+            funding_adjustment = 1.4
         elif funding > 20_000_000:
-            adjustment *= 1.2
+            funding_adjustment = 1.2
         
+        adjustment = tvl_adjustment * funding_adjustment
         estimated_value = int(base_value * adjustment)
         
         return {
@@ -534,7 +681,13 @@ class ScoringEngine:
                 "max": min(int(estimated_value * 2), reference["max"])
             },
             "confidence": "Medium",
-            "reference_category": category
+            "reference_category": category,
+            "historical_avg": base_value,
+            "adjustments": {
+                "tvl": tvl_adjustment,
+                "funding": funding_adjustment,
+                "final": adjustment
+            }
         }
 
 
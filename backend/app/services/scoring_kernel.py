@@ -0,0 +1,297 @@
+"""批量评分内核 - 把评分输入展开成NumPy列, 用数组运算一次算完所有项目
+
+与 ScoringEngine 的逐项目评分规则逐项对应（同样的评分规范、累加顺序和取整方式）,
+结果与 calculate_comprehensive_score 一致, 只是不再逐个构建 ProjectScore 和打日志。
+"""
+
+from typing import Dict, List, Sequence
+import numpy as np
+from app.services.scoring_spec import CompiledScoringSpec
+
+# 特征列（顺序即 extract_features 返回的元组顺序）
+FEATURES = (
+    # 团队
+    "has_team", "team_size", "member_bonus", "has_ceo", "has_cto", "has_cmo",
+    "social_reach", "transparency",
+    # 技术
+    "has_github", "commits_30d", "contributors", "stars", "docs_quality",
+    "innovation", "has_audit", "top_auditor",
+    # 社区
+    "has_twitter", "twitter_followers", "engagement_rate", "has_telegram",
+    "telegram_members", "daily_messages", "has_discord", "discord_activity",
+    "twitter_growth", "telegram_growth",
+    # 代币经济
+    "has_tokenomics", "has_distribution", "team_allocation", "community_allocation",
+    "has_vesting", "team_lockup_months", "gradual_release", "utility_count",
+    "has_burning", "has_staking",
+    # 市场时机
+    "track_score", "competitor_count", "narrative_fit",
+    # 风险
+    "team_anonymous", "token_concentration", "bot_suspicion",
+    "whitepaper_plagiarism", "domain_age_days",
+    # 调整项
+    "is_likely_scam", "has_top_tier_vc",
+)
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+
+# 各维度读取的特征列: 某维度的特征不变（且评分规范不变）时维度分不变
+DIMENSION_FEATURES = {
+    "team": (
+        "has_team", "team_size", "member_bonus", "has_ceo", "has_cto", "has_cmo",
+        "social_reach", "transparency",
+    ),
+    "tech": (
+        "has_github", "commits_30d", "contributors", "stars", "docs_quality",
+        "innovation", "has_audit", "top_auditor",
+    ),
+    "community": (
+        "has_twitter", "twitter_followers", "engagement_rate", "has_telegram",
+        "telegram_members", "daily_messages", "has_discord", "discord_activity",
+        "twitter_growth", "telegram_growth",
+    ),
+    "tokenomics": (
+        "has_tokenomics", "has_distribution", "team_allocation", "community_allocation",
+        "has_vesting", "team_lockup_months", "gradual_release", "utility_count",
+        "has_burning", "has_staking",
+    ),
+    "market": ("track_score", "competitor_count", "narrative_fit"),
+    "risk": (
+        "team_anonymous", "has_audit", "token_concentration", "bot_suspicion",
+        "whitepaper_plagiarism", "domain_age_days",
+    ),
+    # 不属于任何维度、只影响综合分的调整项
+    "adjustments": ("is_likely_scam", "has_top_tier_vc"),
+}
+_DIMENSION_COLUMNS = {
+    dimension: [FEATURE_INDEX[name] for name in names] for dimension, names in DIMENSION_FEATURES.items()
+}
+
+
+def extract_features(project_data: Dict, spec: CompiledScoringSpec) -> tuple:
+    """把一个项目的评分输入展开成一行特征（缺失字段取与逐项目评分相同的默认值）"""
+    team_info = project_data.get("team_info") or {}
+    members = team_info.get("members", []) if team_info else []
+    member_bonus = 0
+    for member in members[:5]:
+        member_bonus += (
+            8 * bool(member.get("from_faang"))
+            + 5 * bool(member.get("web3_success"))
+            + 3 * bool(member.get("top_education"))
+        )
+    roles = team_info.get("roles", []) if team_info else []
+
+    github = project_data.get("github") or {}
+    audit_status = project_data.get("audit_status") or {}
+    twitter = project_data.get("twitter") or {}
+    telegram = project_data.get("telegram") or {}
+    discord = project_data.get("discord") or {}
+    growth = project_data.get("growth_data") or {}
+
+    tokenomics = project_data.get("tokenomics") or {}
+    distribution = tokenomics.get("distribution") or {}
+    vesting = tokenomics.get("vesting") or {}
+    supply = tokenomics.get("supply") or {}
+
+    return (
+        bool(team_info),
+        len(members),
+        member_bonus,
+        "CEO" in roles or "Founder" in roles,
+        "CTO" in roles,
+        "CMO" in roles or "Marketing" in roles,
+        team_info.get("social_reach", 0) if team_info else 0,
+        team_info.get("transparency_score", 0.5) if team_info else 0.5,
+
+        bool(github),
+        github.get("commits_30d", 0),
+        github.get("contributors", 0),
+        github.get("stars", 0),
+        project_data.get("docs_quality", 0),
+        project_data.get("innovation_score", 0.5),
+        bool(audit_status.get("has_audit")),
+        bool(audit_status.get("top_auditor")),
+
+        bool(twitter),
+        twitter.get("followers", 0),
+        twitter.get("engagement_rate", 0),
+        bool(telegram),
+        telegram.get("members", 0),
+        telegram.get("daily_messages", 0),
+        bool(discord),
+        discord.get("activity_score", 0),
+        growth.get("twitter_growth_30d", 0),
+        growth.get("telegram_growth_30d", 0),
+
+        bool(tokenomics),
+        bool(distribution),
+        distribution.get("team", 0),
+        distribution.get("community", 0),
+        bool(vesting),
+        vesting.get("team_lockup_months", 0),
+        "gradual" in (vesting.get("release_schedule") or "").lower(),
+        len(tokenomics.get("utility", [])),
+        bool(supply.get("has_burning", False)),
+        bool(supply.get("has_staking", False)),
+
+        spec.track_score(project_data.get("category", "")),
+        len(project_data.get("competitors", [])),
+        project_data.get("narrative_fit", 0.5),
+
+        bool(project_data.get("team_anonymous", True)),
+        project_data.get("token_concentration", 0),
+        project_data.get("bot_suspicion", 0),
+        project_data.get("whitepaper_plagiarism", 0),
+        project_data.get("domain_age_days", 0),
+
+        bool(project_data.get("is_likely_scam", False)),
+        bool(project_data.get("has_top_tier_vc", False)),
+    )
+
+
+def build_matrix(projects: Sequence[Dict], spec: CompiledScoringSpec) -> np.ndarray:
+    """项目列表 → 特征矩阵 (n_projects, n_features)"""
+    if not projects:
+        return np.zeros((0, len(FEATURES)))
+    return np.array([extract_features(p, spec) for p in projects], dtype=np.float64)
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 终混（uint64 数组, 溢出按模 2^64 回绕）"""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def input_hashes(matrix: np.ndarray, spec: CompiledScoringSpec) -> Dict[str, np.ndarray]:
+    """按维度对特征列做64位哈希（含评分规范指纹, 规范变化后全部不同）
+
+    Returns:
+        {维度: uint64数组}, 维度同 DIMENSION_FEATURES
+    """
+    bits = np.ascontiguousarray(matrix, dtype=np.float64).view(np.uint64)
+    seed = np.uint64(int(spec.fingerprint, 16))
+    hashes = {}
+    for salt, (dimension, columns) in enumerate(_DIMENSION_COLUMNS.items()):
+        value = np.full(len(matrix), seed + np.uint64(salt), dtype=np.uint64)
+        for column in columns:
+            value = _mix64(value ^ bits[:, column])
+        hashes[dimension] = value
+    return hashes
+
+
+def format_hashes(hashes: Dict[str, np.ndarray], index: int) -> Dict[str, str]:
+    """取第 index 行的各维度哈希（十六进制字符串, 存入 projects.score_input_hashes）"""
+    return {dimension: format(int(values[index]), "016x") for dimension, values in hashes.items()}
+
+
+def score_matrix(matrix: np.ndarray, spec: CompiledScoringSpec) -> Dict:
+    """对特征矩阵批量评分
+
+    Args:
+        matrix: build_matrix 生成的特征矩阵
+        spec: 编译后的评分规范
+
+    Returns:
+        {维度_score: int数组, composite_score: int数组, grade_index: 分级下标数组, spec_version: 版本号}
+    """
+    col = {name: matrix[:, i] for name, i in FEATURE_INDEX.items()}
+    minimum = np.minimum
+    caps = spec.caps
+
+    # 团队背景: 无团队信息时取无数据分
+    team = caps["team"]["base"] + minimum(15, col["team_size"] * 3) + col["member_bonus"]
+    team = minimum(team, 40)
+    team = team + (col["has_ceo"] + col["has_cto"] + col["has_cmo"]) / 3 * 20
+    team = team + minimum(15, col["social_reach"] / 50000 * 15)
+    team = team + col["transparency"] * 10
+    team = np.where(col["has_team"] > 0, spec.clamp_array("team", np.trunc(team)), caps["team"]["no_data"])
+
+    # 技术创新
+    has_github = col["has_github"] > 0
+    tech = caps["tech"]["base"] + np.where(has_github, minimum(10, col["commits_30d"] / 10), 0)
+    tech = tech + np.where(has_github, minimum(10, col["contributors"] * 2), 0)
+    tech = tech + np.where(has_github, minimum(10, col["stars"] / 500), 0)
+    tech = tech + col["docs_quality"] * 20
+    tech = tech + col["innovation"] * 30
+    tech = tech + col["has_audit"] * (10 + col["top_auditor"] * 10)
+    tech = spec.clamp_array("tech", np.trunc(tech))
+
+    # 社区热度
+    # 与逐项目评分保持相同的累加顺序（浮点舍入一致, 取整后结果才完全相同）
+    has_twitter, has_telegram = col["has_twitter"] > 0, col["has_telegram"] > 0
+    community = caps["community"]["base"] + np.where(has_twitter, minimum(15, col["twitter_followers"] / 10000 * 15), 0)
+    community = community + np.where(has_twitter, minimum(15, col["engagement_rate"] * 100 * 15), 0)
+    community = community + np.where(has_telegram, minimum(15, col["telegram_members"] / 5000 * 15), 0)
+    community = community + np.where(has_telegram, minimum(10, col["daily_messages"] / 1000 * 10), 0)
+    community = community + np.where(col["has_discord"] > 0, col["discord_activity"] * 0.25, 0)
+    community = community + minimum(10, col["twitter_growth"] * 100)
+    community = community + minimum(10, col["telegram_growth"] * 100)
+    community = spec.clamp_array("community", np.trunc(community))
+
+    # 代币经济: 未公布时取无数据分
+    distribution = (
+        spec.bracket_array("team_allocation_points", col["team_allocation"])
+        + spec.bracket_array("community_allocation_points", col["community_allocation"])
+    )
+    vesting = spec.bracket_array("team_lockup_points", col["team_lockup_months"]) + col["gradual_release"] * 15
+    tokenomics = caps["tokenomics"]["base"] + col["has_distribution"] * distribution + col["has_vesting"] * vesting
+    tokenomics = tokenomics + minimum(20, col["utility_count"] * 5)
+    tokenomics = tokenomics + col["has_burning"] * 10 + col["has_staking"] * 10
+    tokenomics = np.where(
+        col["has_tokenomics"] > 0, spec.clamp_array("tokenomics", np.trunc(tokenomics)), caps["tokenomics"]["no_data"]
+    )
+
+    # 市场时机
+    market = caps["market"]["base"] + (col["track_score"] - 50) * spec.factors["track_weight"]
+    market = market + spec.bracket_array("competitor_points", col["competitor_count"])
+    market = market + col["narrative_fit"] * 30
+    market = spec.clamp_array("market", np.trunc(market))
+
+    # 风险（越高越安全）
+    penalties = spec.factors["risk_penalties"]
+    thresholds = spec.factors["risk_thresholds"]
+    risk = (
+        caps["risk"]["base"]
+        - col["team_anonymous"] * penalties["team_anonymous"]
+        - (1 - col["has_audit"]) * penalties["no_audit"]
+        - spec.bracket_array("token_concentration_penalty", col["token_concentration"])
+        - (col["bot_suspicion"] > thresholds["bot_suspicion"]) * penalties["bot_suspicion"]
+        - (col["whitepaper_plagiarism"] > thresholds["whitepaper_plagiarism"]) * penalties["whitepaper_plagiarism"]
+        - (col["domain_age_days"] < thresholds["young_domain_days"]) * penalties["young_domain"]
+    )
+    risk = spec.clamp_array("risk", np.trunc(risk))
+
+    # 加权综合分 + 致命风险降级 + 顶级VC加分
+    composite = spec.composite_array(
+        {"team": team, "tech": tech, "community": community,
+         "tokenomics": tokenomics, "market": market, "risk": risk},
+        fatal_risk=col["is_likely_scam"],
+        top_vc=col["has_top_tier_vc"],
+    )
+    composite = np.trunc(composite)
+
+    return {
+        "team_score": team.astype(np.int64),
+        "tech_score": tech.astype(np.int64),
+        "community_score": community.astype(np.int64),
+        "tokenomics_score": tokenomics.astype(np.int64),
+        "market_score": market.astype(np.int64),
+        "risk_score": risk.astype(np.int64),
+        "composite_score": composite.astype(np.int64),
+        "grade_index": spec.grade_index_array(composite),
+        "spec_version": spec.version,
+    }
+
+
+def result_rows(results: Dict, spec: CompiledScoringSpec) -> List[Dict]:
+    """批量结果 → 与 ProjectScore 字段一致的字典列表"""
+    columns = {
+        key: value.tolist() for key, value in results.items() if key not in ("grade_index", "spec_version")
+    }
+    columns["grade"] = spec.grade_labels[results["grade_index"]].tolist()
+    columns["recommendation"] = spec.recommendation_labels[results["grade_index"]].tolist()
+    keys = list(columns)
+    return [
+        dict(zip(keys, values), spec_version=results["spec_version"]) for values in zip(*columns.values())
+    ]
@@ -0,0 +1,414 @@
+"""评分规范 - 权重、因子表、上下限和分级阈值的声明式定义, 编译后供所有评分器共用
+
+规范来源（按优先级）:
+1. 数据库 scoring_specs 表中最新的启用版本（权重拟合等流程发布新版本）
+2. 随代码发布的版本文件 app/services/scoring_specs/v*.json（取最大版本号）
+
+每个版本只编译一次（按版本号+内容哈希缓存）, 评分结果都带上所用的规范版本号。
+"""
+
+import bisect
+import hashlib
+import json
+import operator
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+from app.core.config import settings
+
+SPEC_DIR = Path(__file__).parent / "scoring_specs"
+
+# 规范中的维度名（各评分器的旧命名通过别名映射）
+DIMENSIONS = ("team", "tech", "community", "tokenomics", "market", "risk")
+DIMENSION_ALIASES = {"tech": "technology", "market": "market_timing"}
+
+BRACKET_OPS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class ScoringSpecError(ValueError):
+    """评分规范格式错误或版本不存在"""
+
+
+def spec_version_number(version: str) -> int:
+    """'v12' → 12（非标准版本号返回0）"""
+    try:
+        return int(version.lstrip("v"))
+    except (AttributeError, ValueError):
+        return 0
+
+
+def load_spec_file(version: Optional[str] = None) -> Dict:
+    """读取版本文件（未指定版本时取最大版本号）"""
+    if version:
+        path = SPEC_DIR / f"{version}.json"
+    else:
+        files = sorted(SPEC_DIR.glob("v*.json"), key=lambda p: spec_version_number(p.stem))
+        if not files:
+            raise ScoringSpecError(f"No scoring spec files in {SPEC_DIR}")
+        path = files[-1]
+
+    if not path.exists():
+        raise ScoringSpecError(f"Scoring spec file not found: {path.name}")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def spec_fingerprint(spec: Dict) -> str:
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+
+
+class CompiledScoringSpec:
+    """编译后的评分规范（只读）
+
+    编译时把权重、阈值和因子表展开成元组/数组和闭包, 评分时不再解析字典。
+    标量接口供逐项目评分, *_array 接口供 scoring_kernel 批量评分, 两者计算顺序一致。
+    """
+
+    def __init__(self, spec: Dict, source: str = "file"):
+        self.spec = spec
+        self.source = source
+        self.version = spec.get("version")
+        if not self.version:
+            raise ScoringSpecError("Scoring spec has no version")
+        self.fingerprint = spec_fingerprint(spec)
+
+        # 权重（按 DIMENSIONS 顺序）
+        weights = spec.get("weights", {})
+        missing = [dim for dim in DIMENSIONS if dim not in weights]
+        if missing:
+            raise ScoringSpecError(f"Scoring spec {self.version} missing weights: {missing}")
+        self.weights = {dim: float(weights[dim]) for dim in DIMENSIONS}
+        self._weight_items = tuple((dim, DIMENSION_ALIASES.get(dim), self.weights[dim]) for dim in DIMENSIONS)
+
+        # 综合分调整和范围
+        adjustments = spec.get("adjustments", {})
+        self.fatal_risk_multiplier = float(adjustments.get("fatal_risk_multiplier", 1.0))
+        self.top_vc_bonus = float(adjustments.get("top_vc_bonus", 0))
+        self.score_min, self.score_max = spec.get("score_range", [0, 100])
+
+        # 分级（升序, bisect/searchsorted 的下标即分级）
+        grades = sorted(spec.get("grades", []), key=lambda g: g["min_score"])
+        if not grades:
+            raise ScoringSpecError(f"Scoring spec {self.version} has no grades")
+        self.grade_cutoffs = [g["min_score"] for g in grades]
+        self.grade_labels = np.array([g["grade"] for g in grades])
+        self.recommendation_labels = np.array([g.get("recommendation", "") for g in grades])
+        self._grade_cutoffs_array = np.array(self.grade_cutoffs, dtype=np.float64)
+
+        # 各维度基础分/无数据分/上下限
+        self.caps = {
+            dim: {"base": 0, "min": self.score_min, "max": self.score_max, **spec.get("caps", {}).get(dim, {})}
+            for dim in DIMENSIONS
+        }
+
+        # 因子表
+        self.factors = spec.get("factors", {})
+        self._brackets = {
+            name: self._compile_bracket(name, bracket)
+            for name, bracket in self.factors.get("brackets", {}).items()
+        }
+
+    # ==================== 编译 ====================
+
+    def _compile_bracket(self, name: str, bracket: Dict):
+        """阶梯因子表 → (标量函数, 数组函数); 按表顺序取第一个满足条件的档位"""
+        op = BRACKET_OPS.get(bracket.get("op"))
+        if op is None:
+            raise ScoringSpecError(f"Scoring spec {self.version}: bad op in bracket {name}")
+        table = tuple((float(threshold), points) for threshold, points in bracket.get("table", []))
+
+        def scalar(value) -> float:
+            for threshold, points in table:
+                if op(value, threshold):
+                    return points
+            return 0
+
+        def array(values: np.ndarray) -> np.ndarray:
+            if not table:
+                return np.zeros_like(values)
+            return np.select([op(values, threshold) for threshold, _ in table], [points for _, points in table], 0)
+
+        return scalar, array
+
+    # ==================== 因子 ====================
+
+    def bracket(self, name: str, value) -> float:
+        return self._brackets[name][0](value)
+
+    def bracket_array(self, name: str, values: np.ndarray) -> np.ndarray:
+        return self._brackets[name][1](values)
+
+    def clamp(self, dimension: str, value):
+        caps = self.caps[dimension]
+        return min(caps["max"], max(caps["min"], value))
+
+    def clamp_array(self, dimension: str, values: np.ndarray) -> np.ndarray:
+        caps = self.caps[dimension]
+        return np.clip(values, caps["min"], caps["max"])
+
+    def track_score(self, category: Optional[str]) -> float:
+        return self.factors.get("hot_tracks", {}).get(category or "", self.factors.get("default_track_score", 60))
+
+    # ==================== 综合分与分级 ====================
+
+    def composite(self, scores: Dict[str, float], fatal_risk: bool = False, top_vc: bool = False) -> float:
+        """加权综合分（含致命风险降级、顶级VC加分, 限制在分数范围内; 取整由调用方决定）
+
+        scores 可用规范维度名（tech/market）或旧命名（technology/market_timing）
+        """
+        total = 0.0
+        for dim, alias, weight in self._weight_items:
+            value = scores.get(dim)
+            if value is None and alias:
+                value = scores.get(alias)
+            total += (value or 0) * weight
+
+        if fatal_risk:
+            total *= self.fatal_risk_multiplier
+        if top_vc:
+            total += self.top_vc_bonus
+        return min(self.score_max, max(self.score_min, total))
+
+    def composite_array(
+        self,
+        scores: Dict[str, np.ndarray],
+        fatal_risk: Optional[np.ndarray] = None,
+        top_vc: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """composite 的数组版本"""
+        total = 0.0
+        for dim, _, weight in self._weight_items:
+            total = total + scores[dim] * weight
+
+        if fatal_risk is not None:
+            total = np.where(fatal_risk > 0, total * self.fatal_risk_multiplier, total)
+        if top_vc is not None:
+            total = np.where(top_vc > 0, total + self.top_vc_bonus, total)
+        return np.clip(total, self.score_min, self.score_max)
+
+    def grade_index(self, score: float) -> int:
+        return max(0, bisect.bisect_right(self.grade_cutoffs, score) - 1)
+
+    def grade_index_array(self, scores: np.ndarray) -> np.ndarray:
+        return np.maximum(0, np.searchsorted(self._grade_cutoffs_array, scores, side="right") - 1)
+
+    def grade(self, score: float) -> str:
+        return str(self.grade_labels[self.grade_index(score)])
+
+    def recommendation(self, score: float) -> str:
+        return str(self.recommendation_labels[self.grade_index(score)])
+
+    def grading_rule(self, field: str = "overall_score") -> str:
+        """分级规则的文字描述（写入LLM提示词, 与 grade() 一致）, 如 overall_score>=85为S级, ..., 其余为C级"""
+        labels = self.grade_labels.tolist()
+        rules = [
+            f">={cutoff:g}为{label}级"
+            for cutoff, label in reversed(list(zip(self.grade_cutoffs[1:], labels[1:])))
+        ]
+        rules.append(f"其余为{labels[0]}级")
+        return field + ", ".join(rules)
+
+    def __repr__(self):
+        return f"<CompiledScoringSpec {self.version} ({self.source})>"
+
+
+class ScoringSpecStore:
+    """评分规范存储
+
+    - 首次使用时加载（数据库不可用时使用版本文件）
+    - 按间隔检查数据库中启用的版本号, 变化后切换; 编译结果按版本号+内容哈希缓存
+    """
+
+    MAX_COMPILED = 16
+
+    def __init__(self):
+        self._current: Optional[CompiledScoringSpec] = None
+        self._compiled: Dict[Tuple[str, str], CompiledScoringSpec] = {}
+        self._checked_at = 0.0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    # ==================== 对外接口 ====================
+
+    def current(self) -> CompiledScoringSpec:
+        """当前启用的评分规范"""
+        spec = self._current
+        if spec is not None and not self._dirty and not self._check_due():
+            return spec
+
+        with self._lock:
+            if self._current is None or self._dirty:
+                self._reload()
+            elif self._check_due():
+                self._checked_at = time.monotonic()
+                reachable, active_version = self._read_active_version()
+                if reachable and (active_version or self._current.source == "db") \
+                        and active_version != self._current.version:
+                    logger.info(f"🔄 Scoring spec changed ({self._current.version} → {active_version or 'file'}), reloading")
+                    self._reload()
+            return self._current
+
+    def get(self, version: str) -> CompiledScoringSpec:
+        """按版本号取评分规范（数据库优先, 其次版本文件）, 用于回测和对比"""
+        current = self._current
+        if current is not None and current.version == version:
+            return current
+
+        spec, source = self._load_version_from_db(version), "db"
+        if spec is None:
+            spec, source = load_spec_file(version), "file"
+        return self.compile(spec, source)
+
+    def compile(self, spec: Dict, source: str = "file") -> CompiledScoringSpec:
+        """编译评分规范（同一版本同一内容只编译一次）"""
+        key = (spec.get("version"), spec_fingerprint(spec))
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = CompiledScoringSpec(spec, source)
+            if len(self._compiled) >= self.MAX_COMPILED:
+                self._compiled.pop(next(iter(self._compiled)))
+            self._compiled[key] = compiled
+            logger.info(f"🧩 Compiled scoring spec {compiled.version} ({source})")
+        return compiled
+
+    def invalidate(self):
+        self._dirty = True
+
+    def publish(self, spec: Dict, notes: Optional[str] = None, activate: bool = True) -> CompiledScoringSpec:
+        """发布新版本到数据库（先编译校验; 未指定版本号时自动取下一个版本号）"""
+        from app.db.session import SessionLocal
+        from app.models.ai_system import ScoringSpec
+
+        db = SessionLocal()
+        try:
+            spec = dict(spec)
+            spec["version"] = spec.get("version") or self.next_version(db)
+            compiled = self.compile(spec, "db")
+
+            if activate:
+                db.query(ScoringSpec).filter(ScoringSpec.is_active == True).update({"is_active": False})
+            db.add(ScoringSpec(version=compiled.version, spec=spec, is_active=activate, notes=notes))
+            db.commit()
+        finally:
+            db.close()
+
+        self.invalidate()
+        logger.info(f"📣 Scoring spec {compiled.version} published{' and activated' if activate else ''}")
+        return compiled
+
+    def next_version(self, db=None) -> str:
+        """已有版本号（数据库和版本文件）中最大的加一"""
+        versions = [spec_version_number(p.stem) for p in SPEC_DIR.glob("v*.json")]
+        if db is not None:
+            from app.models.ai_system import ScoringSpec
+            versions += [spec_version_number(v) for (v,) in db.query(ScoringSpec.version).all()]
+        return f"v{max(versions, default=0) + 1}"
+
+    # ==================== 加载 ====================
+
+    def _check_due(self) -> bool:
+        return time.monotonic() - self._checked_at >= settings.SCORING_SPEC_CHECK_INTERVAL_SECONDS
+
+    def _reload(self):
+        """读取数据库启用版本, 没有则使用版本文件（调用方持有锁）"""
+        self._dirty = False
+        self._checked_at = time.monotonic()
+
+        spec = self._load_active_from_db()
+        if spec is not None:
+            self._current = self.compile(spec, "db")
+        else:
+            self._current = self.compile(load_spec_file(), "file")
+        logger.info(f"📐 Scoring spec {self._current.version} active ({self._current.source})")
+
+    def _load_active_from_db(self) -> Optional[Dict]:
+        try:
+            from app.db.session import SessionLocal
+            from app.models.ai_system import ScoringSpec
+
+            db = SessionLocal()
+            try:
+                row = db.query(ScoringSpec).filter(
+                    ScoringSpec.is_active == True
+                ).order_by(ScoringSpec.id.desc()).first()
+                return dict(row.spec, version=row.version) if row else None
+            finally:
+                db.close()
+        except Exception as e:
+            logger.debug(f"Scoring spec DB load failed, using bundled file: {e}")
+            return None
+
+    def _load_version_from_db(self, version: str) -> Optional[Dict]:
+        try:
+            from app.db.session import SessionLocal
+            from app.models.ai_system import ScoringSpec
+
+            db = SessionLocal()
+            try:
+                row = db.query(ScoringSpec).filter(ScoringSpec.version == version).first()
+                return dict(row.spec, version=row.version) if row else None
+            finally:
+                db.close()
+        except Exception as e:
+            logger.debug(f"Scoring spec DB lookup failed: {e}")
+            return None
+
+    def _read_active_version(self) -> Tuple[bool, Optional[str]]:
+        """(数据库是否可用, 启用的版本号)"""
+        try:
+            from app.db.session import SessionLocal
+            from app.models.ai_system import ScoringSpec
+
+            db = SessionLocal()
+            try:
+                row = db.query(ScoringSpec.version).filter(
+                    ScoringSpec.is_active == True
+                ).order_by(ScoringSpec.id.desc()).first()
+                return True, row[0] if row else None
+            finally:
+                db.close()
+        except Exception as e:
+            logger.debug(f"Scoring spec version check failed: {e}")
+            return False, None
+
+    def list_versions(self) -> List[Dict]:
+        """所有可用版本（数据库 + 版本文件）"""
+        versions = [
+            {"version": p.stem, "source": "file", "is_active": False}
+            for p in sorted(SPEC_DIR.glob("v*.json"), key=lambda p: spec_version_number(p.stem))
+        ]
+        try:
+            from app.db.session import SessionLocal
+            from app.models.ai_system import ScoringSpec
+
+            db = SessionLocal()
+            try:
+                for row in db.query(ScoringSpec).order_by(ScoringSpec.id).all():
+                    versions.append({
+                        "version": row.version,
+                        "source": "db",
+                        "is_active": row.is_active,
+                        "notes": row.notes,
+                        "created_at": row.created_at.isoformat() if row.created_at else None,
+                    })
+            finally:
+                db.close()
+        except Exception as e:
+            logger.debug(f"Scoring spec listing failed: {e}")
+
+        current = self.current()
+        for item in versions:
+            item["is_current"] = item["version"] == current.version and item["source"] == current.source
+        return versions
+
+
+# 全局实例
+scoring_spec_store = ScoringSpecStore()
@@ -0,0 +1,193 @@
+"""评分权重拟合 - 用 ai_learning_feedback 的审核结果拟合六维度权重, 发布新的评分规范版本
+
+样本: 每条 project_review 反馈（approved = 1, rejected = 0）× 被审核项目的六个维度分
+模型: 带L2正则的逻辑回归（牛顿法/IRLS, 7×7 的海森矩阵, 几十万条样本几次迭代即收敛）
+权重: 各维度系数截断到 WEIGHT_FIT_MIN_WEIGHT 以上并归一化, 再与当前权重按 WEIGHT_FIT_BLEND 混合
+发布: 留出集上新权重综合分的AUC不低于当前权重时才发布（force=True 跳过该检查）
+"""
+
+import time
+from typing import Dict, Optional
+import numpy as np
+from loguru import logger
+from app.core.config import settings
+from app.services.backtest import average_ranks
+from app.services.scoring_spec import DIMENSIONS, scoring_spec_store
+
+# 评分规范维度 → projects 表列
+DIMENSION_COLUMNS = {
+    "team": "team_score",
+    "tech": "tech_score",
+    "community": "community_score",
+    "tokenomics": "tokenomics_score",
+    "market": "market_timing_score",
+    "risk": "risk_score",
+}
+# 反馈ID % HOLDOUT_MODULUS == 0 的样本作为留出集
+HOLDOUT_MODULUS = 5
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-8
+# 任一权重变化不到该值时不发布新版本
+MIN_WEIGHT_CHANGE = 0.005
+
+
+def fit_logistic(x: np.ndarray, y: np.ndarray, l2: float = 1.0) -> np.ndarray:
+    """带L2正则的逻辑回归（截距不正则）
+
+    Returns:
+        系数 [截距, 各特征系数]
+    """
+    design = np.hstack([np.ones((len(x), 1)), x])
+    beta = np.zeros(design.shape[1])
+    penalty = np.full(design.shape[1], l2)
+    penalty[0] = 0.0
+
+    for _ in range(MAX_ITERATIONS):
+        p = 1.0 / (1.0 + np.exp(-np.clip(design @ beta, -30, 30)))
+        gradient = design.T @ (y - p) - penalty * beta
+        hessian = (design * (p * (1 - p))[:, None]).T @ design + np.diag(penalty)
+        step = np.linalg.solve(hessian + 1e-9 * np.eye(len(beta)), gradient)
+        beta += step
+        if np.max(np.abs(step)) < TOLERANCE:
+            break
+    return beta
+
+
+def auc(scores: np.ndarray, labels: np.ndarray) -> Optional[float]:
+    """ROC AUC（Mann-Whitney, 并列取平均秩）"""
+    positives = int(labels.sum())
+    negatives = len(labels) - positives
+    if not positives or not negatives:
+        return None
+    ranks = average_ranks(scores)
+    return float((ranks[labels > 0].sum() - positives * (positives - 1) / 2) / (positives * negatives))
+
+
+def fitted_weights(coefficients: np.ndarray, current: Dict[str, float], blend: float, min_weight: float) -> Dict[str, float]:
+    """维度系数 → 规范权重（非负、和为1, 保留4位小数）"""
+    raw = np.maximum(coefficients, 0)
+    raw = raw / raw.sum() if raw.sum() > 0 else np.full(len(raw), 1 / len(raw))
+    raw = np.maximum(raw, min_weight)
+    raw = raw / raw.sum()
+
+    mixed = blend * raw + (1 - blend) * np.array([current[dim] for dim in DIMENSIONS])
+    mixed = np.round(mixed / mixed.sum(), 4)
+    mixed[np.argmax(mixed)] += round(1.0 - mixed.sum(), 4)  # 舍入误差补到最大的权重上
+    return {dim: round(float(value), 4) for dim, value in zip(DIMENSIONS, mixed)}
+
+
+class WeightTrainer:
+    """从审核反馈离线拟合评分权重"""
+
+    def load_reviews(self, db):
+        """读取 approved/rejected 审核反馈及被审核项目的维度分
+
+        Returns:
+            (反馈ID数组, 维度分矩阵 (样本数 × 6, 0-1, 缺失为NaN), 标签数组)
+        """
+        from app.models import AILearningFeedback, Project
+
+        rows = db.query(
+            AILearningFeedback.id,
+            AILearningFeedback.user_decision,
+            *(getattr(Project, column) for column in DIMENSION_COLUMNS.values())
+        ).join(Project, Project.id == AILearningFeedback.related_project_id).filter(
+            AILearningFeedback.feedback_type == "project_review",
+            AILearningFeedback.user_decision.in_(("approved", "rejected")),
+        ).all()
+
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        labels = np.array([row[1] == "approved" for row in rows], dtype=np.float64)
+        scores = np.array(
+            [[np.nan if value is None else float(value) for value in row[2:]] for row in rows], dtype=np.float64
+        ).reshape(len(rows), len(DIMENSION_COLUMNS)) / 100
+        return ids, scores, labels
+
+    def fit(self, ids: np.ndarray, scores: np.ndarray, labels: np.ndarray) -> Dict:
+        """拟合权重并在留出集上与当前权重对比
+
+        Returns:
+            {"weights": 新权重, "current_weights", "coefficients", "samples", "approval_rate",
+             "auc": {"current": 当前权重留出集AUC, "fitted": 新权重留出集AUC}, "improved": 是否不低于当前}
+        """
+        spec = scoring_spec_store.current()
+
+        # 缺失的维度分用该维度均值填充（全缺失的维度取0.5）
+        means = np.array([
+            np.nanmean(column) if (~np.isnan(column)).any() else 0.5 for column in scores.T
+        ])
+        scores = np.where(np.isnan(scores), means, scores)
+
+        holdout = ids % HOLDOUT_MODULUS == 0
+        train = ~holdout if holdout.any() and (~holdout).any() else np.ones(len(ids), dtype=bool)
+        coefficients = fit_logistic(scores[train], labels[train], settings.WEIGHT_FIT_L2)
+        weights = fitted_weights(
+            coefficients[1:], spec.weights, settings.WEIGHT_FIT_BLEND, settings.WEIGHT_FIT_MIN_WEIGHT
+        )
+
+        evaluate = holdout if holdout.any() else train
+        current_auc = auc(scores[evaluate] @ np.array([spec.weights[dim] for dim in DIMENSIONS]), labels[evaluate])
+        fitted_auc = auc(scores[evaluate] @ np.array([weights[dim] for dim in DIMENSIONS]), labels[evaluate])
+        return {
+            "weights": weights,
+            "current_weights": dict(spec.weights),
+            "current_version": spec.version,
+            "coefficients": {
+                "intercept": round(float(coefficients[0]), 4),
+                **{dim: round(float(value), 4) for dim, value in zip(DIMENSIONS, coefficients[1:])},
+            },
+            "samples": int(len(ids)),
+            "holdout_samples": int(evaluate.sum()),
+            "approval_rate": round(float(labels.mean()), 4) if len(labels) else None,
+            "auc": {
+                "current": None if current_auc is None else round(current_auc, 4),
+                "fitted": None if fitted_auc is None else round(fitted_auc, 4),
+            },
+            "improved": current_auc is None or (fitted_auc is not None and fitted_auc >= current_auc),
+        }
+
+    def train(self, db, dry_run: bool = False, force: bool = False) -> Dict:
+        """读取反馈、拟合并发布新的评分规范版本
+
+        发布后把参与拟合的反馈标记为 adjustment_applied。
+        """
+        from app.models import AILearningFeedback
+
+        started = time.perf_counter()
+        ids, scores, labels = self.load_reviews(db)
+        loaded = time.perf_counter()
+
+        if len(ids) < settings.WEIGHT_FIT_MIN_REVIEWS or labels.min(initial=1) == labels.max(initial=0):
+            logger.info(f"ℹ️ Not enough reviews to fit scoring weights ({len(ids)} samples)")
+            return {"success": True, "published": None, "samples": int(len(ids))}
+
+        result = self.fit(ids, scores, labels)
+        fitted = time.perf_counter()
+        changed = max(abs(result["weights"][dim] - result["current_weights"][dim]) for dim in DIMENSIONS) >= MIN_WEIGHT_CHANGE
+
+        published = None
+        if not dry_run and changed and (result["improved"] or force):
+            spec = {key: value for key, value in scoring_spec_store.current().spec.items() if key != "version"}
+            spec["weights"] = result["weights"]
+            compiled = scoring_spec_store.publish(spec, notes=(
+                f"Fitted from {result['samples']} reviews on {result['current_version']}, "
+                f"holdout AUC {result['auc']['current']} → {result['auc']['fitted']}"
+            ))
+            published = compiled.version
+            db.query(AILearningFeedback).filter(
+                AILearningFeedback.feedback_type == "project_review",
+                AILearningFeedback.user_decision.in_(("approved", "rejected")),
+                AILearningFeedback.id <= int(ids.max()),
+            ).update({"adjustment_applied": True}, synchronize_session=False)
+            db.commit()
+
+        logger.info(
+            f"🎯 Weight fit on {result['samples']} reviews: AUC {result['auc']['current']} → {result['auc']['fitted']}, "
+            f"{'published ' + published if published else 'not published'} "
+            f"(load {loaded - started:.2f}s, fit {fitted - loaded:.2f}s)"
+        )
+        return {"success": True, "published": published, "changed": changed, "dry_run": dry_run, **result}
+
+
+# 全局实例
+weight_trainer = WeightTrainer()
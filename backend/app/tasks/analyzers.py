@@ -1,26 +1,226 @@
 """AI分析任务"""
 
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
 from loguru import logger
+from sqlalchemy import and_, or_, text
+from app.core.config import settings
 from app.tasks.celery_app import celery_app
 from app.db import SessionLocal
-from app.models import Project, AIAnalysis
+from app.models import Project, AIAnalysis, AnalysisEscalation, SocialMetrics
 from app.services.analyzers import ai_analyzer
-from sqlalchemy import and_
+from app.services.analyzers.prefilter import analysis_prefilter
+from app.services.analyzers.risk_detector import flatten_text, risk_detector
+from app.services import scoring_kernel
+from app.services.score_history import score_history
+from app.services.scoring_engine import scoring_engine
+from app.services.scoring_spec import scoring_spec_store
+
+RESCORE_UPDATE_CHUNK = 1000
+# LLM评分（analyzed）和分级预筛规则评分（screened）的项目: 批量重算只看 extra_metadata 和社交指标,
+# 默认不覆盖这些结果
+LLM_SCORED_STATUSES = ("analyzed", "screened")
+
+# ScoringEngine 字段 → projects 表列
+SCORE_COLUMNS = {
+    "composite_score": "overall_score",
+    "team_score": "team_score",
+    "tech_score": "tech_score",
+    "community_score": "community_score",
+    "tokenomics_score": "tokenomics_score",
+    "market_score": "market_timing_score",
+    "risk_score": "risk_score",
+}
+
+
+def build_project_text(project: Project) -> str:
+    """构建项目描述文本（用于LLM评分）"""
+    return f"""
+项目名称: {project.project_name}
+符号: {project.symbol or 'N/A'}
+描述: {project.description or 'N/A'}
+来源: {project.discovered_from}
+Twitter: {project.twitter_handle or 'N/A'}
+"""
+
+
+def build_detailed_analysis_input(db, project: Project) -> dict:
+    """构建详细AI分析的输入（项目信息 + 最新真实指标）"""
+    # 获取项目的真实指标数据
+    metrics_query = text("""
+        SELECT
+            COALESCE(sm.twitter_followers, 0) as twitter_followers,
+            COALESCE(sm.telegram_members, 0) as telegram_members,
+            COALESCE(sm.github_stars, 0) as github_stars
+        FROM projects p
+        LEFT JOIN social_metrics sm ON sm.project_id = p.id
+        WHERE p.id = :project_id
+        ORDER BY sm.snapshot_time DESC
+        LIMIT 1
+    """)
+
+    metrics_result = db.execute(metrics_query, {"project_id": project.id}).fetchone()
+
+    return {
+        "name": project.project_name,
+        "description": project.description or "暂无描述",
+        "category": project.category or "Unknown",
+        "blockchain": project.blockchain or "Unknown",
+        "metrics": {
+            "twitter_followers": metrics_result[0] if metrics_result else 0,
+            "telegram_members": metrics_result[1] if metrics_result else 0,
+            "github_stars": metrics_result[2] if metrics_result else 0,
+        },
+        "scores": {
+            "overall": project.overall_score,
+            "team": project.team_score,
+            "tech": project.tech_score,
+            "community": project.community_score,
+        }
+    }
+
+
+def save_detailed_analysis(db, project: Project, detailed_analysis: dict):
+    """保存详细AI分析到ai_analysis表"""
+    suggestion = detailed_analysis.get('investment_suggestion', {})
+    values = {
+        "whitepaper_summary": detailed_analysis.get('summary', ''),
+        "key_features": detailed_analysis.get('key_features', []),
+        "similar_projects": [],  # 暂时为空
+        "sentiment_score": 0.75,
+        "sentiment_label": 'positive',
+        "risk_flags": [],
+        "scam_probability": 5.0,
+        "investment_suggestion": suggestion.get('action', ''),
+        "position_size": suggestion.get('position_size', ''),
+        "entry_timing": suggestion.get('entry_timing', ''),
+        "stop_loss_percentage": suggestion.get('stop_loss', 0),
+        "analyzed_at": datetime.utcnow(),
+    }
+
+    existing_analysis = db.query(AIAnalysis).filter(
+        AIAnalysis.project_id == project.id
+    ).first()
+
+    if existing_analysis:
+        # 更新现有记录
+        for key, value in values.items():
+            setattr(existing_analysis, key, value)
+    else:
+        # 创建新记录
+        db.add(AIAnalysis(project_id=project.id, **values))
+
+def count_project_platforms(db, projects: List[Project]) -> Dict[int, int]:
+    """跨平台信号: 项目已知的社交渠道数与发现记录中的覆盖平台数取较大值"""
+    from app.services.discovery_store import discovery_store
+
+    keys = {project.id: (project.project_name, project.canonical_project_id or project.id) for project in projects}
+    discoveries = discovery_store.find(db, list(keys.values()))
+
+    platforms = {}
+    for project in projects:
+        channels = sum(1 for channel in (
+            project.twitter_handle, project.telegram_channel, project.discord_link, project.github_repo
+        ) if channel)
+        discovery = discoveries.get(keys[project.id]) or {}
+        platforms[project.id] = max(channels, discovery.get("num_platforms") or 0)
+    return platforms
+
+
+def build_rule_input(project: Project) -> dict:
+    """构建规则评分的输入（与 /analyze/quick-score 的字段保持一致）
+
+    extra_metadata 里的 funding / team_info 可能是dict或list, 统一展平成文本
+    """
+    metadata = project.extra_metadata or {}
+    return {
+        "text": build_project_text(project),
+        "source": project.discovered_from or "unknown",
+        "funding": flatten_text(metadata.get("funding")),
+        "team_info": flatten_text(metadata.get("team_info")),
+    }
+
+
+def prefilter_projects(db, projects: List[Project]):
+    """规则预筛选: 未达阈值的项目直接保存规则评分, 只返回需要LLM分析的项目
+
+    Returns:
+        (需要LLM分析的项目列表, {project_id: AnalysisEscalation})
+    """
+    platforms = count_project_platforms(db, projects)
+    escalated, records = [], {}
+    failed = 0
+
+    for project in projects:
+        try:
+            result = analysis_prefilter.evaluate(build_rule_input(project), platforms[project.id])
+        except Exception as e:
+            # 单个项目的元数据异常不影响整批, 状态保持不变, 下次批量时重试
+            failed += 1
+            logger.warning(f"⚠️ Prefilter failed for {project.project_name}: {e}")
+            continue
+
+        record = AnalysisEscalation(
+            project_id=project.id,
+            rule_score=result["overall_score"],
+            rule_grade=result["grade"],
+            num_platforms=result["num_platforms"],
+            threshold=settings.AI_ESCALATION_MIN_SCORE,
+            escalated=result["escalate"],
+            reason=result["reason"],
+        )
+        db.add(record)
+        records[project.id] = record
+
+        if result["escalate"]:
+            escalated.append(project)
+            continue
+
+        # 规则层结束: 保存规则评分, 状态标记为screened避免重复处理
+        scores = result["scores"]
+        project.overall_score = result["overall_score"]
+        project.team_score = scores["team"]
+        project.tech_score = scores["technology"]
+        project.community_score = scores["community"]
+        project.tokenomics_score = scores["tokenomics"]
+        project.market_timing_score = scores["market_timing"]
+        project.risk_score = scores["risk"]
+        project.grade = result["grade"]
+        project.scoring_spec_version = result["spec_version"]
+        project.status = 'screened'
+
+    logger.info(
+        f"🧮 Prefilter: {len(escalated)}/{len(projects)} projects escalated to LLM"
+        + (f", {failed} failed" if failed else "")
+    )
+    return escalated, records
 
 
 @celery_app.task(name="app.tasks.analyzers.analyze_new_projects")
 def analyze_new_projects():
-    """分析新发现的项目"""
+    """分析新发现的项目（规则预筛选后, 同一批次内的LLM调用并发执行,受提供商限流约束）"""
     logger.info("🤖 Starting AI analysis for new projects...")
     
     try:
         db = SessionLocal()
         
+        # 先归并新项目中的重复项目, 同一项目只分析规范项目
+        from app.services.entity_resolution import entity_resolver
+        try:
+            if entity_resolver.resolve(db)["remapped"]:
+                rebuild_gazetteer.delay(refresh_coins=False)  # 别名的提及改记到规范项目
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"⚠️ Entity resolution skipped: {e}")
+        
         # 查找未分析的项目（每次处理50个）
         projects = db.query(Project).filter(
             and_(
                 Project.status == 'discovered',
-                Project.overall_score == None
+                Project.overall_score == None,
+                or_(Project.canonical_project_id == None, Project.canonical_project_id == Project.id)
             )
         ).limit(50).all()
         
@@ -29,25 +229,23 @@ def analyze_new_projects():
             return {"success": True, "analyzed": 0}
         
         logger.info(f"📊 Found {len(projects)} projects to analyze")
-        
-        analyzed_count = 0
-        for project in projects:
-            try:
-                # 构建项目描述文本
-                project_text = f"""
-项目名称: {project.project_name}
-符号: {project.symbol or 'N/A'}
-描述: {project.description or 'N/A'}
-来源: {project.discovered_from}
-Twitter: {project.twitter_handle or 'N/A'}
-"""
+        total = len(projects)
+        original_projects = list(projects)
 
-                # 1. 调用AI评分分析
-                score_result = ai_analyzer.analyze_project_text(
-                    text=project_text,
-                    source=project.discovered_from or 'unknown'
-                )
+        # 0. 分级分析: 先做规则评分, 只有达到阈值或跨平台信号强的项目调用LLM
+        escalation_records = {}
+        if settings.AI_TIERED_ANALYSIS:
+            projects, escalation_records = prefilter_projects(db, projects)
+        
+        # 1. 并发调用AI评分分析
+        score_results = ai_analyzer.analyze_project_texts([
+            (build_project_text(project), project.discovered_from or 'unknown')
+            for project in projects
+        ])
 
+        scored_projects = []
+        for project, score_result in zip(projects, score_results):
+            try:
                 if not score_result or not score_result.get('overall_score'):
                     logger.warning(f"⚠️ Failed to analyze {project.project_name}: No score returned")
                     continue
@@ -64,102 +262,56 @@ Twitter: {project.twitter_handle or 'N/A'}
                 project.category = score_result.get('category', project.category)
                 project.status = 'analyzed'
 
-                # 2. 生成详细AI分析（基于真实数据）
-                from datetime import datetime
-                from sqlalchemy import text
-
-                # 获取项目的真实指标数据
-                metrics_query = text("""
-                    SELECT
-                        COALESCE(sm.twitter_followers, 0) as twitter_followers,
-                        COALESCE(sm.telegram_members, 0) as telegram_members,
-                        COALESCE(sm.github_stars, 0) as github_stars
-                    FROM projects p
-                    LEFT JOIN social_metrics sm ON sm.project_id = p.id
-                    WHERE p.id = :project_id
-                    ORDER BY sm.snapshot_time DESC
-                    LIMIT 1
-                """)
-
-                metrics_result = db.execute(metrics_query, {"project_id": project.id}).fetchone()
-
-                project_data_for_ai = {
-                    "name": project.project_name,
-                    "description": project.description or "暂无描述",
-                    "category": project.category or "Unknown",
-                    "blockchain": project.blockchain or "Unknown",
-                    "metrics": {
-                        "twitter_followers": metrics_result[0] if metrics_result else 0,
-                        "telegram_members": metrics_result[1] if metrics_result else 0,
-                        "github_stars": metrics_result[2] if metrics_result else 0,
-                    },
-                    "scores": {
-                        "overall": project.overall_score,
-                        "team": project.team_score,
-                        "tech": project.tech_score,
-                        "community": project.community_score,
-                    }
-                }
-
-                detailed_analysis = ai_analyzer.generate_detailed_analysis(project_data_for_ai)
+                # 记录升级结果, 用于评估阈值
+                record = escalation_records.get(project.id)
+                if record:
+                    record.llm_score = float(project.overall_score)
+                    record.llm_grade = project.grade
+
+                scored_projects.append((project, build_detailed_analysis_input(db, project)))
 
+            except Exception as e:
+                logger.error(f"❌ Error analyzing project {project.id}: {e}")
+                import traceback
+                logger.error(traceback.format_exc())
+                continue
+
+        # 2. 并发生成详细AI分析（基于真实数据）
+        detailed_results = ai_analyzer.generate_detailed_analyses([
+            project_data_for_ai for _, project_data_for_ai in scored_projects
+        ])
+
+        analyzed_count = 0
+        for (project, _), detailed_analysis in zip(scored_projects, detailed_results):
+            try:
                 # 3. 保存详细AI分析到ai_analysis表
-                existing_analysis = db.query(AIAnalysis).filter(
-                    AIAnalysis.project_id == project.id
-                ).first()
-
-                if existing_analysis:
-                    # 更新现有记录
-                    existing_analysis.whitepaper_summary = detailed_analysis.get('summary', '')
-                    existing_analysis.key_features = detailed_analysis.get('key_features', [])
-                    existing_analysis.similar_projects = []  # 暂时为空
-                    existing_analysis.sentiment_score = 0.75
-                    existing_analysis.sentiment_label = 'positive'
-                    existing_analysis.risk_flags = []
-                    existing_analysis.scam_probability = 5.0
-                    existing_analysis.investment_suggestion = detailed_analysis.get('investment_suggestion', {}).get('action', '')
-                    existing_analysis.position_size = detailed_analysis.get('investment_suggestion', {}).get('position_size', '')
-                    existing_analysis.entry_timing = detailed_analysis.get('investment_suggestion', {}).get('entry_timing', '')
-                    existing_analysis.stop_loss_percentage = detailed_analysis.get('investment_suggestion', {}).get('stop_loss', 0)
-                    existing_analysis.analyzed_at = datetime.utcnow()
-                else:
-                    # 创建新记录
-                    ai_analysis = AIAnalysis(
-                        project_id=project.id,
-                        whitepaper_summary=detailed_analysis.get('summary', ''),
-                        key_features=detailed_analysis.get('key_features', []),
-                        similar_projects=[],
-                        sentiment_score=0.75,
-                        sentiment_label='positive',
-                        risk_flags=[],
-                        scam_probability=5.0,
-                        investment_suggestion=detailed_analysis.get('investment_suggestion', {}).get('action', ''),
-                        position_size=detailed_analysis.get('investment_suggestion', {}).get('position_size', ''),
-                        entry_timing=detailed_analysis.get('investment_suggestion', {}).get('entry_timing', ''),
-                        stop_loss_percentage=detailed_analysis.get('investment_suggestion', {}).get('stop_loss', 0),
-                        analyzed_at=datetime.utcnow()
-                    )
-                    db.add(ai_analysis)
+                save_detailed_analysis(db, project, detailed_analysis)
 
                 analyzed_count += 1
                 logger.info(f"✅ Analyzed {project.project_name}: Grade {project.grade}, Score {project.overall_score:.1f}")
                 logger.info(f"   📝 Summary: {detailed_analysis.get('summary', '')[:80]}...")
 
             except Exception as e:
-                logger.error(f"❌ Error analyzing project {project.id}: {e}")
+                logger.error(f"❌ Error saving analysis for project {project.id}: {e}")
                 import traceback
                 logger.error(traceback.format_exc())
                 continue
         
+        # 记录评分历史（规则评分和LLM评分, 与上一条相同的不重复记录）
+        score_history.record_projects(db, [
+            project for project in original_projects if project.overall_score is not None
+        ])
         db.commit()
         db.close()
         
-        logger.info(f"🎉 AI analysis completed: {analyzed_count}/{len(projects)} projects analyzed")
+        logger.info(f"🎉 AI analysis completed: {analyzed_count}/{len(projects)} projects analyzed by LLM, {total - len(projects)} screened by rules")
         
         return {
             "success": True,
             "analyzed": analyzed_count,
-            "total": len(projects)
+            "escalated": len(projects),
+            "screened": total - len(projects),
+            "total": total
         }
         
     except Exception as e:
@@ -186,23 +338,15 @@ def update_all_scores():
             logger.info("ℹ️ No projects to update")
             return {"success": True, "updated": 0}
         
+        # 并发重新分析
+        results = ai_analyzer.analyze_project_texts([
+            (build_project_text(project), project.discovered_from or 'unknown')
+            for project in projects
+        ])
+
         updated_count = 0
-        for project in projects:
+        for project, result in zip(projects, results):
             try:
-                # 构建项目描述文本
-                project_text = f"""
-项目名称: {project.project_name}
-符号: {project.symbol or 'N/A'}
-描述: {project.description or 'N/A'}
-来源: {project.discovered_from}
-"""
-                
-                # 重新分析
-                result = ai_analyzer.analyze_project_text(
-                    text=project_text,
-                    source=project.discovered_from or 'unknown'
-                )
-                
                 if result and result.get('overall_score'):
                     project.overall_score = result.get('overall_score')
                     project.grade = result.get('grade')
@@ -212,6 +356,7 @@ def update_all_scores():
                 logger.error(f"❌ Error updating project {project.id}: {e}")
                 continue
         
+        score_history.record_projects(db, projects)
         db.commit()
         db.close()
         
@@ -226,3 +371,317 @@ def update_all_scores():
         logger.error(f"❌ Score update failed: {e}")
         return {"success": False, "error": str(e)}
 
+
+
+def build_scoring_input(category: Optional[str], metadata: Optional[dict], social) -> dict:
+    """构建 ScoringEngine 的输入: extra_metadata 中的评分字段 + 最新社交指标"""
+    project_data = dict(metadata or {})
+    project_data["category"] = category or ""
+
+    if social is None:
+        return project_data
+
+    if social.twitter_followers is not None:
+        project_data["twitter"] = {
+            "followers": social.twitter_followers,
+            "engagement_rate": float(social.twitter_engagement_rate or 0) / 100,  # 表中存百分比
+        }
+    if social.telegram_members is not None:
+        project_data["telegram"] = {
+            "members": social.telegram_members,
+            "daily_messages": (social.telegram_message_frequency or 0) * 24,  # 表中存每小时消息数
+        }
+    if social.discord_members:
+        project_data["discord"] = {
+            "activity_score": (social.discord_online_members or 0) / social.discord_members * 100,
+        }
+    if social.github_stars is not None or social.github_contributors is not None:
+        project_data["github"] = {
+            "commits_30d": (social.github_commits_last_week or 0) * 4,
+            "contributors": social.github_contributors or 0,
+            "stars": social.github_stars or 0,
+        }
+    return project_data
+
+
+@celery_app.task(name="app.tasks.analyzers.rescore_projects")
+def rescore_projects(
+    statuses: Optional[List[str]] = None,
+    dry_run: bool = False,
+    force: bool = False,
+    include_llm_scored: bool = False
+):
+    """用 ScoringEngine 批量重算项目评分（调整权重后全表重算）
+
+    按列读取评分输入, 与上次保存的各维度输入哈希比较, 只对输入（或评分规范）有变化的项目
+    向量化重算并批量写回, 开销随变化量而不是项目总数增长。
+    默认重算除 LLM_SCORED_STATUSES（'analyzed' / 'screened'）之外的全部项目, 这些项目的评分
+    只有 include_llm_scored=True 时才会被覆盖; 传入 statuses 可只重算指定状态;
+    force=True 忽略输入哈希, 全部重算。
+    """
+    logger.info("🔄 Starting batch rescoring...")
+    db = SessionLocal()
+
+    try:
+        started = time.perf_counter()
+        query = db.query(
+            Project.id,
+            Project.category,
+            Project.extra_metadata,
+            Project.score_input_hashes,
+            SocialMetrics,
+        ).outerjoin(SocialMetrics, SocialMetrics.id == Project.social_metrics_id)
+        if statuses:
+            query = query.filter(Project.status.in_(statuses))
+        if not include_llm_scored:
+            query = query.filter(or_(Project.status.notin_(LLM_SCORED_STATUSES), Project.status.is_(None)))
+
+        rows = query.all()
+        if not rows:
+            logger.info("ℹ️ No projects to rescore")
+            return {"success": True, "scored": 0, "updated": 0}
+
+        loaded = time.perf_counter()
+        spec = scoring_spec_store.current()
+
+        # 1. 展开特征矩阵, 按维度比较输入哈希（哈希包含评分规范指纹, 规范变化后全部重算）
+        matrix = scoring_kernel.build_matrix([
+            build_scoring_input(row.category, row.extra_metadata, row.SocialMetrics) for row in rows
+        ], spec)
+        hashes = scoring_kernel.input_hashes(matrix, spec)
+        changed = np.zeros(len(rows), dtype=bool)
+        hit_rates = {}
+        for dimension, values in hashes.items():
+            previous = np.array([
+                int((row.score_input_hashes or {}).get(dimension) or "0", 16) for row in rows
+            ], dtype=np.uint64)
+            unchanged = values == previous
+            changed |= ~unchanged
+            hits = int(unchanged.sum())
+            scoring_engine.score_cache.record(dimension, True, hits)
+            scoring_engine.score_cache.record(dimension, False, len(rows) - hits)
+            hit_rates[dimension] = round(hits / len(rows), 4)
+        scoring_engine.score_cache.flush()  # 管理接口读取各进程的合计
+        pending = np.arange(len(rows)) if force else np.flatnonzero(changed)
+        hashed = time.perf_counter()
+
+        # 2. 只对有变化的项目向量化评分并写回（评分、分级、评分规范版本和新的输入哈希）
+        mappings = []
+        if len(pending):
+            results = scoring_engine.score_matrix(matrix[pending], spec)
+            new_values = {field: results[field].tolist() for field in SCORE_COLUMNS}
+            grades = spec.grade_labels[results["grade_index"]].tolist()
+            for i, index in enumerate(pending.tolist()):
+                mappings.append({
+                    "id": rows[index].id,
+                    "grade": grades[i],
+                    "scoring_spec_version": spec.version,
+                    "score_input_hashes": scoring_kernel.format_hashes(hashes, index),
+                    **{column: new_values[field][i] for field, column in SCORE_COLUMNS.items()},
+                })
+        scored = time.perf_counter()
+
+        if not dry_run:
+            for offset in range(0, len(mappings), RESCORE_UPDATE_CHUNK):
+                db.bulk_update_mappings(Project, mappings[offset:offset + RESCORE_UPDATE_CHUNK])
+            score_history.append_many(db, mappings)
+            db.commit()
+
+        logger.info(
+            f"✅ Rescored {len(mappings)}/{len(rows)} projects with spec {spec.version}"
+            f"{' (dry run)' if dry_run else ''} "
+            f"(load {loaded - started:.2f}s, hash {hashed - loaded:.2f}s, score {scored - hashed:.2f}s, "
+            f"write {time.perf_counter() - scored:.2f}s), dimension hit rates {hit_rates}"
+        )
+        return {
+            "success": True,
+            "checked": len(rows),
+            "scored": len(pending),
+            "updated": len(mappings),
+            "dimension_hit_rates": hit_rates,
+            "spec_version": spec.version,
+            "dry_run": dry_run,
+        }
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Batch rescoring failed: {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.analyzers.recheck_project_risks")
+def recheck_project_risks(statuses: Optional[List[str]] = None, dry_run: bool = False):
+    """整库风险复查（风险关键词或规则调整后）
+
+    按列读取规则评分输入, 用进程池批量检测, 风险摘要写入 extra_metadata["risk_check"],
+    只批量更新摘要有变化的行。
+    """
+    logger.info("🔄 Starting catalog risk re-check...")
+    db = SessionLocal()
+
+    try:
+        started = time.perf_counter()
+        query = db.query(
+            Project.id,
+            Project.project_name,
+            Project.symbol,
+            Project.description,
+            Project.discovered_from,
+            Project.twitter_handle,
+            Project.extra_metadata,
+        )
+        if statuses:
+            query = query.filter(Project.status.in_(statuses))
+        if not include_llm_scored:
+            query = query.filter(or_(Project.status.notin_(LLM_SCORED_STATUSES), Project.status.is_(None)))
+
+        rows = query.all()
+        if not rows:
+            logger.info("ℹ️ No projects to re-check")
+            return {"success": True, "checked": 0, "updated": 0}
+
+        loaded = time.perf_counter()
+        all_risks = risk_detector.detect_risks_many([build_rule_input(row) for row in rows])
+        checked = time.perf_counter()
+
+        checked_at = datetime.utcnow().isoformat()
+        mappings, fatal = [], 0
+        for row, risks in zip(rows, all_risks):
+            summary = risk_detector.summarize(risks)
+            fatal += summary["has_fatal_risk"]
+            metadata = row.extra_metadata or {}
+            previous = {k: v for k, v in (metadata.get("risk_check") or {}).items() if k != "checked_at"}
+            if previous != summary:
+                mappings.append({
+                    "id": row.id,
+                    "extra_metadata": {**metadata, "risk_check": {**summary, "checked_at": checked_at}},
+                })
+
+        if not dry_run:
+            for offset in range(0, len(mappings), RESCORE_UPDATE_CHUNK):
+                db.bulk_update_mappings(Project, mappings[offset:offset + RESCORE_UPDATE_CHUNK])
+            db.commit()
+
+        logger.info(
+            f"✅ Re-checked {len(rows)} projects, {fatal} with fatal risks, {len(mappings)} changed"
+            f"{' (dry run)' if dry_run else ''} "
+            f"(load {loaded - started:.2f}s, detect {checked - loaded:.2f}s, write {time.perf_counter() - checked:.2f}s)"
+        )
+        return {
+            "success": True,
+            "checked": len(rows),
+            "fatal": fatal,
+            "updated": len(mappings),
+            "dry_run": dry_run,
+        }
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Risk re-check failed: {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.analyzers.fit_scoring_weights")
+def fit_scoring_weights(dry_run: bool = False, force: bool = False):
+    """用审核反馈拟合评分权重, 留出集AUC不低于当前权重时发布新的评分规范版本（每晚定时）
+
+    force=True 时即使AUC没有提升也发布; dry_run=True 只返回拟合结果。
+    """
+    from app.services.weight_trainer import weight_trainer
+
+    logger.info("🎯 Starting scoring weight fit...")
+    db = SessionLocal()
+
+    try:
+        return weight_trainer.train(db, dry_run=dry_run, force=force)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Scoring weight fit failed: {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.analyzers.refresh_predictions")
+def refresh_predictions(statuses: Optional[List[str]] = None, dry_run: bool = False):
+    """批量重算发币概率和空投估值, 只写入有变化的行（列表接口直接读表）"""
+    from app.services.prediction_store import prediction_store
+
+    logger.info("🔮 Starting prediction refresh...")
+    db = SessionLocal()
+
+    try:
+        return {"success": True, **prediction_store.refresh(db, statuses=statuses, dry_run=dry_run)}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Prediction refresh failed: {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.analyzers.generate_action_plans")
+def generate_action_plans(tiers: Optional[List[str]] = None, dry_run: bool = False, force: bool = False):
+    """批量生成S/A级项目的行动计划, 只重新生成输入有变化的计划"""
+    from app.services.action_plan_generator import action_plan_generator
+
+    logger.info("📋 Starting action plan generation...")
+    db = SessionLocal()
+
+    try:
+        return {"success": True, **action_plan_generator.refresh_plans(
+            db, tiers=tiers or ("S", "A"), dry_run=dry_run, force=force
+        )}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Action plan generation failed: {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.analyzers.resolve_project_entities")
+def resolve_project_entities(full: bool = False, dry_run: bool = False):
+    """归并不同来源写入的重复项目（默认增量: 只为新项目找重复; full 全量重建）"""
+    from app.services.entity_resolution import entity_resolver
+
+    logger.info("🔗 Starting entity resolution...")
+    db = SessionLocal()
+
+    try:
+        result = entity_resolver.resolve(db, full=full, dry_run=dry_run)
+        if result["remapped"] and not dry_run:
+            rebuild_gazetteer.delay(refresh_coins=False)  # 别名的提及改记到规范项目
+        return {"success": True, **result}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Entity resolution failed: {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.analyzers.rebuild_gazetteer")
+def rebuild_gazetteer(refresh_coins: bool = True):
+    """重建已知项目词典快照（projects 表 + CoinGecko 币种列表）, 各进程检查到文件替换后切换"""
+    from app.services.gazetteer import gazetteer
+
+    logger.info("📚 Starting gazetteer rebuild...")
+    db = SessionLocal()
+
+    try:
+        coins = None
+        if refresh_coins:
+            from app.services.collectors.coingecko import coingecko_collector
+            coins = coingecko_collector.get_coin_list() or None  # 拉取失败时沿用上次缓存的列表
+        return {"success": True, **gazetteer.rebuild(db, coins=coins)}
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Gazetteer rebuild failed: {e}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
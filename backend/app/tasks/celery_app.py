@@ -50,6 +50,24 @@ celery_app.conf.beat_schedule = {
         "schedule": crontab(minute=0),  # 每小时整点
     },
     
+    # 每小时5分归并新项目中的重复项目（分析新项目前也会先执行一次）
+    "resolve-project-entities": {
+        "task": "app.tasks.analyzers.resolve_project_entities",
+        "schedule": crontab(minute=5),
+    },
+    
+    # 每小时15分重算发币概率和空投估值（只写入有变化的行）
+    "refresh-predictions": {
+        "task": "app.tasks.analyzers.refresh_predictions",
+        "schedule": crontab(minute=15),
+    },
+    
+    # 每小时20分批量更新S/A级项目的行动计划（只重新生成输入有变化的计划）
+    "generate-action-plans": {
+        "task": "app.tasks.analyzers.generate_action_plans",
+        "schedule": crontab(minute=20),
+    },
+    
     # 每天早上9点生成报告
     "generate-daily-report": {
         "task": "app.tasks.reporters.generate_daily_report",
@@ -61,5 +79,17 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.backfill.enrich_incomplete_projects",
         "schedule": crontab(hour="*/6"),  # 每6小时
     },
+    
+    # 每天凌晨3点用审核反馈拟合评分权重
+    "fit-scoring-weights": {
+        "task": "app.tasks.analyzers.fit_scoring_weights",
+        "schedule": crontab(hour=3, minute=0),  # 每天3:00
+    },
+    
+    # 每天凌晨4点重建已知项目词典快照（期间新增的项目由各进程增量读入）
+    "rebuild-gazetteer": {
+        "task": "app.tasks.analyzers.rebuild_gazetteer",
+        "schedule": crontab(hour=4, minute=0),  # 每天4:00
+    },
 }
 
@@ -399,6 +399,17 @@ def discover_and_analyze_projects():
         discovered_projects = project_discovery_service.discover_projects(data_sources)
         logger.info(f"  ✅ Discovered {len(discovered_projects)} high-quality projects")
         
+        # 保存发现记录（看板和待审核列表按索引读取）
+        from app.services.discovery_store import discovery_store
+        db = SessionLocal()
+        try:
+            discovery_store.upsert(db, discovered_projects)
+        except Exception as db_error:
+            logger.error(f"  ❌ Failed to save discoveries: {db_error}")
+            db.rollback()
+        finally:
+            db.close()
+        
         # 3. AI评分与分析
         logger.info("🤖 Step 3: Scoring projects...")
         analyzed_projects = []
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+历史数据回填 - 多进程重新提取历史消息中的项目提及（写入小时计数, 可选保存发现记录）
+
+    python scripts/backfill_mentions.py --source telegram=telegram_2025_09.jsonl --source twitter=tweets.jsonl
+    python scripts/backfill_mentions.py --source telegram=telegram.jsonl --workers 8 --save
+    python scripts/backfill_mentions.py --synthetic 200000 --compare-serial --no-counters   # 测量加速比
+
+输入每行一条 JSON 消息（含 text/content, created_at/date, tweet_id/message_id 等采集器字段）。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.mention_aggregator import MentionAggregator
+from app.services.parallel_extraction import ParallelExtractor
+from app.services.project_discovery import project_discovery_service
+
+SYNTHETIC_NAMES = ["Berachain", "Monad", "Hyperliquid", "Eigen Layer", "Scroll", "Zephyrix", "Quorblet", "Jupiter"]
+
+
+def read_jsonl(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def synthetic_items(count: int, seed: int = 42):
+    """合成的消息（用于测量吞吐和加速比）"""
+    import random
+    from datetime import datetime, timedelta
+
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    filler = "airdrop is live farming points for early users snapshot soon bridge testnet mainnet".split()
+    for index in range(count):
+        words = [rnd.choice(filler) for _ in range(30)]
+        for _ in range(rnd.randint(1, 3)):
+            words.insert(rnd.randrange(len(words)), rnd.choice(SYNTHETIC_NAMES))
+        yield {
+            "message_id": index,
+            "source_channel": "synthetic",
+            "text": " ".join(words) + f" https://{rnd.choice(SYNTHETIC_NAMES).lower().replace(' ', '')}.xyz",
+            "date": now - timedelta(minutes=index % (14 * 24 * 60)),
+        }
+
+
+def serial_aggregate(data_sources) -> MentionAggregator:
+    aggregator = MentionAggregator()
+    for platform, items in data_sources.items():
+        for item in items:
+            text = item.get("text", "") or item.get("content", "")
+            if text:
+                aggregator.add_item(platform, item, project_discovery_service.extract_project_mentions(text))
+    return aggregator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract project mentions from a historical corpus in parallel")
+    parser.add_argument("--source", action="append", default=[], help="平台=JSONL文件, 可重复")
+    parser.add_argument("--synthetic", type=int, default=0, help="不读文件, 生成N条合成消息")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="进程数（默认CPU核数）")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="每块消息数")
+    parser.add_argument("--no-counters", action="store_true", help="不写入项目小时计数")
+    parser.add_argument("--save", action="store_true", help="运行完整发现流程并保存发现记录")
+    parser.add_argument("--compare-serial", action="store_true", help="再串行跑一遍, 比较耗时和计数")
+    parser.add_argument("--top", type=int, default=20, help="输出前N个项目")
+    args = parser.parse_args()
+
+    def data_sources():
+        if args.synthetic:
+            return {"telegram": synthetic_items(args.synthetic)}
+        sources = {}
+        for source in args.source:
+            platform, path = source.split("=", 1)
+            sources[platform] = read_jsonl(path)
+        return sources
+
+    if not args.synthetic and not args.source:
+        parser.error("需要 --source 或 --synthetic")
+
+    if args.save:
+        from app.db import SessionLocal
+        from app.services.discovery_store import discovery_store
+
+        discovered = project_discovery_service.discover_projects(data_sources(), workers=args.workers)
+        db = SessionLocal()
+        try:
+            print(discovery_store.upsert(db, discovered))
+        finally:
+            db.close()
+        return
+
+    extractor = ParallelExtractor(workers=args.workers, chunk_size=args.chunk_size)
+    started = time.perf_counter()
+    aggregator = extractor.aggregate(data_sources(), record_counters=not args.no_counters)
+    parallel_seconds = time.perf_counter() - started
+    results = aggregator.results()
+
+    print(f"\n{'project':<32}{'mentions':>10}{'platforms':>11}{'signal':>8}")
+    for project in results[:args.top]:
+        print(
+            f"{project['project_name'][:31]:<32}{project['total_mentions']:>10}"
+            f"{project['num_platforms']:>11}{project['signal_strength']:>8}"
+        )
+    print(f"\n⚡ {aggregator.items} items, {len(results)} projects, {args.workers} workers: {parallel_seconds:.1f}s")
+
+    if args.compare_serial:
+        started = time.perf_counter()
+        serial = serial_aggregate(data_sources())
+        serial_seconds = time.perf_counter() - started
+        mismatches = sum(
+            1 for key, stats in serial.projects.items()
+            if key not in aggregator.projects or aggregator.projects[key].total_mentions != stats.total_mentions
+        ) + len(set(aggregator.projects) - set(serial.projects))
+        print(f"🐢 serial: {serial_seconds:.1f}s → speedup {serial_seconds / parallel_seconds:.2f}x, "
+              f"count mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
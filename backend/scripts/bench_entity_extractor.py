@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+实体提取微基准 - 每条消息的提取耗时（合并扫描器 vs 原来的多次正则扫描）
+
+    python scripts/bench_entity_extractor.py                     # 合成推文长度的消息
+    python scripts/bench_entity_extractor.py --length 4000       # 合成文章长度的消息
+    python scripts/bench_entity_extractor.py --input messages.txt  # 每行一条消息
+
+输出每个提取器的 µs/条 和 条/秒, 以及与原实现提取结果的平均重合度（Jaccard）。
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# 添加项目路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.entity_extractor import (
+    discord_name_extractor, discovery_name_extractor, medium_name_extractor, scan, twitter_name_extractor
+)
+
+NAMES = ["Uniswap", "Arbitrum", "Eigen Layer", "Berachain", "Jupiter", "Monad", "Hyperliquid", "Scroll", "Blast"]
+CAMEL_NAMES = ["LayerZero", "EigenLayer", "PancakeSwap", "zkSync"]
+FILLER = [
+    "airdrop", "is", "live", "farming", "points", "the", "for", "early", "users", "snapshot", "soon", "bridge",
+    "testnet", "mainnet", "and", "with", "This", "The", "New", "Launch", "交互", "空投", "教程",
+]
+EXTRAS = [
+    lambda rnd: f"https://{rnd.choice(NAMES).lower().replace(' ', '-')}.xyz/app",
+    lambda rnd: f"@{rnd.choice(NAMES).replace(' ', '')}",
+    lambda rnd: "0x" + "".join(rnd.choice("0123456789abcdef") for _ in range(40)),
+    lambda rnd: f"Introducing {rnd.choice(NAMES)}.",
+    lambda rnd: f"Introducing {rnd.choice(CAMEL_NAMES)}.",
+    lambda rnd: f"{rnd.choice(NAMES)} Protocol",
+    lambda rnd: "check out",
+]
+
+
+def legacy_extract(text: str) -> list:
+    """原 ProjectDiscoveryService.extract_project_names（每次调用多次未编译的正则扫描）"""
+    projects = []
+    projects.extend(re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text))
+    for pattern in [
+        r'(?:check out|introducing|new project|announcing)\s+([A-Z][a-zA-Z\s]+?)(?:\.|,|$)',
+        r'([A-Z][a-zA-Z]+)\s+(?:protocol|network|chain|finance|swap)',
+        r'(?:protocol|network|chain)\s+([A-Z][a-zA-Z\s]+)',
+    ]:
+        projects.extend(re.findall(pattern, text, re.IGNORECASE))
+    for url in re.findall(r'https?://([a-zA-Z0-9-]+)\.[a-z]+', text):
+        name = url.replace('-', ' ').title()
+        if len(name) > 3:
+            projects.append(name)
+    for contract in re.findall(r"0x[a-fA-F0-9]{40}", text):
+        idx = text.find(contract)
+        nearby = text[max(0, idx - 50):idx] + text[idx:min(len(text), idx + 50)]
+        projects.extend(re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', nearby))
+    projects = list(set([p.strip() for p in projects if p.strip()]))
+    noise_words = {
+        "The", "This", "That", "These", "Those", "Twitter", "Discord", "Telegram", "Medium",
+        "Http", "Https", "Com", "Org", "Io", "New", "Launch", "Project", "Protocol", "And", "For", "With"
+    }
+    return [p for p in projects if p not in noise_words and len(p) > 2 and len(p) < 50]
+
+
+def synthetic_messages(count: int, length: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        words = []
+        while sum(len(word) + 1 for word in words) < length:
+            roll = rnd.random()
+            if roll < 0.08:
+                words.append(rnd.choice(NAMES))
+            elif roll < 0.1:
+                words.append(rnd.choice(CAMEL_NAMES))
+            elif roll < 0.16:
+                words.append(rnd.choice(EXTRAS)(rnd))
+            else:
+                words.append(rnd.choice(FILLER))
+        messages.append(" ".join(words))
+    return messages
+
+
+def bench(extract, messages: list, repeat: int) -> float:
+    """最快一轮的每条耗时（µs）"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in messages:
+            extract(text)
+        best = min(best, time.perf_counter() - started)
+    return best / len(messages) * 1e6
+
+
+def jaccard(a: list, b: list) -> float:
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def camel_recall(extract, messages: list) -> float:
+    """消息中出现的驼峰项目名（LayerZero、zkSync...）被提取出来的比例"""
+    found = total = 0
+    for text in messages:
+        present = {name for name in CAMEL_NAMES if name in text}
+        total += len(present)
+        found += len(present & set(extract(text)))
+    return found / total if total else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark project-name extraction per message")
+    parser.add_argument("--input", help="消息文件（每行一条）, 默认生成合成消息")
+    parser.add_argument("--count", type=int, default=5000, help="合成消息条数")
+    parser.add_argument("--length", type=int, default=240, help="合成消息长度（字符）")
+    parser.add_argument("--repeat", type=int, default=5, help="重复轮数（取最快一轮）")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            messages = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        messages = synthetic_messages(args.count, args.length, args.seed)
+    average_length = sum(map(len, messages)) / max(len(messages), 1)
+    print(f"📨 {len(messages)} messages, avg {average_length:.0f} chars, best of {args.repeat} rounds\n")
+
+    candidates = [
+        ("legacy discovery (5 regex passes)", legacy_extract),
+        ("scan (all entities)", scan),
+        ("discovery", discovery_name_extractor.extract),
+        ("twitter", twitter_name_extractor.extract),
+        ("medium", medium_name_extractor.extract),
+        ("discord", discord_name_extractor.extract),
+    ]
+    baseline = None
+    print(f"{'extractor':<36}{'µs/msg':>10}{'msgs/s':>12}{'speedup':>10}")
+    for label, extract in candidates:
+        per_message = bench(extract, messages, args.repeat)
+        baseline = baseline or per_message
+        print(f"{label:<36}{per_message:>10.2f}{1e6 / per_message:>12,.0f}{baseline / per_message:>9.2f}x")
+
+    overlap = sum(
+        jaccard(legacy_extract(text), discovery_name_extractor.extract(text)) for text in messages
+    ) / max(len(messages), 1)
+    print(f"\n🔁 discovery vs legacy name overlap (mean Jaccard): {overlap:.3f}")
+    # 旧实现不识别驼峰名称, 不含驼峰名称的消息上的重合度反映重构本身的偏差
+    plain = [text for text in messages if not any(name in text for name in CAMEL_NAMES)]
+    if plain:
+        plain_overlap = sum(
+            jaccard(legacy_extract(text), discovery_name_extractor.extract(text)) for text in plain
+        ) / len(plain)
+        print(f"🔁 ... on {len(plain)} messages without camel-case names: {plain_overlap:.3f}")
+    print(
+        f"🐫 camel-case name recall ({', '.join(CAMEL_NAMES)}): "
+        f"legacy {camel_recall(legacy_extract, messages):.3f}, "
+        f"discovery {camel_recall(discovery_name_extractor.extract, messages):.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
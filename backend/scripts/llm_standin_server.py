@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+LLM替身服务 - 本地OpenAI兼容接口, 回放录制的响应并模拟延迟/错误/流式输出
+
+用于离线压测 analyze_new_projects、批处理、缓存和提供商路由, 不产生API费用。
+
+录制真实响应:
+    AI_RECORD_PATH=/tmp/llm_recordings.jsonl  (正常运行分析任务即可)
+
+启动替身服务:
+    python scripts/llm_standin_server.py --recordings /tmp/llm_recordings.jsonl \\
+        --latency-median 1.2 --error-rate 0.02 \\
+        --profile deepseek:median=0.8,error_rate=0.05 --profile claude:median=2.5
+
+让分析器指向替身服务:
+    AI_BASE_URL_OVERRIDE=http://localhost:8900/{provider}/v1
+    DEEPSEEK_API_KEY=standin  ANTHROPIC_API_KEY=standin  OPENAI_API_KEY=standin
+    （只有配置了密钥的提供商会被路由到, 需要哪些就设置哪些）
+
+没有录制文件时, 按请求类型（项目评分/详细分析/字段推断）生成结构完整的JSON,
+同一请求总是得到同一响应, 解析路径和真实调用一致。
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 添加项目路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services.analyzers.llm_recording import load_recordings, messages_key, system_prompt_key
+from app.services.analyzers.prompt_builder import count_message_tokens, count_tokens
+from app.services.scoring_spec import scoring_spec_store
+
+
+class Profile:
+    """一个提供商替身的行为参数"""
+
+    FIELDS = {
+        "median": float,  # 延迟中位数（秒）
+        "sigma": float,  # 对数正态分布的sigma, 越大长尾越重
+        "error_rate": float,  # 返回500的概率
+        "rate_limit_rate": float,  # 返回429的概率
+        "timeout_rate": float,  # 挂起 timeout_seconds 后返回504的概率
+        "timeout_seconds": float,
+        "ttfb": float,  # 流式响应首字节占总延迟的比例
+        "chunk_chars": int,  # 流式响应每块字符数
+        "recorded_latency": int,  # 1=有录制耗时时回放录制耗时
+    }
+
+    def __init__(self, **values):
+        self.median = 1.0
+        self.sigma = 0.4
+        self.error_rate = 0.0
+        self.rate_limit_rate = 0.0
+        self.timeout_rate = 0.0
+        self.timeout_seconds = 30.0
+        self.ttfb = 0.15
+        self.chunk_chars = 8
+        self.recorded_latency = 1
+        self.update(**values)
+
+    def update(self, **values):
+        for key, value in values.items():
+            if value is not None:
+                setattr(self, key, self.FIELDS[key](value))
+        return self
+
+    def copy(self) -> "Profile":
+        return Profile(**{key: getattr(self, key) for key in self.FIELDS})
+
+    def sample_latency(self, rng: random.Random, recorded: Optional[float]) -> float:
+        if recorded is not None and self.recorded_latency:
+            return recorded
+        return rng.lognormvariate(math.log(max(self.median, 1e-3)), self.sigma)
+
+
+def parse_profile(spec: str, base: Profile):
+    """解析 --profile deepseek:median=0.8,error_rate=0.05"""
+    name, _, params = spec.partition(":")
+    values = {}
+    for item in filter(None, params.split(",")):
+        key, _, value = item.partition("=")
+        if key not in Profile.FIELDS:
+            raise argparse.ArgumentTypeError(f"Unknown profile field: {key}")
+        values[key] = value
+    return name, base.copy().update(**values)
+
+
+class ResponseLibrary:
+    """录制响应库: 先按完整请求匹配, 再按系统提示词（调用场景）匹配, 都没有则合成"""
+
+    def __init__(self, records: List[Dict]):
+        self.by_messages: Dict[str, List[Dict]] = defaultdict(list)
+        self.by_system: Dict[str, List[Dict]] = defaultdict(list)
+        for record in records:
+            self.by_messages[record["messages_key"]].append(record)
+            self.by_system[record["system_key"]].append(record)
+
+    def pick(self, messages: List[Dict], rng: random.Random) -> Optional[Dict]:
+        candidates = self.by_messages.get(messages_key(messages)) or self.by_system.get(system_prompt_key(messages))
+        return rng.choice(candidates) if candidates else None
+
+
+def synthesize(messages: List[Dict], rng: random.Random) -> str:
+    """按请求类型合成结构完整的响应"""
+    prompt = "\n".join(m.get("content") or "" for m in messages)
+
+    if "investment_suggestion" in prompt:
+        return json.dumps({
+            "summary": "替身服务生成的项目摘要：基于已知数据，该项目处于早期阶段，社区数据有限，需要持续跟踪。",
+            "key_features": [f"特性{i + 1}" for i in range(5)],
+            "investment_suggestion": {
+                "action": "数据不足，建议小仓位观察，重点关注团队公开信息和代币经济模型。",
+                "position_size": f"{rng.randint(1, 3)}-{rng.randint(4, 5)}%",
+                "entry_timing": "等待更多数据确认",
+                "stop_loss": rng.choice([20, 25, 30]),
+            },
+        }, ensure_ascii=False, indent=2)
+
+    if "overall_score" in prompt:
+        scores = {key: round(rng.uniform(40, 90), 1) for key in (
+            "team_score", "tech_score", "community_score", "tokenomics_score", "market_timing_score"
+        )}
+        overall = round(sum(scores.values()) / len(scores), 1)
+        grade = scoring_spec_store.current().grade(overall)  # 与当前启用的评分规范一致
+        body = json.dumps({
+            "category": rng.choice(["DeFi", "NFT", "GameFi", "Infrastructure", "AI", "Layer2"]),
+            "overall_score": overall,
+            **scores,
+            "risk_score": round(rng.uniform(10, 60), 1),
+            "grade": grade,
+            "reasoning": "替身服务生成的评分理由",
+            "key_features": ["特点1", "特点2"],
+            "risks": ["风险1"],
+            "summary": "替身服务生成的一句话总结",
+        }, ensure_ascii=False, indent=2)
+        return f"```json\n{body}\n```"  # 真实模型经常包一层Markdown代码块
+
+    return json.dumps({
+        "blockchain": rng.choice(["Ethereum", "Solana", "Base", None]),
+        "category": rng.choice(["DeFi", "NFT", "GameFi", None]),
+        "twitter": None,
+        "website": None,
+    })
+
+
+def create_app(library: ResponseLibrary, default: Profile, profiles: Dict[str, Profile], seed: int) -> FastAPI:
+    app = FastAPI(title="LLM Stand-in")
+    rng = random.Random(seed)
+    stats = defaultdict(lambda: defaultdict(int))
+
+    def error(status: int, message: str, headers: Optional[Dict] = None):
+        return JSONResponse(
+            status_code=status,
+            content={"error": {"message": message, "type": "standin_error", "code": status}},
+            headers=headers,
+        )
+
+    async def complete(profile_name: str, request: Request):
+        profile = profiles.get(profile_name, default)
+        body = await request.json()
+        messages = body.get("messages", [])
+        model = body.get("model", "standin")
+        stats[profile_name]["requests"] += 1
+
+        # 故障注入
+        roll = rng.random()
+        if roll < profile.rate_limit_rate:
+            stats[profile_name]["429"] += 1
+            return error(429, "Rate limit exceeded (stand-in)", {"Retry-After": "1"})
+        roll -= profile.rate_limit_rate
+        if roll < profile.error_rate:
+            await asyncio.sleep(profile.sample_latency(rng, None) * 0.2)
+            stats[profile_name]["500"] += 1
+            return error(500, "Internal server error (stand-in)")
+        roll -= profile.error_rate
+        if roll < profile.timeout_rate:
+            await asyncio.sleep(profile.timeout_seconds)
+            stats[profile_name]["504"] += 1
+            return error(504, "Upstream timeout (stand-in)")
+
+        # 选择响应（合成响应用请求指纹做种子, 保证可复现）
+        record = library.pick(messages, rng)
+        if record:
+            content = record["content"]
+            stats[profile_name]["replayed"] += 1
+        else:
+            content = synthesize(messages, random.Random(messages_key(messages)))
+            stats[profile_name]["synthesized"] += 1
+
+        latency = profile.sample_latency(rng, record.get("latency") if record else None)
+        prompt_tokens = count_message_tokens(messages)
+        completion_tokens = count_tokens(content)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+
+        chunks = [content[i:i + profile.chunk_chars] for i in range(0, len(content), profile.chunk_chars)]
+        chunk_delay = latency * (1 - profile.ttfb) / max(len(chunks), 1)
+
+        def sse(delta: Dict, finish_reason: Optional[str] = None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        async def stream():
+            await asyncio.sleep(latency * profile.ttfb)
+            yield sse({"role": "assistant", "content": ""})
+            for chunk in chunks:
+                yield sse({"content": chunk})
+                await asyncio.sleep(chunk_delay)
+            yield sse({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.post("/v1/chat/completions")
+    async def default_completions(request: Request):
+        return await complete("default", request)
+
+    @app.post("/{profile_name}/v1/chat/completions")
+    async def profile_completions(profile_name: str, request: Request):
+        return await complete(profile_name, request)
+
+    @app.get("/stats")
+    async def get_stats():
+        return {name: dict(counts) for name, counts in stats.items()}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible LLM stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--recordings", help="AI_RECORD_PATH 录制的JSONL文件")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-median", type=float, default=1.0, help="延迟中位数（秒）")
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="对数正态分布sigma")
+    parser.add_argument("--synthetic-latency", action="store_true", help="忽略录制耗时, 始终按分布采样")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-seconds", type=float, default=30.0)
+    parser.add_argument("--ttfb", type=float, default=0.15, help="流式响应首字节占总延迟的比例")
+    parser.add_argument("--chunk-chars", type=int, default=8)
+    parser.add_argument(
+        "--profile", action="append", default=[],
+        help="按提供商覆盖参数, 如 deepseek:median=0.8,error_rate=0.05（URL前缀 /deepseek/v1）"
+    )
+    args = parser.parse_args()
+
+    default = Profile(
+        median=args.latency_median,
+        sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_seconds=args.timeout_seconds,
+        ttfb=args.ttfb,
+        chunk_chars=args.chunk_chars,
+        recorded_latency=0 if args.synthetic_latency else 1,
+    )
+    profiles = dict(parse_profile(spec, default) for spec in args.profile)
+
+    records = load_recordings(args.recordings)
+    print(f"🎬 Loaded {len(records)} recorded responses, profiles: {['default'] + list(profiles)}")
+
+    app = create_app(ResponseLibrary(records), default, profiles, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
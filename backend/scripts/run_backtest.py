@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+评分回测 - 用历史 social_metrics / onchain_metrics 快照重放评分, 对比评分规范的排名质量
+
+对比当前规范和调整权重/分级阈值后的候选规范:
+    python scripts/run_backtest.py --days 365 --step-hours 1 \\
+        --weights community=0.3,tech=0.15 --grade-cutoffs A=65
+
+对比两个已发布的版本:
+    python scripts/run_backtest.py --spec v1 --spec v2 --target market_cap --output /tmp/backtest.json
+
+输出每个规范的 IC（评分与前瞻收益的秩相关）、前k名的精确率/召回率、各分级的平均前瞻收益,
+以及赢家第一次达到提醒分级的时间比上涨起点提前多少小时。
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.backtest import TARGETS, scoring_backtest, spec_variant
+from app.services.scoring_spec import scoring_spec_store
+
+
+def parse_pairs(value: str) -> dict:
+    """"team=0.3,tech=0.2" → {"team": 0.3, "tech": 0.2}"""
+    pairs = {}
+    for item in value.split(","):
+        key, _, number = item.partition("=")
+        try:
+            pairs[key.strip()] = float(number)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Bad key=value pair: {item}")
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest scoring specs over historical snapshots")
+    parser.add_argument("--spec", action="append", default=[], help="评分规范版本（可重复, 默认当前启用版本）")
+    parser.add_argument("--spec-file", action="append", default=[], help="候选评分规范JSON文件（可重复）")
+    parser.add_argument("--weights", type=parse_pairs, help="在基准规范上调整权重, 如 community=0.3,tech=0.15")
+    parser.add_argument("--grade-cutoffs", type=parse_pairs, help="在基准规范上调整分级阈值, 如 S=80,A=65")
+    parser.add_argument("--days", type=float, default=90, help="回测天数（截止到 horizon 之前）")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="最后一个评估时间点（默认 当前时间 - horizon）")
+    parser.add_argument("--step-hours", type=float, default=24, help="评估时间点间隔（小时）")
+    parser.add_argument("--horizon-days", type=float, default=30, help="前瞻收益的时间跨度（天）")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="price_usd", help="前瞻收益的目标指标")
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--winner-return", type=float, default=1.0, help="前瞻收益达到该值算赢家（1.0 = 翻倍）")
+    parser.add_argument("--alert-grade", default="A", help="计算提前量时\"被发现\"的最低分级")
+    parser.add_argument("--max-staleness-hours", type=float, default=7 * 24)
+    parser.add_argument("--status", action="append", help="只回测指定状态的项目（可重复）")
+    parser.add_argument("--workers", type=int, help="进程数（默认 BACKTEST_WORKERS）")
+    parser.add_argument("--output", help="完整结果写入JSON文件")
+    args = parser.parse_args()
+
+    specs = {}
+    for version in args.spec or [scoring_spec_store.current().version]:
+        specs[version] = scoring_spec_store.get(version).spec
+    for path in args.spec_file:
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+        specs[spec.get("version") or Path(path).stem] = spec
+    if args.weights or args.grade_cutoffs:
+        base = next(iter(specs.values()))
+        candidate = spec_variant(base, weights=args.weights, grade_cutoffs=args.grade_cutoffs)
+        specs[candidate["version"]] = candidate
+
+    end = args.end or datetime.utcnow() - timedelta(days=args.horizon_days)
+    try:
+        result = scoring_backtest.run(
+            specs,
+            start=end - timedelta(days=args.days),
+            end=end,
+            step_hours=args.step_hours,
+            horizon_hours=args.horizon_days * 24,
+            target=args.target,
+            top_k=args.top_k,
+            winner_return=args.winner_return,
+            alert_grade=args.alert_grade,
+            max_staleness_hours=args.max_staleness_hours,
+            statuses=args.status,
+            workers=args.workers,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"\n📊 Backtest: {result['projects']} projects × {result['time_points']} time points "
+          f"in {result['elapsed_seconds']}s")
+    k = args.top_k
+    print(f"{'spec':<24}{'IC':>8}{'IC IR':>8}{f'P@{k}':>8}{f'R@{k}':>8}{f'top{k} ret':>10}"
+          f"{'winners':>9}{'early':>7}{'lead h':>8}")
+    for label, metrics in result["specs"].items():
+        lead = metrics["lead_time"]
+        cells = [
+            metrics["ic_mean"], metrics["ic_ir"], metrics[f"precision_at_{k}"], metrics[f"recall_at_{k}"],
+            metrics[f"top_{k}_mean_return"],
+        ]
+        print(f"{label:<24}" + "".join(f"{'-' if v is None else v:>8}" for v in cells[:4])
+              + f"{'-' if cells[4] is None else cells[4]:>10}"
+              + f"{lead['winners']:>9}{lead['flagged_before_breakout']:>7}"
+              + f"{'-' if lead['median_lead_hours'] is None else lead['median_lead_hours']:>8}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Full results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,28 @@
 """
 独立的分析器 - 不依赖配置文件,直接分析真实数据
+（权重和分级阈值使用随代码发布的评分规范文件, 不访问数据库）
 """
 
 import json
 import re
+import sys
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List
 
+# 添加项目路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.scoring_spec import load_spec_file, scoring_spec_store
+
 
 class StandaloneScorer:
     """独立评分器"""
     
+    def __init__(self):
+        self.spec = scoring_spec_store.compile(load_spec_file())
+    
     def calculate_scores(self, project: Dict) -> Dict:
         """计算6维度评分"""
         
@@ -57,17 +69,18 @@ class StandaloneScorer:
         risk_score = 70
         
         # 综合评分
-        overall = (
-            team_score * 0.20 +
-            tech_score * 0.25 +
-            community_score * 0.20 +
-            tokenomics_score * 0.15 +
-            market_timing * 0.10 +
-            risk_score * 0.10
-        )
+        overall = self.spec.composite({
+            'team': team_score,
+            'technology': tech_score,
+            'community': community_score,
+            'tokenomics': tokenomics_score,
+            'market_timing': market_timing,
+            'risk': risk_score,
+        })
         
         return {
             'overall': round(overall, 2),
+            'spec_version': self.spec.version,
             'team': team_score,
             'technology': tech_score,
             'community': community_score,
@@ -78,14 +91,7 @@ class StandaloneScorer:
     
     def get_grade(self, score: float) -> str:
         """获取评级"""
-        if score >= 85:
-            return 'S'
-        elif score >= 70:
-            return 'A'
-        elif score >= 55:
-            return 'B'
-        else:
-            return 'C'
+        return self.spec.grade(score)
 
 
 class StandaloneRiskDetector:
@@ -233,6 +239,7 @@ def main():
             **project,
             'grade': grade,
             'overall_score': scores['overall'],
+            'scoring_spec_version': scores['spec_version'],
             'scores': scores,
             'risk_assessment': risks,
             'analyzed_at': datetime.now().isoformat(),
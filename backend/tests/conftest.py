@@ -0,0 +1,30 @@
+"""测试配置 - 使用临时 SQLite 数据库"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# 添加项目路径
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("DEBUG", "false")
+
+
+@pytest.fixture
+def db():
+    """每个测试一个干净的数据库"""
+    import app.models  # noqa: F401 注册所有模型
+    from app.db.session import Base, SessionLocal, engine
+
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
@@ -0,0 +1,51 @@
+"""行动计划生成测试"""
+
+from app.services.action_plan_generator import action_plan_generator
+
+
+def test_identify_risks_skips_missing_scores():
+    risks = action_plan_generator.identify_risks({"has_audit": True}, {"grade": "A", "risk_score": 40})
+    assert risks == ["🚨 风险评分较低（40/100）"]
+
+
+def test_refresh_plans_with_null_team_score(db):
+    from app.models import InvestmentActionPlan, Project
+
+    db.add_all([
+        Project(project_name="NullTeam", grade="S", overall_score=88, team_score=None, risk_score=None),
+        Project(project_name="LowTeam", grade="A", overall_score=72, team_score=30, risk_score=60),
+    ])
+    db.commit()
+
+    result = action_plan_generator.refresh_plans(db)
+
+    assert result["inserted"] == 2
+    plans = {plan.project_id: plan for plan in db.query(InvestmentActionPlan)}
+    assert len(plans) == 2
+    low_team = db.query(Project).filter(Project.project_name == "LowTeam").one()
+    assert any("团队背景评分较低（30/100）" in risk for risk in plans[low_team.id].risks)
+
+
+def test_refresh_plans_update_keeps_step_progress(db):
+    from app.models import InvestmentActionPlan, Project
+
+    project = Project(project_name="Progress", grade="A", overall_score=75, team_score=70, risk_score=60)
+    db.add(project)
+    db.commit()
+    action_plan_generator.refresh_plans(db)
+
+    plan = db.query(InvestmentActionPlan).filter(InvestmentActionPlan.project_id == project.id).one()
+    plan.action_steps = [
+        {**step, "status": "completed"} if step["step_number"] == 1 else step for step in plan.action_steps
+    ]
+    plan.completion_percentage = 50
+    project.overall_score = 80
+    db.commit()
+
+    result = action_plan_generator.refresh_plans(db)
+
+    assert result["updated"] == 1
+    db.refresh(plan)
+    assert plan.action_steps[0]["status"] == "completed"
+    assert all(step["status"] == "pending" for step in plan.action_steps[1:])
+    assert plan.completion_percentage == round(100 / plan.total_steps)
@@ -0,0 +1,26 @@
+"""项目名提取测试"""
+
+import pytest
+
+from app.services.entity_extractor import (
+    discord_name_extractor, discovery_name_extractor, medium_name_extractor, twitter_name_extractor
+)
+
+EXTRACTORS = [discovery_name_extractor, twitter_name_extractor, medium_name_extractor, discord_name_extractor]
+
+
+@pytest.mark.parametrize("extractor", EXTRACTORS)
+def test_camel_case_noise_words_do_not_join_phrases(extractor):
+    assert extractor.extract("Big DeFi news on GitHub") == ["Big"]
+    assert extractor.extract("the YouTube stream on TikTok") == []
+
+
+@pytest.mark.parametrize("extractor", EXTRACTORS)
+def test_camel_case_project_names(extractor):
+    names = extractor.extract("DeFiLlama lists LayerZero, EigenLayer, PancakeSwap and zkSync today")
+    assert {"DeFiLlama", "LayerZero", "EigenLayer", "PancakeSwap", "zkSync"} <= set(names)
+
+
+def test_context_cues_apply_to_camel_case_names():
+    assert "LayerZero" in discovery_name_extractor.extract("Introducing LayerZero.")
+    assert "PancakeSwap" in discovery_name_extractor.extract("check out PancakeSwap Finance now")
@@ -0,0 +1,30 @@
+"""已知项目词典匹配测试"""
+
+from app.services.gazetteer import Gazetteer
+
+
+def make_gazetteer(tmp_path, projects):
+    gazetteer = Gazetteer(path=str(tmp_path / "gazetteer.bin"))
+    gazetteer.add_projects(projects)
+    return gazetteer
+
+
+def matched(gazetteer, text):
+    return [match.name for match in gazetteer.match(text)]
+
+
+def test_single_word_project_names_need_case_or_cashtag(tmp_path):
+    gazetteer = make_gazetteer(tmp_path, [
+        {"id": 1, "project_name": "Live"},
+        {"id": 2, "project_name": "Scroll"},
+        {"id": 3, "project_name": "zkSync"},
+    ])
+    assert matched(gazetteer, "mainnet is live, scroll down for the base fee") == []
+    assert matched(gazetteer, "Scroll mainnet and $live points") == ["Scroll", "Live"]
+    assert matched(gazetteer, "bridging to zkSync today") == ["zkSync"]
+
+
+def test_multi_word_project_names_match_any_case(tmp_path):
+    gazetteer = make_gazetteer(tmp_path, [{"id": 1, "project_name": "Eigen Layer", "twitter_handle": "eigenlayer"}])
+    assert matched(gazetteer, "restaking on eigen layer") == ["Eigen Layer"]
+    assert matched(gazetteer, "follow @eigenlayer") == ["Eigen Layer"]